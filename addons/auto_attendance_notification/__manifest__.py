@@ -5,7 +5,7 @@
     "summary": "Automatic attendance sending by department",
     "description": "This module allows automating the sending of attendance records based on department configuration.",
     "author": "Ing. Diego Venegas",
-    "depends": ["base", "base_setup", "hr", "hr_attendance"],
+    "depends": ["base", "base_setup", "hr", "hr_attendance", "xlsx_stream_export"],
     "data": [
         "security/ir.model.access.csv",
         "views/auto_attendance_config_view.xml",
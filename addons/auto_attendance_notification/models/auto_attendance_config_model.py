@@ -3,14 +3,43 @@ from odoo.exceptions import UserError  # type: ignore
 import logging
 from datetime import date, datetime, timedelta, time
 import pytz
-import io
-import base64
 from pytz import timezone
 from dateutil.relativedelta import relativedelta
-from openpyxl import Workbook
+from itertools import groupby
+from operator import itemgetter
 
 _logger = logging.getLogger(__name__)
 
+# Filas leídas por viaje desde el cursor del servidor
+ATTENDANCE_FETCH_SIZE = 2000
+
+# Asistencias de todos los departamentos en una sola consulta, ordenadas por
+# departamento para escribir cada libro al recorrerla. La conversión de zona
+# horaria, el formato y la duración se calculan en PostgreSQL por bloque.
+ATTENDANCE_QUERY = """
+    SELECT
+        e.department_id,
+        e.name,
+        to_char(
+            a.check_in AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s,
+            'YYYY-MM-DD HH24:MI:SS'
+        ),
+        to_char(
+            a.check_out AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s,
+            'YYYY-MM-DD HH24:MI:SS'
+        ),
+        ROUND(
+            (EXTRACT(EPOCH FROM (a.check_out - a.check_in)) / 3600)::numeric, 2
+        )::float8
+    FROM hr_attendance a
+    JOIN hr_employee e ON e.id = a.employee_id
+    WHERE e.department_id = ANY(%(department_ids)s)
+      AND e.active
+      AND a.check_in >= %(start)s
+      AND a.check_in <= %(end)s
+    ORDER BY e.department_id, a.check_in
+"""
+
 
 class AutoAttendanceConfig(models.Model):
     _name = "auto.attendance.config"
@@ -47,31 +76,26 @@ class AutoAttendanceConfig(models.Model):
         required=True,
     )
 
-    def _generate_excel_attachment(self):
-        self.ensure_one()
+    def _get_report_period(self, start_date=None, end_date=None):
+        """Periodo del reporte y sus límites en UTC
 
-        if not self.enabled:
-            _logger.info(
-                "This department doesn't have automatic submission enabled. Please enable this option before generating the file."
-            )
-            return
-
-        today = date.today()
-        employees = self.env["hr.employee"].search(
-            [("department_id", "=", self.department_id.id)]
-        )
-
-        if not employees:
-            _logger.info("No hay empleados en este departamento")
-            return
+        Por defecto cubre la semana anterior al miércoles actual; con
+        start_date/end_date se puede exportar cualquier periodo (p. ej. un
+        año).
 
+        Returns:
+            tuple: (start_date, end_date, start_utc, end_utc, nombre de la zona)
+        """
         # Configuración de zona horaria
-        user_tz = pytz.timezone(self.env.user.tz or "UTC")
+        tz_name = self.env.user.tz or "UTC"
+        user_tz = pytz.timezone(tz_name)
 
         # Cálculo de rango de fechas (semana anterior al miércoles actual)
-        days_starting_wednesday = (today.weekday() - 2) % 7
-        start_date = today - timedelta(days=days_starting_wednesday + 7)
-        end_date = today - timedelta(days=days_starting_wednesday + 1)
+        if not (start_date and end_date):
+            today = date.today()
+            days_starting_wednesday = (today.weekday() - 2) % 7
+            start_date = today - timedelta(days=days_starting_wednesday + 7)
+            end_date = today - timedelta(days=days_starting_wednesday + 1)
 
         # Convertir fechas a UTC para la consulta
         start_utc = (
@@ -85,94 +109,125 @@ class AutoAttendanceConfig(models.Model):
             .astimezone(pytz.UTC)
             .replace(tzinfo=None)
         )
+        return start_date, end_date, start_utc, end_utc, tz_name
 
-        # _logger.info("Rango de búsqueda: %s a %s (UTC)", start_utc, end_utc)
-
-        # Buscar asistencias
-        attendances = self.env["hr.attendance"].search(
-            [
-                ("employee_id", "in", employees.ids),
-                ("check_in", ">=", start_utc),
-                ("check_in", "<=", end_utc),
-            ],
-            order="check_in asc",
-        )
+    def _iter_attendance_rows(self, department_ids, start_utc, end_utc, tz_name):
+        """Filas de ATTENDANCE_QUERY leídas por bloques (cursor con nombre)
 
-        if not attendances:
-            _logger.info(
-                f"No attendances were recorded between {start_date} y {end_date}"
+        Yields:
+            tuple: (department_id, empleado, entrada, salida, duración)
+        """
+        cr = self.env.cr
+        with cr._cnx.cursor(name="auto_attendance_report") as named:
+            named.itersize = ATTENDANCE_FETCH_SIZE
+            named.execute(
+                ATTENDANCE_QUERY,
+                {
+                    "tz": tz_name,
+                    "department_ids": list(department_ids),
+                    "start": start_utc,
+                    "end": end_utc,
+                },
             )
-            return
+            while True:
+                rows = named.fetchmany(ATTENDANCE_FETCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+
+    def _generate_excel_attachments(self, start_date=None, end_date=None):
+        """Genera en una sola pasada el Excel de cada departamento configurado
+
+        Las asistencias de todos los departamentos se leen con una consulta
+        ordenada y cada libro se escribe en memoria constante
+        (xlsx.stream.export) mientras se recorre. Cada departamento se genera
+        en su propio savepoint: si uno falla, los demás se conservan.
+
+        Returns:
+            dict: {config_id: ir.attachment}
+        """
+        configs = self.filtered("enabled")
+        if not configs:
+            return {}
 
-        # Crear archivo Excel
-        workbook = Workbook()
-        sheet = workbook.active
-        sheet.title = "Asistencias"
-
-        # Encabezados
-        headers = ["Empleado", "Entrada", "Salida", "Duración (hrs)"]
-        sheet.append(headers)
-
-        # Llenar datos
-        for att in attendances:
-            # Convertir a zona horaria local
-            check_in_local = (
-                pytz.UTC.localize(att.check_in).astimezone(user_tz)
-                if att.check_in
-                else None
-            )
-            check_out_local = (
-                pytz.UTC.localize(att.check_out).astimezone(user_tz)
-                if att.check_out
-                else None
-            )
+        start_date, end_date, start_utc, end_utc, tz_name = self._get_report_period(
+            start_date, end_date
+        )
+        configs_by_department = {}
+        for config in configs:
+            configs_by_department.setdefault(config.department_id.id, self.browse())
+            configs_by_department[config.department_id.id] |= config
 
-            # Calcular duración usando horas locales
-            duration = ""
-            if check_in_local and check_out_local:
-                duration = round(
-                    (check_out_local - check_in_local).total_seconds() / 3600, 2
-                )
+        Export = self.env["xlsx.stream.export"]
+        attachments = {}
+        rows = self._iter_attendance_rows(
+            configs_by_department, start_utc, end_utc, tz_name
+        )
+        for department_id, department_rows in groupby(rows, key=itemgetter(0)):
+            department_configs = configs_by_department[department_id]
+            department = department_configs.department_id
+
+            def write_workbook(workbook):
+                sheet = workbook.add_worksheet("Asistencias")
+
+                # Encabezados
+                headers = ["Empleado", "Entrada", "Salida", "Duración (hrs)"]
+                sheet.write_row(0, 0, headers)
+
+                # Llenar datos
+                for row, (_dep, employee, check_in, check_out, duration) in enumerate(
+                    department_rows, 1
+                ):
+                    sheet.write_row(
+                        row,
+                        0,
+                        [
+                            employee or "",
+                            check_in or "Sin entrada",
+                            check_out or "Sin salida",
+                            duration if duration is not None else "",
+                        ],
+                    )
 
-            # Agregamos los datos en el excel
-            sheet.append(
-                [
-                    att.employee_id.name,
-                    (
-                        check_in_local.strftime("%Y-%m-%d %H:%M:%S")
-                        if check_in_local
-                        else "Sin entrada"
-                    ),
-                    (
-                        check_out_local.strftime("%Y-%m-%d %H:%M:%S")
-                        if check_out_local
-                        else "Sin salida"
-                    ),
-                    duration,
-                ]
-            )
+            filename = f"attendance_{department.name}_{start_date}_a_{end_date}.xlsx"
+            try:
+                with self.env.cr.savepoint():
+                    attachment = Export.create_attachment(
+                        filename,
+                        write_workbook,
+                        res_model=self._name,
+                        res_id=department_configs[0].id,
+                    )
+            except Exception as e:
+                # groupby descarta las filas restantes del departamento
+                _logger.error(
+                    f"Error generating the attendance file of {department.name}: {e}",
+                    exc_info=True,
+                )
+                continue
+            for config in department_configs:
+                attachments[config.id] = attachment
 
-        # Preparar archivo para descarga
-        file_stream = io.BytesIO()
-        workbook.save(file_stream)
-        file_stream.seek(0)
+        for config in configs:
+            if config.id not in attachments:
+                _logger.info(
+                    f"No attendances were recorded for {config.department_id.name} "
+                    f"between {start_date} y {end_date}"
+                )
+        return attachments
 
-        filename = (
-            f"attendance_{self.department_id.name}_{start_date}_a_{end_date}.xlsx"
-        )
+    def _generate_excel_attachment(self, start_date=None, end_date=None):
+        """Genera el Excel de asistencias del departamento de esta configuración"""
+        self.ensure_one()
 
-        attachment = self.env["ir.attachment"].create(
-            {
-                "name": filename,
-                "type": "binary",
-                "datas": base64.b64encode(file_stream.read()),
-                "res_model": self._name,
-                "res_id": self.id,
-                "mimetype": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            }
-        )
+        if not self.enabled:
+            _logger.info(
+                "This department doesn't have automatic submission enabled. Please enable this option before generating the file."
+            )
+            return
 
-        return attachment
+        attachments = self._generate_excel_attachments(start_date, end_date)
+        return attachments.get(self.id)
 
     def action_generate_excel(self):
         """
@@ -217,64 +272,65 @@ class AutoAttendanceConfig(models.Model):
                 },
             }
 
+
+    def _prepare_mail_values(self, attachment):
+        self.ensure_one()
+        return {
+            "subject": f"Asistencias Departamento {self.department_id.name}",
+            "body_html": f"<p>Adjunto el reporte de asistencias para el departamento <b>{self.department_id.name}</b>.</p>",
+            "email_to": self.email,
+            "attachment_ids": [(6, 0, [attachment.id])],
+        }
+
     @api.model
     def action_send_attendance(self):
         """
-        Método que usará el cron. Recorre todas las configs enabled,
-        llama a _generate_excel_attachment() y retorna/loggea resultados.
+        Método que usará el cron. Genera en una sola pasada los archivos de
+        todas las configs enabled y deja los correos en la cola de mail.mail,
+        que envía el cron estándar de correo.
         """
         configs = self.search([("enabled", "=", True)])
 
-        _logger.info("info %s", configs)
-
         if not configs:
             _logger.info("There are no active configurations for sending")
             return
 
-        for config in configs:
-            try:
-                # Generar y obtener attachment directamente
-                attachment = config._generate_excel_attachment()
-
-                _logger.info("attachment %s", attachment)
+        attachments = configs._generate_excel_attachments()
 
-                if not attachment:
-                    _logger.warning(
-                        f"No file was generated for {config.department_id.name}"
-                    )
-                    continue
-
-                config.action_generate_excel()
+        queued = False
+        for config in configs:
+            attachment = attachments.get(config.id)
+            if not attachment:
+                _logger.warning(
+                    f"No file was generated for {config.department_id.name}"
+                )
+                continue
 
-                # # Aqui se conecta con el modulo de email
-                email_to = config.email
+            if not config.email:
+                _logger.warning(
+                    f"There is no email configured for {config.department_id.name}"
+                )
+                continue
 
-                if not email_to:
-                    _logger.warning(
-                        f"There is no email configured for {config.department_id.name}"
+            try:
+                # Un savepoint por config: un error no revierte a las demás
+                with self.env.cr.savepoint():
+                    self.env["mail.mail"].create(
+                        config._prepare_mail_values(attachment)
                     )
-                    continue
-
-                # Construir el email
-                mail_values = {
-                    "subject": f"Asistencias Departamento {config.department_id.name}",
-                    "body_html": f"<p>Adjunto el reporte de asistencias para el departamento <b>{config.department_id.name}</b>.</p>",
-                    "email_to": email_to,
-                    "attachment_ids": [(6, 0, [attachment.id])],
-                }
-
-                mail = self.env["mail.mail"].create(mail_values)
-
-                _logger.info("EMAIL %s", mail)
-
-                mail.send()
-
+                queued = True
                 _logger.info(
-                    f"Mail sent to {email_to} with assistance from the department {config.department_id.name}"
+                    f"Mail queued to {config.email} with assistance from the department {config.department_id.name}"
                 )
-
             except Exception as e:
                 _logger.error(
                     f"Error sending email to {config.department_id.name}: {str(e)}",
                     exc_info=True,
                 )
+
+        if queued:
+            mail_cron = self.env.ref(
+                "mail.ir_cron_mail_scheduler_action", raise_if_not_found=False
+            )
+            if mail_cron:
+                mail_cron._trigger()
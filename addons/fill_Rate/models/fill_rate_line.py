@@ -2,6 +2,18 @@
 from odoo import models, fields, api
 from odoo.tools.float_utils import float_compare
 
+from .res_partner import FILL_RATE_COUNTER_FIELDS
+
+# Order states that count towards the supplier's Fill Rate
+EVALUATED_STATES = ("purchase", "done")
+# Line fields that change the supplier counters when written
+COUNTER_TRIGGER_FIELDS = {
+    "partner_id",
+    "purchase_order_id",
+    "qty_ordered",
+    "qty_received",
+}
+
 
 class FillRateLine(models.Model):
     """
@@ -119,30 +131,103 @@ class FillRateLine(models.Model):
                 record.fill_rate = 0.0
                 record.fill_rate_status = "pending"
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env["res.partner"]._apply_fill_rate_deltas(lines._get_counter_deltas())
+        return lines
+
+    def write(self, vals):
+        if not COUNTER_TRIGGER_FIELDS & set(vals):
+            return super().write(vals)
+        before = self._get_counter_deltas(sign=-1)
+        res = super().write(vals)
+        self.env["res.partner"]._apply_fill_rate_deltas(
+            self._merge_counter_deltas(before, self._get_counter_deltas())
+        )
+        return res
+
+    def unlink(self):
+        deltas = self._get_counter_deltas(sign=-1)
+        res = super().unlink()
+        self.env["res.partner"]._apply_fill_rate_deltas(deltas)
+        return res
+
+    def _get_counter_deltas(self, sign=1):
+        """
+        Contribution of these lines to their suppliers' aggregate counters.
+
+        :return: {partner_id: {counter_field: value * sign}}
+        """
+        deltas = {}
+        for line in self:
+            if not line.partner_id or line.state not in EVALUATED_STATES:
+                continue
+            delta = deltas.setdefault(
+                line.partner_id.id, dict.fromkeys(FILL_RATE_COUNTER_FIELDS, 0)
+            )
+            delta["fill_rate_count"] += sign
+            if line.fill_rate_status == "complete":
+                delta["fill_rate_complete_count"] += sign
+            elif line.fill_rate_status == "partial":
+                delta["fill_rate_partial_count"] += sign
+            if line.qty_ordered > 0:
+                delta["fill_rate_qty_ordered"] += sign * line.qty_ordered
+                delta["fill_rate_qty_received"] += sign * line.qty_received
+                if line.qty_received > 0:
+                    delta["fill_rate_received_count"] += sign
+        return deltas
+
+    @api.model
+    def _merge_counter_deltas(self, *all_deltas):
+        merged = {}
+        for deltas in all_deltas:
+            for partner_id, delta in deltas.items():
+                target = merged.setdefault(
+                    partner_id, dict.fromkeys(FILL_RATE_COUNTER_FIELDS, 0)
+                )
+                for field, value in delta.items():
+                    target[field] += value
+        return merged
+
     def update_received_quantity(self):
         """
         Updates the received quantity from validated stock moves.
         Called automatically when a receipt is validated.
+
+        The purchase lines are read once for the whole recordset and the
+        lines are written in groups of equal quantity; lines whose quantity
+        did not change are not written.
         """
-        for record in self:
-            if not record.purchase_order_line_id:
-                continue
+        lines = self.filtered("purchase_order_line_id")
+        if not lines:
+            return True
+
+        # Use qty_received directly from the purchase lines
+        # Odoo automatically computes this field based on validated receipts
+        received_by_po_line = {
+            po_line["id"]: po_line["qty_received"]
+            for po_line in lines.purchase_order_line_id.read(["qty_received"])
+        }
 
-            # Use qty_received directly from the purchase line
-            # Odoo automatically computes this field based on validated receipts
-            purchase_line = record.purchase_order_line_id
-            total_received = purchase_line.qty_received
+        ids_by_qty = {}
+        for record in lines:
+            total_received = received_by_po_line[record.purchase_order_line_id.id]
+            if float_compare(
+                total_received, record.qty_received, precision_digits=5
+            ) == 0 and bool(record.date_received) == (total_received > 0):
+                continue
+            ids_by_qty.setdefault(total_received, []).append(record.id)
 
+        now = fields.Datetime.now()
+        for total_received, record_ids in ids_by_qty.items():
             # Update using write so that computed fields are triggered
-            if total_received > 0:
-                record.write(
-                    {
-                        "qty_received": total_received,
-                        "date_received": fields.Datetime.now(),
-                    }
-                )
-            else:
-                record.write({"qty_received": total_received, "date_received": False})
+            self.browse(record_ids).write(
+                {
+                    "qty_received": total_received,
+                    "date_received": now if total_received > 0 else False,
+                }
+            )
 
         # Computed fields are automatically recalculated with write()
         return True
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
+import threading
+import time
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
@@ -25,58 +27,78 @@ class PurchaseOrder(models.Model):
         help="Indicates whether fill rate records have already been created for this order",
     )
 
+    def write(self, vals):
+        if "state" not in vals:
+            return super().write(vals)
+        # fill.rate.line.state is a stored related field: it is recomputed
+        # without going through fill.rate.line.write, so the supplier
+        # counters are adjusted here
+        lines = self.fill_rate_line_ids
+        before = lines._get_counter_deltas(sign=-1)
+        res = super().write(vals)
+        self.env["res.partner"]._apply_fill_rate_deltas(
+            lines._merge_counter_deltas(before, lines._get_counter_deltas())
+        )
+        return res
+
     def button_confirm(self):
         """
         Overrides the confirmation method to create Fill Rate records.
         """
         res = super(PurchaseOrder, self).button_confirm()
 
-        # Create fill rate records for each order line
-        for order in self:
-            if not order.fill_rate_created:
-                order._create_fill_rate_lines()
+        # Create fill rate records for all confirmed order lines at once
+        self.filtered(lambda o: not o.fill_rate_created)._create_fill_rate_lines()
 
         return res
 
-    def _create_fill_rate_lines(self):
-        """
-        Creates a fill.rate.line record for each purchase order line.
-        Executed automatically when the order is confirmed.
-        """
+    def _prepare_fill_rate_line_vals(self):
+        """Values of the fill.rate.line records for this order's lines."""
         self.ensure_one()
 
-        FillRateLine = self.env["fill.rate.line"]
+        # Detect origin (you can customize this logic)
+        origin_type = "manual"
+        if self.origin:
+            if "bot" in self.origin.lower() or "auto" in self.origin.lower():
+                origin_type = "bot"
 
+        order_date = self.date_order.date() if self.date_order else fields.Date.today()
+
+        vals_list = []
         for line in self.order_line:
             # Only create for lines with products (no services without stock)
             if line.product_id and line.product_qty > 0:
-
-                # Detect origin (you can customize this logic)
-                origin_type = "manual"
-                if self.origin:
-                    if "bot" in self.origin.lower() or "auto" in self.origin.lower():
-                        origin_type = "bot"
-
-                # Create history record
-                FillRateLine.create(
+                vals_list.append(
                     {
                         "partner_id": self.partner_id.id,
                         "purchase_order_id": self.id,
                         "purchase_order_line_id": line.id,
                         "product_id": line.product_id.id,
-                        "order_date": (
-                            self.date_order.date()
-                            if self.date_order
-                            else fields.Date.today()
-                        ),
+                        "order_date": order_date,
                         "origin_type": origin_type,
                         "qty_ordered": line.product_qty,
                         "qty_received": 0.0,  # Updated when goods arrive
                         "uom_id": line.product_uom.id,
                     }
                 )
+        return vals_list
+
+    def _create_fill_rate_lines(self):
+        """
+        Creates a fill.rate.line record for each purchase order line of all
+        the orders in a single multi-create.
+        Executed automatically when the orders are confirmed.
+
+        :return: the created fill.rate.line records
+        """
+        vals_list = []
+        for order in self:
+            vals_list.extend(order._prepare_fill_rate_line_vals())
 
-        self.fill_rate_created = True
+        lines = self.env["fill.rate.line"].create(vals_list)
+        if self:
+            self.write({"fill_rate_created": True})
+        return lines
 
     def action_view_fill_rate(self):
         """Opens the view of fill rate lines for this order."""
@@ -94,21 +116,95 @@ class PurchaseOrder(models.Model):
         """
         Creates fill.rate.line records for confirmed orders that don't have them.
         Useful for orders that existed before the module was installed.
+
+        All lines are created in one batch and their received quantities are
+        reconciled together. If the batch fails, orders are retried one by
+        one so a single bad order does not block the rest.
         """
-        for order in self:
-            if order.state in ["purchase", "done"] and not order.fill_rate_created:
+        orders = self.filtered(
+            lambda o: o.state in ["purchase", "done"] and not o.fill_rate_created
+        )
+        if not orders:
+            return True
+
+        try:
+            with self.env.cr.savepoint():
+                orders._create_fill_rate_lines().update_received_quantity()
+        except Exception as e:
+            _logger.warning(
+                "Batch creation of fill rate lines failed (%s), retrying per order", e
+            )
+            for order in orders:
                 try:
-                    order._create_fill_rate_lines()
-                    for fill_line in order.fill_rate_line_ids:
-                        fill_line.update_received_quantity()
-                except Exception as e:
+                    with self.env.cr.savepoint():
+                        order._create_fill_rate_lines().update_received_quantity()
+                except Exception as e_order:
                     _logger.error(
-                        "Unexpected error processing order %s: %s", order.name, e
+                        "Unexpected error processing order %s: %s", order.name, e_order
                     )
-                    continue
 
         return True
 
+    @api.model
+    def _cron_backfill_fill_rate(self, batch_size=200, time_limit=240):
+        """
+        Creates the missing fill rate records of historical orders in chunks.
+
+        Each chunk is committed on its own so the work done survives a
+        timeout. When the time budget runs out, the cron is re-triggered to
+        continue where it stopped.
+
+        :return: dict with processed orders, created lines and remaining orders
+        """
+        domain = [
+            ("state", "in", ["purchase", "done"]),
+            ("fill_rate_created", "=", False),
+        ]
+        total = self.search_count(domain)
+        processed = created = 0
+        failed_ids = []
+        timed_out = False
+        started = time.monotonic()
+
+        _logger.info("Fill Rate backfill: %d orders pending", total)
+        while True:
+            if time.monotonic() - started >= time_limit:
+                timed_out = True
+                break
+            orders = self.search(
+                domain + [("id", "not in", failed_ids)], limit=batch_size, order="id"
+            )
+            if not orders:
+                break
+
+            lines_before = len(orders.fill_rate_line_ids)
+            orders.create_missing_fill_rate_lines()
+            # Orders that failed stay pending for the next run
+            failed_ids += orders.filtered(lambda o: not o.fill_rate_created).ids
+            created += len(orders.fill_rate_line_ids) - lines_before
+            processed += len(orders)
+
+            _logger.info(
+                "Fill Rate backfill: %d/%d orders processed (%d lines created, %d failed)",
+                processed,
+                total,
+                created,
+                len(failed_ids),
+            )
+            # Tests run in a single transaction that must not be committed
+            if not getattr(threading.current_thread(), "testing", False):
+                self.env.cr.commit()
+            self.env.invalidate_all()
+
+        remaining = self.search_count(domain)
+        if timed_out and remaining > len(failed_ids):
+            cron = self.env.ref(
+                "fill_Rate.ir_cron_backfill_fill_rate", raise_if_not_found=False
+            )
+            if cron:
+                cron._trigger()
+        return {"processed": processed, "created": created, "remaining": remaining}
+
 
 class PurchaseOrderLine(models.Model):
     """
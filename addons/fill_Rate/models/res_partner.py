@@ -1,5 +1,15 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
+
+# Aggregate counters kept on the supplier (see fill.rate.line deltas)
+FILL_RATE_COUNTER_FIELDS = [
+    "fill_rate_count",
+    "fill_rate_complete_count",
+    "fill_rate_partial_count",
+    "fill_rate_received_count",
+    "fill_rate_qty_ordered",
+    "fill_rate_qty_received",
+]
 
 
 class ResPartner(models.Model):
@@ -42,58 +52,70 @@ class ResPartner(models.Model):
         "fill.rate.line", "partner_id", string="Fill Rate History"
     )
 
-    # Statistics
+    # Statistics (aggregate counters maintained by fill.rate.line deltas)
     fill_rate_count = fields.Integer(
         string="Total Orders",
-        compute="_compute_fill_rate_stats",
+        readonly=True,
         help="Total number of evaluated order lines",
     )
 
     fill_rate_complete_count = fields.Integer(
         string="Complete Orders",
-        compute="_compute_fill_rate_stats",
+        readonly=True,
         help="Orders with 100% fulfillment",
     )
 
     fill_rate_partial_count = fields.Integer(
         string="Partial Orders",
-        compute="_compute_fill_rate_stats",
+        readonly=True,
         help="Orders with less than 100% fulfillment",
     )
 
+    fill_rate_received_count = fields.Integer(
+        string="Received Lines",
+        readonly=True,
+        help="Evaluated lines with at least one unit received",
+    )
+
+    fill_rate_qty_ordered = fields.Float(
+        string="Total Ordered",
+        readonly=True,
+        digits="Product Unit of Measure",
+    )
+
+    fill_rate_qty_received = fields.Float(
+        string="Total Received",
+        readonly=True,
+        digits="Product Unit of Measure",
+    )
+
     fill_rate_last_update = fields.Datetime(
         string="Last Update", compute="_compute_fill_rate", store=True
     )
 
-    @api.depends(
-        "fill_rate_history_ids.fill_rate",
-        "fill_rate_history_ids.state",
-        "fill_rate_history_ids.qty_ordered",
-        "fill_rate_history_ids.qty_received",
-    )
+    def init(self):
+        """Backfills the aggregate counters (e.g. after upgrading the module)."""
+        super().init()
+        if tools.table_exists(self.env.cr, "fill_rate_line"):
+            self._recompute_fill_rate_counters(notify=False)
+
+    @api.depends("fill_rate_qty_ordered", "fill_rate_qty_received")
     def _compute_fill_rate(self):
         """
-        Computes the supplier's average Fill Rate based on their history.
+        Computes the supplier's average Fill Rate from the aggregate counters.
         Only considers orders in 'purchase' or 'done' state.
         """
         for partner in self:
-            valid_lines = partner.fill_rate_history_ids.filtered(
-                lambda l: l.state in ["purchase", "done"] and l.qty_ordered > 0
-            )
-
-            if valid_lines:
-                total_ordered = sum(valid_lines.mapped("qty_ordered"))
-                total_received = sum(valid_lines.mapped("qty_received"))
-
+            if partner.fill_rate_qty_ordered > 0:
                 partner.fill_rate = (
-                    total_received / total_ordered if total_ordered > 0 else 0.0
+                    partner.fill_rate_qty_received / partner.fill_rate_qty_ordered
                 )
                 partner.fill_rate_last_update = fields.Datetime.now()
             else:
                 partner.fill_rate = 0.0
                 partner.fill_rate_last_update = False
 
-    @api.depends("fill_rate", "fill_rate_history_ids")
+    @api.depends("fill_rate", "fill_rate_received_count")
     def _compute_supplier_class(self):
         """
         Automatically classifies the supplier according to their Fill Rate.
@@ -113,14 +135,8 @@ class ResPartner(models.Model):
         )
 
         for partner in self:
-            # Check whether there is sufficient data (at least 1 confirmed order with receipt)
-            valid_orders = partner.fill_rate_history_ids.filtered(
-                lambda l: l.state in ["purchase", "done"]
-                and l.qty_ordered > 0
-                and l.qty_received > 0
-            )
-
-            if not valid_orders:
+            # Sufficient data: at least 1 confirmed order line with receipt
+            if not partner.fill_rate_received_count:
                 partner.supplier_class = "new"
             elif partner.fill_rate >= threshold_a:
                 partner.supplier_class = "A"
@@ -129,6 +145,95 @@ class ResPartner(models.Model):
             else:
                 partner.supplier_class = "C"
 
+    def _apply_fill_rate_deltas(self, deltas):
+        """
+        Adds line deltas to the aggregate counters.
+
+        :param deltas: {partner_id: {counter_field: delta}}
+        Uses in-place SQL increments so concurrent receipts for the same
+        supplier never overwrite each other.
+        """
+        partner_ids = []
+        for partner_id, delta in deltas.items():
+            changes = {field: value for field, value in delta.items() if value}
+            if not changes:
+                continue
+            assignments = ", ".join(f"{field} = {field} + %s" for field in changes)
+            self.env.cr.execute(
+                f"UPDATE res_partner SET {assignments} WHERE id = %s",
+                (*changes.values(), partner_id),
+            )
+            partner_ids.append(partner_id)
+
+        if partner_ids:
+            partners = self.browse(partner_ids)
+            partners.invalidate_recordset(FILL_RATE_COUNTER_FIELDS)
+            # Recompute fill_rate / supplier_class from the new counters
+            partners.modified(FILL_RATE_COUNTER_FIELDS)
+
+    @api.model
+    def _recompute_fill_rate_counters(self, partner_ids=None, notify=True):
+        """
+        Recomputes the aggregate counters from fill.rate.line in one grouped
+        query (backfills, corrections). Without partner_ids every supplier is
+        recomputed.
+
+        :return: IDs of the updated partners
+        """
+        self.env["fill.rate.line"].flush_model()
+        if partner_ids is not None:
+            if not partner_ids:
+                return []
+            scope = "id IN %(partner_ids)s"
+        else:
+            scope = """
+                id IN (SELECT partner_id FROM agg)
+                OR fill_rate_count <> 0
+                OR fill_rate_qty_ordered <> 0
+            """
+
+        self.env.cr.execute(
+            f"""
+            WITH agg AS (
+                SELECT
+                    partner_id,
+                    COUNT(*) AS line_count,
+                    COUNT(*) FILTER (WHERE fill_rate_status = 'complete') AS complete_count,
+                    COUNT(*) FILTER (WHERE fill_rate_status = 'partial') AS partial_count,
+                    COUNT(*) FILTER (
+                        WHERE qty_ordered > 0 AND qty_received > 0
+                    ) AS received_count,
+                    COALESCE(SUM(qty_ordered) FILTER (WHERE qty_ordered > 0), 0) AS qty_ordered,
+                    COALESCE(SUM(qty_received) FILTER (WHERE qty_ordered > 0), 0) AS qty_received
+                FROM fill_rate_line
+                WHERE state IN ('purchase', 'done')
+                GROUP BY partner_id
+            ),
+            target AS (
+                SELECT id FROM res_partner WHERE {scope}
+            )
+            UPDATE res_partner p
+            SET fill_rate_count = COALESCE(agg.line_count, 0),
+                fill_rate_complete_count = COALESCE(agg.complete_count, 0),
+                fill_rate_partial_count = COALESCE(agg.partial_count, 0),
+                fill_rate_received_count = COALESCE(agg.received_count, 0),
+                fill_rate_qty_ordered = COALESCE(agg.qty_ordered, 0),
+                fill_rate_qty_received = COALESCE(agg.qty_received, 0)
+            FROM target
+            LEFT JOIN agg ON agg.partner_id = target.id
+            WHERE p.id = target.id
+            RETURNING p.id
+            """,
+            {"partner_ids": tuple(partner_ids or ())},
+        )
+        updated_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        if notify and updated_ids:
+            partners = self.browse(updated_ids)
+            partners.invalidate_recordset(FILL_RATE_COUNTER_FIELDS)
+            partners.modified(FILL_RATE_COUNTER_FIELDS)
+        return updated_ids
+
     @api.depends("supplier_class")
     def _compute_supplier_class_display(self):
         """
@@ -151,24 +256,6 @@ class ResPartner(models.Model):
                 partner.supplier_class, "Unclassified"
             )
 
-    @api.depends(
-        "fill_rate_history_ids.fill_rate_status", "fill_rate_history_ids.state"
-    )
-    def _compute_fill_rate_stats(self):
-        """Computes statistics from the supplier's history."""
-        for partner in self:
-            history = partner.fill_rate_history_ids.filtered(
-                lambda l: l.state in ["purchase", "done"]
-            )
-
-            partner.fill_rate_count = len(history)
-            partner.fill_rate_complete_count = len(
-                history.filtered(lambda l: l.fill_rate_status == "complete")
-            )
-            partner.fill_rate_partial_count = len(
-                history.filtered(lambda l: l.fill_rate_status == "partial")
-            )
-
     def action_view_fill_rate_history(self):
         """Opens the Fill Rate history view for this supplier."""
         self.ensure_one()
@@ -186,13 +273,10 @@ class ResPartner(models.Model):
         Manually recalculates the supplier's Fill Rate.
         Useful for corrections or bulk updates.
         """
-        for partner in self:
-            partner.fill_rate_history_ids.update_received_quantity()
+        self.fill_rate_history_ids.update_received_quantity()
 
-        # Force recomputation of stored computed fields
-        self._compute_fill_rate()
-        self._compute_supplier_class()
-        self._compute_fill_rate_stats()
+        # Rebuild the aggregate counters in one grouped query
+        self._recompute_fill_rate_counters(self.ids)
 
         return {
             "type": "ir.actions.client",
@@ -35,24 +35,15 @@ class StockPicking(models.Model):
         if not self.purchase_id:
             return
 
-        FillRateLine = self.env["fill.rate.line"]
-
-        # Process each validated move
-        for move in self.move_ids_without_package.filtered(lambda m: m.state == "done"):
-            # Find the related purchase order line
-            if not move.purchase_line_id:
-                continue
-
-            # Find the corresponding fill rate record
-            fill_rate_line = FillRateLine.search(
-                [("purchase_order_line_id", "=", move.purchase_line_id.id)], limit=1
-            )
-
-            if fill_rate_line:
-                # Update the received quantity
-                fill_rate_line.update_received_quantity()
-
-        # Recalculate the supplier's fill rate
-        if self.partner_id:
-            self.partner_id._compute_fill_rate()
-            self.partner_id._compute_supplier_class()
+        # All fill rate records of the validated moves in one search
+        purchase_line_ids = self.move_ids_without_package.filtered(
+            lambda m: m.state == "done" and m.purchase_line_id
+        ).purchase_line_id.ids
+        if not purchase_line_ids:
+            return
+
+        fill_rate_lines = self.env["fill.rate.line"].search(
+            [("purchase_order_line_id", "in", purchase_line_ids)]
+        )
+        # Updating the lines adjusts the supplier counters incrementally
+        fill_rate_lines.update_received_quantity()
@@ -5,9 +5,11 @@
     "category": "Custom",
     "license": "LGPL-3",
     "summary": "Automatically generated module",
-    "depends": ["base", "helpdesk", "mail"],
+    "depends": ["base", "helpdesk", "mail", "xlsx_stream_export"],
     "data": [
         "security/ir.model.access.csv",
+        "data/ticket_close_notification_templates.xml",
+        "data/ir_cron.xml",
         "views/help_desk_report_wizard_views.xml",
         "views/help_desk_report_views.xml",
     ],
@@ -0,0 +1,19 @@
+from odoo import http
+from odoo.http import request, content_disposition
+
+
+class HelpDeskReportController(http.Controller):
+
+    @http.route("/help_desk_report/export/<int:wizard_id>", type="http", auth="user")
+    def export_report(self, wizard_id, **kwargs):
+        wizard = request.env["help.desk.report.wizard"].browse(wizard_id)
+        if not wizard.exists():
+            return request.not_found()
+
+        # The rows are sent while they are read (see _stream_export)
+        filename, mimetype, chunks = wizard._stream_export()
+        headers = [
+            ("Content-Type", mimetype),
+            ("Content-Disposition", content_disposition(filename)),
+        ]
+        return request.make_response(chunks, headers)
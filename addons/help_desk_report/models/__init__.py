@@ -1,2 +1,3 @@
 from . import help_desk_report_wizard_models
+from . import helpdesk_close_notification
 from . import helpdesk_ticket
@@ -1,79 +1,302 @@
 import csv
-import base64
 from io import StringIO
-from odoo import models, fields
+from odoo import models, fields, _
+from odoo.exceptions import UserError
 from datetime import datetime
 
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Rows fetched per round trip from the server-side cursor
+EXPORT_FETCH_SIZE = 2000
+RESOLUTION_PERCENTILES = (0.5, 0.9, 0.95)
+
+PRIORITY_LABELS = {
+    "0": "No priority",
+    "1": "Low",
+    "2": "Medium",
+    "3": "High",
+}
+
+TICKET_COLUMNS = [
+    "id",
+    "ticket_ref",
+    "ticket",
+    "create_date",
+    "close_date",
+    "created_by",
+    "assigned_to",
+    "team",
+    "elapsed_hours",
+    "elapsed_days",
+    "priority",
+]
+SUMMARY_COLUMNS = [
+    "dimension",
+    "group",
+    "tickets",
+    "resolved",
+    "avg_hours",
+    "p50_hours",
+    "p90_hours",
+    "p95_hours",
+]
+
+# Ordered by (user_id, create_date): backed by helpdesk_ticket_user_create_date_idx
+TICKETS_QUERY = """
+    SELECT
+        t.id,
+        t.ticket_ref,
+        t.name AS ticket,
+        to_char(t.create_date, 'DD/MM/YYYY HH24:MI:SS') AS create_date,
+        to_char(t.close_date,  'DD/MM/YYYY HH24:MI:SS') AS close_date,
+        p.name AS created_by,
+        ap.name AS assigned_to,
+        t.team_id,
+        ROUND(EXTRACT(EPOCH FROM (t.close_date - t.create_date)) / 3600, 2) AS elapsed_hours,
+        ROUND(EXTRACT(EPOCH FROM (t.close_date - t.create_date)) / 86400, 2) AS elapsed_days,
+        CASE t.priority
+            WHEN '0' THEN 'No priority'
+            WHEN '1' THEN 'Low'
+            WHEN '2' THEN 'Medium'
+            WHEN '3' THEN 'High'
+            ELSE 'Unknown'
+        END AS priority
+    FROM helpdesk_ticket t
+    JOIN res_users u ON u.id = t.create_uid
+    JOIN res_partner p ON p.id = u.partner_id
+    LEFT JOIN res_users au ON au.id = t.user_id
+    LEFT JOIN res_partner ap ON ap.id = au.partner_id
+    WHERE {where}
+    ORDER BY t.user_id, t.create_date
+"""
+
+# Resolution time (hours) percentiles per user, per priority and per week
+SUMMARY_QUERY = """
+    WITH tickets AS (
+        SELECT
+            t.user_id,
+            t.priority,
+            date_trunc('week', t.create_date)::date AS week,
+            EXTRACT(EPOCH FROM (t.close_date - t.create_date)) / 3600 AS hours
+        FROM helpdesk_ticket t
+        WHERE {where}
+    )
+    SELECT
+        CASE
+            WHEN GROUPING(user_id) = 0 THEN 'user'
+            WHEN GROUPING(priority) = 0 THEN 'priority'
+            ELSE 'week'
+        END AS dimension,
+        user_id,
+        priority,
+        week,
+        COUNT(*),
+        COUNT(hours),
+        AVG(hours),
+        percentile_cont(%(percentiles)s::float8[]) WITHIN GROUP (ORDER BY hours)
+    FROM tickets
+    GROUP BY GROUPING SETS ((user_id), (priority), (week))
+    ORDER BY 1, user_id, priority, week
+"""
+
 
 class HelpDeskReportWizard(models.TransientModel):
     _name = "help.desk.report.wizard"
     _description = "Help Desk Report Wizard"
 
-    user_id = fields.Many2one("res.users", string="User", required=True)
+    user_ids = fields.Many2many(
+        "res.users",
+        string="Users",
+        help="Assigned users to include. Leave empty to include all users.",
+    )
+    team_ids = fields.Many2many(
+        "helpdesk.team",
+        string="Teams",
+        help="Helpdesk teams to include. Leave empty to include all teams.",
+    )
     date_from = fields.Datetime(string="Date From", required=True)
     date_to = fields.Datetime(string="Date To", required=True)
+    export_format = fields.Selection(
+        [("xlsx", "Excel (XLSX)"), ("csv", "CSV")],
+        string="Format",
+        default="xlsx",
+        required=True,
+    )
+    include_summary = fields.Boolean(
+        string="Include resolution summary",
+        default=True,
+        help="Adds resolution time percentiles (50/90/95) per user, "
+        "per priority and per week.",
+    )
 
-    file_data = fields.Binary(string="File", readonly=True)
     file_name = fields.Char(string="File Name")
 
     def action_download(self):
         self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError(_("Date From must be earlier than Date To."))
+
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/help_desk_report/export/{self.id}",
+            "target": "self",
+        }
+
+    # ── Export ──────────────────────────────────────────────────────────────
+
+    def _get_where_clause(self):
+        """SQL filter of the selected users, teams and dates (alias t)"""
+        self.ensure_one()
+        where = ["t.create_date >= %(date_from)s", "t.create_date <= %(date_to)s"]
+        params = {"date_from": self.date_from, "date_to": self.date_to}
+        if self.user_ids:
+            where.append("t.user_id = ANY(%(user_ids)s)")
+            params["user_ids"] = self.user_ids.ids
+        if self.team_ids:
+            where.append("t.team_id = ANY(%(team_ids)s)")
+            params["team_ids"] = self.team_ids.ids
+        return " AND ".join(where), params
+
+    def _get_export_filename(self):
+        self.ensure_one()
+        name = self.file_name
+        if not name:
+            if len(self.user_ids) == 1:
+                name = f"helpdesk_report_user_{self.user_ids.id}"
+            else:
+                name = f"helpdesk_report_{datetime.now().strftime('%Y-%m-%d')}"
+        name = name.rsplit(".", 1)[0] if name.endswith((".csv", ".xlsx")) else name
+        return f"{name}.{self.export_format}"
+
+    def _stream_export(self):
+        """Prepares the export of the wizard
+
+        Everything that needs the ORM is read here; the returned generator
+        runs its queries on its own cursor, so it can be consumed by the
+        HTTP response after the request cursor is closed.
 
-        query = """
-            SELECT
-                t.id,
-                t.ticket_ref,
-                t.name AS ticket,
-                to_char(t.create_date, 'DD/MM/YYYY HH24:MI:SS') AS create_date,
-                to_char(t.close_date,  'DD/MM/YYYY HH24:MI:SS') AS close_date,
-                p.name AS created_by,
-                ROUND(EXTRACT(EPOCH FROM (t.close_date - t.create_date)) / 3600, 2) AS elapsed_hours,
-                ROUND(EXTRACT(EPOCH FROM (t.close_date - t.create_date)) / 86400, 2) AS elapsed_days,
-                CASE t.priority
-                    WHEN '0' THEN 'No priority'
-                    WHEN '1' THEN 'Low'
-                    WHEN '2' THEN 'Medium'
-                    WHEN '3' THEN 'High'
-                    ELSE 'Unknown'
-                END AS priority
-            FROM helpdesk_ticket t
-            JOIN res_users u ON u.id = t.create_uid
-            JOIN res_partner p ON p.id = u.partner_id
-            WHERE t.user_id = %s
-            AND t.create_date >= %s
-            AND t.create_date <= %s
+        Returns:
+            tuple: (filename, mimetype, generator of bytes)
         """
+        self.ensure_one()
+        where, params = self._get_where_clause()
+        team_names = {
+            team.id: team.name
+            for team in self.env["helpdesk.team"]
+            .with_context(active_test=False)
+            .search([])
+        }
+        export = _HelpdeskExport(
+            self.env.registry,
+            where,
+            params,
+            team_names,
+            self.include_summary,
+        )
+        if self.export_format == "csv":
+            chunks = export.iter_csv()
+            mimetype = "text/csv"
+        else:
+            chunks = self.env["xlsx.stream.export"].iter_workbook(export.write_workbook)
+            mimetype = XLSX_MIMETYPE
+        return self._get_export_filename(), mimetype, chunks
+
+
+class _HelpdeskExport:
+    """Streams the ticket rows and the summary from a server-side cursor"""
+
+    def __init__(self, registry, where, params, team_names, include_summary):
+        self.registry = registry
+        self.where = where
+        self.params = params
+        self.team_names = team_names
+        self.include_summary = include_summary
+
+    def _iter_ticket_rows(self, cr):
+        """Ticket rows fetched EXPORT_FETCH_SIZE at a time (named cursor)"""
+        team_index = TICKET_COLUMNS.index("team")
+        with cr._cnx.cursor(name="help_desk_report_export") as named:
+            named.itersize = EXPORT_FETCH_SIZE
+            named.execute(TICKETS_QUERY.format(where=self.where), self.params)
+            while True:
+                rows = named.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    row = list(row)
+                    row[team_index] = self.team_names.get(row[team_index], "")
+                    yield row
+
+    def _get_summary_rows(self, cr):
+        cr.execute(
+            SUMMARY_QUERY.format(where=self.where),
+            dict(self.params, percentiles=list(RESOLUTION_PERCENTILES)),
+        )
+        results = cr.fetchall()
+
+        user_ids = list({row[1] for row in results if row[1]})
+        user_names = {}
+        if user_ids:
+            cr.execute(
+                """
+                SELECT u.id, p.name
+                FROM res_users u
+                JOIN res_partner p ON p.id = u.partner_id
+                WHERE u.id = ANY(%s)
+                """,
+                (user_ids,),
+            )
+            user_names = dict(cr.fetchall())
 
-        self.env.cr.execute(query, (self.user_id.id, self.date_from, self.date_to))
-        rows = self.env.cr.fetchall()
-        columns = [desc[0] for desc in self.env.cr.description]
+        rows = []
+        for dimension, user_id, priority, week, total, resolved, avg, pcts in results:
+            if dimension == "user":
+                group = user_names.get(user_id, "") if user_id else "Unassigned"
+            elif dimension == "priority":
+                group = PRIORITY_LABELS.get(priority, "Unknown")
+            else:
+                group = week.strftime("%Y-%m-%d") if week else ""
+            values = [avg] + list(pcts or [None] * len(RESOLUTION_PERCENTILES))
+            rows.append(
+                [dimension, group, total, resolved]
+                + [round(value, 2) if value is not None else None for value in values]
+            )
+        return rows
 
-        # Create CSV
+    def iter_csv(self):
+        """CSV: ticket rows, then the summary block after a blank line"""
         buffer = StringIO()
         writer = csv.writer(buffer)
-        writer.writerow(columns)
-        writer.writerows(rows)
 
-        csv_data = buffer.getvalue().encode()
-        buffer.close()
+        def flush():
+            data = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return data
 
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.file_data = base64.b64encode(csv_data)
+        with self.registry.cursor() as cr:
+            writer.writerow(TICKET_COLUMNS)
+            for count, row in enumerate(self._iter_ticket_rows(cr), 1):
+                writer.writerow(row)
+                if count % EXPORT_FETCH_SIZE == 0:
+                    yield flush()
 
-        self.file_name = (
-            self.file_name
-            or f"helpdesk_report_user_{self.user_id.id}.csv"
-            or f"reports_{today}.csv"
-        )
+            if self.include_summary:
+                writer.writerow([])
+                writer.writerow(SUMMARY_COLUMNS)
+                writer.writerows(self._get_summary_rows(cr))
+        yield flush()
 
-        return {
-            "type": "ir.actions.act_url",
-            "url": (
-                f"/web/content/?model=help.desk.report.wizard"
-                f"&id={self.id}"
-                f"&field=file_data"
-                f"&filename_field=file_name"
-                f"&download=true"
-            ),
-            "target": "self",
-        }
+    def write_workbook(self, workbook):
+        """XLSX: 'Tickets' sheet plus 'Summary' (rows written in order)"""
+        bold = workbook.add_format({"bold": True})
+        with self.registry.cursor() as cr:
+            sheet = workbook.add_worksheet("Tickets")
+            sheet.write_row(0, 0, TICKET_COLUMNS, bold)
+            for row_index, row in enumerate(self._iter_ticket_rows(cr), 1):
+                sheet.write_row(row_index, 0, row)
+
+            if self.include_summary:
+                sheet = workbook.add_worksheet("Summary")
+                sheet.write_row(0, 0, SUMMARY_COLUMNS, bold)
+                for row_index, row in enumerate(self._get_summary_rows(cr), 1):
+                    sheet.write_row(row_index, 0, row)
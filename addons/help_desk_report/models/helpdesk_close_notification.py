@@ -0,0 +1,202 @@
+from odoo import models, fields, api
+import pytz
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Notifications delivered per cron run
+NOTIFICATION_BATCH_SIZE = 200
+NOTIFICATION_TIMEZONE = "America/Mexico_City"
+
+
+class HelpdeskCloseNotification(models.Model):
+    """Queue of closing notifications for helpdesk tickets.
+
+    Closing a ticket only enqueues a row; the cron renders the QWeb
+    templates, posts to the chatter and Discuss and queues the email in
+    mail.mail, which the standard mail queue cron delivers.
+    """
+
+    _name = "helpdesk.close.notification"
+    _description = "Helpdesk Ticket Closing Notification"
+    _order = "id"
+
+    ticket_id = fields.Many2one(
+        "helpdesk.ticket", required=True, ondelete="cascade", index=True
+    )
+    author_id = fields.Many2one(
+        "res.partner",
+        string="Closed by",
+        required=True,
+        help="Author of the chatter and Discuss messages",
+    )
+    email_from = fields.Char()
+    close_date = fields.Datetime(required=True)
+    stage_name = fields.Char()
+    state = fields.Selection(
+        [("pending", "Pending"), ("sent", "Sent"), ("error", "Error")],
+        default="pending",
+        required=True,
+        index=True,
+    )
+    error = fields.Text()
+
+    @api.model
+    def _enqueue(self, tickets):
+        """Queues the closing notification of the given (just closed) tickets"""
+        tickets = tickets.filtered("partner_id")
+        if not tickets:
+            return self.browse()
+        notifications = self.sudo().create(
+            [
+                {
+                    "ticket_id": ticket.id,
+                    "author_id": self.env.user.partner_id.id,
+                    "email_from": self.env.company.email or self.env.user.email,
+                    "close_date": ticket.close_date,
+                    "stage_name": ticket.stage_id.name if ticket.stage_id else False,
+                }
+                for ticket in tickets
+            ]
+        )
+        cron = self.env.ref(
+            "help_desk_report.ir_cron_helpdesk_close_notifications",
+            raise_if_not_found=False,
+        )
+        if cron:
+            cron._trigger()
+        return notifications
+
+    @api.model
+    def _cron_send_pending(self, batch_size=NOTIFICATION_BATCH_SIZE):
+        """Delivers the pending notifications (one batch per run)"""
+        notifications = self.search([("state", "=", "pending")], limit=batch_size)
+        channels = {}
+        sent_mail = False
+        for notification in notifications:
+            try:
+                with self.env.cr.savepoint():
+                    sent_mail |= notification._deliver(channels)
+                    notification.state = "sent"
+            except Exception as e:
+                _logger.warning(
+                    "Closing notification of ticket %s failed: %s",
+                    notification.ticket_id.id,
+                    e,
+                )
+                notification.write({"state": "error", "error": str(e)})
+                # Channels created inside the rolled back savepoint are gone
+                channels.clear()
+
+        if sent_mail:
+            mail_cron = self.env.ref(
+                "mail.ir_cron_mail_scheduler_action", raise_if_not_found=False
+            )
+            if mail_cron:
+                mail_cron._trigger()
+
+        # More pending than one batch: continue in a new run
+        if len(notifications) == batch_size:
+            self.env.ref(
+                "help_desk_report.ir_cron_helpdesk_close_notifications"
+            )._trigger()
+
+    def _prepare_render_values(self):
+        self.ensure_one()
+        ticket = self.ticket_id
+        close_date = pytz.UTC.localize(self.close_date).astimezone(
+            pytz.timezone(NOTIFICATION_TIMEZONE)
+        )
+        return {
+            "ticket": ticket,
+            "partner": ticket.partner_id,
+            "ticket_ref": ticket.ticket_ref or str(ticket.id),
+            "ticket_status": self.stage_name or "Cerrado",
+            "close_date": close_date.strftime("%d/%m/%Y %H:%M:%S"),
+        }
+
+    def _deliver(self, channels):
+        """Posts the notification and queues its email.
+
+        Args:
+            channels: cache {(partner_id, author_id): discuss.channel} shared
+                by the notifications of one cron run
+
+        Returns:
+            bool: True if an email was queued
+        """
+        self.ensure_one()
+        ticket = self.ticket_id
+        partner = ticket.partner_id
+        if not partner:
+            return False
+
+        QWeb = self.env["ir.qweb"]
+        values = self._prepare_render_values()
+        subject = f"Ticket #{values['ticket_ref']} - {values['ticket_status']}"
+        body_chatter = QWeb._render(
+            "help_desk_report.ticket_close_notification_message", values
+        )
+
+        # Post message to the ticket chatter
+        ticket.message_post(
+            body=body_chatter,
+            subject=subject,
+            author_id=self.author_id.id,
+            partner_ids=[partner.id],
+            message_type="comment",
+            subtype_xmlid="mail.mt_comment",
+        )
+
+        # Send private message via Discuss only if the partner is an active user
+        if partner.user_ids and partner.active:
+            channel = self._get_chat_channel(partner, self.author_id, channels)
+            channel.message_post(
+                body=body_chatter,
+                author_id=self.author_id.id,
+                message_type="comment",
+                subtype_xmlid="mail.mt_comment",
+            )
+
+        # Queue the email; the mail queue cron delivers it
+        if not partner.email:
+            return False
+        self.env["mail.mail"].sudo().create(
+            {
+                "subject": subject,
+                "body_html": QWeb._render(
+                    "help_desk_report.ticket_close_notification_email", values
+                ),
+                "email_to": partner.email,
+                "email_from": self.email_from,
+                "model": ticket._name,
+                "res_id": ticket.id,
+                "auto_delete": False,
+            }
+        )
+        return True
+
+    @api.model
+    def _get_chat_channel(self, partner, author, channels):
+        """Private chat between both partners, searched once per pair"""
+        key = (partner.id, author.id)
+        if key not in channels:
+            Channel = self.env["discuss.channel"].sudo()
+            channel = Channel.search(
+                [
+                    ("channel_type", "=", "chat"),
+                    ("channel_partner_ids", "in", [partner.id]),
+                    ("channel_partner_ids", "in", [author.id]),
+                ],
+                limit=1,
+            )
+            if not channel:
+                # Create private channel if it doesn't exist
+                channel = Channel.create(
+                    {
+                        "channel_type": "chat",
+                        "channel_partner_ids": [(4, partner.id), (4, author.id)],
+                    }
+                )
+            channels[key] = channel
+        return channels[key]
@@ -14,7 +14,7 @@
     "category": "Inventory",
     "version": "17.0.1.0",
     "license": "LGPL-3",
-    "depends": ["base", "stock", "purchase"],
+    "depends": ["base", "stock", "purchase", "xlsx_stream_export"],
     "data": [
         "views/purchase_order_views.xml",
         "views/stock_weighted_views.xml",
@@ -27,7 +27,9 @@
         "views/costo_formula_wizard_views.xml",
         "views/stock_weighted_manual_wizard_views.xml",
         "views/history_pricelist_calculate.xml",
+        "views/stock_weighted_event_views.xml",
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
     ],
     "installable": True,
     "application": True,
@@ -1,4 +1,6 @@
+from . import warehouse_stock_snapshot
 from . import stock_weighted
+from . import stock_weighted_event
 from . import pricelist_ponderada
 from .wizard import pricelist_ponderada_set_price_wizard
 from . import global_config
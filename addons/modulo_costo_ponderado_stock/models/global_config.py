@@ -2,11 +2,8 @@ from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 from odoo.exceptions import UserError
 from odoo.exceptions import RedirectWarning
-import io
-import base64
 import re
 
-import xlsxwriter
 
 class GlobalConfig(models.Model):
     _name = 'global.config'
@@ -57,6 +54,16 @@ class GlobalConfig(models.Model):
         string='Usuarios Super Compras'
     )
     
+    compradores_referencia = fields.Many2many(
+        'res.users',
+        'global_config_compradores_referencia_rel',
+        'config_id',
+        'user_id',
+        string='Compradores de referencia',
+        help='Usuarios cuyas últimas compras se consultan como referencia al calcular '
+             'precios ponderados. Si se deja vacío se usan Itzel Partida y Ricardo Partida.'
+    )
+
     warehouse_id = fields.Many2one(
         'stock.warehouse',
         string='Almacén para ajuste',
@@ -96,6 +103,13 @@ class GlobalConfig(models.Model):
         help='Separar múltiples correos con coma (,)'
     )
     
+    costo_ponderado_diferido = fields.Boolean(
+        string='Costo ponderado diferido',
+        default=False,
+        help='Si está activo, validar una recepción solo registra los eventos de compra; '
+             'el costo ponderado y los precios se recalculan en segundo plano por el cron.'
+    )
+
     last_licitacion_date = fields.Date(string='Última generación de licitación')
     last_cierre_date = fields.Date(string='Último cierre de licitación')
 
@@ -120,6 +134,14 @@ class GlobalConfig(models.Model):
         config = self.get_solo_config()
         return config.valor_dollar if config else 0.0
 
+    def _get_compradores_referencia(self):
+        """Compradores configurados o, si no hay, los compradores históricos."""
+        if self and self.compradores_referencia:
+            return self.compradores_referencia
+        return self.env['res.users'].with_context(active_test=False).search([
+            ('partner_id.name', 'in', ['Itzel Partida', 'Ricardo Partida'])
+        ])
+
     @api.model
     def get_purchase_superusers(self):
         """
@@ -333,24 +355,23 @@ class GlobalConfig(models.Model):
     
     def action_update_stock_weighted(self):
         StockWeighted = self.env['stock.weighted']
-        weighted_records = StockWeighted.search([])
+        weighted_records = StockWeighted.search([('product_id', '!=', False)])
 
-        for record in weighted_records:
-            
-            product_id = record.product_id
-            warehouse = self.env['stock.warehouse'].search([('name', '=', 'ALMACEN CENTRAL')], limit=1)
-            if not warehouse:
-                raise UserError("No se encontró el almacén ALMACEN CENTRAL")
-            location = warehouse.lot_stock_id  
+        snapshot = self.env['warehouse.stock.snapshot']
+        if weighted_records and not snapshot.warehouse_exists('ALMACEN CENTRAL'):
+            raise UserError("No se encontró el almacén ALMACEN CENTRAL")
 
-        
-            quants = self.env['stock.quant'].search([
-                ('product_id', '=', product_id.id),
-                ('location_id', 'child_of', location.id)
-            ])
-            available_qty = sum(quants.mapped('quantity'))
-            if record.product_id:
-                record.current_stock = available_qty
+        quantities = snapshot.get_quantities(
+            weighted_records.product_id.ids, ['ALMACEN CENTRAL']
+        )['ALMACEN CENTRAL']
+
+        # Una escritura por valor de stock en lugar de una por registro
+        ids_by_qty = {}
+        for record in weighted_records:
+            qty = quantities.get(record.product_id.id, 0.0)
+            ids_by_qty.setdefault(qty, []).append(record.id)
+        for qty, record_ids in ids_by_qty.items():
+            StockWeighted.browse(record_ids).write({'current_stock': qty})
 
         return {
             'type': 'ir.actions.client',
@@ -437,53 +458,65 @@ class GlobalConfig(models.Model):
         if not purchase_orders:
             raise UserError("No se encontraron órdenes de compra para: %s" % ", ".join(po_names))
 
-      
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        sheet = workbook.add_worksheet('PO Items')
-
-        header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'vcenter'})
-        text_fmt = workbook.add_format({'border': 1})
-        num_fmt = workbook.add_format({'border': 1, 'num_format': '#,##0.00'})
-
-        headers = ['Orden', 'Producto', 'Costo']
-        for col, h in enumerate(headers):
-            sheet.write(0, col, h, header_fmt)
-
-        sheet.set_column(0, 0, 18)  
-        sheet.set_column(1, 1, 55)  
-        sheet.set_column(2, 2, 14)  
-
-        
-        row = 1
-        for po in purchase_orders:
-            for line in po.order_line:
-                default_code = line.product_id.default_code or ''
-                prod_display = f"[{default_code}] {line.product_id.name}" if default_code else line.product_id.name
-
-                sheet.write(row, 0, po.name, text_fmt)
-                sheet.write(row, 1, prod_display or '', text_fmt)
-                sheet.write_number(row, 2, line.price_unit or 0.0, num_fmt)
-                row += 1
 
-        workbook.close()
-        file_content = output.getvalue()
+        # Líneas en el orden de las órdenes (por nombre) y de cada orden;
+        # aquí solo se leen IDs, los datos se leen por bloques al escribir
+        order_rank = {po.id: idx for idx, po in enumerate(purchase_orders)}
+        order_names = {po.id: po.name for po in purchase_orders}
+        line_refs = self.env['purchase.order.line'].search_read(
+            [('order_id', 'in', purchase_orders.ids)],
+            ['order_id'],
+            order='sequence, id',
+            load=None,
+        )
+        line_refs.sort(key=lambda ref: order_rank[ref['order_id']])
+        lines = self.env['purchase.order.line'].browse([ref['id'] for ref in line_refs])
+
+        Export = self.env['xlsx.stream.export']
+        Product = self.env['product.product']
+        product_labels = {}
+
+        def write_workbook(workbook):
+            sheet = workbook.add_worksheet('PO Items')
+
+            header_fmt = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'vcenter'})
+            text_fmt = workbook.add_format({'border': 1})
+            num_fmt = workbook.add_format({'border': 1, 'num_format': '#,##0.00'})
+
+            sheet.set_column(0, 0, 18)
+            sheet.set_column(1, 1, 55)
+            sheet.set_column(2, 2, 14)
+
+            headers = ['Orden', 'Producto', 'Costo']
+            for col, h in enumerate(headers):
+                sheet.write(0, col, h, header_fmt)
+
+            row = 1
+            for chunk in Export.iter_read(lines, ['order_id', 'product_id', 'price_unit']):
+                # Nombres de producto una sola vez por bloque (y reutilizados entre bloques)
+                missing = {l['product_id'] for l in chunk if l['product_id'] not in product_labels}
+                missing.discard(False)
+                for product in Product.browse(list(missing)).read(['default_code', 'name'], load=None):
+                    default_code = product['default_code'] or ''
+                    product_labels[product['id']] = (
+                        f"[{default_code}] {product['name']}" if default_code else product['name']
+                    )
+
+                for line in chunk:
+                    sheet.write(row, 0, order_names[line['order_id']], text_fmt)
+                    sheet.write(row, 1, product_labels.get(line['product_id']) or '', text_fmt)
+                    sheet.write_number(row, 2, line['price_unit'] or 0.0, num_fmt)
+                    row += 1
 
         filename = 'po_items_%s.xlsx' % fields.Datetime.now().strftime('%Y%m%d_%H%M%S')
-        attachment = self.env['ir.attachment'].create({
-            'name': filename,
-            'type': 'binary',
-            'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'datas': base64.b64encode(file_content),
-            'res_model': self._name,
-            'res_id': self.id if (hasattr(self, 'id') and self.id) else 0,
-        })
+        attachment = Export.create_attachment(
+            filename,
+            write_workbook,
+            res_model=self._name,
+            res_id=self.id if (hasattr(self, 'id') and self.id) else 0,
+        )
 
-        return {
-            'type': 'ir.actions.act_url',
-            'url': f'/web/content/{attachment.id}?download=true',
-            'target': 'self',
-        }
+        return Export.download_action(attachment)
 
         
     def action_export_excel_masivo(self):
@@ -54,22 +54,22 @@ class PricelistPonderada(models.Model):
     product_internal_ref = fields.Char(string="Referencia Interna")
 
     stock_central = fields.Float(
-        string="Stock Central", compute="_compute_stock_central", store=False
+        string="Stock Central", compute="_compute_stocks", store=False
     )
     stock_plaza_bonita = fields.Float(
-        string="Stock Plaza Bonita", compute="_compute_stock_plaza_bonita", store=False
+        string="Stock Plaza Bonita", compute="_compute_stocks", store=False
     )
     stock_gran_patio = fields.Float(
-        string="Stock Gran Patio", compute="_compute_stock_gran_patio", store=False
+        string="Stock Gran Patio", compute="_compute_stocks", store=False
     )
     stock_showroom_central = fields.Float(
         string="Stock Showroom Central",
-        compute="_compute_stock_showroom_central",
+        compute="_compute_stocks",
         store=False,
     )
     stock_showroom_obregon = fields.Float(
         string="Stock Showroom Obregón",
-        compute="_compute_stock_showroom_obregon",
+        compute="_compute_stocks",
         store=False,
     )
 
@@ -103,9 +103,44 @@ class PricelistPonderada(models.Model):
                 record.application_status = "Nunca aplicado"
 
     @api.model
-    def calcular_precios(self):
-        self.search([]).unlink()
+    def _get_last_purchases(self, product_ids, buyer_user_ids):
+        """Última compra confirmada por producto y comprador en una sola consulta
+
+        Returns:
+            dict: {(product_id, user_id): {"price_unit", "date_order", "currency"}}
+        """
+        if not product_ids or not buyer_user_ids:
+            return {}
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT ON (pol.product_id, po.create_uid)
+                pol.product_id,
+                po.create_uid,
+                pol.price_unit,
+                po.date_order,
+                po.es_dollar
+            FROM purchase_order_line pol
+            JOIN purchase_order po ON pol.order_id = po.id
+            WHERE pol.product_id IN %s
+              AND po.create_uid IN %s
+              AND po.state IN ('purchase', 'done')
+            ORDER BY pol.product_id, po.create_uid, po.date_order DESC, pol.id DESC
+            """,
+            (tuple(product_ids), tuple(buyer_user_ids)),
+        )
+        last_purchases = {}
+        for row in self.env.cr.fetchall():
+            product_id, user_id, price_unit, date_order, es_dollar = row
+            last_purchases[(product_id, user_id)] = {
+                "price_unit": price_unit,
+                "date_order": date_order,
+                "currency": "USD" if es_dollar else "MXN",
+            }
+        return last_purchases
 
+    @api.model
+    def calcular_precios(self):
         weighted_model = self.env["stock.weighted"]
         pricelists = self.env["product.pricelist"].search([])
 
@@ -113,9 +148,36 @@ class PricelistPonderada(models.Model):
         if not global_config:
             raise UserError(_("No se encontró un registro de Configuración Global."))
 
-        for weighted in weighted_model.search([]):
+        weighted_records = weighted_model.search([("product_id", "!=", False)])
+
+        # Compras de referencia: una sola consulta para todos los productos y
+        # compradores (no alteran el costo ponderado)
+        buyers = global_config._get_compradores_referencia()
+        last_purchases = self._get_last_purchases(
+            weighted_records.product_id.ids, buyers.ids
+        )
+        _logger.info(
+            f"Últimas compras de referencia cargadas: {len(last_purchases)} producto/comprador"
+        )
+
+        existing = {
+            (rec.product_id.id, rec.pricelist_id.id): rec for rec in self.search([])
+        }
+        seen_keys = set()
+        to_create = []
+        updated = 0
+
+        for weighted in weighted_records:
             product = weighted.product_id
 
+            designer = ""
+            descripcion_corta = ""
+            name = product.display_name
+            match = re.search(r"\]\s*(.*?)\s*-\s*(.*)", name)
+            if match:
+                designer = match.group(1).strip()
+                descripcion_corta = match.group(2).strip()
+
             for pricelist in pricelists:
                 try:
                     # Siempre toma costo de weighted
@@ -124,58 +186,12 @@ class PricelistPonderada(models.Model):
                         "resultado", 0.0
                     )  # precio calculado en MXN (moneda lista)
 
-                    # Mantengo consultas de compras SOLO como referencia (no alteran costo)
-                    self.env.cr.execute(
-                        """
-                        SELECT pol.price_unit, po.date_order
-                        FROM purchase_order_line pol
-                        JOIN purchase_order po ON pol.order_id = po.id
-                        JOIN res_users ru ON po.create_uid = ru.id
-                        JOIN res_partner rp ON ru.partner_id = rp.id
-                        WHERE pol.product_id = %s
-                        AND po.state IN ('purchase', 'done')
-                        AND rp.name = %s
-                        ORDER BY po.date_order DESC
-                        LIMIT 1
-                    """,
-                        (product.id, "Itzel Partida"),
-                    )
-                    last_purchase_itzel = self.env.cr.fetchone()
-
-                    self.env.cr.execute(
-                        """
-                        SELECT pol.price_unit, po.date_order, po.es_dollar
-                        FROM purchase_order_line pol
-                        JOIN purchase_order po ON pol.order_id = po.id
-                        JOIN res_users ru ON po.create_uid = ru.id
-                        JOIN res_partner rp ON ru.partner_id = rp.id
-                        WHERE pol.product_id = %s
-                        AND po.state IN ('purchase', 'done')
-                        AND rp.name = %s
-                        ORDER BY po.date_order DESC
-                        LIMIT 1
-                    """,
-                        (product.id, "Ricardo Partida"),
-                    )
-                    last_purchase_ricardo = self.env.cr.fetchone()
-
-                    # ⚠️ Importante: Ya no modificamos weighted.unit_weighted_cost en ningún caso
-                    # Solo se usan como datos de referencia si algún día quieres mostrarlos.
-
                 except Exception as e:
                     _logger.warning(
                         f"Error al calcular precio para {pricelist.name} - {product.name}: {str(e)}"
                     )
                     continue
 
-                designer = ""
-                descripcion_corta = ""
-                name = product.display_name
-                match = re.search(r"\]\s*(.*?)\s*-\s*(.*)", name)
-                if match:
-                    designer = match.group(1).strip()
-                    descripcion_corta = match.group(2).strip()
-
                 # === AJUSTE MXN: usar tu método dedicado justo antes del create ===
                 try:
                     if weighted.currency_id and weighted.currency_id.name == "MXN":
@@ -192,21 +208,56 @@ class PricelistPonderada(models.Model):
                     )
                 # === FIN AJUSTE MXN ===
 
-                self.create(
-                    {
-                        "product_id": product.id,
-                        "pricelist_id": pricelist.id,
-                        "price_calculated": precio_lista_mxn,
-                        "base_cost": weighted.unit_weighted_cost,  # 👈 siempre desde weighted
-                        "currency_id": weighted.currency_id.id,
-                        "designer": designer,
-                        "product_description_fixed": descripcion_corta,
-                        "categ_id": product.categ_id.id,
-                        "product_internal_ref": product.default_code,
-                        "date_applied": False,
+                vals = {
+                    "price_calculated": precio_lista_mxn,
+                    "base_cost": weighted.unit_weighted_cost,  # 👈 siempre desde weighted
+                    "currency_id": weighted.currency_id.id,
+                    "designer": designer,
+                    "product_description_fixed": descripcion_corta,
+                    "categ_id": product.categ_id.id,
+                    "product_internal_ref": product.default_code,
+                }
+                key = (product.id, pricelist.id)
+                seen_keys.add(key)
+                record = existing.get(key)
+                if record:
+                    # Upsert: solo se escribe lo que cambió
+                    if record.price_calculated != precio_lista_mxn:
+                        vals["date_applied"] = False
+                    changed = {
+                        field: value
+                        for field, value in vals.items()
+                        if record._fields[field].convert_to_write(
+                            record[field], record
+                        )
+                        != value
                     }
-                )
+                    if changed:
+                        changed["date_calculated"] = fields.Datetime.now()
+                        record.write(changed)
+                        updated += 1
+                else:
+                    vals.update(
+                        {
+                            "product_id": product.id,
+                            "pricelist_id": pricelist.id,
+                            "date_applied": False,
+                        }
+                    )
+                    to_create.append(vals)
+
+        if to_create:
+            self.create(to_create)
+
+        # Registros cuyo producto/lista ya no existe en el cálculo
+        stale_ids = [rec.id for key, rec in existing.items() if key not in seen_keys]
+        if stale_ids:
+            self.browse(stale_ids).unlink()
 
+        _logger.info(
+            f"Precios ponderados: {len(to_create)} creados, {updated} actualizados, "
+            f"{len(stale_ids)} eliminados"
+        )
         return {"type": "ir.actions.client", "tag": "reload"}
 
     @api.model
@@ -215,40 +266,25 @@ class PricelistPonderada(models.Model):
 
     def obtener_stock_por_almacen(self, nombre_almacen):
         self.ensure_one()
-        warehouse = self.env["stock.warehouse"].search(
-            [("name", "=", nombre_almacen)], limit=1
+        quantities = self.env["warehouse.stock.snapshot"].get_quantities(
+            self.product_id.ids, [nombre_almacen], internal_only=True
         )
-        if not warehouse or not warehouse.lot_stock_id:
-            return 0.0
-        stock_quants = self.env["stock.quant"].search(
-            [
-                ("product_id", "=", self.product_id.id),
-                ("location_id", "child_of", warehouse.lot_stock_id.id),
-                ("location_id.usage", "=", "internal"),
-            ]
+        return quantities[nombre_almacen].get(self.product_id.id, 0.0)
+
+    def _compute_stocks(self):
+        """Existencias de todos los almacenes para todo el lote en una consulta"""
+        almacenes = {
+            "stock_central": "ALMACEN CENTRAL",
+            "stock_plaza_bonita": "PLAZA BONITA",
+            "stock_gran_patio": "GRAN PATIO",
+            "stock_showroom_central": "SHOWROOM CENTRAL",
+            "stock_showroom_obregon": "SHOWROOM OBREGON",
+        }
+        quantities = self.env["warehouse.stock.snapshot"].get_quantities(
+            self.product_id.ids, list(almacenes.values()), internal_only=True
         )
-        return sum(stock_quants.mapped("quantity"))
-
-    def _compute_stock_central(self):
-        for rec in self:
-            rec.stock_central = rec.obtener_stock_por_almacen("ALMACEN CENTRAL")
-
-    def _compute_stock_plaza_bonita(self):
         for rec in self:
-            rec.stock_plaza_bonita = rec.obtener_stock_por_almacen("PLAZA BONITA")
-
-    def _compute_stock_gran_patio(self):
-        for rec in self:
-            rec.stock_gran_patio = rec.obtener_stock_por_almacen("GRAN PATIO")
-
-    def _compute_stock_showroom_central(self):
-        for rec in self:
-            rec.stock_showroom_central = rec.obtener_stock_por_almacen(
-                "SHOWROOM CENTRAL"
-            )
-
-    def _compute_stock_showroom_obregon(self):
-        for rec in self:
-            rec.stock_showroom_obregon = rec.obtener_stock_por_almacen(
-                "SHOWROOM OBREGON"
-            )
+            for field_name, nombre_almacen in almacenes.items():
+                rec[field_name] = quantities[nombre_almacen].get(
+                    rec.product_id.id, 0.0
+                )
@@ -4,6 +4,7 @@ from odoo.tools import float_round
 from .pricing_tools import calcular_precio_debug
 from .pricing_tools import calcular_precio_mxn_debug
 import logging
+import time
 
 _logger = logging.getLogger(__name__)
 
@@ -41,12 +42,18 @@ class StockMove(models.Model):
     _inherit = "stock.move"
 
     def _action_done(self, *args, **kwargs):
+        start = time.perf_counter()
         res = super()._action_done(*args, **kwargs)
+        timings = {"action_done": time.perf_counter() - start}
+
+        start = time.perf_counter()
+        price_buffer = self._new_price_buffer()
         global_config = self.env["global.config"].search([], limit=1)
         if not global_config:
             raise UserError("No hay configuración global definida.")
         valor_dollar = global_config.valor_dollar
 
+        entries = []
         for move in self.filtered(lambda m: m.product_id):
             product = move.product_id
             es_dollar = (
@@ -63,31 +70,89 @@ class StockMove(models.Model):
                 and move.purchase_line_id
                 and move.purchase_line_id.order_id
             ):
-                self._update_weighted_cost(
-                    product=product,
-                    costo=move.purchase_line_id.price_unit,
-                    cantidad=move.product_uom_qty,
-                    currency=currency,
-                    valor_dollar=valor_dollar,
-                    order=move.purchase_line_id.order_id.id,
+                entries.append(
+                    {
+                        "move": move,
+                        "product": product,
+                        "costo": move.purchase_line_id.price_unit,
+                        "cantidad": move.product_uom_qty,
+                        "currency": currency,
+                        "order": move.purchase_line_id.order_id.id,
+                    }
                 )
+
+        if entries and global_config.costo_ponderado_diferido:
+            # Solo se registran los eventos; el cron los aplica en orden
+            self.env["stock.weighted.event"]._enqueue(entries, valor_dollar)
+            timings["weighted_cost"] = time.perf_counter() - start
+            timings["repricing"] = 0.0
+            self._log_repricing_timings(timings, price_buffer)
+            return res
+
+        for entry in entries:
+            self._update_weighted_cost(
+                product=entry["product"],
+                costo=entry["costo"],
+                cantidad=entry["cantidad"],
+                currency=entry["currency"],
+                valor_dollar=valor_dollar,
+                order=entry["order"],
+                price_buffer=price_buffer,
+            )
+        timings["weighted_cost"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self._flush_price_buffer(price_buffer)
+        timings["repricing"] = time.perf_counter() - start
+        self._log_repricing_timings(timings, price_buffer)
         return res
 
+    def _get_central_available_qty(self, product_ids):
+        """Existencia en ALMACEN CENTRAL (y ubicaciones hijas) por producto
+
+        Returns:
+            dict: {product_id: cantidad}
+        """
+        snapshot = self.env["warehouse.stock.snapshot"]
+        if not snapshot.warehouse_exists("ALMACEN CENTRAL"):
+            raise UserError("No se encontró el almacén ALMACEN CENTRAL")
+        return snapshot.get_quantities(product_ids, ["ALMACEN CENTRAL"])[
+            "ALMACEN CENTRAL"
+        ]
+
+    def _new_price_buffer(self):
+        """Buffer de recálculo de precios para una transacción.
+
+        Guarda los productos a repreciar (con la última orden que los afectó)
+        para que el recálculo, el histórico y las escrituras en listas se hagan
+        una sola vez al final de _action_done.
+        """
+        return {"products": {}}
+
+    def _log_repricing_timings(self, timings, price_buffer):
+        """Hook de medición: cuánto de _action_done se va en repreciar"""
+        total = sum(timings.values()) or 1.0
+        _logger.info(
+            f"⏱️ _action_done: {total:.3f}s total | movimientos {timings['action_done']:.3f}s"
+            f" | costo ponderado {timings['weighted_cost']:.3f}s"
+            f" | repreciado {timings['repricing']:.3f}s ({timings['repricing'] / total * 100:.0f}%)"
+            f" | {len(price_buffer['products'])} productos"
+        )
+
     def _update_weighted_cost(
-        self, product, costo, cantidad, currency, valor_dollar, order
+        self,
+        product,
+        costo,
+        cantidad,
+        currency,
+        valor_dollar,
+        order,
+        price_buffer=None,
+        available_qty=None,
     ):
         ponderado = costo
-        product_id = product.id
-        warehouse = self.env["stock.warehouse"].search(
-            [("name", "=", "ALMACEN CENTRAL")], limit=1
-        )
-        if not warehouse:
-            raise UserError("No se encontró el almacén ALMACEN CENTRAL")
-        location = warehouse.lot_stock_id
-        quants = self.env["stock.quant"].search(
-            [("product_id", "=", product_id), ("location_id", "child_of", location.id)]
-        )
-        available_qty = sum(quants.mapped("quantity"))
+        if available_qty is None:
+            available_qty = self._get_central_available_qty(product.ids)[product.id]
         # raise UserError(f"Cantidad sistema: {available_qty} y ademas {cantidad}")
         empate_cantidades = available_qty - cantidad
 
@@ -275,7 +340,112 @@ class StockMove(models.Model):
                     }
                 )
 
-        self._calculate_and_apply_new_price_to_pricelist(product, order)
+        if price_buffer is not None:
+            # Se reprecia una sola vez por producto al final de la transacción
+            price_buffer["products"].pop(product.id, None)
+            price_buffer["products"][product.id] = order
+        else:
+            self._calculate_and_apply_new_price_to_pricelist(product, order)
+
+    def _flush_price_buffer(self, price_buffer):
+        """Recalcula los precios de los productos del buffer en bloque.
+
+        Las listas de precios se buscan una vez, el histórico se guarda con un
+        solo create multi-registro y los items de listas se leen con una sola
+        búsqueda y se escriben agrupados por precio.
+        """
+        pending = price_buffer["products"]
+        if not pending:
+            return
+
+        products = self.env["product.product"].browse(list(pending))
+        # Primer registro en el _order, como el search(limit=1) original
+        weighted_by_product = {}
+        for weighted in self.env["stock.weighted"].search(
+            [("product_id", "in", products.ids)]
+        ):
+            weighted_by_product.setdefault(weighted.product_id.id, weighted)
+        pricelists = self.env["product.pricelist"].search([])
+
+        historicos = []
+        precios = {}  # {(pricelist_id, product_tmpl_id): precio_final}
+        for product in products:
+            weighted = weighted_by_product.get(product.id)
+            if not weighted:
+                raise UserError(
+                    f"No se encontró costo ponderado para {product.display_name}"
+                )
+            order = pending[product.id]
+            for pricelist in pricelists:
+                try:
+                    if weighted.currency_id.name == "MXN":
+                        valores = calcular_precio_mxn_debug(
+                            self.env, product, pricelist
+                        )
+                    else:
+                        valores = calcular_precio_debug(self.env, product, pricelist)
+
+                    valores.update({"order_id": order})
+                    historicos.append(valores)
+                    precios[(pricelist.id, product.product_tmpl_id.id)] = round(
+                        valores.get("resultado", 0.0), 2
+                    )
+
+                except Exception as e:
+                    _logger.warning(
+                        f"Error al calcular precio para {pricelist.name} - {product.name}: {str(e)}"
+                    )
+                    continue
+
+        if historicos:
+            self._guardar_historico(historicos)
+        self._apply_prices_to_pricelists(precios)
+
+    def _apply_prices_to_pricelists(self, precios):
+        """Aplica precios fijos a items de listas en bloque
+
+        Args:
+            precios (dict): {(pricelist_id, product_tmpl_id): precio_final}
+        """
+        if not precios:
+            return
+        PricelistItem = self.env["product.pricelist.item"]
+        pricelist_ids = list({key[0] for key in precios})
+        tmpl_ids = list({key[1] for key in precios})
+
+        items_by_key = {}
+        for item in PricelistItem.search(
+            [
+                ("pricelist_id", "in", pricelist_ids),
+                ("product_tmpl_id", "in", tmpl_ids),
+            ]
+        ):
+            # Mismo criterio que search(..., limit=1): el primero según _order
+            items_by_key.setdefault(
+                (item.pricelist_id.id, item.product_tmpl_id.id), item
+            )
+
+        item_ids_by_price = {}
+        to_create = []
+        for (pricelist_id, tmpl_id), precio_final in precios.items():
+            item = items_by_key.get((pricelist_id, tmpl_id))
+            if item:
+                item_ids_by_price.setdefault(precio_final, []).append(item.id)
+            else:
+                to_create.append(
+                    {
+                        "pricelist_id": pricelist_id,
+                        "product_tmpl_id": tmpl_id,
+                        "applied_on": "1_product",
+                        "compute_price": "fixed",
+                        "fixed_price": precio_final,
+                    }
+                )
+
+        for precio_final, item_ids in item_ids_by_price.items():
+            PricelistItem.browse(item_ids).write({"fixed_price": precio_final})
+        if to_create:
+            PricelistItem.create(to_create)
 
     def _calculate_and_apply_new_price_to_pricelist(self, product, order):
         weighted = self.env["stock.weighted"].search(
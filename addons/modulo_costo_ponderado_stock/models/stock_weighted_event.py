@@ -0,0 +1,237 @@
+from odoo import models, fields, api
+from psycopg2 import errors
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Espacio de nombres para los advisory locks por producto
+_ADVISORY_LOCK_NAMESPACE = 48213
+
+
+class StockWeightedEvent(models.Model):
+    """Entrada de compra pendiente de aplicar al costo ponderado.
+
+    Con el modo diferido activo, la validación de recepciones solo registra
+    estos eventos. El cron los aplica en orden de registro por producto, con
+    la existencia capturada al momento de la recepción, por lo que el cálculo
+    es el mismo que el del modo síncrono.
+    """
+
+    _name = "stock.weighted.event"
+    _description = "Evento de Costo Ponderado Pendiente"
+    _order = "id"
+    _rec_name = "product_id"
+
+    product_id = fields.Many2one(
+        "product.product",
+        string="Producto",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    move_id = fields.Many2one("stock.move", string="Movimiento", ondelete="set null")
+    order_id = fields.Many2one("purchase.order", string="Orden")
+    costo = fields.Float(string="Costo", digits="Product Price")
+    cantidad = fields.Float(string="Cantidad")
+    currency_id = fields.Many2one("res.currency", string="Moneda")
+    valor_dollar = fields.Float(string="Valor del Dólar", digits=(12, 2))
+    available_qty = fields.Float(string="Existencia al recibir")
+    state = fields.Selection(
+        [
+            ("pending", "Pendiente"),
+            ("done", "Aplicado"),
+            ("error", "Error"),
+        ],
+        string="Estado",
+        default="pending",
+        required=True,
+        index=True,
+    )
+    error_message = fields.Text(string="Error")
+    processed_date = fields.Datetime(string="Fecha de Aplicación")
+
+    @api.model
+    def _enqueue(self, entries, valor_dollar):
+        """Registra las entradas de compra de una validación de recepción
+
+        La existencia en ALMACEN CENTRAL se captura aquí (una sola consulta
+        agrupada) para que el cálculo diferido use la misma cantidad que el
+        síncrono.
+        """
+        product_ids = list({entry["product"].id for entry in entries})
+        available = self.env["stock.move"]._get_central_available_qty(product_ids)
+        events = self.create(
+            [
+                {
+                    "product_id": entry["product"].id,
+                    "move_id": entry["move"].id,
+                    "order_id": entry["order"],
+                    "costo": entry["costo"],
+                    "cantidad": entry["cantidad"],
+                    "currency_id": entry["currency"].id,
+                    "valor_dollar": valor_dollar,
+                    "available_qty": available[entry["product"].id],
+                }
+                for entry in entries
+            ]
+        )
+        _logger.info(f"📥 {len(events)} eventos de costo ponderado en cola")
+        return events
+
+    @api.model
+    def process_pending_events(self, limit_products=None):
+        """Aplica los eventos pendientes en orden por producto.
+
+        Cada producto se bloquea con un advisory lock de transacción y se
+        vuelve a validar que sus eventos sigan pendientes, de modo que dos
+        procesadores concurrentes nunca apliquen dos veces los mismos eventos.
+        Un error deja los eventos de ese producto en estado 'error' sin
+        afectar a los demás.
+
+        Los precios se recalculan en bloque al final; si ese recálculo falla,
+        todo se deshace y se repite producto por producto (recálculo dentro
+        del savepoint de cada uno) para aislar al producto que falla.
+        """
+        self.flush_model(["state"])
+        self.env.cr.execute(
+            """
+            SELECT product_id
+            FROM stock_weighted_event e
+            WHERE state = 'pending'
+              -- Un producto con eventos en error espera a que se reintenten
+              AND NOT EXISTS (
+                  SELECT 1 FROM stock_weighted_event err
+                  WHERE err.product_id = e.product_id AND err.state = 'error'
+              )
+            GROUP BY product_id
+            ORDER BY MIN(id)
+            """
+        )
+        product_ids = [row[0] for row in self.env.cr.fetchall()]
+        if limit_products:
+            product_ids = product_ids[:limit_products]
+
+        events_by_product = {}
+        for product_id in product_ids:
+            events = self._lock_pending_events(product_id)
+            if events:
+                events_by_product[product_id] = events
+
+        try:
+            with self.env.cr.savepoint():
+                applied, failed = self._apply_events(events_by_product)
+        except Exception:
+            _logger.warning(
+                "Falló el recálculo de precios en bloque, se aplica producto por producto",
+                exc_info=True,
+            )
+            applied, failed = self._apply_events(
+                events_by_product, flush_per_product=True
+            )
+
+        _logger.info(
+            f"✓ Eventos de costo ponderado: {applied} aplicados, {failed} con error"
+        )
+        return {"applied": applied, "failed": failed}
+
+    @api.model
+    def _lock_pending_events(self, product_id):
+        """Bloquea el producto y devuelve sus eventos aún pendientes
+
+        El advisory lock solo evita el trabajo simultáneo: si otro procesador
+        ya aplicó los eventos después de iniciada esta transacción, la
+        instantánea todavía los ve pendientes. Bloquear las filas lo detecta
+        (error de serialización) y el producto se omite.
+
+        Returns:
+            stock.weighted.event: vacío si el producto está ocupado o ya aplicado
+        """
+        self.env.cr.execute(
+            "SELECT pg_try_advisory_xact_lock(%s, %s)",
+            (_ADVISORY_LOCK_NAMESPACE, product_id),
+        )
+        if not self.env.cr.fetchone()[0]:
+            return self.browse()
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute(
+                    """
+                    SELECT id FROM stock_weighted_event
+                    WHERE product_id = %s AND state = 'pending'
+                    ORDER BY id
+                    FOR UPDATE
+                    """,
+                    (product_id,),
+                )
+                event_ids = [row[0] for row in self.env.cr.fetchall()]
+        except errors.SerializationFailure:
+            _logger.info(
+                f"Eventos del producto {product_id} aplicados por otro proceso, se omiten"
+            )
+            return self.browse()
+        return self.browse(event_ids)
+
+    @api.model
+    def _apply_events(self, events_by_product, flush_per_product=False):
+        """Aplica los eventos de cada producto en su propio savepoint
+
+        Returns:
+            tuple: (eventos aplicados, eventos con error)
+        """
+        StockMove = self.env["stock.move"]
+        price_buffer = StockMove._new_price_buffer()
+        applied = failed = 0
+
+        for product_id, events in events_by_product.items():
+            buffer = (
+                StockMove._new_price_buffer() if flush_per_product else price_buffer
+            )
+            try:
+                with self.env.cr.savepoint():
+                    for event in events:
+                        StockMove._update_weighted_cost(
+                            product=event.product_id,
+                            costo=event.costo,
+                            cantidad=event.cantidad,
+                            currency=event.currency_id,
+                            valor_dollar=event.valor_dollar,
+                            order=event.order_id.id,
+                            price_buffer=buffer,
+                            available_qty=event.available_qty,
+                        )
+                    if flush_per_product:
+                        StockMove._flush_price_buffer(buffer)
+                    events.write(
+                        {"state": "done", "processed_date": fields.Datetime.now()}
+                    )
+                applied += len(events)
+            except Exception as e:
+                buffer["products"].pop(product_id, None)
+                events.write({"state": "error", "error_message": str(e)})
+                failed += len(events)
+                _logger.error(
+                    f"Error al aplicar costo ponderado del producto {product_id}: {str(e)}"
+                )
+
+        StockMove._flush_price_buffer(price_buffer)
+        return applied, failed
+
+    def action_retry(self):
+        """Regresa eventos con error a la cola (se aplican antes que los nuevos)"""
+        self.filtered(lambda e: e.state == "error").write(
+            {"state": "pending", "error_message": False}
+        )
+
+    @api.model
+    def action_process_now(self):
+        result = self.process_pending_events()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Costo Ponderado",
+                "message": f"{result['applied']} eventos aplicados, {result['failed']} con error.",
+                "type": "warning" if result["failed"] else "success",
+                "sticky": False,
+            },
+        }
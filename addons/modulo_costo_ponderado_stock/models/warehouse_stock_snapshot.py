@@ -0,0 +1,170 @@
+from odoo import models, fields, api, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class WarehouseStockSnapshot(models.AbstractModel):
+    """Servicio compartido para consultar existencias por almacén.
+
+    El árbol de ubicaciones de cada almacén se resuelve una sola vez y se
+    guarda en la caché del registro. La clave incluye una generación guardada
+    en la base (stock.warehouse.stock_snapshot_generation) que cambia al
+    modificar ubicaciones o almacenes, así solo se invalida esta caché. Las
+    existencias de muchos productos en varios almacenes se obtienen con una
+    sola consulta agrupada.
+    """
+
+    _name = "warehouse.stock.snapshot"
+    _description = "Existencias por Almacén (consulta agrupada)"
+
+    @api.model
+    def _get_generation(self):
+        """Generación actual del árbol de ubicaciones (clave de la caché)"""
+        self.env["stock.warehouse"].flush_model(["stock_snapshot_generation"])
+        self.env.cr.execute(
+            "SELECT COALESCE(MAX(stock_snapshot_generation), 0) FROM stock_warehouse"
+        )
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _invalidate_locations(self):
+        """Invalida solo las entradas en caché de _get_location_ids
+
+        Todos los almacenes pasan a la generación máxima + 1; no se limpia el
+        resto del ormcache de los workers.
+        """
+        Warehouse = self.env["stock.warehouse"]
+        Warehouse.flush_model(["stock_snapshot_generation"])
+        # SQL directo: no debe disparar write() ni cambiar write_date
+        self.env.cr.execute(
+            """
+            UPDATE stock_warehouse
+            SET stock_snapshot_generation = (
+                SELECT COALESCE(MAX(stock_snapshot_generation), 0) + 1
+                FROM stock_warehouse
+            )
+            """
+        )
+        Warehouse.invalidate_model(["stock_snapshot_generation"])
+
+    @api.model
+    def _get_location_ids(self, warehouse_name, internal_only=False):
+        return self._get_cached_location_ids(
+            warehouse_name, internal_only, self._get_generation()
+        )
+
+    @api.model
+    @tools.ormcache("warehouse_name", "internal_only", "generation")
+    def _get_cached_location_ids(self, warehouse_name, internal_only, generation):
+        """Ubicaciones bajo la ubicación de stock del almacén
+
+        Returns:
+            tuple: IDs de ubicaciones, o None si el almacén no existe
+        """
+        warehouse = (
+            self.env["stock.warehouse"]
+            .sudo()
+            .search([("name", "=", warehouse_name)], limit=1)
+        )
+        if not warehouse or not warehouse.lot_stock_id:
+            return None
+        domain = [("id", "child_of", warehouse.lot_stock_id.id)]
+        if internal_only:
+            domain.append(("usage", "=", "internal"))
+        locations = self.env["stock.location"].sudo().search(domain)
+        return tuple(locations.ids)
+
+    @api.model
+    def warehouse_exists(self, warehouse_name):
+        return self._get_location_ids(warehouse_name) is not None
+
+    @api.model
+    def get_quantities(self, product_ids, warehouse_names, internal_only=False):
+        """Cantidad en stock por almacén y producto
+
+        Args:
+            product_ids (list): IDs de productos
+            warehouse_names (list): Nombres de los almacenes
+            internal_only (bool): Solo ubicaciones internas
+
+        Returns:
+            dict: {nombre_almacen: {product_id: cantidad}} (0.0 si no hay stock)
+        """
+        product_ids = list(set(product_ids))
+        result = {name: dict.fromkeys(product_ids, 0.0) for name in warehouse_names}
+
+        names_by_location = {}
+        generation = self._get_generation()
+        for name in warehouse_names:
+            location_ids = self._get_cached_location_ids(name, internal_only, generation)
+            for location_id in location_ids or ():
+                names_by_location.setdefault(location_id, []).append(name)
+
+        if not product_ids or not names_by_location:
+            return result
+
+        self.env["stock.quant"].flush_model(["product_id", "location_id", "quantity"])
+        self.env.cr.execute(
+            """
+            SELECT location_id, product_id, SUM(quantity)
+            FROM stock_quant
+            WHERE product_id IN %s
+              AND location_id IN %s
+            GROUP BY location_id, product_id
+            """,
+            (tuple(product_ids), tuple(names_by_location)),
+        )
+        for location_id, product_id, quantity in self.env.cr.fetchall():
+            for name in names_by_location[location_id]:
+                result[name][product_id] += quantity or 0.0
+        return result
+
+
+class StockLocation(models.Model):
+    _inherit = "stock.location"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"location_id", "usage", "active"} & set(vals):
+            self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return res
+
+
+class StockWarehouse(models.Model):
+    _inherit = "stock.warehouse"
+
+    stock_snapshot_generation = fields.Integer(
+        string="Generación de ubicaciones",
+        readonly=True,
+        copy=False,
+        default=0,
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "lot_stock_id", "active"} & set(vals):
+            self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return res
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return records
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["warehouse.stock.snapshot"]._invalidate_locations()
+        return res
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+
+class TestStockWeightedEvent(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Event = cls.env["stock.weighted.event"]
+        cls.mxn = cls.env.ref("base.MXN")
+        cls.good, cls.poison = cls.env["product.product"].create(
+            [{"name": "Evento producto sano"}, {"name": "Evento producto dañado"}]
+        )
+        cls.events = cls.Event.create(
+            [
+                {
+                    "product_id": product.id,
+                    "costo": 100.0,
+                    "cantidad": 5.0,
+                    "currency_id": cls.mxn.id,
+                    "valor_dollar": 17.0,
+                    # Existencia = cantidad recibida: primer ingreso del producto
+                    "available_qty": 5.0,
+                }
+                for product in (cls.good, cls.poison, cls.good)
+            ]
+        )
+
+    def _weighted(self, product):
+        return self.env["stock.weighted"].search([("product_id", "=", product.id)])
+
+    def _process(self, flush):
+        with patch.object(
+            type(self.env["stock.move"]),
+            "_flush_price_buffer",
+            autospec=True,
+            side_effect=flush,
+        ):
+            return self.Event.process_pending_events()
+
+    def test_failed_repricing_only_affects_its_product(self):
+        repriced = []
+
+        def flush(move, price_buffer):
+            if self.poison.id in price_buffer["products"]:
+                raise UserError("Precio inválido")
+            repriced.extend(price_buffer["products"])
+
+        result = self._process(flush)
+
+        good_events = self.events.filtered(lambda e: e.product_id == self.good)
+        poison_events = self.events - good_events
+        self.assertEqual(result, {"applied": 2, "failed": 1})
+        self.assertEqual(set(good_events.mapped("state")), {"done"})
+        self.assertEqual(poison_events.state, "error")
+        self.assertIn("Precio inválido", poison_events.error_message)
+        self.assertEqual(repriced, [self.good.id])
+        # El costo del producto dañado se deshizo junto con su recálculo
+        self.assertTrue(self._weighted(self.good))
+        self.assertFalse(self._weighted(self.poison))
+
+    def test_bulk_repricing_when_nothing_fails(self):
+        calls = []
+
+        def flush(move, price_buffer):
+            calls.append(sorted(price_buffer["products"]))
+
+        result = self._process(flush)
+        self.assertEqual(result, {"applied": 3, "failed": 0})
+        self.assertEqual(calls, [sorted((self.good | self.poison).ids)])
+
+    def test_applied_events_are_not_reapplied(self):
+        self._process(lambda move, price_buffer: None)
+        result = self._process(lambda move, price_buffer: None)
+        self.assertEqual(result, {"applied": 0, "failed": 0})
+        self.assertEqual(len(self._weighted(self.good)), 1)
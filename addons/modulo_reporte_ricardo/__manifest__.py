@@ -4,11 +4,20 @@
     "category": "Tools",
     "summary": "Modulo para generar combos con precios",
     "author": "Ing. Diego Venegas",
-    "depends": ["base", "product", "point_of_sale"],
+    "depends": [
+        "base",
+        "product",
+        "stock",
+        "point_of_sale",
+        "modulo_costo_ponderado_stock",
+    ],
     "data": [
         "security/ir.model.access.csv",
+        "data/ir_cron.xml",
         "views/reload_report_wizard_view.xml",
         "views/stock_pricelist_views.xml",
+        "views/stock_pricelist_mv_views.xml",
+        "views/stock_pricelist_report_run_views.xml",
     ],
     "installable": True,
     "application": False,
@@ -1 +1,3 @@
-from . import stock_pricelist_report
\ No newline at end of file
+from . import stock_pricelist_report
+from . import stock_pricelist_report_mv
+from . import stock_pricelist_report_run
@@ -11,6 +11,62 @@ from odoo.addons.modulo_costo_ponderado_stock.models.pricing_tools import (
 _logger = logging.getLogger(__name__)
 
 
+def parse_product_name(product_name):
+    """Extrae referencia, diseñador, descripción, tamaño y género del nombre
+    de un producto con formato "[REF] Diseñador - Descripción 100ML Dama".
+    """
+    product_name = product_name or ""
+    referencia = disenador = descripcion = tamano = genero = ""
+
+    ref_match = re.search(r"\[(.*?)\]", product_name)
+    if ref_match:
+        referencia = ref_match.group(1).strip()
+
+    dis_match = re.search(r"\]\s*([^-\[]+)-", product_name)
+    if dis_match:
+        disenador = dis_match.group(1).strip()
+
+    desc_match = re.search(r"-\s*(.*)", product_name)
+    if desc_match:
+        descripcion = desc_match.group(1).strip()
+
+    tam_match = re.search(r"(\d+\s*[Mm][Ll])", product_name)
+    if tam_match:
+        tamano = tam_match.group(1).replace(" ", "").upper()
+
+    name_lower = product_name.lower()
+    if "dama" in name_lower:
+        genero = "DAMA"
+    elif "caballero" in name_lower:
+        genero = "CABALLERO"
+
+    return {
+        "referencia": referencia,
+        "disenador": disenador,
+        "descripcion": descripcion,
+        "tamano": tamano,
+        "genero": genero,
+    }
+
+
+def detect_product_type(product_name):
+    """Determina el tipo de producto (set, kit, unidad, tester, combo) por su nombre"""
+    name_lower = (product_name or "").lower()
+    if "set de dama" in name_lower:
+        return "Set de dama"
+    elif "set de caballero" in name_lower:
+        return "Set de caballero"
+    elif "kit" in name_lower:
+        return "Kit"
+    elif "unidad" in name_lower:
+        return "Unidad"
+    elif "tester" in name_lower:
+        return "Tester"
+    elif "combo" in name_lower:
+        return "Combo"
+    return ""
+
+
 class StockPricelistReport(models.Model):
     _name = "stock.pricelist.report"
     _description = "Reporte de Stock y Lista de Precios"
@@ -58,40 +114,16 @@ class StockPricelistReport(models.Model):
     @api.depends("product_id.name")
     def _compute_parsed_fields(self):
         for record in self:
-            referencia = disenador = descripcion = tamano = ""
             product_name = (
                 record.product_id.display_name or record.product_id.name or ""
             )
+            parsed = parse_product_name(product_name)
 
-            ref_match = re.search(r"\[(.*?)\]", product_name)
-            if ref_match:
-                referencia = ref_match.group(1).strip()
-
-            dis_match = re.search(r"\]\s*([^-\[]+)-", product_name)
-            if dis_match:
-                disenador = dis_match.group(1).strip()
-
-            desc_match = re.search(r"-\s*(.*)", product_name)
-            if desc_match:
-                descripcion = desc_match.group(1).strip()
-
-            tam_match = re.search(r"(\d+\s*[Mm][Ll])", product_name)
-            if tam_match:
-                tamano = tam_match.group(1).replace(" ", "").upper()
-
-            name_lower = product_name.lower()
-            if "dama" in name_lower:
-                genero = "DAMA"
-            elif "caballero" in name_lower:
-                genero = "CABALLERO"
-            else:
-                genero = ""
-
-            record.referencia = referencia
-            record.disenador = disenador
-            record.descripcion = descripcion
-            record.tamano = tamano
-            record.genero = genero
+            record.referencia = parsed["referencia"]
+            record.disenador = parsed["disenador"]
+            record.descripcion = parsed["descripcion"]
+            record.tamano = parsed["tamano"]
+            record.genero = parsed["genero"]
 
     def _get_stock_by_warehouse(self, product_id, warehouse_names):
         """Obtiene el stock total de un producto en los almacenes especificados"""
@@ -198,19 +230,7 @@ class StockPricelistReport(models.Model):
             stock_obregon = 0.0
 
             if product:
-                name_lower = product.display_name.lower()
-                if "set de dama" in name_lower:
-                    tipo = "Set de dama"
-                elif "set de caballero" in name_lower:
-                    tipo = "Set de caballero"
-                elif "kit" in name_lower:
-                    tipo = "Kit"
-                elif "unidad" in name_lower:
-                    tipo = "Unidad"
-                elif "tester" in name_lower:
-                    tipo = "Tester"
-                elif "combo" in name_lower:
-                    tipo = "Combo"
+                tipo = detect_product_type(product.display_name)
 
                 # Obtener stock usando el método corregido
                 stock_central = self._get_stock_by_warehouse(
@@ -360,7 +380,600 @@ class StockPricelistReport(models.Model):
             _logger.error(f"Error al obtener productos con precio <= 0: {str(e)}")
             return set()
 
-    def reload_report(self, pricelist_ids=None, update_mode="all"):
+    def _process_report_chunk(
+        self, weighted_ids, pricelist_ids, update_mode, stock_cache
+    ):
+        """Calcula precios y filas del reporte para un bloque de productos
+
+        Args:
+            weighted_ids (list): IDs de stock.weighted a procesar
+            pricelist_ids (list): IDs de las listas de precios a procesar
+            update_mode (str): 'all' o 'zero_or_negative'
+            stock_cache (dict): {product_id: stock} de ALMACEN CENTRAL
+
+        Returns:
+            dict: Filas a crear ('data_to_create') y contadores del bloque
+        """
+        weighted_records = self.env["stock.weighted"].browse(weighted_ids)
+        pricelists = self.env["product.pricelist"].browse(pricelist_ids)
+        total_products = len(weighted_records)
+
+        data_to_create = []
+        processed = 0
+
+        # Contadores de diagnóstico
+        error_count = 0
+        products_with_errors = set()
+        error_details = []
+
+        # Contadores de actualización de precios
+        prices_updated = 0
+        prices_unchanged = 0
+        prices_skipped = 0
+        prices_skipped_positive = 0
+        prices_failed = 0
+        # (lista, producto, precio) escritos, para re-aplicarlos al publicar
+        price_updates = []
+
+        for w in weighted_records:
+            if not w.product_id:
+                continue
+
+            # USAR STOCK DEL CACHE (ya no consulta la BD)
+            stock_almacen_central = stock_cache.get(w.product_id.id, 0.0)
+
+            product_has_error = False
+
+            for pricelist in pricelists:
+                try:
+                    # Usar partner de la compañía si el usuario no tiene
+                    partner = (
+                        self.env.user.partner_id or self.env.company.partner_id
+                    )
+
+                    price = pricelist._get_product_price(w.product_id, 1.0, partner)
+                except (
+                    TypeError,
+                    ZeroDivisionError,
+                    ValueError,
+                    AttributeError,
+                ) as e:
+                    error_count += 1
+                    if not product_has_error:
+                        products_with_errors.add(w.product_id.id)
+                        product_has_error = True
+                        # Guardar solo info básica
+                        error_details.append(
+                            {
+                                "product": w.product_id.display_name,
+                                "default_code": w.product_id.default_code or "N/A",
+                                "pricelist": pricelist.name,
+                            }
+                        )
+                    price = 0.0
+
+                # Actualizar precio en la lista de precios si es válido
+                if price >= 0:
+                    # Calcular precio usando la lógica especializada de pricing_tools
+                    try:
+                        valores = calcular_precio_debug(
+                            env=self.env, product=w.product_id, pricelist=pricelist
+                        )
+
+                        # Si la moneda es MXN, usar el cálculo específico para MXN
+                        if w.currency_id and w.currency_id.name == "MXN":
+                            try:
+                                valores_mxn = calcular_precio_mxn_debug(
+                                    env=self.env,
+                                    product=w.product_id,
+                                    pricelist=pricelist,
+                                )
+                                if valores_mxn and not valores_mxn.get("error"):
+                                    price = valores_mxn.get("resultado", price)
+                                else:
+                                    price = valores.get("resultado", price)
+                            except Exception as e_mxn:
+                                _logger.warning(
+                                    f"Error en cálculo MXN para producto {w.product_id.id}: {str(e_mxn)}"
+                                )
+                                price = valores.get("resultado", price)
+                        else:
+                            # Usar el resultado del cálculo estándar
+                            price = valores.get("resultado", price)
+
+                    except Exception as e_calc:
+                        _logger.warning(
+                            f"Error al calcular precio con pricing_tools para producto {w.product_id.id}: {str(e_calc)}. Usando precio original."
+                        )
+                        # Si falla, mantener el precio original obtenido de _get_product_price
+
+                    result = self.actualizar_precio_lista(
+                        pricelist_id=pricelist.id,
+                        product_id=w.product_id.id,
+                        nuevo_precio=price,
+                        update_mode=update_mode,
+                    )
+                    if result.get("success"):
+                        action = result.get("action")
+                        if action == "updated":
+                            prices_updated += 1
+                            price_updates.append(
+                                [pricelist.id, w.product_id.id, price]
+                            )
+                        elif action == "unchanged":
+                            prices_unchanged += 1
+                        elif action == "skipped":
+                            prices_skipped += 1
+                        elif action == "skipped_positive":
+                            prices_skipped_positive += 1
+                    else:
+                        prices_failed += 1
+
+                data_to_create.append(
+                    {
+                        "product_id": w.product_id.id,
+                        "unit_weighted_cost": w.unit_weighted_cost or 0.0,
+                        "current_stock": stock_almacen_central,
+                        "currency_id": (
+                            w.currency_id.id
+                            if w.currency_id
+                            else self.env.company.currency_id.id
+                        ),
+                        "currency_display": w.currency_display or "",
+                        "pricelist_id": pricelist.id,
+                        "price": price or 0.0,
+                    }
+                )
+
+            processed += 1
+            # Log de progreso cada 1000 productos
+            if processed % 1000 == 0:
+                _logger.info(
+                    f"Progreso: {processed}/{total_products} productos ({(processed/total_products)*100:.0f}%)"
+                )
+
+        return {
+            "data_to_create": data_to_create,
+            "processed": processed,
+            "error_count": error_count,
+            "products_with_errors": products_with_errors,
+            "error_details": error_details,
+            "prices_updated": prices_updated,
+            "prices_unchanged": prices_unchanged,
+            "prices_skipped": prices_skipped,
+            "prices_skipped_positive": prices_skipped_positive,
+            "prices_failed": prices_failed,
+            "price_updates": price_updates,
+        }
+
+    def _get_report_stock_cache(self, weighted_ids):
+        """Stock disponible en ALMACEN CENTRAL de los productos de stock.weighted
+
+        Returns:
+            dict: {product_id: stock}
+        """
+        weighted_records = self.env["stock.weighted"].browse(weighted_ids)
+        # OPTIMIZACIÓN 1: Cache de ubicaciones + OPTIMIZACIÓN 2: Query SQL masiva de stocks
+        almacen_central_location_ids = self._get_warehouse_location_ids(
+            ["ALMACEN CENTRAL"]
+        )
+        product_ids = [w.product_id.id for w in weighted_records if w.product_id]
+        return self._get_bulk_stock_by_locations(
+            product_ids, almacen_central_location_ids
+        )
+
+    @api.model
+    def _merge_chunk_results(self, results):
+        """Combina, en el orden de los bloques, resultados de _process_report_chunk
+
+        Returns:
+            dict: Misma estructura que _process_report_chunk
+        """
+        merged = {
+            "data_to_create": [],
+            "processed": 0,
+            "error_count": 0,
+            "products_with_errors": set(),
+            "error_details": [],
+            "prices_updated": 0,
+            "prices_unchanged": 0,
+            "prices_skipped": 0,
+            "prices_skipped_positive": 0,
+            "prices_failed": 0,
+            "price_updates": [],
+        }
+        for result in results:
+            merged["data_to_create"].extend(result["data_to_create"])
+            merged["products_with_errors"].update(result["products_with_errors"])
+            merged["error_details"].extend(result["error_details"])
+            merged["price_updates"].extend(result["price_updates"])
+            for key in (
+                "processed",
+                "error_count",
+                "prices_updated",
+                "prices_unchanged",
+                "prices_skipped",
+                "prices_skipped_positive",
+                "prices_failed",
+            ):
+                merged[key] += result[key]
+        return merged
+
+    def _apply_price_updates(self, result, update_mode):
+        """Escribe los precios calculados por los bloques de una recarga en segundo plano
+
+        Los bloques cuentan como actualizados los precios que cambiaban al
+        calcularse; aquí se recuentan según lo que pasa al escribirlos (otro
+        usuario pudo cambiar la lista mientras tanto).
+        """
+        counters = {
+            "updated": "prices_updated",
+            "unchanged": "prices_unchanged",
+            "skipped": "prices_skipped",
+            "skipped_positive": "prices_skipped_positive",
+        }
+        updates = result["price_updates"]
+        result["prices_updated"] = 0
+        for pricelist_id, product_id, price in updates:
+            outcome = self.actualizar_precio_lista(
+                pricelist_id=pricelist_id,
+                product_id=product_id,
+                nuevo_precio=price,
+                update_mode=update_mode,
+            )
+            if outcome.get("success"):
+                result[counters[outcome["action"]]] += 1
+            else:
+                result["prices_failed"] += 1
+        return result
+
+    def _publish_report(
+        self,
+        result,
+        pricelists,
+        update_mode,
+        total_products,
+        total_products_initial,
+        all_pricelists=False,
+    ):
+        """Reemplaza las filas del reporte de las listas y envía el correo
+
+        Args:
+            result (dict): Resultado de _process_report_chunk (o combinado)
+            pricelists (recordset): Listas procesadas
+            update_mode (str): 'all' o 'zero_or_negative'
+            total_products (int): Productos procesados
+            total_products_initial (int): Productos en stock.weighted
+            all_pricelists (bool): Eliminar también filas de otras listas
+
+        Returns:
+            dict: Notificación para el usuario
+        """
+        if all_pricelists:
+            existing_records = self.search([])
+        else:
+            existing_records = self.search([("pricelist_id", "in", pricelists.ids)])
+        if existing_records:
+            existing_records.unlink()
+            _logger.info(
+                f"🗑️  Eliminados {len(existing_records)} registros de {len(pricelists)} listas"
+            )
+
+        data_to_create = result["data_to_create"]
+        error_count = result["error_count"]
+        products_with_errors = result["products_with_errors"]
+        error_details = result["error_details"]
+        prices_updated = result["prices_updated"]
+        prices_unchanged = result["prices_unchanged"]
+        prices_skipped = result["prices_skipped"]
+        prices_skipped_positive = result["prices_skipped_positive"]
+        prices_failed = result["prices_failed"]
+
+        # Resumen de actualización de precios
+        _logger.info(
+            f"💲 Actualización de precios en listas (modo: {update_mode}):"
+        )
+        _logger.info(f"   ✓ {prices_updated} precios actualizados")
+        _logger.info(f"   = {prices_unchanged} precios sin cambios")
+        _logger.info(
+            f"   ⊘ {prices_skipped} productos sin precio previo (omitidos)"
+        )
+        if prices_skipped_positive > 0:
+            _logger.info(
+                f"   ⊙ {prices_skipped_positive} precios > 0 omitidos (modo zero_or_negative)"
+            )
+        if prices_failed > 0:
+            _logger.warning(f"   ✗ {prices_failed} precios fallaron")
+
+        # Resumen de errores (simplificado)
+        if error_count > 0:
+            _logger.warning(
+                f"⚠️  {len(products_with_errors)} productos con errores al calcular precios (precio = 0.0)"
+            )
+            ejemplos = ", ".join(
+                [f"[{d['default_code']}]" for d in error_details[:5]]
+            )
+            _logger.warning(f"   Ejemplos: {ejemplos}...")
+
+        # OPTIMIZACIÓN 3: Crear registros en lotes (batch insert)
+        if data_to_create:
+            batch_size = 5000
+            total_batches = (len(data_to_create) + batch_size - 1) // batch_size
+            _logger.info(
+                f"Creando {len(data_to_create)} registros en {total_batches} lotes..."
+            )
+
+            for i in range(0, len(data_to_create), batch_size):
+                batch = data_to_create[i : i + batch_size]
+                self.create(batch)
+
+            _logger.info(
+                f"✓ {len(data_to_create)} registros del reporte creados (visualización)"
+            )
+
+            # Obtener correos desde global.config
+            config = self.env["global.config"].search([], limit=1)
+            if config and config.email_reporte_consolidado:
+                try:
+                    emails = [
+                        e.strip()
+                        for e in config.email_reporte_consolidado.split(",")
+                        if e.strip()
+                    ]
+                    # Convertir a zona horaria de Ciudad de México
+                    utc_now = datetime.now(pytz.UTC)
+                    mexico_tz = pytz.timezone("America/Mexico_City")
+                    mexico_time = utc_now.astimezone(mexico_tz)
+
+                    timestamp = mexico_time.strftime("%d/%m/%Y %H:%M")
+                    timestamp_full = mexico_time.strftime(
+                        "%d de %B del %Y a las %H:%M"
+                    )
+                    subject = f"✓ Reporte Consolidado Generado - {timestamp}"
+
+                    # Preparar lista de precios para el correo
+                    if len(pricelists) <= 5:
+                        # Si son 5 o menos, mostrar todas
+                        pricelist_names_html = "<br>".join(
+                            [f"• {pl.name}" for pl in pricelists]
+                        )
+                    else:
+                        # Si son más de 5, mostrar las primeras 5 y agregar "y X más"
+                        first_five = "<br>".join(
+                            [f"• {pl.name}" for pl in pricelists[:5]]
+                        )
+                        pricelist_names_html = (
+                            f"{first_five}<br>• ... y {len(pricelists) - 5} más"
+                        )
+
+                    # Preparar estadísticas para el correo
+                    error_info = ""
+                    if error_count > 0:
+                        error_info = f"""
+                        <tr>
+                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos con errores</td>
+                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #ff9800;">{len(products_with_errors)}</td>
+                        </tr>
+                        """
+
+                    # Info adicional de modo de actualización
+                    mode_info = ""
+                    if prices_skipped_positive > 0:
+                        mode_info = f"""
+                        <tr>
+                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios > 0 omitidos (modo)</td>
+                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #9e9e9e;">{prices_skipped_positive:,}</td>
+                        </tr>
+                        """
+
+                    body = f"""
+                    <!DOCTYPE html>
+                    <html>
+                    <head>
+                        <meta charset="UTF-8">
+                        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                    </head>
+                    <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
+                        <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 40px 20px;">
+                            <tr>
+                                <td align="center">
+                                    <!-- Contenedor principal -->
+                                    <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
+                                        
+                                        <!-- Header -->
+                                        <tr>
+                                            <td style="background-color: #f9f9f9 ; padding: 30px 40px; text-align: center;">
+                                                <h1 style="margin: 0; color: #333333; font-size: 24px; font-weight: 600; letter-spacing: -0.5px;">
+                                                    ✓ Reporte Consolidado Generado
+                                                </h1>
+                                                <p style="margin: 8px 0 0 0; color: rgba(51,51,51,0.9); font-size: 14px;">
+                                                    {timestamp_full}
+                                                </p>
+                                            </td>
+                                        </tr>
+                                        
+                                        <!-- Mensaje principal -->
+                                        <tr>
+                                            <td style="padding: 40px 40px 30px 40px;">
+                                                <p style="margin: 0 0 20px 0; color: #333; font-size: 16px; line-height: 1.6;">
+                                                    El reporte consolidado de <strong>Stock y Listas de Precios</strong> ha sido procesado exitosamente.
+                                                </p>
+                                            </td>
+                                        </tr>
+                                        
+                                        <!-- Estadísticas -->
+                                        <tr>
+                                            <td style="padding: 0 40px 40px 40px;">
+                                                <table width="100%" cellpadding="0" cellspacing="0" style="border: 1px solid #e0e0e0; border-radius: 6px; overflow: hidden;">
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Registros generados</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #667eea;">{len(data_to_create):,}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos procesados</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #333;">{total_products:,}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios actualizados</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #4caf50;">{prices_updated:,}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios sin cambios</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #2196f3;">{prices_unchanged:,}</td>
+                                                    </tr>
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos omitidos</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #9e9e9e;">{prices_skipped:,}</td>
+                                                    </tr>
+                                                    {mode_info}
+                                                    <tr>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666; vertical-align: top;">Listas procesadas</td>
+                                                        <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 500; color: #333; font-size: 13px; line-height: 1.6;">
+                                                            {pricelist_names_html}
+                                                        </td>
+                                                    </tr>
+                                                    {error_info}
+                                                    <tr>
+                                                        <td style="padding: 12px; color: #666;">Estado</td>
+                                                        <td style="padding: 12px; text-align: right;">
+                                                            <span style="background-color: #4caf50; color: white; padding: 4px 12px; border-radius: 12px; font-size: 13px; font-weight: 500;">
+                                                                Completado
+                                                            </span>
+                                                        </td>
+                                                    </tr>
+                                                </table>
+                                            </td>
+                                        </tr>
+                                        
+                                        <!-- Footer -->
+                                        <tr>
+                                            <td style="background-color: #f9f9f9; padding: 30px 40px; text-align: center; border-top: 1px solid #e0e0e0;">
+                                                <p style="margin: 0; color: #999; font-size: 13px; line-height: 1.6;">
+                                                    Este es un mensaje automático generado por el sistema.<br>
+                                                    Reporte: <strong>stock.pricelist.report</strong>
+                                                </p>
+                                            </td>
+                                        </tr>
+                                        
+                                    </table>
+                                </td>
+                            </tr>
+                        </table>
+                    </body>
+                    </html>
+                    """
+
+                    self.env["mail.mail"].create(
+                        {
+                            "subject": subject,
+                            "body_html": body,
+                            "email_to": ",".join(emails),
+                        }
+                    ).send()
+                    _logger.info(
+                        f"📧 Correo enviado a: {', '.join(emails[:3])}{'...' if len(emails) > 3 else ''}"
+                    )
+                except Exception as e:
+                    _logger.error(
+                        f"Error al enviar correo de reporte consolidado: {str(e)}"
+                    )
+            else:
+                _logger.warning(
+                    "No se encontró email_reporte_consolidado en global.config"
+                )
+
+            # Mostrar notificación de éxito
+            # Construir mensaje claro según lo que pasó
+            if (
+                update_mode == "zero_or_negative"
+                and prices_updated == 0
+                and prices_skipped_positive > 0
+            ):
+                # Caso especial: modo zero_or_negative pero todos tienen precios > 0
+                message = f"✅ Proceso completado sin cambios."
+                message += f"\n\n📊 Se revisaron {total_products} productos (de {total_products_initial} totales)"
+                message += f"\n✓ Todos ya tienen precios configurados (> 0)"
+                message += (
+                    f"\n\n💡 No se requieren actualizaciones en modo 'solo ≤ 0'"
+                )
+            elif prices_updated > 0:
+                # Hubo actualizaciones
+                message = f"✅ Reporte actualizado exitosamente"
+                if update_mode == "zero_or_negative":
+                    message += f"\n\n📊 Productos revisados: {total_products} de {total_products_initial}"
+                else:
+                    message += f"\n\n📊 Productos procesados: {total_products}"
+
+                message += f"\n\n💲 Actualización de precios:"
+                message += f"\n   • {prices_updated} actualizados"
+                if prices_unchanged > 0:
+                    message += f"\n   • {prices_unchanged} sin cambios"
+                if prices_skipped > 0:
+                    message += f"\n   • {prices_skipped} sin precio previo"
+            else:
+                # No hubo actualizaciones pero puede haber otras razones
+                message = f"✅ Proceso completado"
+                if update_mode == "zero_or_negative":
+                    message += f"\n\n📊 Productos revisados: {total_products} de {total_products_initial}"
+                else:
+                    message += f"\n\n� Productos procesados: {total_products}"
+
+                if prices_unchanged > 0:
+                    message += f"\n\n� Todos los precios ({prices_unchanged}) ya están actualizados"
+                elif prices_skipped > 0:
+                    message += f"\n\n� {prices_skipped} productos sin precio previo en las listas"
+
+            # Agregar advertencias si hay
+            if error_count > 0:
+                message += f"\n\n⚠️ {len(products_with_errors)} productos con errores (ver logs)"
+            if prices_failed > 0:
+                message += f"\n⚠️ {prices_failed} precios fallaron al actualizar"
+
+            return {
+                "type": "ir.actions.client",
+                "tag": "display_notification",
+                "params": {
+                    "title": "Reporte Recargado",
+                    "message": message,
+                    "type": "warning" if error_count > 0 else "success",
+                    "sticky": error_count > 0,
+                    "next": {"type": "ir.actions.act_window_close"},
+                },
+            }
+        else:
+            if update_mode == "zero_or_negative" and total_products_initial > 0:
+                # Caso especial: hay productos pero ninguno con precio <= 0
+                _logger.info(
+                    f"✅ Todos los productos ({total_products_initial}) ya tienen precios > 0. No se requiere actualización."
+                )
+                return {
+                    "type": "ir.actions.client",
+                    "tag": "display_notification",
+                    "params": {
+                        "title": "Sin cambios necesarios",
+                        "message": f"Todos los productos ({total_products_initial}) ya tienen precios configurados (> 0).\n✅ No se requiere actualización en modo 'solo ≤ 0'.",
+                        "type": "info",
+                        "sticky": False,
+                    },
+                }
+            else:
+                _logger.warning(
+                    "No se encontraron registros válidos en stock.weighted para cargar"
+                )
+                return {
+                    "type": "ir.actions.client",
+                    "tag": "display_notification",
+                    "params": {
+                        "title": "Advertencia",
+                        "message": "No se encontraron datos para cargar en stock.weighted.",
+                        "type": "warning",
+                        "sticky": False,
+                    },
+                }
+
+    def reload_report(
+        self, pricelist_ids=None, update_mode="all", workers=0, chunk_size=500
+    ):
         """Método manual para recargar el reporte completo
 
         Args:
@@ -368,6 +981,9 @@ class StockPricelistReport(models.Model):
                                             Si es None, procesa todas las listas.
             update_mode (str): 'all' = actualizar todos los precios,
                               'zero_or_negative' = solo actualizar precios <= 0
+            workers (int): Crons que procesan los bloques en segundo plano
+                           (0/1 = en serie, en esta transacción).
+            chunk_size (int): Productos por bloque en segundo plano.
         """
         # Modo solo logs - Solo registra los stocks en los logs
         if not self._execute_normal_mode:
@@ -432,25 +1048,12 @@ class StockPricelistReport(models.Model):
         total_products_initial = 0  # Inicializar para uso en except/else
 
         try:
-            # Obtener listas de precios a procesar
+            # Obtener listas de precios a procesar (las filas se reemplazan al publicar)
             if pricelist_ids:
                 pricelists = self.env["product.pricelist"].browse(pricelist_ids)
-                # Eliminar solo registros de las listas seleccionadas
-                existing_records = self.search([("pricelist_id", "in", pricelist_ids)])
-                if existing_records:
-                    existing_records.unlink()
-                    _logger.info(
-                        f"🗑️  Eliminados {len(existing_records)} registros de {len(pricelists)} listas seleccionadas"
-                    )
             else:
                 # Procesar todas las listas (comportamiento original)
                 pricelists = self.env["product.pricelist"].search([])
-                existing_records = self.search([])
-                if existing_records:
-                    existing_records.unlink()
-                    _logger.info(
-                        f"🗑️  Eliminados {len(existing_records)} registros existentes"
-                    )
 
             # Obtener datos frescos desde stock.weighted
             weighted_records = self.env["stock.weighted"].search([])
@@ -495,445 +1098,47 @@ class StockPricelistReport(models.Model):
                 pricelist_names += f" y {len(pricelists) - 5} más"
             _logger.info(f"📋 Listas seleccionadas: {pricelist_names}")
 
-            # OPTIMIZACIÓN 1: Cache de ubicaciones + OPTIMIZACIÓN 2: Query SQL masiva de stocks
-            almacen_central_location_ids = self._get_warehouse_location_ids(
-                ["ALMACEN CENTRAL"]
-            )
-            product_ids = [w.product_id.id for w in weighted_records if w.product_id]
-            stock_cache = self._get_bulk_stock_by_locations(
-                product_ids, almacen_central_location_ids
-            )
-
-            data_to_create = []
-            processed = 0
-
-            # Contadores de diagnóstico
-            error_count = 0
-            products_with_errors = set()
-            error_details = []
-
-            # Contadores de actualización de precios
-            prices_updated = 0
-            prices_unchanged = 0
-            prices_skipped = 0
-            prices_skipped_positive = 0
-            prices_failed = 0
-
-            for w in weighted_records:
-                if not w.product_id:
-                    continue
-
-                # USAR STOCK DEL CACHE (ya no consulta la BD)
-                stock_almacen_central = stock_cache.get(w.product_id.id, 0.0)
-
-                product_has_error = False
-
-                for pricelist in pricelists:
-                    try:
-                        # Usar partner de la compañía si el usuario no tiene
-                        partner = (
-                            self.env.user.partner_id or self.env.company.partner_id
-                        )
-
-                        price = pricelist._get_product_price(w.product_id, 1.0, partner)
-                    except (
-                        TypeError,
-                        ZeroDivisionError,
-                        ValueError,
-                        AttributeError,
-                    ) as e:
-                        error_count += 1
-                        if not product_has_error:
-                            products_with_errors.add(w.product_id.id)
-                            product_has_error = True
-                            # Guardar solo info básica
-                            error_details.append(
-                                {
-                                    "product": w.product_id.display_name,
-                                    "default_code": w.product_id.default_code or "N/A",
-                                    "pricelist": pricelist.name,
-                                }
-                            )
-                        price = 0.0
-
-                    # Actualizar precio en la lista de precios si es válido
-                    if price >= 0:
-                        # Calcular precio usando la lógica especializada de pricing_tools
-                        try:
-                            valores = calcular_precio_debug(
-                                env=self.env, product=w.product_id, pricelist=pricelist
-                            )
-
-                            # Si la moneda es MXN, usar el cálculo específico para MXN
-                            if w.currency_id and w.currency_id.name == "MXN":
-                                try:
-                                    valores_mxn = calcular_precio_mxn_debug(
-                                        env=self.env,
-                                        product=w.product_id,
-                                        pricelist=pricelist,
-                                    )
-                                    if valores_mxn and not valores_mxn.get("error"):
-                                        price = valores_mxn.get("resultado", price)
-                                    else:
-                                        price = valores.get("resultado", price)
-                                except Exception as e_mxn:
-                                    _logger.warning(
-                                        f"Error en cálculo MXN para producto {w.product_id.id}: {str(e_mxn)}"
-                                    )
-                                    price = valores.get("resultado", price)
-                            else:
-                                # Usar el resultado del cálculo estándar
-                                price = valores.get("resultado", price)
-
-                        except Exception as e_calc:
-                            _logger.warning(
-                                f"Error al calcular precio con pricing_tools para producto {w.product_id.id}: {str(e_calc)}. Usando precio original."
-                            )
-                            # Si falla, mantener el precio original obtenido de _get_product_price
-
-                        result = self.actualizar_precio_lista(
-                            pricelist_id=pricelist.id,
-                            product_id=w.product_id.id,
-                            nuevo_precio=price,
-                            update_mode=update_mode,
-                        )
-                        if result.get("success"):
-                            action = result.get("action")
-                            if action == "updated":
-                                prices_updated += 1
-                            elif action == "unchanged":
-                                prices_unchanged += 1
-                            elif action == "skipped":
-                                prices_skipped += 1
-                            elif action == "skipped_positive":
-                                prices_skipped_positive += 1
-                        else:
-                            prices_failed += 1
-
-                    data_to_create.append(
-                        {
-                            "product_id": w.product_id.id,
-                            "unit_weighted_cost": w.unit_weighted_cost or 0.0,
-                            "current_stock": stock_almacen_central,
-                            "currency_id": (
-                                w.currency_id.id
-                                if w.currency_id
-                                else self.env.company.currency_id.id
-                            ),
-                            "currency_display": w.currency_display or "",
-                            "pricelist_id": pricelist.id,
-                            "price": price or 0.0,
-                        }
-                    )
-
-                processed += 1
-                # Log de progreso cada 1000 productos
-                if processed % 1000 == 0:
-                    _logger.info(
-                        f"Progreso: {processed}/{total_products} productos ({(processed/total_products)*100:.0f}%)"
-                    )
-
-            # Resumen de actualización de precios
-            _logger.info(
-                f"💲 Actualización de precios en listas (modo: {update_mode}):"
-            )
-            _logger.info(f"   ✓ {prices_updated} precios actualizados")
-            _logger.info(f"   = {prices_unchanged} precios sin cambios")
-            _logger.info(
-                f"   ⊘ {prices_skipped} productos sin precio previo (omitidos)"
-            )
-            if prices_skipped_positive > 0:
-                _logger.info(
-                    f"   ⊙ {prices_skipped_positive} precios > 0 omitidos (modo zero_or_negative)"
+            parallel = workers and workers > 1 and len(weighted_records) > chunk_size
+            if parallel:
+                run = self.env["stock.pricelist.report.run"]._enqueue(
+                    pricelists,
+                    weighted_records.ids,
+                    update_mode,
+                    total_products_initial,
+                    all_pricelists=not pricelist_ids,
+                    workers=workers,
+                    chunk_size=chunk_size,
                 )
-            if prices_failed > 0:
-                _logger.warning(f"   ✗ {prices_failed} precios fallaron")
-
-            # Resumen de errores (simplificado)
-            if error_count > 0:
-                _logger.warning(
-                    f"⚠️  {len(products_with_errors)} productos con errores al calcular precios (precio = 0.0)"
-                )
-                ejemplos = ", ".join(
-                    [f"[{d['default_code']}]" for d in error_details[:5]]
-                )
-                _logger.warning(f"   Ejemplos: {ejemplos}...")
-
-            # OPTIMIZACIÓN 3: Crear registros en lotes (batch insert)
-            if data_to_create:
-                batch_size = 5000
-                total_batches = (len(data_to_create) + batch_size - 1) // batch_size
-                _logger.info(
-                    f"Creando {len(data_to_create)} registros en {total_batches} lotes..."
-                )
-
-                for i in range(0, len(data_to_create), batch_size):
-                    batch = data_to_create[i : i + batch_size]
-                    self.create(batch)
-
-                _logger.info(
-                    f"✓ {len(data_to_create)} registros del reporte creados (visualización)"
-                )
-
-                # Obtener correos desde global.config
-                config = self.env["global.config"].search([], limit=1)
-                if config and config.email_reporte_consolidado:
-                    try:
-                        emails = [
-                            e.strip()
-                            for e in config.email_reporte_consolidado.split(",")
-                            if e.strip()
-                        ]
-                        # Convertir a zona horaria de Ciudad de México
-                        utc_now = datetime.now(pytz.UTC)
-                        mexico_tz = pytz.timezone("America/Mexico_City")
-                        mexico_time = utc_now.astimezone(mexico_tz)
-
-                        timestamp = mexico_time.strftime("%d/%m/%Y %H:%M")
-                        timestamp_full = mexico_time.strftime(
-                            "%d de %B del %Y a las %H:%M"
-                        )
-                        subject = f"✓ Reporte Consolidado Generado - {timestamp}"
-
-                        # Preparar lista de precios para el correo
-                        if len(pricelists) <= 5:
-                            # Si son 5 o menos, mostrar todas
-                            pricelist_names_html = "<br>".join(
-                                [f"• {pl.name}" for pl in pricelists]
-                            )
-                        else:
-                            # Si son más de 5, mostrar las primeras 5 y agregar "y X más"
-                            first_five = "<br>".join(
-                                [f"• {pl.name}" for pl in pricelists[:5]]
-                            )
-                            pricelist_names_html = (
-                                f"{first_five}<br>• ... y {len(pricelists) - 5} más"
-                            )
-
-                        # Preparar estadísticas para el correo
-                        error_info = ""
-                        if error_count > 0:
-                            error_info = f"""
-                            <tr>
-                                <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos con errores</td>
-                                <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #ff9800;">{len(products_with_errors)}</td>
-                            </tr>
-                            """
-
-                        # Info adicional de modo de actualización
-                        mode_info = ""
-                        if prices_skipped_positive > 0:
-                            mode_info = f"""
-                            <tr>
-                                <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios > 0 omitidos (modo)</td>
-                                <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #9e9e9e;">{prices_skipped_positive:,}</td>
-                            </tr>
-                            """
-
-                        body = f"""
-                        <!DOCTYPE html>
-                        <html>
-                        <head>
-                            <meta charset="UTF-8">
-                            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                        </head>
-                        <body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background-color: #f5f5f5;">
-                            <table width="100%" cellpadding="0" cellspacing="0" style="background-color: #f5f5f5; padding: 40px 20px;">
-                                <tr>
-                                    <td align="center">
-                                        <!-- Contenedor principal -->
-                                        <table width="600" cellpadding="0" cellspacing="0" style="background-color: #ffffff; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); overflow: hidden;">
-                                            
-                                            <!-- Header -->
-                                            <tr>
-                                                <td style="background-color: #f9f9f9 ; padding: 30px 40px; text-align: center;">
-                                                    <h1 style="margin: 0; color: #333333; font-size: 24px; font-weight: 600; letter-spacing: -0.5px;">
-                                                        ✓ Reporte Consolidado Generado
-                                                    </h1>
-                                                    <p style="margin: 8px 0 0 0; color: rgba(51,51,51,0.9); font-size: 14px;">
-                                                        {timestamp_full}
-                                                    </p>
-                                                </td>
-                                            </tr>
-                                            
-                                            <!-- Mensaje principal -->
-                                            <tr>
-                                                <td style="padding: 40px 40px 30px 40px;">
-                                                    <p style="margin: 0 0 20px 0; color: #333; font-size: 16px; line-height: 1.6;">
-                                                        El reporte consolidado de <strong>Stock y Listas de Precios</strong> ha sido procesado exitosamente.
-                                                    </p>
-                                                </td>
-                                            </tr>
-                                            
-                                            <!-- Estadísticas -->
-                                            <tr>
-                                                <td style="padding: 0 40px 40px 40px;">
-                                                    <table width="100%" cellpadding="0" cellspacing="0" style="border: 1px solid #e0e0e0; border-radius: 6px; overflow: hidden;">
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Registros generados</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #667eea;">{len(data_to_create):,}</td>
-                                                        </tr>
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos procesados</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #333;">{total_products:,}</td>
-                                                        </tr>
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios actualizados</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #4caf50;">{prices_updated:,}</td>
-                                                        </tr>
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Precios sin cambios</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #2196f3;">{prices_unchanged:,}</td>
-                                                        </tr>
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666;">Productos omitidos</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; color: #9e9e9e;">{prices_skipped:,}</td>
-                                                        </tr>
-                                                        {mode_info}
-                                                        <tr>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; color: #666; vertical-align: top;">Listas procesadas</td>
-                                                            <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 500; color: #333; font-size: 13px; line-height: 1.6;">
-                                                                {pricelist_names_html}
-                                                            </td>
-                                                        </tr>
-                                                        {error_info}
-                                                        <tr>
-                                                            <td style="padding: 12px; color: #666;">Estado</td>
-                                                            <td style="padding: 12px; text-align: right;">
-                                                                <span style="background-color: #4caf50; color: white; padding: 4px 12px; border-radius: 12px; font-size: 13px; font-weight: 500;">
-                                                                    Completado
-                                                                </span>
-                                                            </td>
-                                                        </tr>
-                                                    </table>
-                                                </td>
-                                            </tr>
-                                            
-                                            <!-- Footer -->
-                                            <tr>
-                                                <td style="background-color: #f9f9f9; padding: 30px 40px; text-align: center; border-top: 1px solid #e0e0e0;">
-                                                    <p style="margin: 0; color: #999; font-size: 13px; line-height: 1.6;">
-                                                        Este es un mensaje automático generado por el sistema.<br>
-                                                        Reporte: <strong>stock.pricelist.report</strong>
-                                                    </p>
-                                                </td>
-                                            </tr>
-                                            
-                                        </table>
-                                    </td>
-                                </tr>
-                            </table>
-                        </body>
-                        </html>
-                        """
-
-                        self.env["mail.mail"].create(
-                            {
-                                "subject": subject,
-                                "body_html": body,
-                                "email_to": ",".join(emails),
-                            }
-                        ).send()
-                        _logger.info(
-                            f"📧 Correo enviado a: {', '.join(emails[:3])}{'...' if len(emails) > 3 else ''}"
-                        )
-                    except Exception as e:
-                        _logger.error(
-                            f"Error al enviar correo de reporte consolidado: {str(e)}"
-                        )
-                else:
-                    _logger.warning(
-                        "No se encontró email_reporte_consolidado en global.config"
-                    )
-
-                # Mostrar notificación de éxito
-                # Construir mensaje claro según lo que pasó
-                if (
-                    update_mode == "zero_or_negative"
-                    and prices_updated == 0
-                    and prices_skipped_positive > 0
-                ):
-                    # Caso especial: modo zero_or_negative pero todos tienen precios > 0
-                    message = f"✅ Proceso completado sin cambios."
-                    message += f"\n\n📊 Se revisaron {total_products} productos (de {total_products_initial} totales)"
-                    message += f"\n✓ Todos ya tienen precios configurados (> 0)"
-                    message += (
-                        f"\n\n💡 No se requieren actualizaciones en modo 'solo ≤ 0'"
-                    )
-                elif prices_updated > 0:
-                    # Hubo actualizaciones
-                    message = f"✅ Reporte actualizado exitosamente"
-                    if update_mode == "zero_or_negative":
-                        message += f"\n\n📊 Productos revisados: {total_products} de {total_products_initial}"
-                    else:
-                        message += f"\n\n📊 Productos procesados: {total_products}"
-
-                    message += f"\n\n💲 Actualización de precios:"
-                    message += f"\n   • {prices_updated} actualizados"
-                    if prices_unchanged > 0:
-                        message += f"\n   • {prices_unchanged} sin cambios"
-                    if prices_skipped > 0:
-                        message += f"\n   • {prices_skipped} sin precio previo"
-                else:
-                    # No hubo actualizaciones pero puede haber otras razones
-                    message = f"✅ Proceso completado"
-                    if update_mode == "zero_or_negative":
-                        message += f"\n\n📊 Productos revisados: {total_products} de {total_products_initial}"
-                    else:
-                        message += f"\n\n� Productos procesados: {total_products}"
-
-                    if prices_unchanged > 0:
-                        message += f"\n\n� Todos los precios ({prices_unchanged}) ya están actualizados"
-                    elif prices_skipped > 0:
-                        message += f"\n\n� {prices_skipped} productos sin precio previo en las listas"
-
-                # Agregar advertencias si hay
-                if error_count > 0:
-                    message += f"\n\n⚠️ {len(products_with_errors)} productos con errores (ver logs)"
-                if prices_failed > 0:
-                    message += f"\n⚠️ {prices_failed} precios fallaron al actualizar"
-
                 return {
                     "type": "ir.actions.client",
                     "tag": "display_notification",
                     "params": {
-                        "title": "Reporte Recargado",
-                        "message": message,
-                        "type": "warning" if error_count > 0 else "success",
-                        "sticky": error_count > 0,
+                        "title": "Recarga en segundo plano",
+                        "message": f"⏳ Recarga #{run.id}: {total_products} productos en "
+                        f"{len(run.chunk_ids)} bloques.\n\nEl reporte y los precios se "
+                        f"actualizan juntos al terminar todos los bloques; se enviará el "
+                        f"correo del reporte consolidado.",
+                        "type": "info",
+                        "sticky": False,
                         "next": {"type": "ir.actions.act_window_close"},
                     },
                 }
-            else:
-                if update_mode == "zero_or_negative" and total_products_initial > 0:
-                    # Caso especial: hay productos pero ninguno con precio <= 0
-                    _logger.info(
-                        f"✅ Todos los productos ({total_products_initial}) ya tienen precios > 0. No se requiere actualización."
-                    )
-                    return {
-                        "type": "ir.actions.client",
-                        "tag": "display_notification",
-                        "params": {
-                            "title": "Sin cambios necesarios",
-                            "message": f"Todos los productos ({total_products_initial}) ya tienen precios configurados (> 0).\n✅ No se requiere actualización en modo 'solo ≤ 0'.",
-                            "type": "info",
-                            "sticky": False,
-                        },
-                    }
-                else:
-                    _logger.warning(
-                        "No se encontraron registros válidos en stock.weighted para cargar"
-                    )
-                    return {
-                        "type": "ir.actions.client",
-                        "tag": "display_notification",
-                        "params": {
-                            "title": "Advertencia",
-                            "message": "No se encontraron datos para cargar en stock.weighted.",
-                            "type": "warning",
-                            "sticky": False,
-                        },
-                    }
+
+            # En serie, en la transacción actual: si algo falla se deshace todo
+            # (filas eliminadas y precios ya escritos)
+            with self.env.cr.savepoint():
+                stock_cache = self._get_report_stock_cache(weighted_records.ids)
+                result = self._process_report_chunk(
+                    weighted_records.ids, pricelists.ids, update_mode, stock_cache
+                )
+                return self._publish_report(
+                    result,
+                    pricelists,
+                    update_mode,
+                    total_products,
+                    total_products_initial,
+                    all_pricelists=not pricelist_ids,
+                )
 
         except Exception as e:
             _logger.error(f"Error crítico al recargar el reporte: {str(e)}")
@@ -0,0 +1,298 @@
+from odoo import models, fields, api
+import hashlib
+import logging
+from .stock_pricelist_report import parse_product_name, detect_product_type
+
+_logger = logging.getLogger(__name__)
+
+
+class StockPricelistReportProduct(models.Model):
+    """Tabla auxiliar por producto con los campos extraídos del nombre.
+
+    El parseo por regex se hace una sola vez por producto (y de nuevo solo si
+    cambia su nombre), en lugar de repetirse en cada registro del reporte.
+    """
+
+    _name = "stock.pricelist.report.product"
+    _description = "Datos de Producto para Reporte Consolidado"
+    _rec_name = "product_id"
+
+    product_id = fields.Many2one(
+        "product.product",
+        string="Producto",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    source_name = fields.Char(string="Nombre procesado")
+    referencia = fields.Char(string="Referencia")
+    disenador = fields.Char(string="Diseñador")
+    descripcion = fields.Char(string="Descripción")
+    tamano = fields.Char(string="Tamaño")
+    genero = fields.Char(string="Genero")
+    tipo = fields.Char(string="Tipo")
+
+    _sql_constraints = [
+        (
+            "product_unique",
+            "unique(product_id)",
+            "Solo puede existir un registro por producto.",
+        )
+    ]
+
+    @api.model
+    def _sync_parsed_names(self, batch_size=1000):
+        """Parsea solo los productos de stock.weighted nuevos o renombrados
+
+        Returns:
+            int: Cantidad de productos creados o actualizados
+        """
+        self.env.cr.execute(
+            "SELECT DISTINCT product_id FROM stock_weighted WHERE product_id IS NOT NULL"
+        )
+        product_ids = [row[0] for row in self.env.cr.fetchall()]
+        existing = {rec.product_id.id: rec for rec in self.search([])}
+
+        to_create = []
+        updated = 0
+        for i in range(0, len(product_ids), batch_size):
+            products = self.env["product.product"].browse(
+                product_ids[i : i + batch_size]
+            )
+            for product in products:
+                name = product.display_name or product.name or ""
+                record = existing.get(product.id)
+                if record and record.source_name == name:
+                    continue
+
+                vals = parse_product_name(name)
+                vals.update({"source_name": name, "tipo": detect_product_type(name)})
+                if record:
+                    record.write(vals)
+                    updated += 1
+                else:
+                    vals["product_id"] = product.id
+                    to_create.append(vals)
+
+        if to_create:
+            self.create(to_create)
+
+        _logger.info(
+            f"🔤 Nombres parseados: {len(to_create)} nuevos, {updated} actualizados"
+        )
+        return len(to_create) + updated
+
+
+class StockPricelistReportMv(models.Model):
+    """Reporte consolidado respaldado por una vista materializada de PostgreSQL.
+
+    Stock, costo ponderado y precio de lista se cruzan en SQL. La vista se
+    refresca con REFRESH MATERIALIZED VIEW CONCURRENTLY, por lo que el
+    reporte sigue disponible para lectura mientras se recalcula.
+
+    Limitación: el precio solo se obtiene de reglas de precio fijo por
+    producto o variante (la regla que Odoo aplicaría primero para cantidad 1,
+    vigente al refrescar). Si la regla que gobierna al producto es una
+    fórmula o un porcentaje, o el precio viene de una regla por categoría o
+    global, el precio queda en 0; para esos casos se usa el modo tabla, que
+    evalúa la lista completa con _get_product_price.
+    """
+
+    _name = "stock.pricelist.report.mv"
+    _description = "Reporte de Stock y Lista de Precios (Vista Materializada)"
+    _auto = False
+    _order = "product_id, pricelist_id"
+
+    product_id = fields.Many2one("product.product", string="Producto", readonly=True)
+    unit_weighted_cost = fields.Float(
+        string="Costo", digits="Product Price", readonly=True
+    )
+    current_stock = fields.Float(string="Existencias", readonly=True)
+    currency_id = fields.Many2one("res.currency", string="Moneda", readonly=True)
+    currency_display = fields.Char(string="Moneda", readonly=True)
+    pricelist_id = fields.Many2one(
+        "product.pricelist", string="Lista de Precios", readonly=True
+    )
+    price = fields.Float(string="Precio", digits="Product Price", readonly=True)
+
+    referencia = fields.Char(string="Referencia", readonly=True)
+    disenador = fields.Char(string="Diseñador", readonly=True)
+    descripcion = fields.Char(string="Descripción", readonly=True)
+    tamano = fields.Char(string="Tamaño", readonly=True)
+    genero = fields.Char(string="Genero", readonly=True)
+    tipo = fields.Char(string="Tipo", readonly=True)
+    stock_showroom_central = fields.Float(
+        string="Stock Showroom Central", readonly=True
+    )
+    stock_showroom_obregon = fields.Float(
+        string="Stock Showroom Obregón", readonly=True
+    )
+
+    def _query(self):
+        """SQL de la vista: un registro por producto ponderado × lista activa"""
+        return """
+            WITH warehouse_locations AS (
+                SELECT sw.name AS warehouse_name, sl.id AS location_id
+                FROM stock_warehouse sw
+                JOIN stock_location root ON root.id = sw.lot_stock_id
+                JOIN stock_location sl ON sl.parent_path LIKE root.parent_path || '%'
+                WHERE sw.name IN ('ALMACEN CENTRAL', 'SHOWROOM CENTRAL', 'SHOWROOM OBREGON')
+            ),
+            stock AS (
+                SELECT
+                    sq.product_id,
+                    SUM(CASE WHEN wl.warehouse_name = 'ALMACEN CENTRAL'
+                        THEN sq.quantity - sq.reserved_quantity ELSE 0 END) AS current_stock,
+                    SUM(CASE WHEN wl.warehouse_name = 'SHOWROOM CENTRAL'
+                        THEN sq.quantity - sq.reserved_quantity ELSE 0 END) AS stock_showroom_central,
+                    SUM(CASE WHEN wl.warehouse_name = 'SHOWROOM OBREGON'
+                        THEN sq.quantity - sq.reserved_quantity ELSE 0 END) AS stock_showroom_obregon
+                FROM stock_quant sq
+                JOIN warehouse_locations wl ON wl.location_id = sq.location_id
+                GROUP BY sq.product_id
+            ),
+            item_prices AS (
+                -- Primera regla por producto/variante en el orden de Odoo
+                -- (applied_on, min_quantity desc, id desc) aplicable a
+                -- cantidad 1 y vigente; solo se usa si es de precio fijo
+                SELECT product_id, pricelist_id, fixed_price
+                FROM (
+                    SELECT DISTINCT ON (pp.id, ppi.pricelist_id)
+                        pp.id AS product_id,
+                        ppi.pricelist_id,
+                        ppi.compute_price,
+                        ppi.fixed_price
+                    FROM product_product pp
+                    JOIN product_pricelist_item ppi
+                      ON (ppi.applied_on = '0_product_variant' AND ppi.product_id = pp.id)
+                      OR (ppi.applied_on = '1_product' AND ppi.product_tmpl_id = pp.product_tmpl_id)
+                    WHERE COALESCE(ppi.min_quantity, 0) <= 1
+                      AND (ppi.date_start IS NULL
+                           OR ppi.date_start <= (NOW() AT TIME ZONE 'UTC'))
+                      AND (ppi.date_end IS NULL
+                           OR ppi.date_end >= (NOW() AT TIME ZONE 'UTC'))
+                    ORDER BY pp.id, ppi.pricelist_id, ppi.applied_on,
+                             ppi.min_quantity DESC, ppi.id DESC
+                ) rules
+                WHERE compute_price = 'fixed'
+            )
+            SELECT
+                ROW_NUMBER() OVER (ORDER BY sw.product_id, pl.id) AS id,
+                sw.product_id,
+                COALESCE(sw.unit_weighted_cost, 0.0) AS unit_weighted_cost,
+                COALESCE(st.current_stock, 0.0) AS current_stock,
+                COALESCE(
+                    sw.currency_id,
+                    (SELECT currency_id FROM res_company ORDER BY id LIMIT 1)
+                ) AS currency_id,
+                COALESCE(rc.name, 'MXN') AS currency_display,
+                pl.id AS pricelist_id,
+                COALESCE(ip.fixed_price, 0.0) AS price,
+                rp.referencia,
+                rp.disenador,
+                rp.descripcion,
+                rp.tamano,
+                rp.genero,
+                rp.tipo,
+                COALESCE(st.stock_showroom_central, 0.0) AS stock_showroom_central,
+                COALESCE(st.stock_showroom_obregon, 0.0) AS stock_showroom_obregon
+            FROM (
+                SELECT DISTINCT ON (product_id) *
+                FROM stock_weighted
+                WHERE product_id IS NOT NULL
+                ORDER BY product_id, id DESC
+            ) sw
+            CROSS JOIN product_pricelist pl
+            LEFT JOIN res_currency rc ON rc.id = sw.currency_id
+            LEFT JOIN stock st ON st.product_id = sw.product_id
+            LEFT JOIN item_prices ip
+              ON ip.product_id = sw.product_id AND ip.pricelist_id = pl.id
+            LEFT JOIN stock_pricelist_report_product rp ON rp.product_id = sw.product_id
+            WHERE pl.active
+        """
+
+    def _index_statements(self):
+        return [
+            # REFRESH ... CONCURRENTLY requiere un índice único sin condición
+            f"""
+            CREATE UNIQUE INDEX {self._table}_product_pricelist_uniq
+            ON {self._table} (product_id, pricelist_id)
+            """,
+            f"CREATE INDEX {self._table}_pricelist_idx ON {self._table} (pricelist_id)",
+            f"CREATE INDEX {self._table}_id_idx ON {self._table} (id)",
+        ]
+
+    def init(self):
+        """Crea la vista materializada y sus índices si su definición cambió
+
+        La firma de la definición se guarda como comentario de la vista; si
+        coincide, la actualización del módulo no la borra ni la repuebla.
+        """
+        query = self._query()
+        indexes = self._index_statements()
+        signature = hashlib.md5("\n".join([query] + indexes).encode()).hexdigest()
+        self.env.cr.execute(
+            """
+            SELECT obj_description(oid, 'pg_class')
+            FROM pg_class
+            WHERE relname = %s AND relkind = 'm'
+            """,
+            (self._table,),
+        )
+        row = self.env.cr.fetchone()
+        if row and row[0] == signature:
+            return
+
+        self.env.cr.execute(f"DROP MATERIALIZED VIEW IF EXISTS {self._table} CASCADE")
+        self.env.cr.execute(f"CREATE MATERIALIZED VIEW {self._table} AS ({query})")
+        for statement in indexes:
+            self.env.cr.execute(statement)
+        self.env.cr.execute(
+            f"COMMENT ON MATERIALIZED VIEW {self._table} IS %s", (signature,)
+        )
+
+    @api.model
+    def refresh_view(self):
+        """Refresca la vista materializada sin bloquear las lecturas del reporte"""
+        return self._refresh_view()
+
+    @api.model
+    def _refresh_view(self, pricelist_ids=None):
+        """Refresca la vista; la vista siempre cubre todas las listas activas
+
+        Con pricelist_ids, al terminar se abre el reporte filtrado a esas listas.
+        """
+        _logger.info("⚙️  Refrescando vista materializada del reporte...")
+        self.env["stock.pricelist.report.product"]._sync_parsed_names()
+        self.env.flush_all()
+
+        self.env.cr.execute(
+            "SELECT relispopulated FROM pg_class WHERE relname = %s", (self._table,)
+        )
+        row = self.env.cr.fetchone()
+        concurrently = "CONCURRENTLY" if row and row[0] else ""
+        self.env.cr.execute(f"REFRESH MATERIALIZED VIEW {concurrently} {self._table}")
+        self.invalidate_model()
+
+        self.env.cr.execute(f"SELECT COUNT(*) FROM {self._table}")
+        total = self.env.cr.fetchone()[0]
+        _logger.info(f"✓ Vista materializada refrescada: {total} registros")
+
+        next_action = {"type": "ir.actions.act_window_close"}
+        if pricelist_ids:
+            next_action = self.env["ir.actions.act_window"]._for_xml_id(
+                "modulo_reporte_ricardo.action_stock_pricelist_report_mv"
+            )
+            next_action["domain"] = [("pricelist_id", "in", list(pricelist_ids))]
+
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Reporte Recargado",
+                "message": f"✅ Vista materializada refrescada ({total:,} registros)",
+                "type": "success",
+                "sticky": False,
+                "next": next_action,
+            },
+        }
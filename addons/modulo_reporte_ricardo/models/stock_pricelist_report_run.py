@@ -0,0 +1,391 @@
+"""
+Recarga en segundo plano del reporte consolidado (stock.pricelist.report).
+
+reload_report encola una corrida con un bloque de productos por registro de
+stock.pricelist.report.run.chunk. Los bloques los procesan las tareas
+programadas "Reporte consolidado: procesar bloques"; cada una corre en su
+propio proceso de cron (servidor con workers), por lo que el cálculo de
+precios usa varios núcleos. Cuántas corren a la vez lo limita también
+max_cron_threads del servidor.
+
+  1. Cada bloque calcula sus filas y precios dentro de un savepoint que se
+     deshace al terminar: no deja cambios en las listas de precios. Las
+     filas y los precios a escribir se guardan como resultado del bloque
+     (staging, clave = la corrida).
+  2. Un bloque que falla se reintenta hasta CHUNK_MAX_ATTEMPTS veces; si
+     sigue fallando la corrida queda en error sin tocar el reporte ni los
+     precios, y "Reintentar" vuelve a encolar solo los bloques fallidos.
+  3. Cuando todos los bloques terminaron, la corrida se publica en una sola
+     transacción: se escriben los precios, se reemplazan las filas del
+     reporte y se envía el correo. Si algo falla, se deshace completa.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+# Intentos de un bloque antes de dar la corrida por fallida
+CHUNK_MAX_ATTEMPTS = 3
+# Segundos que una ejecución del cron procesa bloques antes de re-encolarse
+CHUNK_TIME_BUDGET = 300
+# Tareas programadas que procesan bloques (ver data/ir_cron.xml)
+REPORT_CRON_WORKERS = 4
+
+
+class StockPricelistReportRun(models.Model):
+    _name = "stock.pricelist.report.run"
+    _description = "Recarga en segundo plano del Reporte Consolidado"
+    _order = "id desc"
+
+    user_id = fields.Many2one(
+        "res.users",
+        string="Solicitado por",
+        default=lambda self: self.env.user,
+        readonly=True,
+    )
+    pricelist_ids = fields.Many2many(
+        "product.pricelist", string="Listas de Precios", readonly=True
+    )
+    all_pricelists = fields.Boolean(string="Todas las listas", readonly=True)
+    update_mode = fields.Selection(
+        [
+            ("all", "Actualizar todos los precios"),
+            ("zero_or_negative", "Solo actualizar precios ≤ 0"),
+        ],
+        string="Modo de actualización",
+        default="all",
+        required=True,
+        readonly=True,
+    )
+    total_products = fields.Integer(string="Productos", readonly=True)
+    total_products_initial = fields.Integer(
+        string="Productos en stock.weighted", readonly=True
+    )
+    state = fields.Selection(
+        [
+            ("running", "En proceso"),
+            ("done", "Publicada"),
+            ("failed", "Con error"),
+        ],
+        string="Estado",
+        default="running",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    date_start = fields.Datetime(
+        string="Inicio", default=fields.Datetime.now, readonly=True
+    )
+    date_end = fields.Datetime(string="Fin", readonly=True)
+    error = fields.Text(string="Error", readonly=True)
+    chunk_ids = fields.One2many(
+        "stock.pricelist.report.run.chunk",
+        "run_id",
+        string="Bloques",
+        readonly=True,
+    )
+    chunk_count = fields.Integer(string="Bloques", compute="_compute_progress")
+    done_count = fields.Integer(string="Terminados", compute="_compute_progress")
+    failed_count = fields.Integer(string="Fallidos", compute="_compute_progress")
+    progress = fields.Float(string="Progreso", compute="_compute_progress")
+
+    @api.depends("chunk_ids.state")
+    def _compute_progress(self):
+        counts = {
+            (run.id, state): count
+            for run, state, count in self.env[
+                "stock.pricelist.report.run.chunk"
+            ]._read_group(
+                [("run_id", "in", self.ids)],
+                groupby=["run_id", "state"],
+                aggregates=["__count"],
+            )
+        }
+        for run in self:
+            run.done_count = counts.get((run.id, "done"), 0)
+            run.failed_count = counts.get((run.id, "failed"), 0)
+            run.chunk_count = (
+                run.done_count + run.failed_count + counts.get((run.id, "pending"), 0)
+            )
+            run.progress = (
+                100.0 * run.done_count / run.chunk_count if run.chunk_count else 0.0
+            )
+
+    # ── Encolado ────────────────────────────────────────────────────────────
+
+    @api.model
+    def _enqueue(
+        self,
+        pricelists,
+        weighted_ids,
+        update_mode,
+        total_products_initial,
+        all_pricelists=False,
+        workers=REPORT_CRON_WORKERS,
+        chunk_size=500,
+    ):
+        """Crea la corrida con sus bloques y despierta a `workers` crons"""
+        run = self.create(
+            {
+                "pricelist_ids": [fields.Command.set(pricelists.ids)],
+                "all_pricelists": all_pricelists,
+                "update_mode": update_mode,
+                "total_products": len(weighted_ids),
+                "total_products_initial": total_products_initial,
+                "chunk_ids": [
+                    fields.Command.create(
+                        {
+                            "sequence": index,
+                            "weighted_ids": json.dumps(
+                                weighted_ids[i : i + chunk_size]
+                            ),
+                        }
+                    )
+                    for index, i in enumerate(
+                        range(0, len(weighted_ids), chunk_size)
+                    )
+                ],
+            }
+        )
+        _logger.info(
+            f"🧵 Recarga #{run.id}: {len(weighted_ids)} productos en "
+            f"{len(run.chunk_ids)} bloques para {workers} crons"
+        )
+        self._trigger_workers(workers)
+        return run
+
+    @api.model
+    def _trigger_workers(self, workers=REPORT_CRON_WORKERS):
+        for number in range(1, min(max(workers, 1), REPORT_CRON_WORKERS) + 1):
+            cron = self.env.ref(
+                f"modulo_reporte_ricardo.ir_cron_pricelist_report_chunks_{number}",
+                raise_if_not_found=False,
+            )
+            if cron:
+                cron._trigger()
+
+    def action_retry(self):
+        """Vuelve a encolar los bloques fallidos; los terminados se conservan"""
+        for run in self.filtered(lambda run: run.state == "failed"):
+            run.chunk_ids.filtered(lambda chunk: chunk.state == "failed").write(
+                {"state": "pending", "attempts": 0, "error": False}
+            )
+            run.write({"state": "running", "error": False, "date_end": False})
+        self._trigger_workers()
+
+    # ── Procesamiento (cron) ────────────────────────────────────────────────
+
+    @api.model
+    def _cron_process_chunks(self, time_budget=CHUNK_TIME_BUDGET):
+        """Procesa bloques pendientes y publica las corridas completas
+
+        Varias de estas tareas corren a la vez: cada bloque se toma con
+        FOR UPDATE SKIP LOCKED y se confirma junto con su resultado.
+        """
+        Chunk = self.env["stock.pricelist.report.run.chunk"]
+        deadline = time.monotonic() + time_budget
+        while time.monotonic() < deadline:
+            chunk = Chunk._claim_next()
+            if not chunk:
+                break
+            chunk._process()
+            self._commit()
+            self._publish_completed()
+            self._commit()
+        else:
+            # Sin tiempo: continuar en una nueva ejecución
+            self._trigger_workers(1)
+            return
+
+        # Corridas completas sin publicar (p. ej. reintentadas tras fallar al publicar)
+        self._publish_completed()
+        self._commit()
+
+    def _commit(self):
+        # Las pruebas corren en una sola transacción que no se confirma
+        if not getattr(threading.current_thread(), "testing", False):
+            self.env.cr.commit()
+
+    @api.model
+    def _publish_completed(self):
+        """Publica las corridas que ya no tienen bloques pendientes
+
+        Se llama al inicio de una transacción. El bloqueo de la fila de la
+        corrida (SKIP LOCKED) evita que dos crons la publiquen a la vez.
+        """
+        self.flush_model(["state"])
+        self.env["stock.pricelist.report.run.chunk"].flush_model(["state"])
+        self.env.cr.execute(
+            """
+            SELECT r.id
+            FROM stock_pricelist_report_run r
+            WHERE r.state = 'running'
+              AND NOT EXISTS (
+                  SELECT 1 FROM stock_pricelist_report_run_chunk c
+                  WHERE c.run_id = r.id AND c.state != 'done'
+              )
+            ORDER BY r.id
+            FOR UPDATE OF r SKIP LOCKED
+            """
+        )
+        runs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        for run in runs:
+            try:
+                with self.env.cr.savepoint():
+                    run._publish()
+            except Exception as e:
+                _logger.exception(f"Error al publicar la recarga #{run.id}")
+                run._fail(str(e))
+        return runs.filtered(lambda run: run.state == "done")
+
+    def _publish(self):
+        """Aplica los resultados de todos los bloques en la transacción actual"""
+        self.ensure_one()
+        Report = self.env["stock.pricelist.report"].with_user(self.user_id)
+        chunks = self.chunk_ids.sorted("sequence")
+        result = Report._merge_chunk_results(
+            [json.loads(chunk.result) for chunk in chunks]
+        )
+        Report._apply_price_updates(result, self.update_mode)
+        Report._publish_report(
+            result,
+            self.pricelist_ids,
+            self.update_mode,
+            self.total_products,
+            self.total_products_initial,
+            all_pricelists=self.all_pricelists,
+        )
+        chunks.write({"result": False})
+        self.write({"state": "done", "date_end": fields.Datetime.now()})
+        _logger.info(f"✓ Recarga #{self.id} publicada ({len(chunks)} bloques)")
+
+    def _fail(self, error):
+        """La corrida queda en error; el reporte y los precios no cambian"""
+        self.ensure_one()
+        self.write(
+            {"state": "failed", "error": error, "date_end": fields.Datetime.now()}
+        )
+        try:
+            self.env["bus.bus"]._sendone(
+                self.user_id.partner_id,
+                "simple_notification",
+                {
+                    "title": _("Error al recargar el reporte"),
+                    "message": _(
+                        "La recarga #%(run)s no se aplicó: %(error)s"
+                    )
+                    % {"run": self.id, "error": error},
+                    "type": "danger",
+                    "sticky": True,
+                },
+            )
+        except Exception:
+            pass  # la notificación no debe afectar a la corrida
+
+
+class StockPricelistReportRunChunk(models.Model):
+    _name = "stock.pricelist.report.run.chunk"
+    _description = "Bloque de la recarga del Reporte Consolidado"
+    _order = "run_id, sequence"
+
+    run_id = fields.Many2one(
+        "stock.pricelist.report.run",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    sequence = fields.Integer(string="Bloque", readonly=True)
+    weighted_ids = fields.Text(
+        string="Registros stock.weighted", required=True, readonly=True
+    )
+    state = fields.Selection(
+        [
+            ("pending", "Pendiente"),
+            ("done", "Terminado"),
+            ("failed", "Fallido"),
+        ],
+        string="Estado",
+        default="pending",
+        required=True,
+        index=True,
+    )
+    attempts = fields.Integer(string="Intentos", readonly=True)
+    error = fields.Text(string="Error", readonly=True)
+    # Filas y precios calculados, en JSON, hasta que la corrida se publica
+    result = fields.Text(string="Resultado", readonly=True)
+
+    @api.model
+    def _claim_next(self):
+        """Siguiente bloque pendiente, bloqueado hasta el commit del bloque"""
+        self.flush_model(["state"])
+        self.env["stock.pricelist.report.run"].flush_model(["state"])
+        self.env.cr.execute(
+            """
+            SELECT c.id
+            FROM stock_pricelist_report_run_chunk c
+            JOIN stock_pricelist_report_run r ON r.id = c.run_id
+            WHERE c.state = 'pending' AND r.state = 'running'
+            ORDER BY c.run_id, c.sequence
+            LIMIT 1
+            FOR UPDATE OF c SKIP LOCKED
+            """
+        )
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    def _process(self):
+        """Calcula el bloque sin dejar cambios y guarda su resultado
+
+        Los precios se escriben igual que en la recarga en serie (un producto
+        ve los precios que ya se actualizaron de las listas anteriores), pero
+        dentro de un savepoint que se deshace: se aplican al publicar.
+        """
+        self.ensure_one()
+        run = self.run_id
+        Report = self.env["stock.pricelist.report"].with_user(run.user_id)
+        weighted_ids = json.loads(self.weighted_ids)
+        try:
+            with self.env.cr.savepoint() as savepoint:
+                stock_cache = Report._get_report_stock_cache(weighted_ids)
+                result = Report._process_report_chunk(
+                    weighted_ids, run.pricelist_ids.ids, run.update_mode, stock_cache
+                )
+                savepoint.rollback()
+        except Exception as e:
+            _logger.exception(
+                f"Error en el bloque {self.sequence + 1} de la recarga #{run.id}"
+            )
+            attempts = self.attempts + 1
+            failed = attempts >= CHUNK_MAX_ATTEMPTS
+            self.write(
+                {
+                    "state": "failed" if failed else "pending",
+                    "attempts": attempts,
+                    "error": str(e),
+                }
+            )
+            if failed:
+                run._fail(
+                    f"Bloque {self.sequence + 1}: {e} ({attempts} intentos)"
+                )
+            return False
+
+        result["products_with_errors"] = sorted(result["products_with_errors"])
+        self.write(
+            {
+                "state": "done",
+                "attempts": self.attempts + 1,
+                "error": False,
+                "result": json.dumps(result),
+            }
+        )
+        _logger.info(
+            f"Bloque {self.sequence + 1} de la recarga #{run.id}: "
+            f"{result['processed']} productos procesados"
+        )
+        return True
@@ -0,0 +1,139 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+PRICING = (
+    "odoo.addons.modulo_reporte_ricardo.models.stock_pricelist_report."
+    "calcular_precio_debug"
+)
+
+
+class TestStockPricelistReportRun(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Run = cls.env["stock.pricelist.report.run"]
+        cls.Report = cls.env["stock.pricelist.report"]
+        cls.pricelist = cls.env["product.pricelist"].create(
+            {"name": "Lista prueba bloques"}
+        )
+        cls.products = cls.env["product.product"].create(
+            [
+                {"name": f"[BLQ{index}] Diseñador - Perfume {index} 100ML Dama"}
+                for index in range(4)
+            ]
+        )
+        cls.items = cls.env["product.pricelist.item"].create(
+            [
+                {
+                    "pricelist_id": cls.pricelist.id,
+                    "applied_on": "0_product_variant",
+                    "product_id": product.id,
+                    "compute_price": "fixed",
+                    "fixed_price": 10.0,
+                }
+                for product in cls.products
+            ]
+        )
+        cls.weighted = cls.env["stock.weighted"].create(
+            [
+                {"product_id": product.id, "unit_weighted_cost": 5.0}
+                for product in cls.products
+            ]
+        )
+        cls.old_row = cls.Report.create(
+            {
+                "product_id": cls.products[0].id,
+                "pricelist_id": cls.pricelist.id,
+                "price": 10.0,
+            }
+        )
+
+    def _enqueue(self):
+        # 4 productos en bloques de 2
+        return self.Run._enqueue(
+            self.pricelist,
+            self.weighted.ids,
+            "all",
+            len(self.weighted),
+            chunk_size=2,
+        )
+
+    def _fixed_prices(self):
+        self.items.invalidate_recordset(["fixed_price"])
+        return set(self.items.mapped("fixed_price"))
+
+    def _report_rows(self):
+        return self.Report.search([("pricelist_id", "=", self.pricelist.id)])
+
+    def test_chunk_does_not_write_prices(self):
+        run = self._enqueue()
+        self.assertEqual(len(run.chunk_ids), 2)
+        with patch(PRICING, return_value={"resultado": 20.0}):
+            chunk = self.env["stock.pricelist.report.run.chunk"]._claim_next()
+            self.assertTrue(chunk._process())
+        self.assertEqual(chunk.state, "done")
+        self.assertEqual(self._fixed_prices(), {10.0})
+        self.assertEqual(self._report_rows(), self.old_row)
+        self.assertEqual(run.state, "running")
+
+    def test_publish_applies_all_chunks(self):
+        run = self._enqueue()
+        with patch(PRICING, return_value={"resultado": 20.0}):
+            self.Run._cron_process_chunks()
+        self.assertEqual(run.state, "done")
+        self.assertEqual(self._fixed_prices(), {20.0})
+        rows = self._report_rows()
+        self.assertFalse(self.old_row.exists())
+        self.assertEqual(rows.product_id, self.products)
+        self.assertEqual(set(rows.mapped("price")), {20.0})
+        self.assertFalse(any(run.chunk_ids.mapped("result")))
+
+    def test_failed_chunk_keeps_report_and_retry(self):
+        run = self._enqueue()
+        broken_id = self.weighted[-1].id
+        get_stock_cache = type(self.Report)._get_report_stock_cache
+
+        def stock_cache(report, weighted_ids):
+            if broken_id in weighted_ids:
+                raise ValueError("bloque dañado")
+            return get_stock_cache(report, weighted_ids)
+
+        with patch(PRICING, return_value={"resultado": 20.0}), patch.object(
+            type(self.Report),
+            "_get_report_stock_cache",
+            autospec=True,
+            side_effect=stock_cache,
+        ):
+            self.Run._cron_process_chunks()
+
+        first, second = run.chunk_ids.sorted("sequence")
+        self.assertEqual(run.state, "failed")
+        self.assertEqual(first.state, "done")
+        self.assertEqual(second.state, "failed")
+        self.assertEqual(second.attempts, 3)
+        # Nada de la corrida se aplicó
+        self.assertEqual(self._fixed_prices(), {10.0})
+        self.assertEqual(self._report_rows(), self.old_row)
+
+        # Reintentar solo procesa el bloque fallido
+        run.action_retry()
+        with patch(PRICING, return_value={"resultado": 20.0}):
+            self.Run._cron_process_chunks()
+        self.assertEqual(run.state, "done")
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(second.attempts, 1)
+        self.assertEqual(self._fixed_prices(), {20.0})
+        self.assertEqual(self._report_rows().product_id, self.products)
+
+    def test_serial_reload_rolls_back_on_error(self):
+        with patch(PRICING, return_value={"resultado": 20.0}), patch.object(
+            type(self.Report),
+            "_publish_report",
+            autospec=True,
+            side_effect=ValueError("fallo al publicar"),
+        ):
+            action = self.Report.reload_report(pricelist_ids=self.pricelist.ids)
+        self.assertEqual(action["params"]["type"], "danger")
+        self.assertEqual(self._fixed_prices(), {10.0})
+        self.assertTrue(self.old_row.exists())
@@ -30,6 +30,35 @@ class ReloadReportWizard(models.TransientModel):
         "• Solo ≤ 0: Solo actualiza productos sin precio o con precio negativo (más rápido)",
     )
 
+    report_backend = fields.Selection(
+        [
+            ("table", "Tabla (recalcula y actualiza precios)"),
+            ("materialized_view", "Vista materializada (solo refresca)"),
+        ],
+        string="Modo del reporte",
+        default="table",
+        required=True,
+        help="• Tabla: Borra y recrea el reporte, recalculando los precios de las listas\n"
+        "• Vista materializada: Refresca en SQL el stock, costo y precio fijo "
+        "por producto de las listas activas sin bloquear las consultas al reporte "
+        "(fórmulas y reglas por categoría o globales quedan en 0)",
+    )
+
+    parallel_workers = fields.Integer(
+        string="Procesos en paralelo",
+        default=0,
+        help="Cantidad de tareas programadas (hasta 4) que procesan los productos "
+        "en bloques en segundo plano, cada una en su propio proceso. El reporte y "
+        "los precios se actualizan juntos al terminar todos los bloques. "
+        "0 o 1 = procesamiento en serie.",
+    )
+
+    chunk_size = fields.Integer(
+        string="Productos por bloque",
+        default=500,
+        help="Tamaño de cada bloque de productos en el procesamiento en segundo plano",
+    )
+
     total_pricelists = fields.Integer(
         string="Total de listas disponibles",
         compute="_compute_total_pricelists",
@@ -99,8 +128,17 @@ class ReloadReportWizard(models.TransientModel):
             # Si no hay selección, procesar todas (comportamiento por defecto)
             pricelist_ids = self.env["product.pricelist"].search([]).ids
 
+        if self.report_backend == "materialized_view":
+            # La vista cubre todas las listas; se abre filtrada a la selección
+            return self.env["stock.pricelist.report.mv"]._refresh_view(
+                pricelist_ids=None if self.process_all else self.pricelist_ids.ids
+            )
+
         # Llamar al método de recarga con las listas seleccionadas y el modo de actualización
         report_model = self.env["stock.pricelist.report"]
         return report_model.reload_report(
-            pricelist_ids=pricelist_ids, update_mode=self.update_mode
+            pricelist_ids=pricelist_ids,
+            update_mode=self.update_mode,
+            workers=self.parallel_workers,
+            chunk_size=self.chunk_size or 500,
         )
@@ -45,6 +45,12 @@ WordPress Sync
         "views/woo_order_views.xml",
         # Cupones WooCommerce
         "views/woo_coupon_views.xml",
+        # Historial de rendimiento de sincronizaciones
+        "views/woo_sync_profile_views.xml",
+        # Publicación masiva en segundo plano
+        "views/woo_bulk_publish_job_views.xml",
+        # Caché de imágenes subidas a WordPress
+        "views/woo_media_views.xml",
         # Acciones filtradas por instancia activa (Ordenes, Productos, ...)
         "views/woo_instance_filtered_actions.xml",
         # Main menu
@@ -53,7 +59,7 @@ WordPress Sync
         "views/wizards/woo_confirmation_wizard_views.xml",
         "views/wizards/woo_link_wizard_views.xml",
         "views/wizards/woo_publish_wizard_views.xml",
-        # "views/wizards/woo_bulk_publish_wizard_views.xml",
+        "views/wizards/woo_bulk_publish_wizard_views.xml",
         # Herencia producto
         "views/woo_product_template_views.xml",
     ],
@@ -15,7 +15,10 @@ from . import (
 from . import woo_link_wizard  # Wizard: link WC product to Odoo
 from . import woo_publish_wizard  # Wizard: publish Odoo product to WooCommerce
 
-# from . import woo_bulk_publish_wizard  # Wizard: bulk publish Odoo → WooCommerce
+from . import woo_bulk_publish_wizard  # Wizard: bulk publish Odoo → WooCommerce
+from . import woo_bulk_publish_job  # Background bulk publish queue
+from . import woo_media  # Content-addressed WordPress media cache
+from . import woo_sync_profiler  # Per-run sync performance history
 from . import woo_service  # Centralized HTTP service for WooCommerce
 from . import woo_confirmation_wizard  # Generic confirmation wizard
 from . import woo_pricelist_listener  # Pricelist change → woo_pending_sync flag
@@ -0,0 +1,441 @@
+"""
+Background bulk publish of Odoo products → WooCommerce.
+
+The bulk publish wizard queues a ``woo.bulk.publish.job`` with one line per
+product; a cron processes the queue by chunks:
+
+  1. Payloads are built with ``woo.product.sync._prepare_publish_payload``.
+  2. Product images are uploaded concurrently (``woo.service.upload_images``),
+     reusing media already uploaded to the instance (``woo.media``).
+  3. Creates and updates go through ``products/batch`` (one request per chunk).
+
+Every chunk is committed with its line states, so a job interrupted by a
+restart or the worker limits resumes with its pending lines on the next run.
+
+Resending a chunk never duplicates products in WooCommerce:
+
+  - Each chunk runs in a savepoint; if it fails before the batch is sent,
+    its lines are marked ``error`` (and can be retried).
+  - The WooCommerce ids returned by ``products/batch`` are stored on the
+    lines before any other ORM work, and each result is applied in its own
+    savepoint, so a failure there keeps the id and a retry updates.
+  - Lines without a known id are looked up by SKU first: a product already
+    in WooCommerce (e.g. created by a request whose response was lost) is
+    updated instead of created again.
+"""
+
+import base64
+import logging
+import threading
+import time
+
+from odoo import models, fields, api, _
+
+from .woo_media import image_checksum
+
+_logger = logging.getLogger(__name__)
+
+# Products per products/batch request (WooCommerce accepts up to 100)
+PUBLISH_CHUNK_SIZE = 50
+# Seconds a cron run keeps processing before re-triggering itself
+PUBLISH_TIME_BUDGET = 300
+
+
+class WooBulkPublishJob(models.Model):
+    _name = "woo.bulk.publish.job"
+    _description = "WooCommerce Bulk Publish Job"
+    _order = "id desc"
+
+    name = fields.Char(string="Job", required=True, readonly=True)
+    instance_id = fields.Many2one(
+        "woo.instance",
+        string="WooCommerce Instance",
+        required=True,
+        readonly=True,
+        ondelete="cascade",
+    )
+    user_id = fields.Many2one(
+        "res.users",
+        string="Requested by",
+        default=lambda self: self.env.user,
+        readonly=True,
+    )
+    wc_status = fields.Selection(
+        [
+            ("draft", "Draft"),
+            ("publish", "Published"),
+        ],
+        string="WooCommerce Status",
+        default="draft",
+        required=True,
+        readonly=True,
+    )
+    state = fields.Selection(
+        [
+            ("queued", "Queued"),
+            ("running", "Running"),
+            ("done", "Done"),
+            ("cancelled", "Cancelled"),
+        ],
+        string="Status",
+        default="queued",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    date_start = fields.Datetime(string="Started", readonly=True)
+    date_end = fields.Datetime(string="Finished", readonly=True)
+    line_ids = fields.One2many(
+        "woo.bulk.publish.job.line",
+        "job_id",
+        string="Products",
+        readonly=True,
+    )
+    line_count = fields.Integer(string="Products", compute="_compute_progress")
+    done_count = fields.Integer(string="Published", compute="_compute_progress")
+    error_count = fields.Integer(string="Errors", compute="_compute_progress")
+    pending_count = fields.Integer(string="Pending", compute="_compute_progress")
+    progress = fields.Float(string="Progress", compute="_compute_progress")
+
+    # ── Computed ───────────────────────────────────────────────────────────────
+
+    @api.depends("line_ids.state")
+    def _compute_progress(self):
+        counts = {
+            (job.id, state): count
+            for job, state, count in self.env["woo.bulk.publish.job.line"]._read_group(
+                [("job_id", "in", self.ids)],
+                groupby=["job_id", "state"],
+                aggregates=["__count"],
+            )
+        }
+        for job in self:
+            job.done_count = counts.get((job.id, "done"), 0)
+            job.error_count = counts.get((job.id, "error"), 0)
+            job.pending_count = counts.get((job.id, "pending"), 0)
+            job.line_count = job.done_count + job.error_count + job.pending_count
+            processed = job.done_count + job.error_count
+            job.progress = 100.0 * processed / job.line_count if job.line_count else 0.0
+
+    # ── Actions ────────────────────────────────────────────────────────────────
+
+    def action_retry_failed(self):
+        """Queues the failed lines again."""
+        for job in self:
+            failed = job.line_ids.filtered(lambda line: line.state == "error")
+            if not failed:
+                continue
+            failed.write({"state": "pending", "error": False})
+            job.write({"state": "queued", "date_end": False})
+        self._trigger_processing()
+
+    def action_cancel(self):
+        """Stops the job; lines already published stay published."""
+        self.filtered(lambda job: job.state in ("queued", "running")).write(
+            {"state": "cancelled", "date_end": fields.Datetime.now()}
+        )
+
+    def action_refresh(self):
+        return True
+
+    # ── Queue processing ───────────────────────────────────────────────────────
+
+    def _trigger_processing(self):
+        cron = self.env.ref(
+            "odoo_wp_sync.ir_cron_woo_bulk_publish", raise_if_not_found=False
+        )
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _cron_process_jobs(self, time_budget=PUBLISH_TIME_BUDGET):
+        """Processes queued jobs chunk by chunk within the time budget."""
+        deadline = time.monotonic() + time_budget
+        jobs = self.search([("state", "in", ("queued", "running"))], order="id")
+        for job in jobs:
+            if job.state == "queued":
+                job.write({"state": "running", "date_start": fields.Datetime.now()})
+            while time.monotonic() < deadline:
+                lines = job.line_ids.filtered(lambda line: line.state == "pending")
+                if not lines:
+                    job._finish()
+                    break
+                chunk = lines[:PUBLISH_CHUNK_SIZE]
+                try:
+                    with self.env.cr.savepoint():
+                        job._process_chunk(chunk)
+                except Exception as e:
+                    _logger.exception(
+                        "Bulk publish chunk failed for '%s'", job.name
+                    )
+                    # Lines already published keep their state and WooCommerce id
+                    chunk.filtered(lambda line: line.state == "pending").write(
+                        {"state": "error", "error": str(e)}
+                    )
+                # Tests run in a single transaction that must not be committed
+                if not getattr(threading.current_thread(), "testing", False):
+                    self.env.cr.commit()
+                # A user may have cancelled the job meanwhile
+                job.invalidate_recordset(["state"])
+                if job.state == "cancelled":
+                    break
+            else:
+                # Out of time: continue in a new cron run
+                self._trigger_processing()
+                return
+
+    def _finish(self):
+        self.ensure_one()
+        self.write({"state": "done", "date_end": fields.Datetime.now()})
+        _logger.info(
+            "Bulk publish '%s' finished: %d published, %d errors",
+            self.name,
+            self.done_count,
+            self.error_count,
+        )
+        try:
+            with self.env.cr.savepoint():
+                self.env["bus.bus"]._sendone(
+                    self.user_id.partner_id,
+                    "simple_notification",
+                    {
+                        "title": _("Bulk publish completed"),
+                        "message": _(
+                            "%(ok)d product(s) published in '%(instance)s', "
+                            "%(fail)d with errors."
+                        )
+                        % {
+                            "ok": self.done_count,
+                            "instance": self.instance_id.name,
+                            "fail": self.error_count,
+                        },
+                        "type": "warning" if self.error_count else "success",
+                        "sticky": bool(self.error_count),
+                    },
+                )
+        except Exception:
+            # Never fail the job over a notification
+            _logger.exception(
+                "Could not notify the end of bulk publish '%s'", self.name
+            )
+
+    def _process_chunk(self, lines):
+        """Publishes one chunk of lines with a single products/batch request."""
+        self.ensure_one()
+        instance = self.instance_id
+        sync = self.env["woo.product.sync"]
+        svc = self.env["woo.service"]
+        WooProduct = self.env["woo.product"]
+        templates = lines.product_tmpl_id
+
+        existing_by_tmpl = {}
+        for woo_product in WooProduct.search(
+            [("product_tmpl_id", "in", templates.ids), ("instance_id", "=", instance.id)]
+        ):
+            existing_by_tmpl.setdefault(woo_product.product_tmpl_id.id, woo_product)
+
+        # Apply taxes configured in instance to the Odoo products (one write)
+        if instance.include_taxes_wc_product_sync and instance.taxes_product:
+            templates.write(
+                {"taxes_id": [fields.Command.set(instance.taxes_product.ids)]}
+            )
+
+        payloads = {}
+        for line in lines:
+            tmpl = line.product_tmpl_id
+            try:
+                payloads[line.id] = sync._prepare_publish_payload(
+                    tmpl, instance, existing_by_tmpl.get(tmpl.id), self.wc_status
+                )
+            except Exception as e:
+                line.write({"state": "error", "error": str(e)})
+
+        media = self._upload_chunk_images(
+            lines.filtered(lambda line: line.id in payloads)
+        )
+
+        to_create, to_update = [], []
+        for line in lines:
+            if line.id not in payloads:
+                continue
+            payload, _price = payloads[line.id]
+            if line.image_checksum and media.get(line.image_checksum):
+                payload["images"] = [{"id": media[line.image_checksum][0]}]
+            existing = existing_by_tmpl.get(line.product_tmpl_id.id)
+            # line.woo_id: created by an earlier attempt of this job
+            woo_id = (existing and existing.woo_id) or line.woo_id
+            if woo_id:
+                to_update.append((line, dict(payload, id=woo_id)))
+            else:
+                to_create.append((line, payload))
+
+        if to_create:
+            to_create, found = self._split_existing_by_sku(to_create)
+            to_update += found
+
+        if not to_create and not to_update:
+            return
+
+        try:
+            response = svc.batch_products(
+                instance,
+                create=[payload for _line, payload in to_create],
+                update=[payload for _line, payload in to_update],
+            )
+        except Exception as e:
+            _logger.warning("Bulk publish batch failed for '%s': %s", self.name, e)
+            for line, _payload in to_create + to_update:
+                line.write({"state": "error", "error": str(e)})
+            return
+
+        # Results come back in the order sent; a missing result is an error.
+        # The WooCommerce ids are stored first: whatever fails afterwards, a
+        # retry updates these products instead of creating them again.
+        outcomes = []
+        for key, sent in (("create", to_create), ("update", to_update)):
+            results = response.get(key) or []
+            for position, (line, _payload) in enumerate(sent):
+                result = results[position] if position < len(results) else None
+                if result and not result.get("error") and result.get("id"):
+                    line.woo_id = result["id"]
+                outcomes.append((line, result))
+        lines.flush_recordset(["woo_id"])
+
+        for line, result in outcomes:
+            existing = existing_by_tmpl.get(line.product_tmpl_id.id)
+            try:
+                with self.env.cr.savepoint():
+                    self._apply_result(line, result, payloads[line.id][1], existing)
+            except Exception as e:
+                _logger.warning(
+                    "Bulk publish '%s': could not store result of %s: %s",
+                    self.name,
+                    line.product_tmpl_id.display_name,
+                    e,
+                )
+                line.write({"state": "error", "error": str(e)})
+
+        _logger.info(
+            "Bulk publish '%s': chunk of %d sent (%d created, %d updated)",
+            self.name,
+            len(lines),
+            len(to_create),
+            len(to_update),
+        )
+
+    def _split_existing_by_sku(self, to_create):
+        """
+        Moves to update the products that already exist in WooCommerce.
+
+        Returns:
+            tuple: (to_create, to_update) lists of ``(line, payload)``
+        """
+        by_sku = self.env["woo.service"].fetch_products_by_sku(
+            self.instance_id, [payload.get("sku") for _line, payload in to_create]
+        )
+        if not by_sku:
+            return to_create, []
+        remaining, to_update = [], []
+        for line, payload in to_create:
+            wc_product = by_sku.get(payload.get("sku"))
+            if wc_product:
+                to_update.append((line, dict(payload, id=wc_product["id"])))
+            else:
+                remaining.append((line, payload))
+        return remaining, to_update
+
+    def _upload_chunk_images(self, lines):
+        """
+        Uploads the chunk's product images.
+
+        ``woo.service.upload_images`` uploads each distinct image once and
+        reuses media already uploaded to the instance (``woo.media``).
+
+        Returns:
+            dict: {checksum: (media_id, src_url)}
+        """
+        images = {}
+        for line in lines:
+            image_b64 = line.product_tmpl_id.image_1920
+            if not image_b64:
+                continue
+            data = base64.b64decode(image_b64)
+            checksum = image_checksum(data)
+            line.image_checksum = checksum
+            images.setdefault(checksum, data)
+        if not images:
+            return {}
+
+        uploaded = self.env["woo.service"].upload_images(self.instance_id, images)
+        media = {key: value for key, value in uploaded.items() if value[0]}
+        for line in lines:
+            if line.image_checksum in media:
+                media_id, src = media[line.image_checksum]
+                line.write({"media_id": media_id, "media_src": src})
+        return media
+
+    def _apply_result(self, line, result, price, existing):
+        """Stores the products/batch result of one line."""
+        if not result or result.get("error") or not result.get("id"):
+            error = (result or {}).get("error") or {}
+            line.write(
+                {
+                    "state": "error",
+                    "error": error.get("message") or _("No response from WooCommerce"),
+                }
+            )
+            return
+
+        tmpl = line.product_tmpl_id
+        if existing:
+            existing.write(
+                {
+                    "woo_id": result["id"],
+                    "woo_name": result.get("name", tmpl.name),
+                    "woo_status": result.get("status", self.wc_status),
+                    "woo_price": price,
+                    "last_sync_date": fields.Datetime.now(),
+                }
+            )
+        else:
+            sync = self.env["woo.product.sync"]
+            vals = sync._build_woo_product_vals(result, self.instance_id)
+            vals["product_tmpl_id"] = tmpl.id
+            self.env["woo.product"].create(vals)
+        line.write({"state": "done", "woo_id": result["id"], "error": False})
+
+
+class WooBulkPublishJobLine(models.Model):
+    _name = "woo.bulk.publish.job.line"
+    _description = "WooCommerce Bulk Publish Job Line"
+    _order = "id"
+
+    job_id = fields.Many2one(
+        "woo.bulk.publish.job",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    product_tmpl_id = fields.Many2one(
+        "product.template",
+        string="Product",
+        required=True,
+        ondelete="cascade",
+    )
+    default_code = fields.Char(related="product_tmpl_id.default_code", string="SKU")
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("done", "Published"),
+            ("error", "Error"),
+        ],
+        string="Status",
+        default="pending",
+        required=True,
+        index=True,
+    )
+    woo_id = fields.Integer(string="WooCommerce ID")
+    error = fields.Text(string="Error")
+    image_checksum = fields.Char(string="Image Checksum")
+    media_id = fields.Integer(string="WP Media ID")
+    media_src = fields.Char(string="WP Media URL")
@@ -212,55 +212,37 @@ class WooBulkPublishWizard(models.TransientModel):
     # ── Action ────────────────────────────────────────────────────────────────
 
     def action_bulk_publish(self):
-        """Publishes all selected products to the chosen instance."""
-        self.ensure_one()
-        sync = self.env["woo.product.sync"]
-        success_count = 0
-        errors = []
-
-        for line in self.line_ids:
-            tmpl = line.product_tmpl_id
-            try:
-                sync.publish_to_wc(
-                    product_tmpl=tmpl,
-                    instance=self.instance_id,
-                    wc_status=self.wc_status,
-                )
-                success_count += 1
-                _logger.info(
-                    "Bulk publish: '%s' → instance '%s'",
-                    tmpl.name,
-                    self.instance_id.name,
-                )
-            except Exception as e:
-                errors.append(f"• {tmpl.name}: {e}")
-                _logger.warning("Bulk publish error for '%s': %s", tmpl.name, e)
+        """
+        Queues the selected products for publication in the chosen instance.
 
-        title = _("Bulk publish completed")
-        if errors:
-            message = _(
-                "%(ok)d published successfully in '%(instance)s'.\n"
-                "%(fail)d with errors:\n%(errors)s"
-            ) % {
-                "ok": success_count,
-                "instance": self.instance_id.name,
-                "fail": len(errors),
-                "errors": "\n".join(errors),
+        Publishing runs in the background (``woo.bulk.publish.job``); the job
+        form shows the progress of each product.
+        """
+        self.ensure_one()
+        job = self.env["woo.bulk.publish.job"].create(
+            {
+                "name": _("%(instance)s — %(count)d product(s)")
+                % {"instance": self.instance_id.name, "count": len(self.line_ids)},
+                "instance_id": self.instance_id.id,
+                "wc_status": self.wc_status,
+                "line_ids": [
+                    fields.Command.create({"product_tmpl_id": line.product_tmpl_id.id})
+                    for line in self.line_ids
+                ],
             }
-            notif_type = "warning"
-        else:
-            message = _(
-                "%(ok)d product(s) published successfully in '%(instance)s'."
-            ) % {"ok": success_count, "instance": self.instance_id.name}
-            notif_type = "success"
-
+        )
+        job._trigger_processing()
+        _logger.info(
+            "Bulk publish queued: %d product(s) → instance '%s' (job %s)",
+            len(self.line_ids),
+            self.instance_id.name,
+            job.id,
+        )
         return {
-            "type": "ir.actions.client",
-            "tag": "display_notification",
-            "params": {
-                "title": title,
-                "message": message,
-                "type": notif_type,
-                "sticky": bool(errors),
-            },
+            "type": "ir.actions.act_window",
+            "name": _("Bulk Publish"),
+            "res_model": "woo.bulk.publish.job",
+            "res_id": job.id,
+            "view_mode": "form",
+            "target": "current",
         }
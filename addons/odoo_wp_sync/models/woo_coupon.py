@@ -261,21 +261,24 @@ class WooCoupon(models.Model):
 
     @api.constrains("instance_id", "code", "active")
     def _check_unique_code_per_instance(self):
-        for rec in self:
-            if not rec.active:
-                continue
-            duplicate = self.search(
-                [
-                    ("instance_id", "=", rec.instance_id.id),
-                    ("code", "=", rec.code),
-                    ("active", "=", True),
-                    ("id", "!=", rec.id),
-                ],
-                limit=1,
-            )
-            if duplicate:
+        active = self.filtered("active")
+        if not active:
+            return
+        # One grouped query for the whole batch (imports create coupons by page)
+        keys = {(rec.instance_id.id, rec.code) for rec in active}
+        duplicates = self._read_group(
+            [
+                ("instance_id", "in", active.instance_id.ids),
+                ("code", "in", list({code for _instance, code in keys})),
+                ("active", "=", True),
+            ],
+            groupby=["instance_id", "code"],
+            having=[("__count", ">", 1)],
+        )
+        for instance, code in duplicates:
+            if (instance.id, code) in keys:
                 raise ValidationError(
-                    _("Coupon code '%s' already exists for this instance!") % rec.code
+                    _("Coupon code '%s' already exists for this instance!") % code
                 )
 
     # ── ORM Overrides ──────────────────────────────────────────────────────────
@@ -350,29 +353,47 @@ class WooCoupon(models.Model):
     def set_meta_data(self, meta_list):
         """Set meta data from a Python list."""
         self.ensure_one()
-        self.meta_data_json = json.dumps(meta_list)
+        self.write(self._prepare_meta_vals(meta_list))
+
+    @api.model
+    def _prepare_meta_vals(self, meta_list, locations_by_code=None):
+        """Values stored from a WC meta_data list (raw JSON plus known keys).
+
+        :param locations_by_code: optional preloaded {code: [woo.coupon.location id]}
+        """
+        vals = {"meta_data_json": json.dumps(meta_list)}
         # Parse known meta keys
         for meta in meta_list:
             key = meta.get("key", "")
             value = meta.get("value", "")
             if key == "_wc_make_coupon_available":
                 locations = [v.strip() for v in value.split(",") if v.strip()]
-                location_records = self.env["woo.coupon.location"].search(
-                    [("code", "in", locations)]
-                )
-                self.availability_ids = [(6, 0, location_records.ids)]
+                if locations_by_code is None:
+                    location_ids = (
+                        self.env["woo.coupon.location"]
+                        .search([("code", "in", locations)])
+                        .ids
+                    )
+                else:
+                    location_ids = [
+                        location_id
+                        for code in locations
+                        for location_id in locations_by_code.get(code, [])
+                    ]
+                vals["availability_ids"] = [(6, 0, location_ids)]
             elif key == "_wt_coupon_start_date":
                 if value:
                     try:
-                        self.date_start = datetime.strptime(value, "%Y-%m-%d").date()
+                        vals["date_start"] = datetime.strptime(value, "%Y-%m-%d").date()
                     except ValueError:
                         pass
             elif key == "wt_apply_discount_before_tax_calculation":
-                self.apply_before_tax = value == "1"
+                vals["apply_before_tax"] = value == "1"
             elif key == "_wt_make_auto_coupon":
-                self.auto_coupon = bool(value)
+                vals["auto_coupon"] = bool(value)
             elif key == "_wt_enable_product_category_restriction":
-                self.enable_category_restriction = value == "yes"
+                vals["enable_category_restriction"] = value == "yes"
+        return vals
 
     # ── WooCommerce Sync Methods ──────────────────────────────────────────────
 
@@ -468,37 +489,76 @@ class WooCoupon(models.Model):
         If WooCommerce marks the coupon as 'trash', the Odoo record is archived
         (soft-deleted) instead of updated or created.
         """
-        woo_id = data.get("id")
-        wc_status = data.get("status", "")
+        index = self._get_woo_sync_index(instance, [data])
+        coupons, _created, _updated = self._upsert_from_woo(instance, [data], index)
+        return coupons.get(data.get("id")) or self.browse()
 
-        # Locate existing record regardless of active state
-        coupon = self.with_context(active_test=False).search(
-            [
-                ("instance_id", "=", instance.id),
-                ("woo_id", "=", woo_id),
-            ],
-            limit=1,
-        )
+    @api.model
+    def _get_woo_sync_index(self, instance, data_list=None):
+        """woo_id → ids maps used to import the coupons of an instance.
 
-        # WooCommerce signals deletion via status=trash — archive and stop
-        if wc_status == "trash":
-            if coupon:
-                coupon.with_context(skip_pending_sync=True).write(
-                    {
-                        "active": False,
-                        "woo_delete_status": "trash",
-                        "pending_sync": False,
-                    }
-                )
-                _logger.info(
-                    "Coupon woo_id=%s received status 'trash' from WooCommerce; sent to Odoo trash.",
-                    woo_id,
-                )
-            return coupon or self.browse()
+        A sync run builds it once for the whole instance (coupons including
+        archived ones, woo products, woo categories) plus the coupon locations
+        by code. With ``data_list`` only the ids those coupons reference are
+        loaded.
+        """
+
+        def referenced(*keys):
+            if data_list is None:
+                return None
+            woo_ids = set()
+            for data in data_list:
+                for key in keys:
+                    value = data.get(key)
+                    if isinstance(value, list):
+                        woo_ids.update(value)
+                    elif value:
+                        woo_ids.add(value)
+            return list(woo_ids)
+
+        locations_by_code = {}
+        for location in self.env["woo.coupon.location"].search([]):
+            locations_by_code.setdefault(location.code, []).append(location.id)
+
+        return {
+            "coupons": self._get_woo_id_map(
+                "woo.coupon", instance, referenced("id")
+            ),
+            "products": self._get_woo_id_map(
+                "woo.product",
+                instance,
+                referenced("product_ids", "excluded_product_ids"),
+            ),
+            "categories": self._get_woo_id_map(
+                "woo.category",
+                instance,
+                referenced("product_categories", "excluded_product_categories"),
+            ),
+            "locations": locations_by_code,
+        }
 
+    @api.model
+    def _get_woo_id_map(self, model_name, instance, woo_ids=None):
+        """{woo_id: [record ids]} of one instance (archived records included)."""
+        Model = self.env[model_name]
+        Model.flush_model(["instance_id", "woo_id"])
+        query = f"SELECT woo_id, id FROM {Model._table} WHERE instance_id = %s"
+        params = [instance.id]
+        if woo_ids is not None:
+            query += " AND woo_id = ANY(%s)"
+            params.append(woo_ids)
+        self.env.cr.execute(query + " ORDER BY id", params)
+        mapping = {}
+        for woo_id, record_id in self.env.cr.fetchall():
+            mapping.setdefault(woo_id, []).append(record_id)
+        return mapping
+
+    @api.model
+    def _prepare_woo_vals(self, instance, data, index):
+        """Coupon values from WC data, relations resolved through ``index``."""
         vals = {
             "instance_id": instance.id,
-            "woo_id": woo_id,
+            "woo_id": data.get("id"),
             "code": data.get("code", ""),
             "description": data.get("description", ""),
             "status": data.get("status", "publish"),
@@ -517,49 +577,22 @@ class WooCoupon(models.Model):
             "last_sync_date": fields.Datetime.now(),
         }
 
-        # Relacionar productos incluidos por woo_id
-        wc_product_ids = data.get("product_ids", [])
-        if wc_product_ids:
-            products = self.env["woo.product"].search(
-                [
-                    ("instance_id", "=", instance.id),
-                    ("woo_id", "in", wc_product_ids),
-                ]
-            )
-            vals["product_ids"] = [(6, 0, products.ids)]
-
-        # Relacionar productos excluidos por woo_id
-        wc_excluded_ids = data.get("excluded_product_ids", [])
-        if wc_excluded_ids:
-            excluded = self.env["woo.product"].search(
-                [
-                    ("instance_id", "=", instance.id),
-                    ("woo_id", "in", wc_excluded_ids),
-                ]
-            )
-            vals["excluded_product_ids"] = [(6, 0, excluded.ids)]
-
-        # Link included categories by woo_id
-        wc_category_ids = data.get("product_categories", [])
-        if wc_category_ids:
-            categories = self.env["woo.category"].search(
-                [
-                    ("instance_id", "=", instance.id),
-                    ("woo_id", "in", wc_category_ids),
-                ]
-            )
-            vals["product_category_ids"] = [(6, 0, categories.ids)]
-
-        # Link excluded categories by woo_id
-        wc_excluded_cats = data.get("excluded_product_categories", [])
-        if wc_excluded_cats:
-            excluded_cats = self.env["woo.category"].search(
-                [
-                    ("instance_id", "=", instance.id),
-                    ("woo_id", "in", wc_excluded_cats),
-                ]
-            )
-            vals["excluded_category_ids"] = [(6, 0, excluded_cats.ids)]
+        def resolve(mapping, woo_ids):
+            return [
+                record_id for woo_id in woo_ids for record_id in mapping.get(woo_id, [])
+            ]
+
+        # Relacionar productos y categorías (incluidos / excluidos) por woo_id
+        relations = (
+            ("product_ids", "product_ids", "products"),
+            ("excluded_product_ids", "excluded_product_ids", "products"),
+            ("product_categories", "product_category_ids", "categories"),
+            ("excluded_product_categories", "excluded_category_ids", "categories"),
+        )
+        for wc_key, field_name, mapping in relations:
+            wc_ids = data.get(wc_key, [])
+            if wc_ids:
+                vals[field_name] = [(6, 0, resolve(index[mapping], wc_ids))]
 
         # Date expires
         date_expires = data.get("date_expires")
@@ -571,19 +604,67 @@ class WooCoupon(models.Model):
             except ValueError:
                 pass
 
-        if coupon:
-            # If the record was archived but now WC sends it as active, reactivate it
-            vals["active"] = True
-            coupon.with_context(skip_pending_sync=True).write(vals)
-        else:
-            coupon = self.with_context(skip_pending_sync=True).create(vals)
-
-        # Process meta data
+        # Meta data
         meta_data = data.get("meta_data", [])
         if meta_data:
-            coupon.set_meta_data(meta_data)
+            vals.update(self._prepare_meta_vals(meta_data, index["locations"]))
+        return vals
+
+    @api.model
+    def _upsert_from_woo(self, instance, data_list, index):
+        """Creates or updates a batch of coupons from WooCommerce data.
+
+        Existing coupons are found in ``index`` (no search per coupon), new ones
+        are created with a single multi-create and added to the index.
+
+        :return: tuple ({woo_id: woo.coupon}, created count, updated count)
+        """
+        Coupon = self.with_context(skip_pending_sync=True, active_test=False)
+        coupon_ids = index["coupons"]
+        result = {}
+        to_create = {}
+        updated = 0
+
+        for data in data_list:
+            woo_id = data.get("id")
+            existing = coupon_ids.get(woo_id)
+            coupon = Coupon.browse(existing[0]) if existing else Coupon.browse()
+
+            # WooCommerce signals deletion via status=trash — archive and stop
+            if data.get("status", "") == "trash":
+                to_create.pop(woo_id, None)
+                if coupon:
+                    coupon.write(
+                        {
+                            "active": False,
+                            "woo_delete_status": "trash",
+                            "pending_sync": False,
+                        }
+                    )
+                    updated += 1
+                    _logger.info(
+                        "Coupon woo_id=%s received status 'trash' from WooCommerce; sent to Odoo trash.",
+                        woo_id,
+                    )
+                result[woo_id] = self.browse(coupon.ids)
+                continue
+
+            vals = self._prepare_woo_vals(instance, data, index)
+            if coupon:
+                # If the record was archived but now WC sends it as active, reactivate it
+                vals["active"] = True
+                coupon.write(vals)
+                updated += 1
+                result[woo_id] = self.browse(coupon.ids)
+            else:
+                to_create[woo_id] = vals
+
+        if to_create:
+            for coupon in Coupon.create(list(to_create.values())):
+                coupon_ids[coupon.woo_id] = [coupon.id]
+                result[coupon.woo_id] = self.browse(coupon.ids)
 
-        return coupon
+        return result, len(to_create), updated
 
     def action_sync_to_woocommerce(self):
         """Push coupon to WooCommerce."""
@@ -1,10 +1,22 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
 import re
+import time
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Seconds the instance counters (orders, products, coupons) stay cached
+STATISTICS_CACHE_TTL = 60
+STATISTICS_FIELDS = [
+    "order_count",
+    "pending_order_count",
+    "completed_order_count",
+    "woo_product_count",
+    "woo_product_linked_count",
+    "coupon_count",
+]
+
 
 class WooInstance(models.Model):
     _name = "woo.instance"
@@ -200,6 +212,11 @@ class WooInstance(models.Model):
         readonly=True,
         help="Last synchronization error message",
     )
+    profile_next_sync = fields.Boolean(
+        string="Profile Next Sync",
+        help="Capture a cProfile dump of the next sync run of this instance "
+        "(orders, products or coupons). Cleared automatically once captured.",
+    )
     sync_duration = fields.Float(
         string="Last Sync Duration (s)",
         readonly=True,
@@ -276,6 +293,13 @@ class WooInstance(models.Model):
         string="Coupons",
         compute="_compute_statistics",
     )
+    statistics_version = fields.Integer(
+        string="Statistics Version",
+        readonly=True,
+        copy=False,
+        default=0,
+        help="Part of the statistics cache key; bumped when a sync changes them",
+    )
 
     _sql_constraints = [
         (
@@ -287,20 +311,108 @@ class WooInstance(models.Model):
 
     def _compute_statistics(self):
         """Compute statistics for each instance"""
-        for record in self:
-            domain_base = [("instance_id", "=", record.id)]
-            record.order_count = self.env["odoo.wp.sync"].search_count(domain_base)
-            record.pending_order_count = self.env["odoo.wp.sync"].search_count(
-                domain_base + [("status", "=", "pending")]
+        instance_ids = tuple(sorted({r._origin.id for r in self if r._origin.id}))
+        stats = {}
+        if instance_ids:
+            # The versions drop the entry after a sync; the time bucket
+            # expires it after the TTL
+            versions = tuple(
+                self.browse(instance_ids).mapped("statistics_version")
+            )
+            stats = self._get_statistics(
+                instance_ids, versions, int(time.time() // STATISTICS_CACHE_TTL)
             )
-            record.completed_order_count = self.env["odoo.wp.sync"].search_count(
-                domain_base + [("status", "=", "completed")]
+        for record in self:
+            values = stats.get(record._origin.id, {})
+            for fname in STATISTICS_FIELDS:
+                record[fname] = values.get(fname, 0)
+
+    @api.model
+    @tools.ormcache("instance_ids", "versions", "time_bucket")
+    def _get_statistics(self, instance_ids, versions, time_bucket):
+        """
+        Counters of several instances with one grouped query per model.
+
+        :return: dict {instance_id: {statistics field: count}}
+        """
+        stats = {
+            instance_id: dict.fromkeys(STATISTICS_FIELDS, 0)
+            for instance_id in instance_ids
+        }
+        cr = self.env.cr
+
+        self.env["odoo.wp.sync"].flush_model(["instance_id", "status"])
+        cr.execute(
+            """
+            SELECT instance_id,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 'pending'),
+                   COUNT(*) FILTER (WHERE status = 'completed')
+            FROM odoo_wp_sync
+            WHERE instance_id IN %s
+            GROUP BY instance_id
+            """,
+            (instance_ids,),
+        )
+        for instance_id, total, pending, completed in cr.fetchall():
+            stats[instance_id].update(
+                order_count=total,
+                pending_order_count=pending,
+                completed_order_count=completed,
             )
-            record.woo_product_count = self.env["woo.product"].search_count(domain_base)
-            record.woo_product_linked_count = self.env["woo.product"].search_count(
-                domain_base + [("link_state", "=", "linked")]
+
+        self.env["woo.product"].flush_model(["instance_id", "link_state"])
+        cr.execute(
+            """
+            SELECT instance_id,
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE link_state = 'linked')
+            FROM woo_product
+            WHERE instance_id IN %s
+            GROUP BY instance_id
+            """,
+            (instance_ids,),
+        )
+        for instance_id, total, linked in cr.fetchall():
+            stats[instance_id].update(
+                woo_product_count=total,
+                woo_product_linked_count=linked,
             )
-            record.coupon_count = self.env["woo.coupon"].search_count(domain_base)
+
+        self.env["woo.coupon"].flush_model(["instance_id", "active"])
+        cr.execute(
+            """
+            SELECT instance_id, COUNT(*)
+            FROM woo_coupon
+            WHERE instance_id IN %s
+              AND active
+            GROUP BY instance_id
+            """,
+            (instance_ids,),
+        )
+        for instance_id, total in cr.fetchall():
+            stats[instance_id]["coupon_count"] = total
+
+        return stats
+
+    def _invalidate_statistics(self):
+        """Drops the cached counters once a sync has changed them
+
+        Only the statistics_version of these instances changes, so only
+        their _get_statistics entries stop being hit.
+        """
+        if not self:
+            return
+        # Plain SQL: no write() side effects, no write_date change
+        self.env.cr.execute(
+            """
+            UPDATE woo_instance
+            SET statistics_version = COALESCE(statistics_version, 0) + 1
+            WHERE id IN %s
+            """,
+            (tuple(self.ids),),
+        )
+        self.invalidate_recordset(["statistics_version"] + STATISTICS_FIELDS)
 
     @api.constrains("wp_url")
     def _check_wp_url(self):
@@ -465,6 +577,17 @@ class WooInstance(models.Model):
             "context": {"default_instance_id": self.id},
         }
 
+    def action_view_sync_profiles(self):
+        """Open the sync performance history of this instance"""
+        self.ensure_one()
+        action = self.env["ir.actions.act_window"]._for_xml_id(
+            "odoo_wp_sync.action_woo_sync_profile"
+        )
+        action["name"] = _("Sync Performance - %s") % self.name
+        action["domain"] = [("instance_id", "=", self.id)]
+        action["context"] = {"default_instance_id": self.id}
+        return action
+
     def action_view_coupons(self):
         """Open coupons related to this instance"""
         self.ensure_one()
@@ -634,8 +757,6 @@ class WooInstance(models.Model):
 
     def _do_sync_coupons(self):
         """Import coupons from WooCommerce into Odoo."""
-        from datetime import datetime, timezone
-
         self.ensure_one()
 
         if self.state != "connected":
@@ -650,74 +771,15 @@ class WooInstance(models.Model):
                 },
             }
 
-        # Build modified_after for incremental sync
-        modified_after = None
-        if self.coupon_sync_mode == "incremental" and self.coupon_last_sync_date:
-            # WC expects ISO-8601 UTC — format: 2025-01-15T10:30:00
-            modified_after = self.coupon_last_sync_date.strftime("%Y-%m-%dT%H:%M:%S")
-
-        wc_coupons = self.env["woo.service"].fetch_coupons(
-            self, status=self.coupon_sync_status, modified_after=modified_after
-        )
-
-        # Apply expiry filter (WC API has no native filter for this)
-        now = datetime.now(timezone.utc)
-
-        def _parse_wc_dt(exp_str):
-            """Parse a WC GMT datetime string to a timezone-aware UTC datetime."""
-            if not exp_str:
-                return None
-            exp_str = exp_str.strip()
-            # Replace "Z" with "+00:00" so fromisoformat handles it
-            if exp_str.endswith("Z"):
-                exp_str = exp_str[:-1] + "+00:00"
-            dt = datetime.fromisoformat(exp_str)
-            # If WC returned a naive datetime, treat it as UTC
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt
-
-        if self.coupon_sync_expiry == "active":
-
-            def _is_active(c):
-                exp_dt = _parse_wc_dt(c.get("date_expires_gmt"))
-                if exp_dt is None:
-                    return True
-                try:
-                    return exp_dt > now
-                except TypeError:
-                    return True
-
-            wc_coupons = [c for c in wc_coupons if _is_active(c)]
-
-        elif self.coupon_sync_expiry == "expired":
-
-            def _is_expired(c):
-                exp_dt = _parse_wc_dt(c.get("date_expires_gmt"))
-                if exp_dt is None:
-                    return False
-                try:
-                    return exp_dt < now
-                except TypeError:
-                    return False
-
-            wc_coupons = [c for c in wc_coupons if _is_expired(c)]
-
-        created = updated = 0
-        WooCoupon = self.env["woo.coupon"]
-
-        for wc in wc_coupons:
-            existing = WooCoupon.search(
-                [("instance_id", "=", self.id), ("woo_id", "=", wc.get("id"))],
-                limit=1,
-            )
-            WooCoupon.from_woo_data(self, wc)
-            if existing:
-                updated += 1
-            else:
-                created += 1
-
-        self.write({"coupon_last_sync_date": fields.Datetime.now()})
+        Profile = self.env["woo.sync.profile"]
+        run = Profile._start_run(self, "coupons")
+        try:
+            created, updated = self._import_coupons(run)
+        except Exception as e:
+            run.error = str(e)
+            raise
+        finally:
+            Profile._finish_run(run)
 
         total = created + updated
         _logger.info(
@@ -758,6 +820,77 @@ class WooInstance(models.Model):
             },
         }
 
+    def _import_coupons(self, run):
+        """Fetch and store the instance coupons; returns (created, updated)."""
+        from datetime import datetime, timezone
+
+        # Build modified_after for incremental sync
+        modified_after = None
+        if self.coupon_sync_mode == "incremental" and self.coupon_last_sync_date:
+            # WC expects ISO-8601 UTC — format: 2025-01-15T10:30:00
+            modified_after = self.coupon_last_sync_date.strftime("%Y-%m-%dT%H:%M:%S")
+
+        # Changes made while the run downloads are picked up by the next run
+        sync_started = fields.Datetime.now()
+
+        # Apply expiry filter page by page (WC API has no native filter for this)
+        now = datetime.now(timezone.utc)
+
+        def _parse_wc_dt(exp_str):
+            """Parse a WC GMT datetime string to a timezone-aware UTC datetime."""
+            if not exp_str:
+                return None
+            exp_str = exp_str.strip()
+            # Replace "Z" with "+00:00" so fromisoformat handles it
+            if exp_str.endswith("Z"):
+                exp_str = exp_str[:-1] + "+00:00"
+            dt = datetime.fromisoformat(exp_str)
+            # If WC returned a naive datetime, treat it as UTC
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt
+
+        def _keep(c):
+            if self.coupon_sync_expiry == "all":
+                return True
+            exp_dt = _parse_wc_dt(c.get("date_expires_gmt"))
+            if exp_dt is None:
+                return self.coupon_sync_expiry == "active"
+            if self.coupon_sync_expiry == "active":
+                return exp_dt > now
+            return exp_dt < now
+
+        created = updated = 0
+        WooCoupon = self.env["woo.coupon"]
+
+        # woo_id → record maps loaded once for the whole run
+        with run.phase("coupon_mapping"):
+            index = WooCoupon._get_woo_sync_index(self)
+
+        pages = self.env["woo.service"].iter_coupon_pages(
+            self, status=self.coupon_sync_status, modified_after=modified_after
+        )
+        while True:
+            with run.phase("fetch"):
+                wc_coupons = next(pages, None)
+            if wc_coupons is None:
+                break
+            wc_coupons = [c for c in wc_coupons if _keep(c)]
+            if not wc_coupons:
+                continue
+            with run.phase("orm"):
+                _coupons, page_created, page_updated = WooCoupon._upsert_from_woo(
+                    self, wc_coupons, index
+                )
+                # Keep the cache bounded on large catalogs
+                WooCoupon.invalidate_model()
+            created += page_created
+            updated += page_updated
+
+        self.write({"coupon_last_sync_date": sync_started})
+        self._invalidate_statistics()
+        return created, updated
+
     def get_api_credentials(self):
         """Return API credentials for this instance"""
         self.ensure_one()
@@ -853,6 +986,7 @@ class WooInstance(models.Model):
         :param sync_type: 'full' or 'incremental' (determines if last_full_sync_date is updated)
         """
         self.ensure_one()
+        self._invalidate_statistics()
 
         now = fields.Datetime.now()
         vals = {
@@ -1099,6 +1233,7 @@ class WooInstance(models.Model):
 
         try:
             stats = self.env["woo.product.sync"].import_and_link(self)
+            self._invalidate_statistics()
         except Exception as e:
             return {
                 "type": "ir.actions.client",
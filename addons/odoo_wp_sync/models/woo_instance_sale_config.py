@@ -90,6 +90,14 @@ class WooInstanceSales(models.Model):
         "generate a sale order in Odoo during synchronization.",
     )
 
+    auto_create_cursor = fields.Integer(
+        string="Auto-create Cursor",
+        readonly=True,
+        copy=False,
+        help="Last WooCommerce order (record ID) handled by the automatic "
+        "creation backlog; the next sync continues after it.",
+    )
+
     taxes_included_price = fields.Boolean(
         string="Tax-Inclusive Prices",
         default=False,
@@ -107,3 +115,8 @@ class WooInstanceSales(models.Model):
         default=False,
         help="If active, the WooCommerce shipping cost will be imported as order lines in Odoo.",
     )
+
+    def _get_auto_create_trigger_statuses(self):
+        """WooCommerce statuses that trigger automatic sale order creation"""
+        raw_statuses = self.auto_create_sale_order_statuses or "processing"
+        return {s.strip() for s in raw_statuses.split(",") if s.strip()}
@@ -79,3 +79,37 @@ class WooInstanceWarehouse(models.Model):
         string="Product taxes",
         help="Taxes assigned to products created in WooCommerce (if 'Include taxes when creating products' is active)",
     )
+
+    # ── Product images (WordPress Media Library) ─────────────────────────────
+    media_optimize = fields.Boolean(
+        string="Optimize images before upload",
+        default=False,
+        help="Resize and recompress product images in Odoo before uploading them "
+        "to the WordPress Media Library",
+    )
+    media_max_dimension = fields.Integer(
+        string="Max image size (px)",
+        default=1600,
+        help="Longest side of uploaded images; larger images are scaled down",
+    )
+    media_webp = fields.Boolean(
+        string="Convert to WebP",
+        default=True,
+        help="Upload optimized images as WebP instead of their original format",
+    )
+    media_quality = fields.Integer(
+        string="Image quality",
+        default=85,
+        help="Compression quality (1-100) of optimized images",
+    )
+
+    def _get_media_options(self):
+        """Image optimization settings passed to the upload workers (or None)."""
+        self.ensure_one()
+        if not self.media_optimize:
+            return None
+        return {
+            "max_dimension": self.media_max_dimension,
+            "webp": self.media_webp,
+            "quality": min(max(self.media_quality or 85, 1), 100),
+        }
@@ -0,0 +1,119 @@
+"""
+Content-addressed cache of images uploaded to the WordPress Media Library.
+
+Every image uploaded through ``woo.service`` is recorded per instance by the
+SHA-256 of its original content (before any resize/recompression), so
+uploading the same image again returns the existing media instead of a new
+copy in WordPress.
+"""
+
+import hashlib
+import io
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+
+def image_checksum(image_data):
+    """Cache key of raw image bytes."""
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def optimize_image(image_data, options):
+    """
+    Resizes and recompresses an image. Thread-safe (no ORM access).
+
+    Args:
+        options: dict from ``woo.instance._get_media_options``
+
+    Returns:
+        bytes: the optimized image, or the original bytes if it cannot be
+        processed or the result is not smaller
+    """
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        image.load()
+
+        max_dimension = options.get("max_dimension") or 0
+        if max_dimension and max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if options.get("webp"):
+            image.save(output, format="WEBP", quality=options["quality"], method=4)
+        elif image.format == "PNG":
+            image.save(output, format="PNG", optimize=True)
+        else:
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(
+                output, format="JPEG", quality=options["quality"], optimize=True
+            )
+    except Exception as exc:
+        # Any decode/resize/encode failure uploads the original image
+        _logger.warning("Image optimization skipped: %s", exc)
+        return image_data
+
+    result = output.getvalue()
+    return result if len(result) < len(image_data) else image_data
+
+class WooMedia(models.Model):
+    _name = "woo.media"
+    _description = "WordPress Media Cache"
+    _order = "id desc"
+    _rec_name = "checksum"
+
+    instance_id = fields.Many2one(
+        "woo.instance",
+        string="Instance",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    checksum = fields.Char(string="SHA-256", required=True, readonly=True)
+    media_id = fields.Integer(string="WP Media ID", required=True, readonly=True)
+    source_url = fields.Char(string="URL", readonly=True)
+    original_size = fields.Integer(string="Original Size (bytes)", readonly=True)
+    uploaded_size = fields.Integer(string="Uploaded Size (bytes)", readonly=True)
+
+    _sql_constraints = [
+        (
+            "instance_checksum_uniq",
+            "unique(instance_id, checksum)",
+            "An image can only be cached once per instance.",
+        ),
+    ]
+
+    @api.model
+    def _lookup(self, instance, checksums):
+        """Returns {checksum: (media_id, source_url)} of the cached images."""
+        if not checksums:
+            return {}
+        return {
+            media.checksum: (media.media_id, media.source_url or "")
+            for media in self.search(
+                [("instance_id", "=", instance.id), ("checksum", "in", list(checksums))]
+            )
+        }
+
+    @api.model
+    def _store(self, instance, entries):
+        """
+        Records uploaded images.
+
+        Args:
+            entries: list of dicts with ``checksum``, ``media_id``,
+                ``source_url``, ``original_size`` and ``uploaded_size``
+        """
+        known = self._lookup(instance, [entry["checksum"] for entry in entries])
+        vals_list = [
+            dict(entry, instance_id=instance.id)
+            for entry in entries
+            if entry["checksum"] not in known
+        ]
+        if vals_list:
+            self.sudo().create(vals_list)
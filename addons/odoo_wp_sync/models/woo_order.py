@@ -7,6 +7,13 @@ from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
 
+# Orders handled by the auto-create backlog on each sync run
+AUTO_CREATE_BATCH_SIZE = 50
+# Failed auto-create attempts before an order leaves the backlog
+AUTO_CREATE_MAX_ATTEMPTS = 3
+# WooCommerce statuses an order does not move out of towards a trigger status
+AUTO_CREATE_FINAL_STATUSES = {"completed", "cancelled", "refunded", "failed"}
+
 
 class OdooWpSync(models.Model):
     _name = "odoo.wp.sync"
@@ -88,6 +95,32 @@ class OdooWpSync(models.Model):
 
     sale_order_id = fields.Many2one("sale.order")
 
+    # Automatic sale order creation backlog
+    auto_create_state = fields.Selection(
+        [
+            ("waiting", "Waiting"),
+            ("eligible", "Eligible"),
+            ("done", "Done"),
+            ("error", "Error"),
+            ("excluded", "Excluded"),
+        ],
+        string="Auto-create State",
+        compute="_compute_auto_create_state",
+        store=True,
+        readonly=True,
+        help="Waiting: status may still become a trigger status.\n"
+        "Eligible: queued for automatic sale order creation.\n"
+        "Done: a sale order is linked.\n"
+        "Error: automatic creation failed too many times.\n"
+        "Excluded: the status can no longer trigger a sale order.",
+    )
+    auto_create_attempts = fields.Integer(
+        string="Auto-create Attempts", readonly=True, copy=False
+    )
+    auto_create_error = fields.Text(
+        string="Auto-create Error", readonly=True, copy=False
+    )
+
     # Sync Info
     synced_date = fields.Datetime(string="Last Synced", default=fields.Datetime.now)
 
@@ -99,6 +132,57 @@ class OdooWpSync(models.Model):
         )
     ]
 
+    def init(self):
+        # Only eligible orders are ever scanned by the backlog: keep the
+        # index limited to them so it stays small as history grows.
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS odoo_wp_sync_auto_create_backlog_idx
+            ON odoo_wp_sync (instance_id, id)
+            WHERE auto_create_state = 'eligible'
+            """
+        )
+        # Per-instance counters and backlog lookups (woo.instance statistics)
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS odoo_wp_sync_instance_status_idx
+            ON odoo_wp_sync (instance_id, status)
+            """
+        )
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS odoo_wp_sync_instance_sale_order_idx
+            ON odoo_wp_sync (instance_id, sale_order_id)
+            """
+        )
+
+    @api.depends(
+        "status",
+        "sale_order_id",
+        "auto_create_attempts",
+        "instance_id.auto_create_sale_order_statuses",
+    )
+    def _compute_auto_create_state(self):
+        for record in self:
+            trigger_statuses = record.instance_id._get_auto_create_trigger_statuses()
+            if record.sale_order_id:
+                record.auto_create_state = "done"
+            elif record.status in trigger_statuses:
+                if record.auto_create_attempts >= AUTO_CREATE_MAX_ATTEMPTS:
+                    record.auto_create_state = "error"
+                else:
+                    record.auto_create_state = "eligible"
+            elif record.status in AUTO_CREATE_FINAL_STATUSES:
+                record.auto_create_state = "excluded"
+            else:
+                record.auto_create_state = "waiting"
+
+    def action_retry_auto_create(self):
+        """Puts orders whose automatic creation failed back in the backlog"""
+        self.filtered(lambda o: o.auto_create_state == "error").write(
+            {"auto_create_attempts": 0, "auto_create_error": False}
+        )
+
     @api.depends("order_number", "customer_name")
     def _compute_name(self):
         """Compute display name combining order number and customer name"""
@@ -192,6 +276,7 @@ class OdooWpSync(models.Model):
         start_time = time.time()
 
         instance = None
+        run = None
         created_count = 0
         updated_count = 0
         all_orders = []
@@ -235,6 +320,7 @@ class OdooWpSync(models.Model):
                 }
 
             svc = self.env["woo.service"]
+            run = self.env["woo.sync.profile"]._start_run(instance, "orders")
 
             # Build query parameters from instance settings
             params_result, sync_type = self._build_sync_params(
@@ -243,100 +329,86 @@ class OdooWpSync(models.Model):
 
             _logger.info("Starting %s sync for %s", sync_type, instance.name)
 
-            # Fetch orders — incremental uses two requests (new + modified) for
-            # compatibility with all WooCommerce versions.
-            if sync_type == "incremental" and isinstance(params_result, list):
-                params_new, params_modified = params_result
+            with run.phase("fetch"):
+                # Fetch orders — incremental uses two requests (new + modified) for
+                # compatibility with all WooCommerce versions.
+                if sync_type == "incremental" and isinstance(params_result, list):
+                    params_new, params_modified = params_result
 
-                # A: orders created after last sync (all WC versions)
-                new_orders = svc.fetch_orders(instance, params_new)
-                _logger.info(
-                    "Incremental A (after/new): %d orders from '%s'",
-                    len(new_orders),
-                    instance.name,
-                )
+                    # A: orders created after last sync (all WC versions)
+                    new_orders = svc.fetch_orders(instance, params_new)
+                    _logger.info(
+                        "Incremental A (after/new): %d orders from '%s'",
+                        len(new_orders),
+                        instance.name,
+                    )
 
-                # B: orders modified after last sync (WC 5.5+; returns [] on older)
-                modified_orders = svc.fetch_orders(instance, params_modified)
-                _logger.info(
-                    "Incremental B (modified_after): %d orders from '%s'",
-                    len(modified_orders),
-                    instance.name,
-                )
+                    # B: orders modified after last sync (WC 5.5+; returns [] on older)
+                    modified_orders = svc.fetch_orders(instance, params_modified)
+                    _logger.info(
+                        "Incremental B (modified_after): %d orders from '%s'",
+                        len(modified_orders),
+                        instance.name,
+                    )
 
-                # Deduplicate: B overwrites A so the most up-to-date data wins
-                merged = {o["id"]: o for o in new_orders}
-                merged.update({o["id"]: o for o in modified_orders})
-                all_orders = list(merged.values())
-            else:
-                all_orders = svc.fetch_orders(instance, params_result)
+                    # Deduplicate: B overwrites A so the most up-to-date data wins
+                    merged = {o["id"]: o for o in new_orders}
+                    merged.update({o["id"]: o for o in modified_orders})
+                    all_orders = list(merged.values())
+                else:
+                    all_orders = svc.fetch_orders(instance, params_result)
 
             _logger.info(
                 "Fetched %d total orders from '%s'", len(all_orders), instance.name
             )
 
             # Process all fetched orders
-            # Collect woo.order records that are candidates for auto sale order creation.
-            auto_create_candidates = []
-
-            for order_data in all_orders:
-                order_id = order_data.get("id")
-
-                # Check if order already exists for this instance
-                existing_order = self.search(
-                    [("wc_order_id", "=", order_id), ("instance_id", "=", instance_id)],
-                    limit=1,
-                )
-
-                # Prepare order values
-                vals = self._prepare_order_vals(order_data)
-                vals["instance_id"] = instance_id
-
-                if existing_order:
-                    existing_order.write(vals)
-                    updated_count += 1
-                    woo_record = existing_order
-                else:
-                    woo_record = self.create(vals)
-                    created_count += 1
-
-                # Queue for auto sale order creation if applicable
-                if instance.auto_create_sale_order and not woo_record.sale_order_id:
-                    auto_create_candidates.append(woo_record)
+            with run.phase("orm"):
+                for order_data in all_orders:
+                    order_id = order_data.get("id")
+
+                    # Check if order already exists for this instance
+                    existing_order = self.search(
+                        [("wc_order_id", "=", order_id), ("instance_id", "=", instance_id)],
+                        limit=1,
+                    )
 
-            # Auto-create sale orders for qualifying WooCommerce orders
-            auto_create_stats = {"created": 0, "skipped": 0, "errors": 0}
+                    # Prepare order values
+                    vals = self._prepare_order_vals(order_data)
+                    vals["instance_id"] = instance_id
+
+                    if existing_order:
+                        existing_order.write(vals)
+                        updated_count += 1
+                    else:
+                        self.create(vals)
+                        created_count += 1
+
+            # Auto-create sale orders: imported orders whose status is a
+            # trigger status join the eligible backlog; one bounded batch is
+            # processed per run.
+            auto_create_stats = {
+                "created": 0,
+                "skipped": 0,
+                "errors": 0,
+                "processed": 0,
+                "remaining": 0,
+            }
             if instance.auto_create_sale_order:
-                # Also pick up any existing records that were synced before
-                # auto-create was enabled and still don't have a sale order.
-                existing_without_so = self.search(
-                    [
-                        ("instance_id", "=", instance_id),
-                        ("sale_order_id", "=", False),
-                    ]
-                )
-                # Merge: use a dict keyed by id to avoid duplicates
-                candidates_map = {r.id: r for r in auto_create_candidates}
-                for r in existing_without_so:
-                    candidates_map.setdefault(r.id, r)
-                all_candidates = list(candidates_map.values())
-
-                if all_candidates:
-                    auto_create_stats = self._auto_create_sale_orders(
-                        instance, all_candidates
-                    )
+                with run.phase("auto_create"):
+                    auto_create_stats = self._process_auto_create_backlog(instance)
                 _logger.info(
-                    "Auto-create enabled: %d candidates (sync: %d, backlog: %d), "
-                    "%d created, %d skipped, %d errors",
-                    len(all_candidates),
-                    len(auto_create_candidates),
-                    len(existing_without_so),
+                    "Auto-create for '%s': %d processed, %d created, %d skipped, "
+                    "%d errors, %d still eligible",
+                    instance.name,
+                    auto_create_stats["processed"],
                     auto_create_stats["created"],
                     auto_create_stats["skipped"],
                     auto_create_stats["errors"],
+                    auto_create_stats["remaining"],
                 )
             else:
-                _logger.info(
+                _logger.debug(
                     "Auto-create sale orders is DISABLED for instance '%s'",
                     instance.name,
                 )
@@ -385,7 +457,7 @@ class OdooWpSync(models.Model):
                     f"\n🛒 Auto-created orders: {auto_create_stats['created']} | "
                     f"Skipped: {auto_create_stats['skipped']} | "
                     f"Errors: {auto_create_stats['errors']} "
-                    f"({len(all_candidates)} candidates)"
+                    f"({auto_create_stats['remaining']} pending)"
                 )
             else:
                 sale_order_line = (
@@ -414,6 +486,8 @@ class OdooWpSync(models.Model):
         except Exception as e:
             error_msg = str(e)
             duration = time.time() - start_time
+            if run:
+                run.error = error_msg
 
             # Update instance with error statistics
             if instance:
@@ -439,63 +513,109 @@ class OdooWpSync(models.Model):
                 },
             }
 
+        finally:
+            if run:
+                self.env["woo.sync.profile"]._finish_run(run)
+
+    def _process_auto_create_backlog(self, instance, batch_size=AUTO_CREATE_BATCH_SIZE):
+        """
+        Processes one bounded batch of the instance's eligible backlog.
+
+        Eligible orders are read through the partial backlog index in id
+        order, starting after the cursor stored on the instance and wrapping
+        around once the end is reached, so orders that keep failing never
+        block the rest of the queue.
+
+        :returns: dict with keys ``created``, ``skipped``, ``errors``,
+            ``processed`` and ``remaining`` (eligible orders left)
+        """
+        domain = [
+            ("instance_id", "=", instance.id),
+            ("auto_create_state", "=", "eligible"),
+        ]
+        cursor = instance.auto_create_cursor or 0
+        head = self.search(domain + [("id", ">", cursor)], order="id", limit=batch_size)
+        tail = self.browse()
+        if len(head) < batch_size and cursor:
+            tail = self.search(
+                domain + [("id", "<=", cursor)],
+                order="id",
+                limit=batch_size - len(head),
+            )
+        batch = head | tail
+
+        if tail:
+            next_cursor = tail[-1].id
+        elif len(head) == batch_size:
+            next_cursor = head[-1].id
+        else:
+            next_cursor = 0
+        if next_cursor != cursor:
+            instance.auto_create_cursor = next_cursor
+
+        stats = self._auto_create_sale_orders(instance, batch)
+        stats["processed"] = len(batch)
+        stats["remaining"] = self.search_count(domain)
+        return stats
+
     def _auto_create_sale_orders(self, instance, woo_records):
         """
         Create sale orders automatically for WooCommerce orders whose status
         matches the configured ``auto_create_sale_order_statuses`` list.
 
-        Called from ``action_sync`` after importing/updating records.
+        The batch is materialized at once by ``woo.sale.order.helper``,
+        which keeps errors isolated per order: a failure is recorded on the
+        order (``auto_create_attempts`` / ``auto_create_error``) and after
+        ``AUTO_CREATE_MAX_ATTEMPTS`` failures it leaves the backlog.
 
         :param instance: woo.instance record
-        :param woo_records: list of odoo.wp.sync records (no sale_order_id yet)
+        :param woo_records: odoo.wp.sync records (no sale_order_id yet)
         :returns: dict with keys ``created``, ``skipped``, ``errors``
         """
-        # Parse the configured status list (comma-separated, strip whitespace)
-        raw_statuses = instance.auto_create_sale_order_statuses or "processing"
-        trigger_statuses = {s.strip() for s in raw_statuses.split(",") if s.strip()}
+        trigger_statuses = instance._get_auto_create_trigger_statuses()
 
-        _logger.info(
+        _logger.debug(
             "_auto_create_sale_orders: %d candidates, trigger statuses=%s",
             len(woo_records),
             trigger_statuses,
         )
 
-        sale_order_helper = self.env["woo.sale.order.helper"]
-        created = skipped = errors = 0
-
-        for woo_record in woo_records:
-            _logger.info(
-                "  Order #%s status='%s' — in trigger_statuses: %s",
-                woo_record.order_number,
-                woo_record.status,
-                woo_record.status in trigger_statuses,
-            )
-            if woo_record.status not in trigger_statuses:
-                skipped += 1
-                continue
+        candidates = woo_records.filtered(
+            lambda r: not r.sale_order_id and r.status in trigger_statuses
+        )
+        skipped = len(woo_records) - len(candidates)
+        created = errors = 0
 
-            try:
-                result = sale_order_helper.create_sale_order_from_woo(woo_record)
-                if result.get("created"):
-                    created += 1
-                    _logger.info(
-                        "Auto-created sale order %s for WooCommerce order #%s",
-                        result["order"].name,
-                        woo_record.order_number,
-                    )
-                elif result.get("skipped"):
-                    skipped += 1
-                else:
-                    skipped += 1
-                    _logger.debug(
-                        "Sale order already existed (%s) for WooCommerce order #%s — skipped.",
-                        result["order"].name if result.get("order") else "N/A",
-                        woo_record.order_number,
-                    )
-            except Exception:
+        results = self.env["woo.sale.order.helper"].create_sale_orders_from_woo(
+            candidates
+        )
+        for woo_record in candidates:
+            result = results.get(woo_record.id, {})
+            if result.get("error"):
                 errors += 1
-                _logger.exception(
-                    "Auto sale order creation failed for WooCommerce order #%s",
+                woo_record.write(
+                    {
+                        "auto_create_attempts": woo_record.auto_create_attempts + 1,
+                        "auto_create_error": str(result["error"]),
+                    }
+                )
+                _logger.error(
+                    "Auto sale order creation failed for WooCommerce order #%s: %s",
+                    woo_record.order_number,
+                    result["error"],
+                )
+            elif result.get("created"):
+                created += 1
+                _logger.debug(
+                    "Auto-created sale order %s for WooCommerce order #%s",
+                    result["order"].name,
+                    woo_record.order_number,
+                )
+            else:
+                skipped += 1
+                _logger.debug(
+                    "Sale order already existed (%s) for WooCommerce order #%s — skipped.",
+                    result["order"].name if result.get("order") else "N/A",
                     woo_record.order_number,
                 )
 
@@ -705,6 +825,7 @@ class OdooWpSync(models.Model):
         errors = []
 
         created_orders = self.env["sale.order"]
+        to_process = self.browse()
 
         for woo_order in self:
             # Skip if already has a linked sale order
@@ -721,27 +842,22 @@ class OdooWpSync(models.Model):
                 )
                 continue
 
-            try:
-                result = helper.create_sale_order_from_woo(woo_order)
-                order = result["order"]
-                was_created = result["created"]
-
-                # Save the sale order link
-                woo_order.sale_order_id = order.id
+            to_process |= woo_order
 
-                if was_created:
-                    created_count += 1
-                    created_orders |= order
-                else:
-                    linked_count += 1
-
-            except Exception as e:
+        results = helper.create_sale_orders_from_woo(to_process)
+        for woo_order in to_process:
+            result = results[woo_order.id]
+            if result.get("error"):
                 error_count += 1
-                errors.append(f"Order #{woo_order.order_number}: {str(e)}")
+                errors.append(f"Order #{woo_order.order_number}: {result['error']}")
                 _logger.error(
-                    f"Error creating sale order for Woo Order ID {woo_order.wc_order_id}: {str(e)}",
-                    exc_info=True,
+                    f"Error creating sale order for Woo Order ID {woo_order.wc_order_id}: {result['error']}"
                 )
+            elif result["created"]:
+                created_count += 1
+                created_orders |= result["order"]
+            else:
+                linked_count += 1
 
         # Preparar mensaje de resumen
         total_processed = len(self)
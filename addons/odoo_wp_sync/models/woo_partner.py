@@ -18,67 +18,118 @@ class WooPartner(models.AbstractModel):
         :param woo_order_record: odoo.wp.sync record with the WooCommerce partner data
         :return: The created or updated partner record in Odoo
         """
+        return self.create_partners_from_woo_data(woo_order_record)[woo_order_record.id]
 
-        # Use the instance's default client if configured
-        default_client = woo_order_record.instance_id.client_id
-
-        # Extract shipping address for potential use in partner creation
-        shipping = (
-            json.loads(woo_order_record.shipping_address)
-            if woo_order_record.shipping_address
-            else {}
-        )
-
-        if default_client:
-            _logger.debug(f"Using instance default client: {default_client.name}")
-            return default_client
+    @api.model
+    def create_partners_from_woo_data(self, woo_order_records):
+        """
+        Resolves the customer of several WooCommerce orders at once.
 
-        _logger.error(f"Data {woo_order_record}: No default client configured")
+        Instance default clients are used as-is; otherwise customers are
+        matched by email with one search, and the missing ones are created
+        with one multi-create (orders sharing an email share the partner).
+        Countries and states are resolved with one search each.
 
+        :param woo_order_records: odoo.wp.sync recordset
+        :return: dict {odoo.wp.sync id: res.partner}
+        """
         Partner = self.env["res.partner"]
-
-        # Search by email if it exists
-        if woo_order_record.customer_email:
-            partner = Partner.search(
-                [("email", "=", woo_order_record.customer_email)], limit=1
-            )
+        result = {}
+        pending = []
+        for record in woo_order_records:
+            default_client = record.instance_id.client_id
+            if default_client:
+                _logger.debug(f"Using instance default client: {default_client.name}")
+                result[record.id] = default_client
+            else:
+                _logger.error(f"Data {record}: No default client configured")
+                pending.append(record)
+
+        if not pending:
+            return result
+
+        # Search by email if it exists (same ordering as a limit=1 search)
+        emails = {r.customer_email for r in pending if r.customer_email}
+        partners_by_email = {}
+        if emails:
+            for partner in Partner.search([("email", "in", list(emails))]):
+                partners_by_email.setdefault(partner.email, partner)
+
+        to_create = []
+        for record in pending:
+            partner = partners_by_email.get(record.customer_email)
             if partner:
                 _logger.debug(f"Customer found by email: {partner.name}")
-                return partner
+                result[record.id] = partner
+            else:
+                to_create.append(record)
 
-        # Map state code if it's from Mexico to improve matching with Odoo states
-        state_code = map_state_code_mx(shipping.get("state"))
+        if not to_create:
+            return result
 
-        # Resolve country
-        country = self.env["res.country"].search(
-            [("code", "=", shipping.get("country"))], limit=1
-        )
+        shippings = {
+            r.id: json.loads(r.shipping_address) if r.shipping_address else {}
+            for r in to_create
+        }
 
-        # Resolve state
-        state = (
-            self.env["res.country.state"].search(
-                [("code", "=", state_code), ("country_id", "=", country.id)],
-                limit=1,
+        # Resolve countries and states (state codes mapped for Mexico)
+        country_codes = {s.get("country") for s in shippings.values() if s.get("country")}
+        countries = {}
+        if country_codes:
+            for country in self.env["res.country"].search(
+                [("code", "in", list(country_codes))]
+            ):
+                countries.setdefault(country.code, country)
+
+        state_codes = {
+            map_state_code_mx(s.get("state")) for s in shippings.values() if s.get("state")
+        } - {None, ""}
+        states = {}
+        if state_codes and countries:
+            for state in self.env["res.country.state"].search(
+                [
+                    ("code", "in", list(state_codes)),
+                    ("country_id", "in", [c.id for c in countries.values()]),
+                ]
+            ):
+                states.setdefault((state.country_id.id, state.code), state)
+
+        # Create new customers (one per email within the batch)
+        vals_list = []
+        records_by_vals = []
+        vals_index_by_email = {}
+        for record in to_create:
+            email = record.customer_email
+            if email and email in vals_index_by_email:
+                records_by_vals[vals_index_by_email[email]].append(record)
+                continue
+
+            shipping = shippings[record.id]
+            country = countries.get(shipping.get("country"))
+            state_code = map_state_code_mx(shipping.get("state"))
+            state = states.get((country.id, state_code)) if country and state_code else None
+            vals_list.append(
+                {
+                    "name": (record.customer_name or "WooCommerce Customer").upper(),
+                    "email": email,
+                    "phone": record.customer_phone,
+                    "street": shipping.get("address_1"),
+                    "street2": shipping.get("address_2"),
+                    "city": shipping.get("city"),
+                    "zip": shipping.get("postcode"),
+                    "country_id": country.id if country else False,
+                    "state_id": state.id if state else False,
+                    "comment": f"Cliente importado desde WooCommerce - Orden {record.order_number}",
+                }
             )
-            if state_code and country
-            else self.env["res.country.state"]
-        )
-
-        # Create new customer
-        partner_vals = {
-            "name": (woo_order_record.customer_name or "WooCommerce Customer").upper(),
-            "email": woo_order_record.customer_email,
-            "phone": woo_order_record.customer_phone,
-            "street": shipping.get("address_1"),
-            "street2": shipping.get("address_2"),
-            "city": shipping.get("city"),
-            "zip": shipping.get("postcode"),
-            "country_id": country.id or False,
-            "state_id": state.id or False,
-            "comment": f"Cliente importado desde WooCommerce - Orden {woo_order_record.order_number}",
-        }
+            if email:
+                vals_index_by_email[email] = len(records_by_vals)
+            records_by_vals.append([record])
 
-        partner = Partner.create(partner_vals)
-        _logger.info(f"New customer created: {partner.name}")
+        partners = Partner.create(vals_list)
+        for partner, records in zip(partners, records_by_vals):
+            _logger.info(f"New customer created: {partner.name}")
+            for record in records:
+                result[record.id] = partner
 
-        return partner
+        return result
@@ -144,10 +144,22 @@ class WooProductSync(models.AbstractModel):
         Returns:
             dict: Statistics {created, updated, linked, unlinked, errors}
         """
+        Profile = self.env["woo.sync.profile"]
+        run = Profile._start_run(instance, "products")
+        try:
+            return self._import_and_link(instance, run)
+        except Exception as e:
+            run.error = str(e)
+            raise
+        finally:
+            Profile._finish_run(run)
+
+    def _import_and_link(self, instance, run):
         stats = {"created": 0, "updated": 0, "linked": 0, "unlinked": 0, "errors": 0}
 
         try:
-            wc_products = self._fetch_wc_products(instance)
+            with run.phase("fetch"):
+                wc_products = self._fetch_wc_products(instance)
         except Exception as e:
             _logger.error(
                 "Error fetching products from WC instance '%s': %s", instance.name, e
@@ -156,48 +168,49 @@ class WooProductSync(models.AbstractModel):
 
         WooProduct = self.env["woo.product"]
 
-        for wc_product in wc_products:
-            woo_id = wc_product.get("id")
-            if not woo_id:
-                continue
+        with run.phase("orm"):
+            for wc_product in wc_products:
+                woo_id = wc_product.get("id")
+                if not woo_id:
+                    continue
 
-            vals = self._build_woo_product_vals(wc_product, instance)
-
-            # Search for a match in Odoo by SKU
-            odoo_product = self._match_odoo_product(vals.get("woo_sku"))
-            if odoo_product:
-                vals["product_tmpl_id"] = odoo_product.id
-            # If it already exists and has a manual link, do not overwrite it
-
-            try:
-                existing = WooProduct.search(
-                    [("woo_id", "=", woo_id), ("instance_id", "=", instance.id)],
-                    limit=1,
-                )
-                if existing:
-                    # Update metadata; if it already has a manual link, preserve it
-                    write_vals = dict(vals)
-                    if existing.product_tmpl_id and not odoo_product:
-                        write_vals.pop("product_tmpl_id", None)
-                    existing.write(write_vals)
-                    stats["updated"] += 1
-                else:
-                    WooProduct.create(vals)
-                    stats["created"] += 1
+                vals = self._build_woo_product_vals(wc_product, instance)
 
+                # Search for a match in Odoo by SKU
+                odoo_product = self._match_odoo_product(vals.get("woo_sku"))
                 if odoo_product:
-                    stats["linked"] += 1
-                else:
-                    stats["unlinked"] += 1
-
-            except Exception as e:
-                stats["errors"] += 1
-                _logger.error(
-                    "Error processing WC product id=%s name='%s': %s",
-                    woo_id,
-                    wc_product.get("name"),
-                    e,
-                )
+                    vals["product_tmpl_id"] = odoo_product.id
+                # If it already exists and has a manual link, do not overwrite it
+
+                try:
+                    existing = WooProduct.search(
+                        [("woo_id", "=", woo_id), ("instance_id", "=", instance.id)],
+                        limit=1,
+                    )
+                    if existing:
+                        # Update metadata; if it already has a manual link, preserve it
+                        write_vals = dict(vals)
+                        if existing.product_tmpl_id and not odoo_product:
+                            write_vals.pop("product_tmpl_id", None)
+                        existing.write(write_vals)
+                        stats["updated"] += 1
+                    else:
+                        WooProduct.create(vals)
+                        stats["created"] += 1
+
+                    if odoo_product:
+                        stats["linked"] += 1
+                    else:
+                        stats["unlinked"] += 1
+
+                except Exception as e:
+                    stats["errors"] += 1
+                    _logger.error(
+                        "Error processing WC product id=%s name='%s': %s",
+                        woo_id,
+                        wc_product.get("name"),
+                        e,
+                    )
 
         _logger.info(
             "Product sync for '%s': created=%d updated=%d linked=%d unlinked=%d errors=%d",
@@ -210,28 +223,24 @@ class WooProductSync(models.AbstractModel):
         )
         return stats
 
-    def publish_to_wc(
+    def _prepare_publish_payload(
         self,
         product_tmpl,
         instance,
+        existing,
         wc_status="draft",
         price_override=0.0,
         description="",
     ):
         """
-        Publishes (or updates) a product.template to a WooCommerce instance.
-
-        If a woo.product mapping already exists for this product+instance combination,
-        PUT is used to update. Otherwise POST is used to create.
+        Builds the WooCommerce payload used to publish a product.template.
 
         Args:
-            product_tmpl: product.template record to publish.
-            instance: target woo.instance record.
-            wc_status: "draft" | "publish" — initial status in WooCommerce.
-            price_override: if > 0, overrides the product's list price.
-        """
-        svc = self.env["woo.service"]
+            existing: woo.product mapping of the product in the instance (may be empty).
 
+        Returns:
+            tuple(dict, float): (payload, price sent to WooCommerce)
+        """
         # ── Price: manual override > pricelist > list_price ───────────────────
         price_is_manual = bool(price_override and price_override > 0)
         if price_is_manual:
@@ -274,22 +283,9 @@ class WooProductSync(models.AbstractModel):
             "sku": product_tmpl.default_code or "",
             "type": "simple",
         }
-
-        # Apply taxes configured in instance to the Odoo product and WC payload
         if instance.include_taxes_wc_product_sync and instance.taxes_product:
-            product_tmpl.write(
-                {"taxes_id": [fields.Command.set(instance.taxes_product.ids)]}
-            )
             payload["tax_status"] = "taxable"
 
-        existing = self.env["woo.product"].search(
-            [
-                ("product_tmpl_id", "=", product_tmpl.id),
-                ("instance_id", "=", instance.id),
-            ],
-            limit=1,
-        )
-
         # ── Categories and brands from the existing woo.product mapping ───────────────────
         # Only added if the mapping already exists (has woo_category_ids / woo_brand_ids).
         # For a new creation there is no prior mapping, so they are omitted.
@@ -306,6 +302,47 @@ class WooProductSync(models.AbstractModel):
             if brands_payload:
                 payload["brands"] = brands_payload
 
+        return payload, price
+
+    def publish_to_wc(
+        self,
+        product_tmpl,
+        instance,
+        wc_status="draft",
+        price_override=0.0,
+        description="",
+    ):
+        """
+        Publishes (or updates) a product.template to a WooCommerce instance.
+
+        If a woo.product mapping already exists for this product+instance combination,
+        PUT is used to update. Otherwise POST is used to create.
+
+        Args:
+            product_tmpl: product.template record to publish.
+            instance: target woo.instance record.
+            wc_status: "draft" | "publish" — initial status in WooCommerce.
+            price_override: if > 0, overrides the product's list price.
+        """
+        svc = self.env["woo.service"]
+
+        existing = self.env["woo.product"].search(
+            [
+                ("product_tmpl_id", "=", product_tmpl.id),
+                ("instance_id", "=", instance.id),
+            ],
+            limit=1,
+        )
+        payload, price = self._prepare_publish_payload(
+            product_tmpl, instance, existing, wc_status, price_override, description
+        )
+
+        # Apply taxes configured in instance to the Odoo product
+        if instance.include_taxes_wc_product_sync and instance.taxes_product:
+            product_tmpl.write(
+                {"taxes_id": [fields.Command.set(instance.taxes_product.ids)]}
+            )
+
         if existing and existing.woo_id:
             # Update existing product in WooCommerce
             wc_response = svc.update_product(instance, existing.woo_id, payload)
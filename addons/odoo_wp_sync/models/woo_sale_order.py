@@ -11,6 +11,10 @@ import json
 
 _logger = logging.getLogger(__name__)
 
+# Sale orders confirmed together in one action_confirm call
+CONFIRM_GROUP_SIZE = 20
+SHIPPING_PRODUCT_CODE = "WC-SHIPPING"
+
 
 class WooSaleOrderHelper(models.AbstractModel):
     """
@@ -37,94 +41,350 @@ class WooSaleOrderHelper(models.AbstractModel):
         Raises:
             Exception: If there is an error during creation
         """
+        result = self.create_sale_orders_from_woo(woo_order_record)[woo_order_record.id]
+        if result.get("error"):
+            raise result["error"]
+        return result
 
-        SaleOrder = self.env["sale.order"]
-        instance = woo_order_record.instance_id
+    def create_sale_orders_from_woo(self, woo_order_records):
+        """
+        Creates the sale orders of several WooCommerce orders in one pass.
+
+        Existing references, customers, countries/states and SKUs are
+        resolved with a few set-based queries, the orders are created with a
+        single multi-create and confirmed in groups. Errors stay isolated per
+        order: a failing order is reported in its result and never prevents
+        the others from being created.
 
-        # Check for duplicates by reference
-        existing = SaleOrder.search(
-            [("client_order_ref", "=", woo_order_record.order_number)], limit=1
+        Args:
+            woo_order_records: odoo.wp.sync recordset
+
+        Returns:
+            dict: {odoo.wp.sync id: {'order': sale.order, 'created': bool}
+                   or {'error': Exception}}
+        """
+        SaleOrder = self.env["sale.order"]
+        results = {}
+
+        # Check for duplicates by reference (one search for the whole batch)
+        refs = {r.order_number for r in woo_order_records if r.order_number}
+        existing_by_ref = {}
+        if refs:
+            for order in SaleOrder.search([("client_order_ref", "in", list(refs))]):
+                existing_by_ref.setdefault(order.client_order_ref, order)
+
+        to_create = []
+        duplicates = []  # same reference as another order of this batch
+        refs_to_create = set()
+        for record in woo_order_records:
+            existing = existing_by_ref.get(record.order_number)
+            if existing:
+                _logger.info(
+                    "Existing order found: %s for WooCommerce Order #%s",
+                    existing.name,
+                    record.order_number,
+                )
+                # Ensure the link is updated even though the order already existed
+                if not record.sale_order_id:
+                    record.sale_order_id = existing.id
+                results[record.id] = {"order": existing, "created": False}
+            elif not record.instance_id.warehouse_id:
+                # Validate warehouse is configured on the instance
+                results[record.id] = {
+                    "error": UserError(
+                        _(
+                            "The instance '%s' does not have a warehouse configured.\nPlease go to WooCommerce \u203a Instances, open this instance, and fill in the 'Warehouse' field before creating orders."
+                        )
+                        % record.instance_id.name
+                    )
+                }
+            elif record.order_number and record.order_number in refs_to_create:
+                duplicates.append(record)
+            else:
+                if record.order_number:
+                    refs_to_create.add(record.order_number)
+                to_create.append(record)
+
+        if not to_create:
+            return results
+
+        partners = self._get_partners_for_batch(to_create, results)
+        to_create = [r for r in to_create if r.id in partners]
+
+        # Resolve every SKU of the batch (and the shipping product) once.
+        # A malformed order (invalid JSON) is reported in its own result.
+        items_by_record = {}
+        for record in to_create:
+            try:
+                items_by_record[record.id] = self._get_order_items(record)
+            except Exception as e:
+                results[record.id] = {"error": e}
+                _logger.exception(
+                    "Could not read the items of WooCommerce Order #%s",
+                    record.order_number,
+                )
+        to_create = [r for r in to_create if r.id in items_by_record]
+        products_by_sku = self._get_products_by_sku(
+            item.get("sku") for items in items_by_record.values() for item in items
         )
+        shipping_product = None
+        if any(
+            r.instance_id.wc_shipping and float(r.shipping_total or 0) > 0
+            for r in to_create
+        ):
+            shipping_product = self._get_shipping_product()
+
+        vals_list = []
+        prepared = []
+        missing_by_record = {}
+        for record in to_create:
+            try:
+                order_vals, has_missing_products = self._prepare_sale_order_vals(
+                    record,
+                    partners[record.id],
+                    products_by_sku=products_by_sku,
+                    shipping_product=shipping_product,
+                    items=items_by_record[record.id],
+                )
+            except Exception as e:
+                # e.g. a non-numeric total or quantity in the order items
+                results[record.id] = {"error": e}
+                _logger.exception(
+                    "Could not prepare the sale order for WooCommerce Order #%s",
+                    record.order_number,
+                )
+                continue
+            vals_list.append(order_vals)
+            prepared.append(record)
+            missing_by_record[record.id] = has_missing_products
+        to_create = prepared
+
+        orders_by_record = self._create_orders_for_batch(to_create, vals_list, results)
+
+        to_confirm = []
+        for record, order in orders_by_record:
+            instance = record.instance_id
+
+            # Link the order back to the WooCommerce record
+            record.sale_order_id = order.id
+
+            # use sequence if configured
+            if not instance.use_sequence:
+                prefix = instance.prefix_sequence or "WC-"
+                order.name = f"{prefix}{order.name}"
+
+            # Confirm order ONLY if:
+            #   1. The instance has confirm_orders = True
+            #   2. All products were resolved by SKU (none missing)
+            # If any SKU was not found, the order stays as a quotation (draft)
+            # for manual review.
+            if instance.confirm_orders and order.state == "draft":
+                if missing_by_record[record.id]:
+                    _logger.info(
+                        "Order %s created as QUOTATION (draft): one or more products "
+                        "were not found by SKU in WooCommerce Order #%s. "
+                        "Check the order notes.",
+                        order.name,
+                        record.order_number,
+                    )
+                else:
+                    to_confirm.append(order)
 
-        if existing:
             _logger.info(
-                "Existing order found: %s for WooCommerce Order #%s",
-                existing.name,
-                woo_order_record.order_number,
-            )
-            # Ensure the link is updated even though the order already existed
-            if not woo_order_record.sale_order_id:
-                woo_order_record.sale_order_id = existing.id
-            return {"order": existing, "created": False}
-
-        # Validate warehouse is configured on the instance
-        if not instance.warehouse_id:
-            raise UserError(
-                _(
-                    "The instance '%s' does not have a warehouse configured.\nPlease go to WooCommerce \u203a Instances, open this instance, and fill in the 'Warehouse' field before creating orders."
-                )
-                % instance.name
+                "Order created successfully: %s for WooCommerce Order #%s",
+                order.name,
+                record.order_number,
             )
+            results[record.id] = {"order": order, "created": True}
 
-        # Find or create customer
-        partner = self.env["woo.partner"].create_partner_from_woo_data(woo_order_record)
+        self._confirm_orders_in_groups(to_confirm)
 
-        # Create sale order.
-        # _prepare_sale_order_vals also returns whether there were products without SKU in Odoo.
-        order_vals, has_missing_products = self._prepare_sale_order_vals(
-            woo_order_record, partner
-        )
+        # Orders repeating a reference of this batch link to the order just created
+        orders_by_ref = {
+            record.order_number: order for record, order in orders_by_record
+        }
+        for record in duplicates:
+            order = orders_by_ref.get(record.order_number)
+            if not order:
+                results[record.id] = {
+                    "error": UserError(
+                        _("The sale order for reference %s could not be created.")
+                        % record.order_number
+                    )
+                }
+                continue
+            if not record.sale_order_id:
+                record.sale_order_id = order.id
+            results[record.id] = {"order": order, "created": False}
 
-        order = SaleOrder.create(order_vals)
+        return results
 
-        # Link the order back to the WooCommerce record
-        woo_order_record.sale_order_id = order.id
+    def _get_partners_for_batch(self, woo_order_records, results):
+        """
+        Customers of the batch; falls back to one order at a time when the
+        batch resolution fails so the error stays with the order causing it.
 
-        # use sequence if configured
-        if not instance.use_sequence:
-            prefix = instance.prefix_sequence or "WC-"
-            order.name = f"{prefix}{order.name}"
+        Returns:
+            dict: {odoo.wp.sync id: res.partner} (failed orders are left out
+            and reported in ``results``)
+        """
+        WooPartner = self.env["woo.partner"]
+        records = self.env["odoo.wp.sync"].concat(*woo_order_records)
+        try:
+            with self.env.cr.savepoint():
+                return WooPartner.create_partners_from_woo_data(records)
+        except Exception:
+            _logger.warning(
+                "Batch customer resolution failed, retrying order by order",
+                exc_info=True,
+            )
 
-        # Confirm order ONLY if:
-        #   1. The instance has confirm_orders = True
-        #   2. All products were resolved by SKU (none missing)
-        # If any SKU was not found, the order stays as a quotation (draft)
-        # for manual review.
-        if instance.confirm_orders and order.state == "draft":
-            if has_missing_products:
-                _logger.info(
-                    "Order %s created as QUOTATION (draft): one or more products "
-                    "were not found by SKU in WooCommerce Order #%s. "
-                    "Check the order notes.",
-                    order.name,
-                    woo_order_record.order_number,
+        partners = {}
+        for record in woo_order_records:
+            try:
+                with self.env.cr.savepoint():
+                    partners.update(WooPartner.create_partners_from_woo_data(record))
+            except Exception as e:
+                results[record.id] = {"error": e}
+                _logger.exception(
+                    "Could not resolve the customer of WooCommerce Order #%s",
+                    record.order_number,
                 )
-            else:
+        return partners
+
+    def _create_orders_for_batch(self, woo_order_records, vals_list, results):
+        """
+        Creates the sale orders with one multi-create; if it fails, each
+        order is created on its own so only the failing ones are reported.
+
+        Returns:
+            list: (odoo.wp.sync record, sale.order) pairs of created orders
+        """
+        SaleOrder = self.env["sale.order"]
+        try:
+            with self.env.cr.savepoint():
+                orders = SaleOrder.create(vals_list)
+            return list(zip(woo_order_records, orders))
+        except Exception:
+            _logger.warning(
+                "Batch sale order creation failed, retrying order by order",
+                exc_info=True,
+            )
+
+        created = []
+        for record, order_vals in zip(woo_order_records, vals_list):
+            try:
+                with self.env.cr.savepoint():
+                    created.append((record, SaleOrder.create(order_vals)))
+            except Exception as e:
+                results[record.id] = {"error": e}
+                _logger.exception(
+                    "Could not create the sale order for WooCommerce Order #%s",
+                    record.order_number,
+                )
+        return created
+
+    def _confirm_orders_in_groups(self, orders):
+        """Confirms orders in groups; a failing group is retried order by order"""
+        SaleOrder = self.env["sale.order"]
+        for start in range(0, len(orders), CONFIRM_GROUP_SIZE):
+            group = SaleOrder.concat(*orders[start : start + CONFIRM_GROUP_SIZE])
+            try:
+                with self.env.cr.savepoint():
+                    group.action_confirm()
+                continue
+            except Exception:
+                _logger.warning(
+                    "Group confirmation failed, retrying order by order",
+                    exc_info=True,
+                )
+            for order in group:
                 try:
-                    order.action_confirm()
+                    with self.env.cr.savepoint():
+                        order.action_confirm()
                 except Exception:
                     _logger.exception(
                         "Could not confirm order %s for WooCommerce Order #%s. "
                         "The order remained as a quotation (draft).",
                         order.name,
-                        woo_order_record.order_number,
+                        order.client_order_ref,
                     )
 
-        _logger.info(
-            "Order created successfully: %s for WooCommerce Order #%s",
-            order.name,
-            woo_order_record.order_number,
-        )
+    def _get_order_items(self, woo_order_record):
+        """Order items from the stored order_lines JSON"""
+        # Use stored order_lines JSON; fall back to raw_data for records
+        # synced before the order_lines field existed.
+        if woo_order_record.order_lines:
+            items = json.loads(woo_order_record.order_lines)
+            if not isinstance(items, list) or not all(
+                isinstance(item, dict) for item in items
+            ):
+                raise UserError(
+                    _("The items of WooCommerce Order #%s are malformed.")
+                    % woo_order_record.order_number
+                )
+            return items
+        raw = json.loads(woo_order_record.raw_data or "{}")
+        return [
+            {
+                "sku": i.get("sku"),
+                "quantity": i.get("quantity", 0),
+                "total": float(i.get("total", 0)),
+                "total_tax": float(i.get("total_tax", 0)),
+                "taxes": i.get("taxes", []),
+            }
+            for i in raw.get("line_items", [])
+        ]
 
-        return {"order": order, "created": True}
+    def _get_products_by_sku(self, skus):
+        """
+        Products by internal reference with one search.
 
-    def _prepare_sale_order_vals(self, woo_order_record, partner):
+        Returns:
+            dict: {sku: product.product} (first match, as a limit=1 search)
+        """
+        skus = {sku for sku in skus if sku}
+        products = {}
+        if skus:
+            for product in self.env["product.product"].search(
+                [("default_code", "in", list(skus))]
+            ):
+                products.setdefault(product.default_code, product)
+        return products
+
+    def _get_shipping_product(self):
+        shipping_product = self.env["product.product"].search(
+            [("default_code", "=", SHIPPING_PRODUCT_CODE)], limit=1
+        )
+        if not shipping_product:
+            shipping_product = self.env["product.product"].create(
+                {
+                    "name": "WooCommerce Shipping Cost",
+                    "default_code": SHIPPING_PRODUCT_CODE,
+                    "type": "service",
+                    "sale_ok": True,
+                }
+            )
+        return shipping_product
+
+    def _prepare_sale_order_vals(
+        self,
+        woo_order_record,
+        partner,
+        products_by_sku=None,
+        shipping_product=None,
+        items=None,
+    ):
         """
         Prepares the values for creating a sale order.
 
         Args:
             woo_order_record: odoo.wp.sync record
             partner: res.partner (customer)
+            products_by_sku: dict {sku: product.product} already resolved
+                for a batch (searched here when not given)
+            shipping_product: product.product for the shipping line
+            items: order items already parsed from the record
 
         Returns:
             dict: Values for creating the sale.order
@@ -133,30 +393,16 @@ class WooSaleOrderHelper(models.AbstractModel):
         instance = woo_order_record.instance_id
         order_lines = []
 
-        # Use stored order_lines JSON; fall back to raw_data for records
-        # synced before the order_lines field existed.
-        if woo_order_record.order_lines:
-            items = json.loads(woo_order_record.order_lines)
-        else:
-            raw = json.loads(woo_order_record.raw_data or "{}")
-            items = [
-                {
-                    "sku": i.get("sku"),
-                    "quantity": i.get("quantity", 0),
-                    "total": float(i.get("total", 0)),
-                    "total_tax": float(i.get("total_tax", 0)),
-                    "taxes": i.get("taxes", []),
-                }
-                for i in raw.get("line_items", [])
-            ]
+        if items is None:
+            items = self._get_order_items(woo_order_record)
+        if products_by_sku is None:
+            products_by_sku = self._get_products_by_sku(i.get("sku") for i in items)
 
         note_lines = []
         for item in items:
             sku = item.get("sku")
 
-            product = self.env["product.product"].search(
-                [("default_code", "=", sku)], limit=1
-            )
+            product = products_by_sku.get(sku)
 
             if not product:
                 missing_msg = (
@@ -208,18 +454,8 @@ class WooSaleOrderHelper(models.AbstractModel):
             shipping_cost = float(woo_order_record.shipping_total or 0)
 
             if shipping_cost > 0:
-                shipping_product = self.env["product.product"].search(
-                    [("default_code", "=", "WC-SHIPPING")], limit=1
-                )
                 if not shipping_product:
-                    shipping_product = self.env["product.product"].create(
-                        {
-                            "name": "WooCommerce Shipping Cost",
-                            "default_code": "WC-SHIPPING",
-                            "type": "service",
-                            "sale_ok": True,
-                        }
-                    )
+                    shipping_product = self._get_shipping_product()
 
                 order_lines.append(
                     (
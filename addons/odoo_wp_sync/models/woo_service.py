@@ -9,15 +9,116 @@ library directly.
 
 import base64
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from odoo import models, _
 from odoo.exceptions import UserError
 
+from .woo_media import image_checksum, optimize_image
+from .woo_sync_profiler import current_run
+
 _logger = logging.getLogger(__name__)
 
 _WC_PAGE_SIZE = 100  # maximum allowed by the WooCommerce API
+_MEDIA_UPLOAD_WORKERS = 4  # concurrent uploads to /wp/v2/media
+# Coupon fields read by woo.coupon (requested through ``_fields``)
+_WC_COUPON_FIELDS = (
+    "id",
+    "code",
+    "status",
+    "description",
+    "discount_type",
+    "amount",
+    "date_expires",
+    "date_expires_gmt",
+    "individual_use",
+    "exclude_sale_items",
+    "free_shipping",
+    "usage_limit",
+    "usage_limit_per_user",
+    "usage_count",
+    "minimum_amount",
+    "maximum_amount",
+    "product_ids",
+    "excluded_product_ids",
+    "product_categories",
+    "excluded_product_categories",
+    "meta_data",
+)
+
+
+def _post_media(http, config, image_data, product_ref):
+    """
+    POSTs raw image bytes to ``/wp/v2/media``. Thread-safe (no ORM access).
+
+    Args:
+        http: ``requests`` module or a ``requests.Session``
+
+    Returns:
+        tuple: ``(media_id|None, src_url, call)`` where ``call`` holds the
+        arguments for ``SyncRun.record_request`` (None on connection errors)
+    """
+    # Detectar MIME por magic bytes
+    if image_data[:4] == b"\x89PNG":
+        mime, ext = "image/png", "png"
+    elif image_data[:2] == b"\xff\xd8":
+        mime, ext = "image/jpeg", "jpg"
+    elif image_data[:4] == b"GIF8":
+        mime, ext = "image/gif", "gif"
+    elif image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
+        mime, ext = "image/webp", "webp"
+    else:
+        mime, ext = "image/jpeg", "jpg"
+
+    filename = f"woo_product_{product_ref}.{ext}"
+    url = f"{config['url']}/wp-json/wp/v2/media"
+
+    try:
+        start = time.perf_counter()
+        response = http.post(
+            url,
+            auth=(config["consumer_key"], config["consumer_secret"]),
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Type": mime,
+            },
+            data=image_data,
+            timeout=30,
+        )
+        call = (
+            "POST",
+            "wp/v2/media",
+            response.status_code,
+            time.perf_counter() - start,
+            0.0,
+            len(response.content),
+            len(image_data),
+        )
+        if response.status_code in (200, 201):
+            media = response.json()
+            return media.get("id"), media.get("source_url", ""), call
+        _logger.warning(
+            "WP Media upload returned %s: %s",
+            response.status_code,
+            response.text[:300],
+        )
+        return None, "", call
+    except Exception as exc:
+        _logger.warning("Error uploading image to WordPress: %s", str(exc))
+
+    return None, "", None
+
+
+def _upload_media(http, config, image_data, product_ref, options=None):
+    """Optimizes (when ``options`` is set) and uploads one image."""
+    if options:
+        image_data = optimize_image(image_data, options)
+    return _post_media(http, config, image_data, product_ref)
 
 
 class WooService(models.AbstractModel):
@@ -83,8 +184,10 @@ class WooService(models.AbstractModel):
         """
         config = self._get_config(instance)
         url = f"{config['url']}/wp-json/wc/v3/{endpoint}"
+        run = current_run()
 
         try:
+            start = time.perf_counter()
             response = requests.request(
                 method,
                 url,
@@ -92,9 +195,34 @@ class WooService(models.AbstractModel):
                 json=data,
                 timeout=timeout,
             )
+            elapsed = time.perf_counter() - start
 
             if response.status_code in (200, 201):
-                return response.json()
+                if not run:
+                    return response.json()
+                start = time.perf_counter()
+                payload = response.json()
+                run.record_request(
+                    method,
+                    endpoint,
+                    response.status_code,
+                    elapsed,
+                    time.perf_counter() - start,
+                    len(response.content),
+                    len(response.request.body or b""),
+                )
+                return payload
+
+            if run:
+                run.record_request(
+                    method,
+                    endpoint,
+                    response.status_code,
+                    elapsed,
+                    0.0,
+                    len(response.content),
+                    len(response.request.body or b""),
+                )
 
             # Parsear error
             try:
@@ -146,6 +274,9 @@ class WooService(models.AbstractModel):
         """
         Uploads a binary image (base64) to the WordPress Media Library.
 
+        Images already uploaded to the instance (same content) are not sent
+        again: the cached media is returned (see ``woo.media``).
+
         Args:
             instance: ``woo.instance`` record
             image_b64: image content encoded in base64
@@ -158,46 +289,101 @@ class WooService(models.AbstractModel):
             return None, ""
 
         image_data = base64.b64decode(image_b64)
+        return self.upload_images(instance, {product_ref: image_data}, max_workers=1)[
+            product_ref
+        ]
 
-        # Detectar MIME por magic bytes
-        if image_data[:4] == b"\x89PNG":
-            mime, ext = "image/png", "png"
-        elif image_data[:2] == b"\xff\xd8":
-            mime, ext = "image/jpeg", "jpg"
-        elif image_data[:4] == b"GIF8":
-            mime, ext = "image/gif", "gif"
-        elif image_data[:4] == b"RIFF" and image_data[8:12] == b"WEBP":
-            mime, ext = "image/webp", "webp"
-        else:
-            mime, ext = "image/jpeg", "jpg"
+    def upload_images(self, instance, images, max_workers=_MEDIA_UPLOAD_WORKERS):
+        """
+        Uploads several images concurrently over one pooled HTTP session.
 
-        filename = f"woo_product_{product_ref}.{ext}"
-        config = self._get_config(instance)
-        url = f"{config['url']}/wp-json/wp/v2/media"
+        Images are content-addressed per instance (``woo.media``): cached
+        images and duplicates within ``images`` are uploaded once. When the
+        instance optimizes images, they are resized/recompressed before upload
+        (the cache key remains the original content).
 
-        try:
-            response = requests.post(
-                url,
-                auth=(config["consumer_key"], config["consumer_secret"]),
-                headers={
-                    "Content-Disposition": f'attachment; filename="{filename}"',
-                    "Content-Type": mime,
-                },
-                data=image_data,
-                timeout=30,
+        Workers only optimize and upload (no ORM access), so the caller keeps
+        reading and writing records from its own thread.
+
+        Args:
+            instance: ``woo.instance`` record
+            images: dict ``{key: raw image bytes}`` (key is also the filename ref)
+            max_workers: concurrent uploads
+
+        Returns:
+            dict: ``{key: (media_id|None, src_url)}``
+        """
+        if not images:
+            return {}
+
+        Media = self.env["woo.media"]
+        checksums = {key: image_checksum(data) for key, data in images.items()}
+        cached = Media._lookup(instance, set(checksums.values()))
+
+        # One upload per distinct image missing from the cache
+        to_upload = {}
+        for key, data in images.items():
+            if checksums[key] not in cached:
+                to_upload.setdefault(checksums[key], (key, data))
+
+        uploaded = {}
+        error = None
+        if to_upload:
+            config = self._get_config(instance)
+            options = instance._get_media_options()
+            run = current_run()
+            with requests.Session() as session:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = {
+                        executor.submit(
+                            _upload_media, session, config, data, key, options
+                        ): checksum
+                        for checksum, (key, data) in to_upload.items()
+                    }
+                    for future in as_completed(futures):
+                        try:
+                            media_id, src, call = future.result()
+                        except Exception as exc:
+                            # Keep collecting: media already uploaded must
+                            # reach the cache or it is orphaned in WordPress
+                            _logger.warning(
+                                "Image upload failed for %s: %s",
+                                to_upload[futures[future]][0],
+                                exc,
+                            )
+                            error = error or exc
+                            continue
+                        uploaded[futures[future]] = (media_id, src, call)
+                        if run and call:
+                            run.record_request(*call)
+
+            Media._store(
+                instance,
+                [
+                    {
+                        "checksum": checksum,
+                        "media_id": media_id,
+                        "source_url": src,
+                        "original_size": len(to_upload[checksum][1]),
+                        "uploaded_size": call[6],
+                    }
+                    for checksum, (media_id, src, call) in uploaded.items()
+                    if media_id
+                ],
             )
-            if response.status_code in (200, 201):
-                media = response.json()
-                return media.get("id"), media.get("source_url", "")
-            _logger.warning(
-                "WP Media upload returned %s: %s",
-                response.status_code,
-                response.text[:300],
+            cached.update(
+                {
+                    checksum: (media_id, src)
+                    for checksum, (media_id, src, _call) in uploaded.items()
+                }
             )
-        except Exception as exc:
-            _logger.warning("Error uploading image to WordPress: %s", str(exc))
+            if error:
+                raise error
 
-        return None, ""
+        return {key: cached.get(checksums[key], (None, "")) for key in images}
 
     # ── Productos ────────────────────────────────────────────────────────────
 
@@ -219,6 +405,45 @@ class WooService(models.AbstractModel):
             instance=instance,
         )
 
+    def batch_products(self, instance, create=None, update=None):
+        """
+        Creates and updates products in one request (POST ``products/batch``).
+
+        WooCommerce accepts up to 100 items per request. Results come back in
+        the same order as sent; failed items carry an ``error`` key instead of
+        the product data.
+
+        Returns:
+            dict: ``{"create": [...], "update": [...]}``
+        """
+        return self._request(
+            endpoint="products/batch",
+            method="POST",
+            data={"create": create or [], "update": update or []},
+            instance=instance,
+            timeout=120,
+        )
+
+    def fetch_products_by_sku(self, instance, skus):
+        """
+        Looks up WooCommerce products by SKU (GET ``products?sku=a,b,...``).
+
+        Returns:
+            dict: {sku: WooCommerce product dict} for the SKUs that exist
+        """
+        skus = sorted({sku for sku in skus if sku})
+        found = {}
+        for start in range(0, len(skus), _WC_PAGE_SIZE):
+            batch = skus[start : start + _WC_PAGE_SIZE]
+            endpoint = (
+                f"products?sku={quote(','.join(batch))}"
+                f"&per_page={_WC_PAGE_SIZE}&status=any"
+            )
+            for product in self._request(endpoint=endpoint, instance=instance) or []:
+                if product.get("sku"):
+                    found.setdefault(product["sku"], product)
+        return found
+
     def fetch_products(self, instance):
         """
         Fetches all WooCommerce products with automatic pagination.
@@ -262,30 +487,60 @@ class WooService(models.AbstractModel):
         Returns:
             list[dict]: list of WooCommerce coupons
         """
-        all_coupons = []
-        page = 1
-        extra = f"&after={modified_after}" if modified_after else ""
+        return [
+            coupon
+            for page in self.iter_coupon_pages(instance, status, modified_after)
+            for coupon in page
+        ]
 
-        while True:
-            endpoint = (
-                f"coupons?per_page={_WC_PAGE_SIZE}&page={page}"
-                f"&orderby=modified&order=asc&status={status}{extra}"
-            )
-            batch = self._request(endpoint=endpoint, instance=instance)
-            if not batch:
-                break
-            all_coupons.extend(batch)
-            if len(batch) < _WC_PAGE_SIZE:
-                break
-            page += 1
+    def iter_coupon_pages(self, instance, status="any", modified_after=None):
+        """
+        Yields WooCommerce coupons page by page (lists of at most 100).
+
+        Only the fields read by ``woo.coupon`` are requested (``_fields``), which
+        drops ``used_by`` — the list of every customer that used the coupon.
+
+        Incremental runs use two passes, like the order sync:
+          A) ``after``          → coupons created since the date (all WC versions)
+          B) ``modified_after`` → coupons modified since the date (WC 5.5+)
+        Coupons already returned by pass A are skipped in pass B.
+        """
+        base = (
+            f"coupons?per_page={_WC_PAGE_SIZE}&orderby=modified&order=asc"
+            f"&status={status}&_fields={','.join(_WC_COUPON_FIELDS)}"
+        )
+        if not modified_after:
+            passes = [base]
+        else:
+            # The date is UTC: ``dates_are_gmt`` keeps WC from reading it as site time
+            since = f"{modified_after}Z&dates_are_gmt=true"
+            passes = [f"{base}&after={since}", f"{base}&modified_after={since}"]
+
+        seen = set()
+        total = 0
+        for query in passes:
+            page = 1
+            while True:
+                batch = self._request(
+                    endpoint=f"{query}&page={page}", instance=instance
+                )
+                if not batch:
+                    break
+                fresh = [c for c in batch if c.get("id") not in seen]
+                seen.update(c.get("id") for c in fresh)
+                total += len(fresh)
+                if fresh:
+                    yield fresh
+                if len(batch) < _WC_PAGE_SIZE:
+                    break
+                page += 1
 
         _logger.info(
             "Fetched %d coupons from WooCommerce instance '%s'%s",
-            len(all_coupons),
+            total,
             instance.name,
             f" (modified after {modified_after})" if modified_after else "",
         )
-        return all_coupons
 
     # ── Orders ────────────────────────────────────────────────────────────────
 
@@ -0,0 +1,300 @@
+"""
+Sync profiler for WooCommerce instances.
+
+Every order, product and coupon sync run records where its time went:
+HTTP calls (per endpoint, bytes and slowest calls, captured in
+``woo.service._request``), JSON parsing and the pipeline phases (fetch,
+ORM writes, auto-create, coupon mapping). Each run is stored as a
+``woo.sync.profile`` record; a single run can also be captured with
+cProfile for deep dives (``woo.instance.profile_next_sync``).
+"""
+
+import base64
+import cProfile
+import heapq
+import io
+import itertools
+import json
+import logging
+import marshal
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# Slowest HTTP calls kept per run
+SLOWEST_CALLS_KEPT = 10
+# Profile history kept per instance
+PROFILE_RETENTION_DAYS = 90
+# Lines of the cProfile summary stored on the run
+PROFILE_SUMMARY_LINES = 60
+
+# Pipeline phase → float field of woo.sync.profile
+PHASE_FIELDS = {
+    "fetch": "fetch_time",
+    "orm": "orm_time",
+    "auto_create": "auto_create_time",
+    "coupon_mapping": "coupon_mapping_time",
+}
+
+_local = threading.local()
+
+
+def current_run():
+    """Sync run being recorded in this thread (innermost), or None."""
+    stack = getattr(_local, "runs", None)
+    return stack[-1] if stack else None
+
+
+class SyncRun:
+    """In-memory recorder of a single sync run."""
+
+    _sequence = itertools.count()
+
+    def __init__(self, instance, run_type, capture_profile=False):
+        self.instance_id = instance.id
+        self.run_type = run_type
+        self.date_start = fields.Datetime.now()
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASE_FIELDS, 0.0)
+        self.endpoints = {}
+        self.slowest = []  # heap of (elapsed, seq, call)
+        self.http_count = 0
+        self.http_time = 0.0
+        self.json_time = 0.0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.error = None
+        self.profiler = None
+        if capture_profile:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. Odoo's) is already active
+                _logger.warning("cProfile capture skipped: a profiler is already active")
+                self.profiler = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def record_request(
+        self, method, endpoint, status, elapsed, json_time, bytes_received, bytes_sent
+    ):
+        path = re.sub(r"/\d+", "/{id}", endpoint.split("?", 1)[0])
+        key = f"{method} {path}"
+        stats = self.endpoints.setdefault(
+            key, {"count": 0, "time": 0.0, "bytes": 0, "errors": 0}
+        )
+        stats["count"] += 1
+        stats["time"] += elapsed
+        stats["bytes"] += bytes_received
+        if status not in (200, 201):
+            stats["errors"] += 1
+
+        self.http_count += 1
+        self.http_time += elapsed
+        self.json_time += json_time
+        self.bytes_received += bytes_received
+        self.bytes_sent += bytes_sent
+
+        call = {
+            "method": method,
+            "endpoint": endpoint,
+            "status": status,
+            "time": round(elapsed, 4),
+            "bytes": bytes_received,
+        }
+        entry = (elapsed, next(self._sequence), call)
+        if len(self.slowest) < SLOWEST_CALLS_KEPT:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+
+class WooSyncProfile(models.Model):
+    _name = "woo.sync.profile"
+    _description = "WooCommerce Sync Performance"
+    _order = "date_start desc, id desc"
+    _rec_name = "date_start"
+
+    instance_id = fields.Many2one(
+        "woo.instance",
+        string="Instance",
+        required=True,
+        ondelete="cascade",
+        index=True,
+    )
+    run_type = fields.Selection(
+        [
+            ("orders", "Orders"),
+            ("products", "Products"),
+            ("coupons", "Coupons"),
+        ],
+        string="Sync",
+        required=True,
+    )
+    state = fields.Selection(
+        [("success", "Success"), ("error", "Error")],
+        string="Result",
+        default="success",
+    )
+    error = fields.Text(string="Error")
+    date_start = fields.Datetime(string="Started", index=True)
+
+    duration = fields.Float(string="Duration (s)", digits=(16, 3), group_operator="avg")
+    http_time = fields.Float(string="HTTP (s)", digits=(16, 3), group_operator="avg")
+    json_time = fields.Float(string="JSON Parse (s)", digits=(16, 3), group_operator="avg")
+    fetch_time = fields.Float(string="Fetch (s)", digits=(16, 3), group_operator="avg")
+    orm_time = fields.Float(string="ORM Writes (s)", digits=(16, 3), group_operator="avg")
+    auto_create_time = fields.Float(
+        string="Auto-create (s)", digits=(16, 3), group_operator="avg"
+    )
+    coupon_mapping_time = fields.Float(
+        string="Coupon Mapping (s)", digits=(16, 3), group_operator="avg"
+    )
+    http_count = fields.Integer(string="Requests")
+    bytes_received = fields.Integer(string="Bytes Received")
+    bytes_sent = fields.Integer(string="Bytes Sent")
+
+    endpoint_stats = fields.Text(string="Per Endpoint (JSON)", readonly=True)
+    slowest_calls = fields.Text(string="Slowest Calls (JSON)", readonly=True)
+    profile_summary = fields.Text(string="cProfile Summary", readonly=True)
+    profile_attachment_id = fields.Many2one(
+        "ir.attachment", string="cProfile Dump", readonly=True, ondelete="set null"
+    )
+
+    # ── Run lifecycle ────────────────────────────────────────────────────────
+
+    @api.model
+    def _start_run(self, instance, run_type):
+        """Starts recording a sync run for the instance (current thread)."""
+        capture = instance.profile_next_sync
+        if capture:
+            # One run only: the flag is consumed by the run that captures
+            instance.sudo().profile_next_sync = False
+        run = SyncRun(instance, run_type, capture_profile=capture)
+        if not hasattr(_local, "runs"):
+            _local.runs = []
+        _local.runs.append(run)
+        return run
+
+    @api.model
+    def _finish_run(self, run):
+        """Stops recording and stores the run in the history.
+
+        Safe to call from a ``finally``: the record is written on a separate
+        cursor and a failure to store it is only logged.
+        """
+        stack = getattr(_local, "runs", [])
+        if run in stack:
+            stack.remove(run)
+
+        duration = time.perf_counter() - run.started
+        summary = dump = None
+        if run.profiler:
+            run.profiler.disable()
+            run.profiler.create_stats()
+            stream = io.StringIO()
+            pstats.Stats(run.profiler, stream=stream).sort_stats(
+                "cumulative"
+            ).print_stats(PROFILE_SUMMARY_LINES)
+            summary = stream.getvalue()
+            dump = marshal.dumps(run.profiler.stats)
+
+        slowest = [call for _elapsed, _seq, call in sorted(run.slowest, reverse=True)]
+        vals = {
+            "instance_id": run.instance_id,
+            "run_type": run.run_type,
+            "state": "error" if run.error else "success",
+            "error": run.error or False,
+            "date_start": run.date_start,
+            "duration": duration,
+            "http_time": run.http_time,
+            "json_time": run.json_time,
+            "http_count": run.http_count,
+            "bytes_received": run.bytes_received,
+            "bytes_sent": run.bytes_sent,
+            "endpoint_stats": json.dumps(run.endpoints, indent=2),
+            "slowest_calls": json.dumps(slowest, indent=2),
+            "profile_summary": summary or False,
+        }
+        for phase, fname in PHASE_FIELDS.items():
+            vals[fname] = run.phases.get(phase, 0.0)
+
+        try:
+            profile_id = self._store_run(vals, dump)
+        except Exception:
+            # The history must never hide the sync result or its error
+            _logger.exception(
+                "Could not store the %s sync profile for instance %s",
+                run.run_type,
+                run.instance_id,
+            )
+            return self.browse()
+        return self.browse(profile_id)
+
+    @api.model
+    def _store_run(self, vals, dump=None):
+        """Stores the run from its own transaction
+
+        The sync may end with its transaction aborted (database error) or
+        rolled back by the exception it re-raises; writing on that cursor
+        would fail with InFailedSqlTransaction, hide the original error and
+        lose the history of exactly the runs that failed. The profile (and
+        its cProfile dump) is therefore committed on its own, whatever
+        happens to the sync transaction.
+
+        Returns:
+            int: ID of the woo.sync.profile record
+        """
+        if getattr(threading.current_thread(), "testing", False):
+            # Tests never commit: a separate cursor would not see their data
+            return self._create_profile(vals, dump).id
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            return env[self._name]._create_profile(vals, dump).id
+
+    @api.model
+    def _create_profile(self, vals, dump=None):
+        profile = self.sudo().create(vals)
+        if dump:
+            profile.profile_attachment_id = self.env["ir.attachment"].sudo().create(
+                {
+                    "name": f"woo_sync_{vals['run_type']}_{profile.id}.prof",
+                    "datas": base64.b64encode(dump),
+                    "mimetype": "application/octet-stream",
+                    "res_model": self._name,
+                    "res_id": profile.id,
+                }
+            )
+        self._prune(vals["instance_id"])
+        return profile
+
+    @api.model
+    def _prune(self, instance_id):
+        limit = fields.Datetime.now() - timedelta(days=PROFILE_RETENTION_DAYS)
+        self.sudo().search(
+            [("instance_id", "=", instance_id), ("date_start", "<", limit)]
+        ).unlink()
+
+    def action_download_profile(self):
+        self.ensure_one()
+        if not self.profile_attachment_id:
+            return False
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{self.profile_attachment_id.id}?download=true",
+            "target": "self",
+        }
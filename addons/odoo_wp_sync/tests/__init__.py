@@ -0,0 +1,4 @@
+from . import test_woo_bulk_publish_job
+from . import test_woo_sale_order
+from . import test_woo_sync_profiler
+from . import test_woo_media
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestWooBulkPublishJob(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.instance = cls.env["woo.instance"].create(
+            {"name": "Test Shop", "wp_url": "https://shop.example.com"}
+        )
+        cls.templates = cls.env["product.template"].create(
+            [
+                {"name": "Bulk Product A", "default_code": "BULK-A", "list_price": 10},
+                {"name": "Bulk Product B", "default_code": "BULK-B", "list_price": 20},
+            ]
+        )
+        cls.service_class = type(cls.env["woo.service"])
+
+    def _create_job(self):
+        return self.env["woo.bulk.publish.job"].create(
+            {
+                "name": "Test job",
+                "instance_id": self.instance.id,
+                "line_ids": [
+                    (0, 0, {"product_tmpl_id": tmpl.id}) for tmpl in self.templates
+                ],
+            }
+        )
+
+    def _batch_response(self, create=None, update=None):
+        def products(payloads, first_id):
+            return [
+                dict(payload, id=payload.get("id") or first_id + index)
+                for index, payload in enumerate(payloads or [])
+            ]
+
+        return {"create": products(create, 500), "update": products(update, 0)}
+
+    def _run(self, batch, found=None):
+        with patch.object(
+            self.service_class, "batch_products", autospec=True, side_effect=batch
+        ) as batch_products, patch.object(
+            self.service_class,
+            "fetch_products_by_sku",
+            autospec=True,
+            return_value=found or {},
+        ):
+            self.env["woo.bulk.publish.job"]._cron_process_jobs()
+        return batch_products
+
+    def _woo_products(self):
+        return self.env["woo.product"].search(
+            [("instance_id", "=", self.instance.id)]
+        )
+
+    def test_resume_after_failed_results_does_not_recreate(self):
+        job = self._create_job()
+
+        # The batch creates the products, but storing the results fails:
+        # the instance is not connected, so woo.product cannot be created
+        batch_products = self._run(
+            lambda svc, instance, create=None, update=None: self._batch_response(
+                create, update
+            )
+        )
+        self.assertEqual(len(batch_products.call_args.kwargs["create"]), 2)
+        self.assertEqual(set(job.line_ids.mapped("state")), {"error"})
+        self.assertEqual(sorted(job.line_ids.mapped("woo_id")), [500, 501])
+        self.assertFalse(self._woo_products())
+
+        self.instance.write({"state": "connected"})
+        job.action_retry_failed()
+        batch_products = self._run(
+            lambda svc, instance, create=None, update=None: self._batch_response(
+                create, update
+            )
+        )
+        kwargs = batch_products.call_args.kwargs
+        self.assertFalse(kwargs["create"])
+        self.assertEqual(sorted(item["id"] for item in kwargs["update"]), [500, 501])
+        self.assertEqual(set(job.line_ids.mapped("state")), {"done"})
+        self.assertEqual(sorted(self._woo_products().mapped("woo_id")), [500, 501])
+
+    def test_existing_sku_is_updated_not_created(self):
+        self.instance.write({"state": "connected"})
+        job = self._create_job()
+        found = {"BULK-A": {"id": 700, "sku": "BULK-A"}}
+        batch_products = self._run(
+            lambda svc, instance, create=None, update=None: self._batch_response(
+                create, update
+            ),
+            found=found,
+        )
+        kwargs = batch_products.call_args.kwargs
+        self.assertEqual([item["sku"] for item in kwargs["create"]], ["BULK-B"])
+        self.assertEqual([item["id"] for item in kwargs["update"]], [700])
+        self.assertEqual(set(job.line_ids.mapped("state")), {"done"})
+        self.assertEqual(sorted(self._woo_products().mapped("woo_id")), [500, 700])
+
+    def test_failed_chunk_marks_lines_error(self):
+        self.instance.write({"state": "connected"})
+        job = self._create_job()
+        with patch.object(
+            type(self.env["woo.bulk.publish.job"]),
+            "_upload_chunk_images",
+            autospec=True,
+            side_effect=RuntimeError("media server down"),
+        ):
+            batch_products = self._run(lambda *args, **kwargs: {})
+        batch_products.assert_not_called()
+        self.assertEqual(job.state, "done")
+        self.assertEqual(set(job.line_ids.mapped("state")), {"error"})
+        self.assertIn("media server down", job.line_ids[0].error)
@@ -0,0 +1,59 @@
+import io
+from unittest.mock import patch
+
+from PIL import Image
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.odoo_wp_sync.models.woo_media import image_checksum, optimize_image
+
+SERVICE = "odoo.addons.odoo_wp_sync.models.woo_service"
+
+
+class TestWooMedia(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.instance = cls.env["woo.instance"].create(
+            {"name": "Test Media Shop", "wp_url": "https://media.example.com"}
+        )
+        cls.service_class = type(cls.env["woo.service"])
+
+    def _png(self, size=(64, 64)):
+        output = io.BytesIO()
+        Image.new("RGBA", size, (255, 0, 0, 128)).save(output, format="PNG")
+        return output.getvalue()
+
+    def test_optimize_falls_back_to_original_on_encode_error(self):
+        data = self._png()
+        options = {"max_dimension": 32, "webp": True, "quality": 80}
+        with patch.object(Image.Image, "save", side_effect=OSError("encoder")):
+            self.assertEqual(optimize_image(data, options), data)
+
+    def test_failed_upload_keeps_uploaded_media(self):
+        good, bad = b"good-image", b"bad-image"
+
+        def upload(session, config, data, key, options):
+            if data == bad:
+                raise RuntimeError("worker crashed")
+            return 42, "https://media.example.com/good.png", (
+                "POST", "wp/v2/media", 201, 0.1, 0.0, 10, len(data)
+            )
+
+        with patch(f"{SERVICE}._upload_media", side_effect=upload), patch.object(
+            self.service_class,
+            "_get_config",
+            autospec=True,
+            return_value={"url": "https://media.example.com"},
+        ), self.assertRaises(RuntimeError):
+            self.env["woo.service"].upload_images(
+                self.instance, {"good": good, "bad": bad}
+            )
+
+        cached = self.env["woo.media"]._lookup(
+            self.instance, [image_checksum(good), image_checksum(bad)]
+        )
+        self.assertEqual(
+            cached,
+            {image_checksum(good): (42, "https://media.example.com/good.png")},
+        )
@@ -0,0 +1,85 @@
+import json
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestWooSaleOrderHelper(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.client = cls.env["res.partner"].create({"name": "Woo Default Client"})
+        cls.instance = cls.env["woo.instance"].create(
+            {
+                "name": "Test Orders Shop",
+                "wp_url": "https://orders.example.com",
+                "warehouse_id": cls.env["stock.warehouse"].search([], limit=1).id,
+                "client_id": cls.client.id,
+                "confirm_orders": False,
+            }
+        )
+        cls.product = cls.env["product.product"].create(
+            {"name": "Woo Order Product", "default_code": "WOO-ORDER-1"}
+        )
+        WooOrder = cls.env["odoo.wp.sync"]
+        cls.malformed = WooOrder.create(
+            {
+                "instance_id": cls.instance.id,
+                "wc_order_id": 9001,
+                "order_number": "9001",
+                "status": "processing",
+                "order_lines": "{not json",
+            }
+        )
+        cls.bad_total = WooOrder.create(
+            {
+                "instance_id": cls.instance.id,
+                "wc_order_id": 9002,
+                "order_number": "9002",
+                "status": "processing",
+                "order_lines": json.dumps(
+                    [{"sku": "WOO-ORDER-1", "quantity": 1, "total": "n/a"}]
+                ),
+            }
+        )
+        cls.valid = WooOrder.create(
+            {
+                "instance_id": cls.instance.id,
+                "wc_order_id": 9003,
+                "order_number": "9003",
+                "status": "processing",
+                "order_lines": json.dumps(
+                    [{"sku": "WOO-ORDER-1", "quantity": 2, "total": "50.0"}]
+                ),
+            }
+        )
+        cls.records = cls.malformed | cls.bad_total | cls.valid
+
+    def test_malformed_orders_are_isolated(self):
+        results = self.env["woo.sale.order.helper"].create_sale_orders_from_woo(
+            self.records
+        )
+        self.assertIn("error", results[self.malformed.id])
+        self.assertIn("error", results[self.bad_total.id])
+        self.assertTrue(results[self.valid.id]["created"])
+        order = results[self.valid.id]["order"]
+        self.assertEqual(self.valid.sale_order_id, order)
+        self.assertEqual(order.order_line.product_id, self.product)
+        self.assertFalse(self.malformed.sale_order_id)
+
+    def test_auto_create_counts_attempts(self):
+        with patch.object(
+            type(self.instance),
+            "_get_auto_create_trigger_statuses",
+            autospec=True,
+            return_value=["processing"],
+        ):
+            summary = self.env["odoo.wp.sync"]._auto_create_sale_orders(
+                self.instance, self.records
+            )
+        self.assertEqual(summary["created"], 1)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(self.malformed.auto_create_attempts, 1)
+        self.assertEqual(self.bad_total.auto_create_attempts, 1)
+        self.assertTrue(self.malformed.auto_create_error)
+        self.assertTrue(self.valid.sale_order_id)
@@ -0,0 +1,52 @@
+import json
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestWooSyncProfiler(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.instance = cls.env["woo.instance"].create(
+            {
+                "name": "Test Profiler Shop",
+                "wp_url": "https://profiler.example.com",
+                "warehouse_id": cls.env["stock.warehouse"].search([], limit=1).id,
+            }
+        )
+        cls.Profile = cls.env["woo.sync.profile"]
+
+    def test_failed_run_is_stored(self):
+        run = self.Profile._start_run(self.instance, "orders")
+        run.record_request("GET", "orders/15?page=2", 500, 0.25, 0.01, 2048, 0)
+        with run.phase("fetch"):
+            pass
+        run.error = "boom"
+        profile = self.Profile._finish_run(run)
+
+        stored = self.Profile.search(
+            [("instance_id", "=", self.instance.id), ("run_type", "=", "orders")]
+        )
+        self.assertEqual(stored, profile)
+        self.assertEqual(stored.state, "error")
+        self.assertEqual(stored.error, "boom")
+        self.assertEqual(stored.http_count, 1)
+        self.assertEqual(stored.bytes_received, 2048)
+        self.assertAlmostEqual(stored.http_time, 0.25)
+        self.assertGreaterEqual(stored.duration, 0.0)
+        endpoints = json.loads(stored.endpoint_stats)
+        self.assertEqual(endpoints["GET orders/{id}"]["errors"], 1)
+        slowest = json.loads(stored.slowest_calls)
+        self.assertEqual(slowest[0]["endpoint"], "orders/15?page=2")
+
+    def test_store_failure_does_not_raise(self):
+        run = self.Profile._start_run(self.instance, "products")
+        with patch.object(
+            type(self.Profile), "_store_run", side_effect=Exception("db down")
+        ), self.assertLogs(
+            "odoo.addons.odoo_wp_sync.models.woo_sync_profiler", level="ERROR"
+        ):
+            profile = self.Profile._finish_run(run)
+
+        self.assertFalse(profile)
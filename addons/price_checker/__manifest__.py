@@ -16,6 +16,7 @@
         "views/stock_warehouse_views.xml",
         "views/price_list_views.xml",
         "views/pricelist_warehouse_label_views.xml",
+        "data/ir_cron.xml",
     ],
     "assets": {
         "web.assets_frontend": [
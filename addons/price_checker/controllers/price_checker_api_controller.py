@@ -1,19 +1,26 @@
 from odoo import http
 from odoo.http import request, Response
 import json
+import zlib
+
+from ..models.price_checker_model import IMAGE_SIZES, DEFAULT_IMAGE_SIZE
 
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Líneas JSON que se agrupan antes de comprimir y enviar cada parte
+STREAM_CHUNK_LINES = 500
+
 
 class PriceCheckerSfController(http.Controller):
     @staticmethod
-    def _respond(data, status=200):
+    def _respond(data, status=200, headers=None):
         return Response(
             json.dumps(data),
             content_type="application/json",
             status=status,
+            headers=headers,
         )
 
     def _error_response(self, message, status=400, **extra):
@@ -24,6 +31,56 @@ class PriceCheckerSfController(http.Controller):
         payload.update(extra)
         return self._respond(payload, status=status)
 
+    @staticmethod
+    def _stream_lines(lines, headers=None):
+        """Respuesta en líneas JSON (NDJSON) transmitida por partes
+
+        Se comprime con gzip al vuelo si el cliente lo acepta. `lines` debe
+        estar ya leído de la base de datos: el generador corre después de que
+        el controlador devuelve la respuesta y el cursor se cierra.
+        """
+        use_gzip = "gzip" in request.httprequest.headers.get("Accept-Encoding", "")
+
+        def generate():
+            # wbits 16 + MAX_WBITS = formato gzip (cabecera y CRC)
+            compressor = (
+                zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                if use_gzip
+                else None
+            )
+            for i in range(0, len(lines), STREAM_CHUNK_LINES):
+                batch = lines[i : i + STREAM_CHUNK_LINES]
+                chunk = "".join(json.dumps(line) + "\n" for line in batch).encode()
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+            if compressor:
+                yield compressor.flush()
+
+        headers = list(headers or []) + [("Vary", "Accept-Encoding")]
+        if use_gzip:
+            headers.append(("Content-Encoding", "gzip"))
+        return Response(
+            generate(),
+            content_type="application/x-ndjson",
+            headers=headers,
+            direct_passthrough=True,
+        )
+
+    @staticmethod
+    def _parse_since(value):
+        """Número de cambio de la última sincronización (None = respuesta completa)"""
+        if value in (None, ""):
+            return None, None
+        try:
+            since = int(value)
+        except (ValueError, TypeError):
+            return None, "since inválido"
+        if since < 0:
+            return None, "since inválido"
+        return since, None
+
     def _parse_json_body(self):
         try:
             body = json.loads(request.httprequest.data or "{}")
@@ -67,20 +124,52 @@ class PriceCheckerSfController(http.Controller):
         if error:
             return self._error_response(error, status=400)
 
-        products = request.env["price.checker"].sudo().get_all_products_with_prices(
-            warehouse_id=warehouse.id,
-        )
+        since, error = self._parse_since(body.get("since", kw.get("since")))
+        if error:
+            return self._error_response(error, status=400)
+
+        checker = request.env["price.checker"].sudo()
+
+        # Sincronización incremental: solo los cambios a partir de `since`
+        if since is not None:
+            return self._stream_lines(
+                checker.get_prices_delta(warehouse.id, since),
+                headers=[("Cache-Control", "no-cache")],
+            )
+
+        # Sin índice todavía: el cron lo construye y el kiosko reintenta
+        building = checker.is_index_building(warehouse.id)
+
+        # El kiosko solo descarga de nuevo si el índice cambió
+        etag = checker.get_prices_etag(warehouse.id)
+        headers = [("ETag", etag), ("Cache-Control", "no-cache")]
+        if etag in request.httprequest.headers.get("If-None-Match", ""):
+            return Response(status=304, headers=headers)
+
+        products = checker.get_all_products_with_prices(warehouse_id=warehouse.id)
 
         return self._respond({
             "warehouse_id": warehouse.id,
+            "building": building,
             "total": len(products),
             "products": products,
-        })
+        }, headers=headers)
     
     @http.route("/warehouse/products", type="http", auth="public", csrf=False, methods=["GET"])
     def get_products(self, **kw):
+        since, error = self._parse_since(kw.get("since"))
+        if error:
+            return self._error_response(error, status=400)
+
         try:
-            products = request.env["price.checker"].sudo().get_all_products()
+            checker = request.env["price.checker"].sudo()
+            if since is not None:
+                return self._stream_lines(
+                    checker.get_products_delta(since),
+                    headers=[("Cache-Control", "no-cache")],
+                )
+
+            products = checker.get_all_products()
 
             return self._respond({
                 "total": len(products),
@@ -115,18 +204,45 @@ class PriceCheckerSfController(http.Controller):
                 "product": None,
             })
 
-        product_data = request.env["price.checker"].sudo().find_product_price(
-            name=query,
-            warehouse_id=warehouse.id,
+        payload, error = request.env["price.checker"].sudo().get_product_response(
+            query, warehouse.id
         )
+        if error:
+            return self._error_response(error, status=400)
 
-        if not product_data:
+        if not payload:
             return self._error_response(f'No se encontró: "{query}"', status=404)
 
-        if "error" in product_data:
-            return self._error_response(product_data["error"], status=400)
+        # payload ya viene serializado desde la caché del modelo
+        return Response(
+            '{"product": %s}' % payload,
+            content_type="application/json",
+            status=200,
+        )
 
-        return self._respond({"product": product_data})
+    @http.route(
+        "/warehouse/products/<int:product_id>/image",
+        type="http",
+        auth="public",
+        methods=["GET"],
+    )
+    def get_product_image(self, product_id, size=None, unique=None, **kw):
+        """Imagen redimensionada del producto; con `unique` se cachea como inmutable"""
+        try:
+            size = int(size or DEFAULT_IMAGE_SIZE)
+        except (ValueError, TypeError):
+            size = DEFAULT_IMAGE_SIZE
+        if size not in IMAGE_SIZES:
+            size = DEFAULT_IMAGE_SIZE
+
+        product = request.env["product.product"].sudo().browse(product_id)
+        if not product.exists():
+            return self._error_response("Producto no existe", status=404)
+
+        stream = request.env["ir.binary"]._get_image_stream_from(
+            product, f"image_{size}"
+        )
+        return stream.get_response(immutable=bool(unique))
 
     def _resolve_warehouse(self, warehouse_id):
         if not warehouse_id:
@@ -33,7 +33,7 @@ class PriceCheckerController(http.Controller):
         query = kw.get("query", "")
         warehouse_id = kw.get("warehouse_id", None)
 
-        _logger.info(
+        _logger.debug(
             f"Consulta de búsqueda recibida: {query}, warehouse_id: {warehouse_id}"
         )
 
@@ -79,8 +79,7 @@ class PriceCheckerController(http.Controller):
                     _logger.warning(f"Error en búsqueda: {product_data['error']}")
                 else:
                     # Producto encontrado correctamente
-                    _logger.info(f"Datos del producto encontrados: {product_data}")
-                    _logger.info(f"Precios: {product_data.get('prices', {})}")
+                    _logger.debug(f"Datos del producto encontrados: {product_data}")
                     context.update(
                         {
                             "product": product_data,
@@ -2,3 +2,4 @@ from . import price_checker_model
 from . import price_list_model
 from . import stock_warehouse_model
 from . import pricelist_warehouse_label_model
+from . import price_index_model
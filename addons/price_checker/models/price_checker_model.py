@@ -1,126 +1,162 @@
-from odoo import models, fields
+from odoo import models, fields, api, tools
+import hashlib
+import json
 
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Tamaños de imagen que sirve el checador (campos image_<tamaño> de Odoo)
+IMAGE_SIZES = (128, 256, 512, 1024)
+DEFAULT_IMAGE_SIZE = 512
+
 
 class PriceChecker(models.Model):
     _name = "price.checker"
     _description = "Price Checker"
 
     def find_product_price(self, sku=None, barcode=None, name=None, warehouse_id=None):
-        """Buscar un producto por SKU, código de barras o nombre y obtener precios según almacén."""
-
-        # Obtener el término de búsqueda
-        search_term = sku or barcode or name
+        """Buscar un producto por SKU o código de barras y obtener precios según almacén."""
+        payload, error = self.get_product_response(sku or barcode or name, warehouse_id)
+        if error:
+            return {"error": error}
+        return json.loads(payload) if payload else None
+
+    def get_product_response(self, search_term, warehouse_id):
+        """Ruta rápida del escaneo
+
+        El código se resuelve en el índice en memoria y la respuesta del
+        producto en el almacén se toma ya serializada de la caché; solo se
+        consulta la base de datos la primera vez o tras un cambio.
+
+        Returns:
+            tuple: (JSON del producto o None si no se encontró, mensaje de error)
+        """
+        search_term = (search_term or "").strip()
         if not search_term:
-            _logger.info("No se proporcionó término de búsqueda")
-            return None
+            return None, None
 
-        # Verificar que el warehouse_id sea válido
         if not warehouse_id:
-            _logger.warning("No se proporcionó warehouse_id")
-            return {"error": "Debe seleccionar un almacén"}
-
-        # Verificar que el modelo product.product existe y tiene datos
-        Product = self.env["product.product"].sudo()
-        total_products = Product.search_count([])
-        _logger.info(f"Total de productos en la base de datos: {total_products}")
-
-        if total_products == 0:
-            _logger.error("No hay productos en la base de datos")
-            return None
-
-        product = False
-
-        # 1. Buscar por SKU exacto
-        _logger.info(f"1. Buscando por SKU exacto: '{search_term}'")
-        try:
-            domain = [("default_code", "=", search_term)]
-            product = Product.search(domain, limit=1)
-            if product:
-                _logger.info(
-                    f"✓ Producto encontrado por SKU: {product.name} (ID: {product.id})"
-                )
-        except Exception as e:
-            _logger.error(f"Error en búsqueda por SKU: {e}")
-
-        # 2. Buscar por código de barras exacto
-        if not product:
-            _logger.info(f"2. Buscando por código de barras exacto: '{search_term}'")
-            try:
-                domain = [("barcode", "=", search_term)]
-                product = Product.search(domain, limit=1)
-                if product:
-                    _logger.info(
-                        f"✓ Producto encontrado por código de barras: {product.name} (ID: {product.id})"
-                    )
-            except Exception as e:
-                _logger.error(f"Error en búsqueda por código de barras: {e}")
-
-        if not product:
-            _logger.warning(f"No se encontró producto con: {search_term}")
-            return None
+            return None, "Debe seleccionar un almacén"
 
-        # Obtener el almacén y sus listas de precios
         warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
-
         if not warehouse.exists():
             _logger.error(f"El almacén con ID {warehouse_id} no existe")
-            return {"error": "Almacén no encontrado"}
-
-        if not warehouse.price_checker_pricelist_id:
-            _logger.warning(
-                f"El almacén '{warehouse.name}' no tiene listas de precios asignadas"
-            )
-            # Devolver solo precio de lista
-            price_with_tax = product.lst_price * 1.16
-            return {
-                "id": product.id,
-                "name": product.name,
-                "sku": product.default_code,
-                "barcode": product.barcode,
-                "prices": {"Precio de lista": {"value": price_with_tax, "label": None}},
-                "image_1920": self._get_product_image(product),
-                "warehouse": warehouse.name,
-            }
-
-        pricelists = warehouse.price_checker_pricelist_id
-        _logger.info(
-            f"Usando almacén: {warehouse.name} ({warehouse.identifier_name or 'Sin identificador'}) con {len(pricelists)} lista(s) de precios"
+            return None, "Almacén no encontrado"
+
+        generation, catalog_generation = self._get_cache_generations(warehouse.id)
+        product_id = self._get_code_index(catalog_generation).get(search_term)
+        if not product_id:
+            _logger.debug(f"No se encontró producto con: {search_term}")
+            return None, None
+
+        # Sin índice aún, el producto se calcula directo mientras el cron lo construye
+        self.env["price.checker.price.index"].sudo()._check_index(warehouse)
+        return self._get_product_response(product_id, warehouse.id, generation), None
+
+    @api.model
+    def _get_cache_generations(self, warehouse_id):
+        """Claves de la caché del escaneo
+
+        La clave del catálogo es la tupla ordenada (id, generación) de todos
+        los almacenes y no su suma: una suma puede repetir un valor ya en
+        caché al borrar un almacén; la tupla no, porque las generaciones solo
+        crecen y los ids no se reutilizan.
+
+        Returns:
+            tuple: (generación del almacén, ((id, generación), ...))
+        """
+        self.env["stock.warehouse"].flush_model(["price_checker_generation"])
+        self.env.cr.execute(
+            """
+            SELECT id, COALESCE(price_checker_generation, 0)
+            FROM stock_warehouse
+            ORDER BY id
+            """
+        )
+        generations = tuple(self.env.cr.fetchall())
+        generation = dict(generations).get(warehouse_id, 0)
+        return generation, generations
+
+    @api.model
+    @tools.ormcache("catalog_generation")
+    def _get_code_index(self, catalog_generation):
+        """Índice en memoria código → ID de producto (SKU y código de barras)
+
+        El SKU tiene prioridad sobre el código de barras, como en la búsqueda
+        original. Los cambios de productos pasan por la cola del índice de
+        precios, que incrementa la generación de los almacenes al aplicarse;
+        la clave son las generaciones de todos los almacenes.
+        """
+        Product = self.env["product.product"]
+        Product.flush_model(["default_code", "barcode", "active"])
+        self.env.cr.execute(
+            """
+            SELECT id, default_code, barcode
+            FROM product_product
+            WHERE active
+            ORDER BY id
+            """
         )
+        by_sku, by_barcode = {}, {}
+        for product_id, default_code, barcode in self.env.cr.fetchall():
+            if default_code:
+                by_sku.setdefault(default_code, product_id)
+            if barcode:
+                by_barcode.setdefault(barcode, product_id)
+        by_barcode.update(by_sku)
+        return by_barcode
+
+    @api.model
+    @tools.ormcache("product_id", "warehouse_id", "generation")
+    def _get_product_response(self, product_id, warehouse_id, generation):
+        """Respuesta del escaneo serializada en JSON para (producto, almacén)
+
+        `generation` es stock.warehouse.price_checker_generation: cambia con
+        el índice de precios, las etiquetas, el producto o el almacén.
+        """
+        product = self.env["product.product"].sudo().browse(product_id)
+        warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
+        pricelists = warehouse.price_checker_pricelist_id
 
-        # Obtener diferentes precios según las listas de precios
-        prices = self._get_product_prices(product, pricelists, warehouse)
+        indexed = self.env["price.checker.price.index"].sudo().get_warehouse_prices(
+            warehouse, [product.id]
+        )
+        if indexed:
+            prices = indexed[0]["prices"]
+        elif pricelists:
+            # Producto fuera del índice (no vendible): cálculo directo
+            prices = self._get_product_prices(product, pricelists, warehouse)
+        else:
+            prices = {}
 
         # Si no hay precios específicos, usar precio de lista
         if not prices:
             price_with_tax = product.lst_price * 1.16
             prices["Precio de lista"] = {"value": price_with_tax, "label": None}
 
-        return {
+        data = {
             "id": product.id,
             "name": product.name,
             "sku": product.default_code,
             "barcode": product.barcode,
             "prices": prices,
-            "image_1920": self._get_product_image(product),
+            "image_url": self._get_image_url(product),
             "warehouse": warehouse.name,
-            "warehouse_identifier": warehouse.identifier_name or warehouse.name,
         }
+        if pricelists:
+            data["warehouse_identifier"] = warehouse.identifier_name or warehouse.name
+        return json.dumps(data)
 
-    def _get_product_image(self, product):
-        import base64
-        
-        tmpl = product.product_tmpl_id
-        image = tmpl.image_1920 or tmpl.image_512 or tmpl.image_256 or tmpl.image_128
-        
-        if not image:
+    def _get_image_url(self, product, size=DEFAULT_IMAGE_SIZE):
+        """URL de la imagen redimensionada; `unique` cambia con la imagen (caché inmutable)"""
+        if not product.with_context(bin_size=True).image_128:
             return None
-        if isinstance(image, bytes):
-            return base64.b64encode(image).decode("utf-8")
-        return image
+        tmpl = product.product_tmpl_id
+        unique = hashlib.sha1(
+            f"{product.write_date}-{tmpl.write_date}".encode()
+        ).hexdigest()[:8]
+        return f"/warehouse/products/{product.id}/image?size={size}&unique={unique}"
 
     def _get_product_prices(self, product, pricelists, warehouse):
         """Obtener precios del producto para cada lista de precios con etiquetas específicas por almacén."""
@@ -168,14 +204,14 @@ class PriceChecker(models.Model):
                         "label": label_text,
                     }
 
-                    _logger.info(
+                    _logger.debug(
                         f"Precio de '{display_name}': ${price_with_tax:.2f} (sin IVA: ${pricelist_price:.2f})"
                         + (f" - Etiqueta: '{label_text}'" if label_text else "")
                     )
                 else:
                     # El precio no cambió, no hay regla específica para este producto
                     prices[display_name] = {"value": 0.0, "label": None}
-                    _logger.info(
+                    _logger.debug(
                         f"Sin regla específica en '{display_name}' - usando precio base: ${base_price:.2f}"
                     )
 
@@ -206,20 +242,92 @@ class PriceChecker(models.Model):
         return result
     
 
+    def is_index_building(self, warehouse_id):
+        """True si el índice del almacén aún no existe (su construcción queda encolada)"""
+        warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
+        return not self.env["price.checker.price.index"].sudo()._check_index(warehouse)
+
     def get_all_products_with_prices(self, warehouse_id):
+        """Precios de todos los productos vendibles del almacén desde el índice precalculado"""
         warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
-        pricelists = warehouse.price_checker_pricelist_id
-        Product = self.env["product.product"].sudo()
-        products = Product.search([("active", "=", True), ("sale_ok", "=", True)])
+        return self.env["price.checker.price.index"].sudo().get_warehouse_prices(
+            warehouse
+        )
 
-        result = []
+    def get_products_delta(self, since=0):
+        """Catálogo incremental en líneas JSON a partir del número de cambio `since`
+
+        La primera línea ("meta") trae el número de cambio que el kiosco debe
+        enviar en la siguiente sincronización; después, una línea por producto
+        agregado/modificado ("upsert") o retirado ("delete"). Con since=0 se
+        envía el catálogo completo (reset). Una sincronización puede repetir
+        líneas de la anterior; aplicarlas de nuevo no cambia el resultado.
+        """
+        Tombstone = self.env["price.checker.tombstone"].sudo()
+        Product = self.env["product.product"].sudo().with_context(active_test=False)
+        since, reset, watermark = Tombstone._get_sync_window(since)
+        if reset:
+            products = Product.search(
+                [("active", "=", True), ("sale_ok", "=", True)], order="id"
+            )
+            deletes = []
+        else:
+            products = Product.search([("price_checker_seq", ">=", since)], order="id")
+            deletes = Tombstone._get_since("product", since)
+
+        lines = []
         for p in products:
-            prices = self._get_product_prices(p, pricelists, warehouse) if pricelists else {
-                "Precio de lista": {"value": p.lst_price * 1.16, "label": None}
-            }
-            result.append({
+            seq = p.price_checker_seq or 0
+            # Productos archivados o no vendibles salen del catálogo del kiosco
+            if not (p.active and p.sale_ok):
+                deletes.append({"id": p.id, "seq": seq})
+                continue
+            lines.append({
+                "op": "upsert",
+                "seq": seq,
                 "id": p.id,
-                "prices": prices,
+                "name": p.name,
+                "sku": p.default_code or "",
+                "barcode": p.barcode or "",
             })
+        for entry in deletes:
+            lines.append({"op": "delete", "seq": entry["seq"], "id": entry["id"]})
+
+        meta = {
+            "type": "meta",
+            "since": since,
+            "seq": watermark,
+            "reset": reset,
+            "total": len(lines),
+        }
+        return [meta] + lines
 
-        return result
\ No newline at end of file
+    def get_prices_delta(self, warehouse_id, since=0):
+        """Precios incrementales del almacén en líneas JSON (mismo formato que get_products_delta)"""
+        warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
+        Index = self.env["price.checker.price.index"].sudo()
+        building = not Index._check_index(warehouse)
+        delta = Index.get_warehouse_prices_delta(warehouse, since)
+
+        lines = [
+            {"op": "upsert", "seq": row["seq"], "id": row["id"], "prices": row["prices"]}
+            for row in delta["upserts"]
+        ]
+        lines.extend(
+            {"op": "delete", "seq": row["seq"], "id": row["id"]}
+            for row in delta["deletes"]
+        )
+        meta = {
+            "type": "meta",
+            "warehouse_id": warehouse.id,
+            "since": 0 if delta["reset"] else since,
+            "seq": delta["seq"],
+            "reset": delta["reset"],
+            "building": building,
+            "total": len(lines),
+        }
+        return [meta] + lines
+
+    def get_prices_etag(self, warehouse_id):
+        warehouse = self.env["stock.warehouse"].sudo().browse(warehouse_id)
+        return self.env["price.checker.price.index"].sudo().get_etag(warehouse)
@@ -0,0 +1,698 @@
+from odoo import models, fields, api
+import hashlib
+import logging
+
+_logger = logging.getLogger(__name__)
+
+IVA = 1.16
+LIST_PRICE_NAME = "Precio de lista"
+
+# Secuencia de los números de cambio anteriores a usar txid (se elimina al
+# actualizar el módulo)
+LEGACY_CHANGE_SEQUENCE = "price_checker_change_seq"
+# Las marcas de borrado se conservan este tiempo; un kiosco con un número de
+# cambio anterior a la última depuración recibe el catálogo completo
+TOMBSTONE_RETENTION_DAYS = 30
+TOMBSTONE_FLOOR_PARAM = "price_checker.tombstone_floor"
+
+
+class ChangeNumber(fields.Integer):
+    """Entero de 64 bits para los números de cambio (txid de PostgreSQL)"""
+
+    column_type = ("int8", "int8")
+
+
+class PriceCheckerPriceIndex(models.Model):
+    """Índice precalculado de precios por almacén para el checador.
+
+    Un registro por (almacén, producto, lista de precios) con el precio con
+    IVA y la etiqueta que muestra el checador. Los endpoints leen de aquí con
+    una sola consulta en lugar de evaluar cada lista para cada producto.
+    """
+
+    _name = "price.checker.price.index"
+    _description = "Índice de Precios del Checador"
+    _order = "warehouse_id, product_id, sequence"
+
+    warehouse_id = fields.Many2one(
+        "stock.warehouse", string="Almacén", required=True, ondelete="cascade"
+    )
+    product_id = fields.Many2one(
+        "product.product", string="Producto", required=True, ondelete="cascade"
+    )
+    pricelist_id = fields.Many2one(
+        "product.pricelist", string="Lista de Precios", ondelete="cascade"
+    )
+    sequence = fields.Integer(string="Secuencia", default=0)
+    name = fields.Char(string="Nombre del precio", required=True)
+    price = fields.Float(string="Precio con IVA", digits="Product Price")
+    label = fields.Char(string="Etiqueta")
+    change_seq = ChangeNumber(string="Número de cambio", readonly=True)
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS price_checker_price_index_wh_product_idx
+            ON price_checker_price_index (warehouse_id, product_id, sequence)
+            """
+        )
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS price_checker_price_index_wh_seq_idx
+            ON price_checker_price_index (warehouse_id, change_seq)
+            """
+        )
+        self.env.cr.execute(
+            "SELECT 1 FROM pg_class WHERE relkind = 'S' AND relname = %s",
+            (LEGACY_CHANGE_SEQUENCE,),
+        )
+        if self.env.cr.fetchone():
+            # Los números de la secuencia anterior quedan bajo el piso: los
+            # kioscos que los envíen reciben el catálogo completo
+            self.env["ir.config_parameter"].sudo().set_param(
+                TOMBSTONE_FLOOR_PARAM, self._next_change_seq()
+            )
+            self.env.cr.execute(f"DROP SEQUENCE {LEGACY_CHANGE_SEQUENCE}")
+
+    @api.model
+    def _next_change_seq(self):
+        """Número de cambio: el id de la transacción actual (txid_current)
+
+        No se serializan las transacciones que cambian precios o productos:
+        un número menor puede confirmarse después de uno mayor, por eso los
+        kioscos reanudan desde el xmin de la instantánea de su última lectura
+        (price.checker.tombstone._get_sync_window) y no desde el mayor número
+        recibido.
+        """
+        self.env.cr.execute("SELECT txid_current()")
+        return self.env.cr.fetchone()[0]
+
+    # ── Construcción ────────────────────────────────────────────────────────
+
+    @api.model
+    def _get_indexed_products(self, product_ids=None):
+        domain = [("active", "=", True), ("sale_ok", "=", True)]
+        if product_ids is not None:
+            domain.append(("id", "in", list(product_ids)))
+        return self.env["product.product"].sudo().search(domain)
+
+    @api.model
+    def _get_labels_by_pricelist(self, warehouse):
+        labels = (
+            self.env["pricelist.warehouse.label"]
+            .sudo()
+            .search([("warehouse_id", "=", warehouse.id), ("enable_label", "=", True)])
+        )
+        return {label.pricelist_id.id: label.label_text for label in labels}
+
+    @api.model
+    def _compute_rows(self, warehouse, products):
+        """Calcula las filas del índice para un lote de productos.
+
+        Cada lista se evalúa una sola vez para todo el lote con
+        _get_products_price; solo si falla se evalúa producto por producto.
+        """
+        pricelists = warehouse.price_checker_pricelist_id
+        if not pricelists:
+            return [
+                {
+                    "warehouse_id": warehouse.id,
+                    "product_id": product.id,
+                    "pricelist_id": False,
+                    "sequence": 0,
+                    "name": LIST_PRICE_NAME,
+                    "price": product.lst_price * IVA,
+                    "label": False,
+                }
+                for product in products
+            ]
+
+        labels_by_pricelist = self._get_labels_by_pricelist(warehouse)
+        rows = []
+        for sequence, pricelist in enumerate(pricelists):
+            display_name = pricelist.price_checker_alias or pricelist.name
+            try:
+                prices = pricelist._get_products_price(products, 1.0)
+            except Exception as e:
+                _logger.warning(
+                    f"Error calculando '{display_name}' en lote, se calcula por producto: {e}"
+                )
+                prices = {}
+                for product in products:
+                    try:
+                        prices[product.id] = pricelist._get_product_price(
+                            product, 1.0, uom=product.uom_id
+                        )
+                    except Exception as e_product:
+                        _logger.error(
+                            f"Error obteniendo precio de '{display_name}' para {product.id}: {e_product}"
+                        )
+
+            for product in products:
+                pricelist_price = prices.get(product.id)
+                value, label = 0.0, False
+                # Solo hay regla específica si el precio difiere del precio base
+                if (
+                    pricelist_price is not None
+                    and abs(pricelist_price - product.lst_price) > 0.01
+                ):
+                    value = pricelist_price * IVA
+                    label = labels_by_pricelist.get(pricelist.id) or False
+                rows.append(
+                    {
+                        "warehouse_id": warehouse.id,
+                        "product_id": product.id,
+                        "pricelist_id": pricelist.id,
+                        "sequence": sequence,
+                        "name": display_name,
+                        "price": value,
+                        "label": label,
+                    }
+                )
+        return rows
+
+    @api.model
+    def _get_row_signatures(self, warehouse, product_ids=None):
+        """Filas actuales del índice agrupadas por producto
+
+        Returns:
+            dict: {product_id: (ids de filas, firma comparable de los precios)}
+        """
+        self.flush_model()
+        query = """
+            SELECT id, product_id, sequence, pricelist_id, name, price, label
+            FROM price_checker_price_index
+            WHERE warehouse_id = %s
+        """
+        params = [warehouse.id]
+        if product_ids is not None:
+            if not product_ids:
+                return {}
+            query += " AND product_id IN %s"
+            params.append(tuple(product_ids))
+        self.env.cr.execute(query + " ORDER BY product_id, sequence", params)
+
+        result = {}
+        for row_id, product_id, *values in self.env.cr.fetchall():
+            ids, signature = result.setdefault(product_id, ([], []))
+            ids.append(row_id)
+            signature.append(self._row_signature(*values))
+        return {pid: (ids, tuple(sig)) for pid, (ids, sig) in result.items()}
+
+    @staticmethod
+    def _row_signature(sequence, pricelist_id, name, price, label):
+        return (
+            sequence,
+            pricelist_id or False,
+            name,
+            round(price or 0.0, 2),
+            label or False,
+        )
+
+    @api.model
+    def _refresh_index(self, warehouse, product_ids=None, batch_size=1000):
+        """Recalcula el índice de un almacén (completo o para ciertos productos)
+
+        Solo se reemplazan las filas de los productos cuyos precios cambiaron,
+        con un número de cambio nuevo para la sincronización incremental de
+        los kioscos. Los productos que salen del índice dejan marca de borrado.
+        """
+        warehouse = warehouse.sudo()
+        products = self._get_indexed_products(product_ids)
+        change_seq = self._next_change_seq()
+        current = self._get_row_signatures(
+            warehouse, None if product_ids is None else list(product_ids)
+        )
+
+        stale_row_ids = []
+        changed_product_ids = []
+        for i in range(0, len(products), batch_size):
+            rows_by_product = {}
+            for row in self._compute_rows(warehouse, products[i : i + batch_size]):
+                rows_by_product.setdefault(row["product_id"], []).append(row)
+
+            to_create = []
+            for product_id, rows in rows_by_product.items():
+                old_ids, old_signature = current.pop(product_id, ([], None))
+                signature = tuple(
+                    self._row_signature(
+                        row["sequence"],
+                        row["pricelist_id"],
+                        row["name"],
+                        row["price"],
+                        row["label"],
+                    )
+                    for row in rows
+                )
+                if signature == old_signature:
+                    continue
+                stale_row_ids.extend(old_ids)
+                changed_product_ids.append(product_id)
+                for row in rows:
+                    row["change_seq"] = change_seq
+                to_create.extend(rows)
+            if to_create:
+                self.sudo().create(to_create)
+
+        # Lo que queda en current ya no pertenece al índice
+        removed_product_ids = list(current)
+        for old_ids, _signature in current.values():
+            stale_row_ids.extend(old_ids)
+        if stale_row_ids:
+            self.sudo().browse(stale_row_ids).unlink()
+        # Los productos encolados pueden traer cambios de nombre, códigos o
+        # imagen aunque sus precios no cambien (respuestas del escaneo en caché)
+        if product_ids or changed_product_ids or removed_product_ids:
+            warehouse._bump_price_checker_generation()
+
+        self.env["price.checker.tombstone"]._record(
+            "price",
+            removed_product_ids,
+            change_seq,
+            warehouse=warehouse,
+            restored_ids=changed_product_ids,
+        )
+
+        _logger.info(
+            f"Índice de precios '{warehouse.name}': {len(changed_product_ids)} productos "
+            f"actualizados, {len(removed_product_ids)} retirados "
+            f"({'completo' if product_ids is None else f'{len(products)} productos'})"
+        )
+        return len(changed_product_ids)
+
+    @api.model
+    def _refresh_labels(self, warehouse):
+        """Actualiza solo las etiquetas del índice de un almacén"""
+        labels_by_pricelist = self._get_labels_by_pricelist(warehouse)
+        rows = self.sudo().search(
+            [("warehouse_id", "=", warehouse.id), ("pricelist_id", "!=", False)]
+        )
+        ids_by_label = {}
+        for row in rows:
+            # Igual que en _compute_rows: solo los precios con regla llevan etiqueta
+            label = False
+            if row.price:
+                label = labels_by_pricelist.get(row.pricelist_id.id) or False
+            if (row.label or False) != label:
+                ids_by_label.setdefault(label, []).append(row.id)
+        if not ids_by_label:
+            return
+        change_seq = self._next_change_seq()
+        for label, row_ids in ids_by_label.items():
+            self.sudo().browse(row_ids).write(
+                {"label": label, "change_seq": change_seq}
+            )
+        warehouse.sudo()._bump_price_checker_generation()
+
+    # ── Invalidación incremental ───────────────────────────────────────────
+
+    @api.model
+    def _enqueue(self, warehouses, product_ids=None):
+        """Marca productos (o el almacén completo si product_ids es None) para recalcular"""
+        Queue = self.env["price.checker.price.index.queue"].sudo()
+        vals_list = []
+        for warehouse in warehouses:
+            if product_ids is None:
+                vals_list.append({"warehouse_id": warehouse.id, "product_id": False})
+            else:
+                vals_list.extend(
+                    {"warehouse_id": warehouse.id, "product_id": product_id}
+                    for product_id in product_ids
+                )
+        if vals_list:
+            Queue.create(vals_list)
+            self._trigger_queue()
+
+    @api.model
+    def _trigger_queue(self):
+        """Programa el cron de la cola para que corra en cuanto se confirme"""
+        cron = self.env.ref(
+            "price_checker.ir_cron_price_index_queue", raise_if_not_found=False
+        )
+        if cron:
+            cron._trigger()
+
+    @api.model
+    def _enqueue_pricelists(self, pricelists, product_ids=None):
+        warehouses = (
+            self.env["stock.warehouse"]
+            .sudo()
+            .search([("price_checker_pricelist_id", "in", pricelists.ids)])
+        )
+        self._enqueue(warehouses, product_ids)
+
+    @api.model
+    def _enqueue_products(self, product_ids):
+        warehouses = self.env["stock.warehouse"].sudo().search([])
+        self._enqueue(warehouses, product_ids)
+
+    @api.model
+    def process_queue(self, warehouse_ids=None):
+        """Aplica las invalidaciones pendientes (todas o de ciertos almacenes)
+
+        Solo lo ejecuta el cron (disparado al encolar): las lecturas de los
+        kioscos nunca recalculan el índice ni tocan la cola.
+        """
+        Queue = self.env["price.checker.price.index.queue"].sudo()
+        domain = []
+        if warehouse_ids is not None:
+            domain.append(("warehouse_id", "in", list(warehouse_ids)))
+        entries = Queue.search(domain)
+        if not entries:
+            return
+
+        pending = {}
+        for entry in entries:
+            products = pending.setdefault(entry.warehouse_id, set())
+            if products is None:
+                continue
+            if entry.product_id:
+                products.add(entry.product_id.id)
+            else:
+                pending[entry.warehouse_id] = None  # almacén completo
+
+        entries.unlink()
+        for warehouse, product_ids in pending.items():
+            self._refresh_index(warehouse, product_ids)
+
+    @api.model
+    def _check_index(self, warehouse):
+        """Indica si el índice del almacén ya existe
+
+        Si no existe, encola su construcción completa (una sola vez) y el
+        cron la hace; mientras tanto las lecturas responden con lo que haya.
+
+        Returns:
+            bool: False mientras el índice se está construyendo
+        """
+        if self.sudo().search_count([("warehouse_id", "=", warehouse.id)], limit=1):
+            return True
+        Queue = self.env["price.checker.price.index.queue"].sudo()
+        pending = Queue.search_count(
+            [("warehouse_id", "=", warehouse.id), ("product_id", "=", False)],
+            limit=1,
+        )
+        if not pending:
+            self._enqueue(warehouse)
+        return False
+
+    @api.model
+    def _cron_rebuild(self):
+        """Reconstrucción completa (reglas con vigencia por fechas, etc.)"""
+        # Solo lo encolado hasta ahora queda cubierto por la reconstrucción
+        entries = self.env["price.checker.price.index.queue"].sudo().search([])
+        for warehouse in self.env["stock.warehouse"].sudo().search([]):
+            self._refresh_index(warehouse)
+        entries.unlink()
+        self.env["price.checker.tombstone"]._prune()
+
+    # ── Lectura ─────────────────────────────────────────────────────────────
+
+    @api.model
+    def get_etag(self, warehouse):
+        """ETag del índice de un almacén: cambia con cualquier fila nueva o borrada"""
+        self.env.cr.execute(
+            """
+            SELECT COUNT(*), COALESCE(MAX(id), 0), MAX(write_date)
+            FROM price_checker_price_index
+            WHERE warehouse_id = %s
+            """,
+            (warehouse.id,),
+        )
+        count, max_id, last_write = self.env.cr.fetchone()
+        digest = hashlib.sha1(
+            f"{warehouse.id}-{count}-{max_id}-{last_write}".encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    @api.model
+    def get_warehouse_prices(self, warehouse, product_ids=None):
+        """Precios de los productos del almacén (todos o algunos) en una sola consulta
+
+        Returns:
+            list: [{"id": product_id, "prices": {nombre: {"value", "label"}}}]
+        """
+        query = """
+            SELECT product_id, name, price, label
+            FROM price_checker_price_index
+            WHERE warehouse_id = %s
+        """
+        params = [warehouse.id]
+        if product_ids is not None:
+            if not product_ids:
+                return []
+            query += " AND product_id IN %s"
+            params.append(tuple(product_ids))
+        self.env.cr.execute(query + " ORDER BY product_id, sequence", params)
+        result = []
+        current = None
+        for product_id, name, price, label in self.env.cr.fetchall():
+            if current is None or current["id"] != product_id:
+                current = {"id": product_id, "prices": {}}
+                result.append(current)
+            current["prices"][name] = {"value": price or 0.0, "label": label or None}
+        return result
+
+    @api.model
+    def get_warehouse_prices_delta(self, warehouse, since=0):
+        """Productos del almacén cuyos precios cambiaron después de `since`
+
+        Un producto cambiado se envía con todos sus precios. Con since=0 (o un
+        número anterior a la última depuración de borrados) se envía todo.
+
+        Returns:
+            dict: {"reset": bool, "seq": número desde el que reanudar,
+                   "upserts": [{"id", "seq", "prices"}], "deletes": [{"id", "seq"}]}
+        """
+        Tombstone = self.env["price.checker.tombstone"]
+        since, reset, watermark = Tombstone._get_sync_window(since)
+
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT product_id, name, price, label, change_seq
+            FROM price_checker_price_index
+            WHERE warehouse_id = %s
+              AND product_id IN (
+                  SELECT product_id FROM price_checker_price_index
+                  WHERE warehouse_id = %s AND change_seq >= %s
+              )
+            ORDER BY product_id, sequence
+            """,
+            (warehouse.id, warehouse.id, since),
+        )
+        upserts = []
+        current = None
+        for product_id, name, price, label, change_seq in self.env.cr.fetchall():
+            if current is None or current["id"] != product_id:
+                current = {"id": product_id, "seq": 0, "prices": {}}
+                upserts.append(current)
+            current["seq"] = max(current["seq"], change_seq or 0)
+            current["prices"][name] = {"value": price or 0.0, "label": label or None}
+
+        deletes = [] if reset else Tombstone._get_since("price", since, warehouse)
+        return {
+            "reset": reset,
+            "seq": watermark,
+            "upserts": upserts,
+            "deletes": deletes,
+        }
+
+
+class PriceCheckerTombstone(models.Model):
+    """Marca de borrado para la sincronización incremental de los kioscos.
+
+    kind='price': el producto salió del índice de precios de un almacén.
+    kind='product': el producto se eliminó del catálogo.
+    """
+
+    _name = "price.checker.tombstone"
+    _description = "Borrados para Sincronización del Checador"
+    _order = "change_seq"
+
+    kind = fields.Selection(
+        [("price", "Precio"), ("product", "Producto")],
+        string="Tipo",
+        required=True,
+    )
+    warehouse_id = fields.Many2one(
+        "stock.warehouse", string="Almacén", ondelete="cascade"
+    )
+    # Entero y no Many2one: el producto puede ya no existir
+    product_id = fields.Integer(string="ID de Producto", required=True)
+    change_seq = ChangeNumber(string="Número de cambio", required=True, index=True)
+
+    @api.model
+    def _record(
+        self, kind, product_ids, change_seq, warehouse=None, restored_ids=None
+    ):
+        """Registra borrados y descarta los de productos que volvieron a aparecer"""
+        warehouse_id = warehouse.id if warehouse else False
+        if restored_ids:
+            self.sudo().search(
+                [
+                    ("kind", "=", kind),
+                    ("warehouse_id", "=", warehouse_id),
+                    ("product_id", "in", restored_ids),
+                ]
+            ).unlink()
+        if product_ids:
+            self.sudo().create(
+                [
+                    {
+                        "kind": kind,
+                        "warehouse_id": warehouse_id,
+                        "product_id": product_id,
+                        "change_seq": change_seq,
+                    }
+                    for product_id in product_ids
+                ]
+            )
+
+    @api.model
+    def _get_since(self, kind, since, warehouse=None):
+        domain = [("kind", "=", kind), ("change_seq", ">=", since)]
+        if warehouse:
+            domain.append(("warehouse_id", "=", warehouse.id))
+        return [
+            {"id": record["product_id"], "seq": record["change_seq"]}
+            for record in self.sudo().search_read(domain, ["product_id", "change_seq"])
+        ]
+
+    @api.model
+    def _get_sync_window(self, since):
+        """Rango de una sincronización incremental
+
+        Se envían los cambios con número >= since. El kiosco reanuda desde el
+        xmin de la instantánea de esta lectura: toda transacción anterior ya
+        terminó y sus cambios van en esta respuesta; las que seguían en curso
+        tienen número >= xmin y llegan en la siguiente (a lo sumo repetidas).
+
+        Returns:
+            tuple: (since efectivo, reset, número desde el que reanudar)
+        """
+        self.env.cr.execute(
+            """
+            SELECT txid_snapshot_xmin(snapshot), txid_snapshot_xmax(snapshot)
+            FROM (SELECT txid_current_snapshot() AS snapshot) s
+            """
+        )
+        xmin, xmax = self.env.cr.fetchone()
+        # Los borrados con número <= piso ya se depuraron; un número mayor que
+        # cualquier transacción no es de esta base
+        reset = not since or since <= self._get_floor() or since > xmax
+        return (0 if reset else since), reset, xmin
+
+    @api.model
+    def _get_floor(self):
+        """Número de cambio más alto ya depurado (0 si nunca se ha depurado)"""
+        param = self.env["ir.config_parameter"].sudo().get_param(TOMBSTONE_FLOOR_PARAM)
+        return int(param or 0)
+
+    @api.model
+    def _prune(self):
+        """Elimina las marcas de borrado más antiguas que la retención"""
+        limit = fields.Datetime.subtract(
+            fields.Datetime.now(), days=TOMBSTONE_RETENTION_DAYS
+        )
+        old = self.sudo().search([("create_date", "<", limit)])
+        if not old:
+            return
+        floor = max(max(old.mapped("change_seq")), self._get_floor())
+        self.env["ir.config_parameter"].sudo().set_param(TOMBSTONE_FLOOR_PARAM, floor)
+        old.unlink()
+
+
+class PriceCheckerPriceIndexQueue(models.Model):
+    _name = "price.checker.price.index.queue"
+    _description = "Cola de Recalculo del Índice de Precios"
+    _order = "id"
+
+    warehouse_id = fields.Many2one(
+        "stock.warehouse", string="Almacén", required=True, ondelete="cascade"
+    )
+    product_id = fields.Many2one(
+        "product.product",
+        string="Producto",
+        ondelete="cascade",
+        help="Vacío = recalcular todo el almacén",
+    )
+
+
+# Campos que publica el catálogo del kiosco (GET /warehouse/products)
+CATALOG_FIELDS = {"name", "default_code", "barcode", "sale_ok", "active"}
+# Campos del índice de códigos y de la respuesta del escaneo en caché; sus
+# cambios se encolan y el cron invalida la caché al procesarlos
+LOOKUP_FIELDS = {"name", "default_code", "barcode", "active", "image_1920"}
+
+
+class ProductTemplate(models.Model):
+    _inherit = "product.template"
+
+    def write(self, vals):
+        res = super().write(vals)
+        variant_ids = None
+        # Los cambios de LOOKUP_FIELDS llegan a la caché del escaneo por la cola
+        if ({"list_price", "sale_ok", "active"} | LOOKUP_FIELDS) & set(vals):
+            variant_ids = self.with_context(active_test=False).product_variant_ids.ids
+            self.env["price.checker.price.index"]._enqueue_products(variant_ids)
+        if CATALOG_FIELDS & set(vals):
+            if variant_ids is None:
+                variant_ids = self.with_context(
+                    active_test=False
+                ).product_variant_ids.ids
+            self.env["product.product"].browse(variant_ids)._touch_price_checker_seq()
+        return res
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    price_checker_seq = ChangeNumber(
+        string="Número de cambio (checador)", readonly=True, copy=False, index=True
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        self.env["price.checker.price.index"]._enqueue_products(products.ids)
+        products._touch_price_checker_seq()
+        return products
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Los cambios de LOOKUP_FIELDS llegan a la caché del escaneo por la cola
+        enqueue_fields = {"sale_ok", "active", "product_template_attribute_value_ids"}
+        if (enqueue_fields | LOOKUP_FIELDS) & set(vals):
+            self.env["price.checker.price.index"]._enqueue_products(self.ids)
+        if CATALOG_FIELDS & set(vals):
+            self._touch_price_checker_seq()
+        return res
+
+    def unlink(self):
+        product_ids = self.ids
+        res = super().unlink()
+        if product_ids:
+            # Sus códigos ya no deben resolverse desde el índice en caché
+            self.env["stock.warehouse"].sudo().search(
+                []
+            )._bump_price_checker_generation()
+            change_seq = self.env["price.checker.price.index"]._next_change_seq()
+            self.env["price.checker.tombstone"]._record(
+                "product", product_ids, change_seq
+            )
+        return res
+
+    def _touch_price_checker_seq(self):
+        """Asigna un número de cambio nuevo a los productos del catálogo"""
+        if not self:
+            return
+        # SQL directo: no debe disparar de nuevo write() ni cambiar write_date
+        self.env.cr.execute(
+            """
+            UPDATE product_product SET price_checker_seq = txid_current()
+            WHERE id IN %s
+            """,
+            (tuple(self.ids),),
+        )
+        self.invalidate_recordset(["price_checker_seq"])
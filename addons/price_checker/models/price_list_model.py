@@ -1,4 +1,4 @@
-from odoo import models, fields
+from odoo import models, fields, api
 import logging
 
 
@@ -19,3 +19,74 @@ class PriceListModel(models.Model):
         string="Texto de la etiqueta condicional",
         help="Texto que se mostrará en la etiqueta condicional.",
     )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"price_checker_alias", "item_ids", "currency_id", "active"} & set(vals):
+            self.env["price.checker.price.index"]._enqueue_pricelists(self)
+        return res
+
+
+class ProductPricelistItem(models.Model):
+    _inherit = "product.pricelist.item"
+
+    def _get_price_index_products(self):
+        """Productos afectados por estas reglas en el índice del checador
+
+        Returns:
+            dict: {lista de precios: set de ids de productos, o None = lista completa}
+        """
+        products_by_pricelist = {}
+        for item in self:
+            pricelist = item.pricelist_id
+            if not pricelist:
+                continue
+            product_ids = products_by_pricelist.setdefault(pricelist, set())
+            if product_ids is None:
+                continue
+            if item.applied_on == "0_product_variant" and item.product_id:
+                product_ids.add(item.product_id.id)
+            elif item.applied_on == "1_product" and item.product_tmpl_id:
+                product_ids.update(
+                    item.product_tmpl_id.with_context(
+                        active_test=False
+                    ).product_variant_ids.ids
+                )
+            else:
+                # Regla por categoría o global: recalcular la lista completa
+                products_by_pricelist[pricelist] = None
+        return products_by_pricelist
+
+    @api.model
+    def _enqueue_price_index(self, products_by_pricelist):
+        """Marca en el índice del checador los productos afectados"""
+        Index = self.env["price.checker.price.index"]
+        for pricelist, product_ids in products_by_pricelist.items():
+            # Listas que se calculan a partir de esta también cambian
+            dependents = self.env["product.pricelist"].search(
+                [("item_ids.base_pricelist_id", "=", pricelist.id)]
+            )
+            Index._enqueue_pricelists(pricelist | dependents, product_ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        items = super().create(vals_list)
+        self._enqueue_price_index(items._get_price_index_products())
+        return items
+
+    def write(self, vals):
+        # Productos y listas antes y después del cambio, encolados una sola vez
+        products_by_pricelist = self._get_price_index_products()
+        res = super().write(vals)
+        for pricelist, product_ids in self._get_price_index_products().items():
+            before = products_by_pricelist.get(pricelist, set())
+            if before is None or product_ids is None:
+                products_by_pricelist[pricelist] = None
+            else:
+                products_by_pricelist[pricelist] = before | product_ids
+        self._enqueue_price_index(products_by_pricelist)
+        return res
+
+    def unlink(self):
+        self._enqueue_price_index(self._get_price_index_products())
+        return super().unlink()
@@ -48,6 +48,30 @@ class PriceListWarehouseLabel(models.Model):
         )
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._refresh_price_index_labels(records.warehouse_id)
+        return records
+
+    def write(self, vals):
+        warehouses = self.warehouse_id
+        res = super().write(vals)
+        self._refresh_price_index_labels(warehouses | self.warehouse_id)
+        return res
+
+    def unlink(self):
+        warehouses = self.warehouse_id
+        res = super().unlink()
+        self._refresh_price_index_labels(warehouses)
+        return res
+
+    def _refresh_price_index_labels(self, warehouses):
+        """Las etiquetas se actualizan directamente en el índice (sin recalcular precios)"""
+        Index = self.env["price.checker.price.index"]
+        for warehouse in warehouses:
+            Index._refresh_labels(warehouse)
+
     @api.depends("warehouse_id", "pricelist_id")
     def _compute_display_name(self):
         for record in self:
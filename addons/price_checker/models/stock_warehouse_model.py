@@ -14,3 +14,40 @@ class StockWarehouse(models.Model):
         string="Identificador de Almacén",
         help="Identificador o nombre corto del almacén para mostrar en el checador de precios",
     )
+
+    price_checker_generation = fields.Integer(
+        string="Generación de caché (checador)",
+        readonly=True,
+        copy=False,
+        default=0,
+        help="Forma parte de la clave de las respuestas del escaneo en caché; "
+        "cambia cada vez que cambian los datos que muestra el checador.",
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "price_checker_pricelist_id" in vals:
+            self.env["price.checker.price.index"]._enqueue(self)
+        if {"name", "identifier_name"} & set(vals):
+            # El nombre del almacén va en la respuesta del escaneo en caché
+            self._bump_price_checker_generation()
+        return res
+
+    def _bump_price_checker_generation(self):
+        """Invalida las respuestas del escaneo en caché de estos almacenes
+
+        Solo cambia la clave de price.checker._get_code_index y
+        _get_product_response; el resto del ormcache no se toca.
+        """
+        if not self:
+            return
+        # SQL directo: no debe disparar write() ni cambiar write_date
+        self.env.cr.execute(
+            """
+            UPDATE stock_warehouse
+            SET price_checker_generation = COALESCE(price_checker_generation, 0) + 1
+            WHERE id IN %s
+            """,
+            (tuple(self.ids),),
+        )
+        self.invalidate_recordset(["price_checker_generation"])
@@ -0,0 +1,3 @@
+from . import test_price_index
+from . import test_price_delta
+from . import test_price_cache
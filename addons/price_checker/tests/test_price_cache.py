@@ -0,0 +1,71 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestPriceCheckerCache(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Index = cls.env["price.checker.price.index"]
+        cls.PriceChecker = cls.env["price.checker"]
+        cls.product = cls.env["product.product"].create(
+            {"name": "Caché producto", "default_code": "PCC-A", "list_price": 100.0}
+        )
+        cls.warehouse, cls.other = cls.env["stock.warehouse"].create(
+            [
+                {"name": "Checador Caché", "code": "PCKC"},
+                {"name": "Checador Otro", "code": "PCKO"},
+            ]
+        )
+        cls.Index._enqueue(cls.warehouse | cls.other)
+        cls.Index.process_queue()
+
+    def _scan_price(self):
+        result = self.PriceChecker.find_product_price(
+            sku="PCC-A", warehouse_id=self.warehouse.id
+        )
+        return result["prices"]["Precio de lista"]["value"]
+
+    def test_refresh_bumps_only_its_warehouse(self):
+        generation = self.warehouse.price_checker_generation
+        other_generation = self.other.price_checker_generation
+
+        self.product.product_tmpl_id.list_price = 200.0
+        self.Index.process_queue([self.warehouse.id])
+
+        self.assertGreater(self.warehouse.price_checker_generation, generation)
+        self.assertEqual(self.other.price_checker_generation, other_generation)
+
+    def test_catalog_key_tracks_each_warehouse(self):
+        generation, key = self.PriceChecker._get_cache_generations(self.warehouse.id)
+        self.assertEqual(generation, self.warehouse.price_checker_generation)
+        self.assertIn((self.other.id, self.other.price_checker_generation), key)
+
+        self.other._bump_price_checker_generation()
+
+        new_generation, new_key = self.PriceChecker._get_cache_generations(
+            self.warehouse.id
+        )
+        self.assertEqual(new_generation, generation)
+        self.assertNotEqual(new_key, key)
+
+    def test_scan_follows_processed_changes(self):
+        self.assertAlmostEqual(self._scan_price(), 116.0)
+
+        self.product.product_tmpl_id.list_price = 200.0
+        # El escaneo no procesa la cola: sigue la respuesta en caché
+        self.assertAlmostEqual(self._scan_price(), 116.0)
+
+        self.Index.process_queue()
+        self.assertAlmostEqual(self._scan_price(), 232.0)
+
+    def test_warehouse_rename_changes_response(self):
+        self._scan_price()
+        generation = self.warehouse.price_checker_generation
+
+        self.warehouse.name = "Checador Renombrado"
+
+        self.assertGreater(self.warehouse.price_checker_generation, generation)
+        result = self.PriceChecker.find_product_price(
+            sku="PCC-A", warehouse_id=self.warehouse.id
+        )
+        self.assertEqual(result["warehouse"], "Checador Renombrado")
@@ -0,0 +1,93 @@
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.price_checker.models.price_index_model import TOMBSTONE_FLOOR_PARAM
+
+
+class TestPriceDelta(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Index = cls.env["price.checker.price.index"]
+        cls.product_a, cls.product_b = cls.env["product.product"].create(
+            [
+                {
+                    "name": "Delta producto A",
+                    "default_code": "PCD-A",
+                    "list_price": 100.0,
+                },
+                {
+                    "name": "Delta producto B",
+                    "default_code": "PCD-B",
+                    "list_price": 50.0,
+                },
+            ]
+        )
+        cls.warehouse = cls.env["stock.warehouse"].create(
+            {"name": "Checador Delta", "code": "PCKD"}
+        )
+        cls.Index._enqueue(cls.warehouse)
+        cls.Index.process_queue([cls.warehouse.id])
+        # Toda la prueba corre en una transacción: un solo número de cambio
+        cls.change_seq = cls.Index._next_change_seq()
+
+    def _delta(self, since):
+        return self.Index.get_warehouse_prices_delta(self.warehouse, since)
+
+    def _upserted(self, delta):
+        return {row["id"]: row for row in delta["upserts"]}
+
+    def test_delta_includes_changes_at_since(self):
+        self.product_a.product_tmpl_id.list_price = 200.0
+        self.Index.process_queue([self.warehouse.id])
+
+        delta = self._delta(self.change_seq)
+
+        self.assertFalse(delta["reset"])
+        row = self._upserted(delta)[self.product_a.id]
+        self.assertEqual(row["seq"], self.change_seq)
+        self.assertAlmostEqual(row["prices"]["Precio de lista"]["value"], 232.0)
+        # Se reanuda desde el xmin: esta transacción sigue abierta
+        self.assertLessEqual(delta["seq"], self.change_seq)
+
+        delta = self._delta(self.change_seq + 1)
+        self.assertFalse(delta["reset"])
+        self.assertEqual(delta["upserts"], [])
+
+    def test_delta_reports_removed_products(self):
+        self.product_b.product_tmpl_id.sale_ok = False
+        self.Index.process_queue([self.warehouse.id])
+
+        delta = self._delta(self.change_seq)
+
+        self.assertNotIn(self.product_b.id, self._upserted(delta))
+        self.assertIn(
+            {"id": self.product_b.id, "seq": self.change_seq}, delta["deletes"]
+        )
+
+    def test_since_before_floor_resets(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            TOMBSTONE_FLOOR_PARAM, self.change_seq
+        )
+
+        delta = self._delta(self.change_seq)
+
+        self.assertTrue(delta["reset"])
+        self.assertEqual(delta["deletes"], [])
+        self.assertLessEqual(
+            {self.product_a.id, self.product_b.id}, set(self._upserted(delta))
+        )
+
+    def test_unknown_since_resets(self):
+        self.assertTrue(self._delta(0)["reset"])
+        # Un número mayor que cualquier transacción no es de esta base
+        self.assertTrue(self._delta(self.change_seq + 10**9)["reset"])
+
+    def test_products_delta(self):
+        self.product_b.active = False
+
+        meta, *lines = self.env["price.checker"].get_products_delta(self.change_seq)
+
+        self.assertFalse(meta["reset"])
+        ops = {(line["op"], line["id"]) for line in lines}
+        self.assertIn(("upsert", self.product_a.id), ops)
+        self.assertIn(("delete", self.product_b.id), ops)
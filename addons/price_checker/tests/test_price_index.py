@@ -0,0 +1,113 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestPriceIndex(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Index = cls.env["price.checker.price.index"]
+        cls.Queue = cls.env["price.checker.price.index.queue"]
+        cls.product_a, cls.product_b = cls.env["product.product"].create(
+            [
+                {
+                    "name": "Checador producto A",
+                    "default_code": "PCK-A",
+                    "list_price": 100.0,
+                },
+                {
+                    "name": "Checador producto B",
+                    "default_code": "PCK-B",
+                    "list_price": 50.0,
+                },
+            ]
+        )
+        # Después de los productos: el almacén empieza sin índice ni cola
+        cls.warehouse = cls.env["stock.warehouse"].create(
+            {"name": "Checador Índice", "code": "PCKI"}
+        )
+
+    def _rows(self, product):
+        return self.Index.search(
+            [("warehouse_id", "=", self.warehouse.id), ("product_id", "=", product.id)]
+        )
+
+    def _full_builds_pending(self):
+        return self.Queue.search_count(
+            [("warehouse_id", "=", self.warehouse.id), ("product_id", "=", False)]
+        )
+
+    def test_missing_index_is_enqueued_once(self):
+        self.assertFalse(self.Index._check_index(self.warehouse))
+        self.assertFalse(self.Index._check_index(self.warehouse))
+
+        self.assertEqual(self._full_builds_pending(), 1)
+        self.assertFalse(self._rows(self.product_a))
+
+    def test_kiosk_reads_do_not_build_index(self):
+        PriceChecker = self.env["price.checker"]
+        self.assertTrue(PriceChecker.is_index_building(self.warehouse.id))
+        meta = PriceChecker.get_prices_delta(self.warehouse.id)[0]
+
+        self.assertTrue(meta["building"])
+        self.assertEqual(meta["total"], 0)
+        # La construcción queda en la cola para el cron
+        self.assertEqual(self._full_builds_pending(), 1)
+        self.assertFalse(
+            self.Index.search_count([("warehouse_id", "=", self.warehouse.id)])
+        )
+
+    def test_process_queue_builds_index(self):
+        self.Index._check_index(self.warehouse)
+        self.Index.process_queue([self.warehouse.id])
+
+        row = self._rows(self.product_a)
+        self.assertEqual(len(row), 1)
+        self.assertAlmostEqual(row.price, 116.0)
+        self.assertFalse(
+            self.Queue.search_count([("warehouse_id", "=", self.warehouse.id)])
+        )
+        self.assertTrue(self.Index._check_index(self.warehouse))
+        meta = self.env["price.checker"].get_prices_delta(self.warehouse.id)[0]
+        self.assertFalse(meta["building"])
+
+    def test_queue_replaces_only_changed_products(self):
+        self.Index._check_index(self.warehouse)
+        self.Index.process_queue([self.warehouse.id])
+        unchanged = self._rows(self.product_b)
+
+        self.product_a.product_tmpl_id.list_price = 200.0
+        self.assertTrue(
+            self.Queue.search_count(
+                [
+                    ("warehouse_id", "=", self.warehouse.id),
+                    ("product_id", "=", self.product_a.id),
+                ]
+            )
+        )
+        # Hasta que corre la cola, las lecturas devuelven el precio anterior
+        self.assertAlmostEqual(self._rows(self.product_a).price, 116.0)
+
+        self.Index.process_queue([self.warehouse.id])
+
+        self.assertAlmostEqual(self._rows(self.product_a).price, 232.0)
+        self.assertEqual(self._rows(self.product_b), unchanged)
+
+    def test_item_write_enqueues_each_product_once(self):
+        pricelist = self.env["product.pricelist"].create({"name": "Checador Lista"})
+        self.warehouse.price_checker_pricelist_id = pricelist
+        item = self.env["product.pricelist.item"].create(
+            {
+                "pricelist_id": pricelist.id,
+                "applied_on": "0_product_variant",
+                "product_id": self.product_a.id,
+                "compute_price": "fixed",
+                "fixed_price": 80.0,
+            }
+        )
+        self.Queue.search([]).unlink()
+
+        item.write({"fixed_price": 70.0})
+
+        entries = self.Queue.search([("warehouse_id", "=", self.warehouse.id)])
+        self.assertEqual(entries.product_id, self.product_a)
+        self.assertEqual(len(entries), 1)
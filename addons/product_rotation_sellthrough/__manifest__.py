@@ -1,6 +1,6 @@
 {
     'name': 'Product Sell-Through Rate',
-    'version': '17.0.1.0.0',
+    'version': '17.0.1.1.0',
     'category': 'Inventory / Reporting',
     'summary': 'Sell-through rate analytics per product (6 and 9 months)',
 
@@ -12,6 +12,10 @@ Provides analytical KPIs for product performance:
 - Sell-through rate (6 months)
 - Sell-through rate (12 months)
 - Units sold, initial stock, and available stock metrics
+- Stored 6/12 month rates to sort and filter the catalog by rotation,
+  backed by a daily per-product, per-location rollup of done moves
+- Nightly rotation analytics snapshots for the whole catalog: ABC/XYZ
+  classes, days of cover and weeks of supply per window
 
 This module helps analyze product movement efficiency over time windows
 for inventory and purchasing decisions.
@@ -27,7 +31,10 @@ for inventory and purchasing decisions.
 
     'data': [
        'security/groups.xml',
+        'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/product_product_views.xml',
+        'views/product_rotation_snapshot_views.xml',
     ],
 
     'installable': True,
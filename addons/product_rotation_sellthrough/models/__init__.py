@@ -1,2 +1,5 @@
 # -*- coding: utf-8 -*-
 from . import product_product
+from . import sellthrough_rollup
+from . import stock_move
+from . import rotation_analytics
@@ -4,6 +4,10 @@ from dateutil.relativedelta import relativedelta
 import logging
 _logger = logging.getLogger(__name__)
 
+# Ventanas (meses) de las tasas almacenadas para ordenar/filtrar el catálogo
+SELL_THROUGH_WINDOWS = (6, 12)
+SELL_THROUGH_CHUNK_SIZE = 1000
+
 
 class ProductProduct(models.Model):
     _inherit = 'product.product'
@@ -33,25 +37,45 @@ class ProductProduct(models.Model):
         store=False,
     )
 
-    # ── Sell-Through a 9 meses ──────────────────────────────────────────────
+    # ── Sell-Through a 12 meses ─────────────────────────────────────────────
+    # Los campos conservan el sufijo 9m por compatibilidad con vistas y
+    # filtros guardados; la ventana siempre ha sido de 12 meses.
     sell_through_9m = fields.Float(
-        string='Sell-Through 9m (%)',
+        string='Sell-Through 12m (%)',
         compute='_compute_sell_through_9m',
         digits=(5, 2),
         store=False,
-        help='(Unidades vendidas últimos 9 meses / Stock inicial hace 9 meses)',
+        help='(Unidades vendidas últimos 12 meses / Stock inicial hace 12 meses)',
     )
     sell_through_9m_sold = fields.Float(
-        string='Vendido 9m (uds)',
+        string='Vendido 12m (uds)',
         compute='_compute_sell_through_9m',
         store=False,
     )
     sell_through_9m_initial_stock = fields.Float(
-        string='Stock inicial 9m (uds)',
+        string='Stock inicial 12m (uds)',
         compute='_compute_sell_through_9m',
         store=False,
     )
 
+    # ── Tasas almacenadas (todas las compañías y almacenes) ─────────────────
+    # Se actualizan desde el acumulado diario al validar movimientos y con el
+    # cron nocturno; permiten ordenar y filtrar el catálogo por rotación.
+    sell_through_rate_6m = fields.Float(
+        string='Rotación 6m (%)',
+        digits=(5, 2),
+        readonly=True,
+        copy=False,
+        help='Sell-through de los últimos 6 meses en todos los almacenes',
+    )
+    sell_through_rate_12m = fields.Float(
+        string='Rotación 12m (%)',
+        digits=(5, 2),
+        readonly=True,
+        copy=False,
+        help='Sell-through de los últimos 12 meses en todos los almacenes',
+    )
+
     # ── Helpers privados ────────────────────────────────────────────────────
 
     def _get_warehouse_internal_location_ids(self):
@@ -82,66 +106,64 @@ class ProductProduct(models.Model):
         ]).ids
 
 
-    def _get_sold_qty(self, product_ids, date_from, date_to, location_ids=None):
+    def _get_sell_through_company_ids(self, company_ids=None):
+        return list(company_ids) if company_ids else [self.env.company.id]
+
+    def _get_rollup_date_range(self, date_from, date_to):
+        # El acumulado es diario: el día de `date_to` entra completo
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to) + relativedelta(days=1)
+        return date_from, date_to
+
+    def _get_sold_qty(self, product_ids, date_from, date_to, location_ids=None,
+                      company_ids=None):
+        date_from, date_to = self._get_rollup_date_range(date_from, date_to)
         query = """
-            SELECT
-                sm.product_id,
-                SUM(sm.quantity) AS qty
-            FROM stock_move sm
-            JOIN stock_location src ON src.id = sm.location_id
-            JOIN stock_location dest ON dest.id = sm.location_dest_id
-            WHERE sm.state = 'done'
-              AND sm.product_id = ANY(%s)
-              AND sm.company_id = %s
-              AND src.usage IN ('internal', 'transit')
-              AND dest.usage = 'customer'
-              AND sm.date >= %s
-              AND sm.date <  %s
+            SELECT product_id, SUM(qty_sold) AS qty
+            FROM product_sellthrough_rollup
+            WHERE product_id = ANY(%s)
+              AND company_id = ANY(%s)
+              AND date >= %s
+              AND date <  %s
         """
-        params = [product_ids, self.env.company.id, date_from, date_to]
+        params = [
+            product_ids, self._get_sell_through_company_ids(company_ids),
+            date_from, date_to,
+        ]
 
         if location_ids is not None:
-            query += "\n              AND sm.location_id = ANY(%s)"
+            query += "\n              AND location_id = ANY(%s)"
             params.append(location_ids)
 
-        query += "\n            GROUP BY sm.product_id"
+        query += "\n            GROUP BY product_id"
 
         self.env.cr.execute(query, params)
-        return {row[0]: row[1] for row in self.env.cr.fetchall()}
-
-    def _get_moves_in_period(self, product_ids, date_from, date_to, location_ids=None):
+        return {row[0]: row[1] or 0.0 for row in self.env.cr.fetchall()}
+
+    def _get_moves_in_period(self, product_ids, date_from, date_to, location_ids=None,
+                             company_ids=None):
+        date_from, date_to = self._get_rollup_date_range(date_from, date_to)
+        # Las entradas se acumulan en la ubicación destino y las salidas en la
+        # de origen, así que filtrar por ubicación equivale al filtro
+        # origen-o-destino sobre stock_move.
         query = """
-            SELECT
-                sm.product_id,
-                SUM(
-                    CASE WHEN src.usage = 'supplier'
-                    AND dest.usage = 'internal'
-                    THEN sm.quantity ELSE 0 END
-                ) AS qty_in,
-
-                SUM(
-                    CASE WHEN src.usage = 'internal'
-                    AND dest.usage = 'customer'
-                    THEN sm.quantity ELSE 0 END
-                ) AS qty_out
-
-            FROM stock_move sm
-            JOIN stock_location src ON src.id = sm.location_id
-            JOIN stock_location dest ON dest.id = sm.location_dest_id
-
-            WHERE sm.state = 'done'
-            AND sm.product_id = ANY(%s)
-            AND sm.company_id = %s
-            AND sm.date >= %s
-            AND sm.date < %s
+            SELECT product_id, SUM(qty_in) AS qty_in, SUM(qty_out) AS qty_out
+            FROM product_sellthrough_rollup
+            WHERE product_id = ANY(%s)
+              AND company_id = ANY(%s)
+              AND date >= %s
+              AND date <  %s
         """
-        params = [product_ids, self.env.company.id, date_from, date_to]
+        params = [
+            product_ids, self._get_sell_through_company_ids(company_ids),
+            date_from, date_to,
+        ]
 
         if location_ids is not None:
-            query += "\n            AND (sm.location_id = ANY(%s) OR sm.location_dest_id = ANY(%s))"
-            params.extend([location_ids, location_ids])
+            query += "\n              AND location_id = ANY(%s)"
+            params.append(location_ids)
 
-        query += "\n            GROUP BY sm.product_id;"
+        query += "\n            GROUP BY product_id"
 
         self.env.cr.execute(query, params)
         return {
@@ -149,7 +171,7 @@ class ProductProduct(models.Model):
             for row in self.env.cr.fetchall()
         }
 
-    def _get_current_stock(self, product_ids, location_ids=None):
+    def _get_current_stock(self, product_ids, location_ids=None, company_ids=None):
 
         query = """
             SELECT sq.product_id, SUM(sq.quantity) AS qty
@@ -157,9 +179,9 @@ class ProductProduct(models.Model):
             JOIN stock_location loc ON loc.id = sq.location_id
             WHERE sq.product_id = ANY(%s)
             AND loc.usage = 'internal'
-            AND (sq.company_id IS NULL OR sq.company_id = %s)
+            AND (sq.company_id IS NULL OR sq.company_id = ANY(%s))
         """
-        params = [product_ids, self.env.company.id]
+        params = [product_ids, self._get_sell_through_company_ids(company_ids)]
 
         if location_ids is not None:
             query += "\n            AND sq.location_id = ANY(%s)"
@@ -171,23 +193,24 @@ class ProductProduct(models.Model):
         rows = self.env.cr.fetchall()
         return {row[0]: row[1] or 0.0 for row in rows}
 
-    def _compute_sell_through(self, months):
-        # Usar datetime evita cortar el periodo a las 00:00 y perder movimientos del dia.
-        date_to = fields.Datetime.now()
-        date_from = date_to - relativedelta(months=months)
-        location_ids = self._get_warehouse_internal_location_ids()
+    def _get_sell_through_data(self, product_ids, months, location_ids=None,
+                               company_ids=None):
+        """Sell-through de la ventana de `months` meses hasta hoy
 
-        product_ids = self.ids
+        Returns:
+            dict: {product_id: {'sold', 'initial', 'available', 'rate'}}
+        """
         if not product_ids:
             return {}
-
-        sold_map    = self._get_sold_qty(product_ids, date_from, date_to, location_ids=location_ids)
-        moves_map   = self._get_moves_in_period(product_ids, date_from, date_to, location_ids=location_ids)
-        current_map = self._get_current_stock(product_ids, location_ids=location_ids)
+        date_to = fields.Date.today()
+        date_from = date_to - relativedelta(months=months)
+        scope = {'location_ids': location_ids, 'company_ids': company_ids}
+        sold_map    = self._get_sold_qty(product_ids, date_from, date_to, **scope)
+        moves_map   = self._get_moves_in_period(product_ids, date_from, date_to, **scope)
+        current_map = self._get_current_stock(product_ids, **scope)
 
         result = {}
-        for product in self:
-            pid     = product.id
+        for pid in product_ids:
             current = current_map.get(pid, 0.0)
             moves   = moves_map.get(pid, {'in': 0.0, 'out': 0.0})
             sold    = sold_map.get(pid, 0.0)
@@ -207,6 +230,56 @@ class ProductProduct(models.Model):
 
         return result
 
+    def _compute_sell_through(self, months):
+        self.env['product.sellthrough.rollup'].flush_model()
+        return self._get_sell_through_data(
+            self.ids, months, location_ids=self._get_warehouse_internal_location_ids()
+        )
+
+    def _refresh_sell_through_rates(self, chunk_size=SELL_THROUGH_CHUNK_SIZE):
+        """Recalcula las tasas almacenadas desde el acumulado
+
+        Sin registros se recalcula todo el catálogo por bloques de IDs. Las
+        tasas almacenadas consideran todas las compañías y almacenes.
+        """
+        self.env['product.sellthrough.rollup'].flush_model()
+        self.env['stock.quant'].flush_model(['product_id', 'location_id', 'quantity'])
+        if self.ids:
+            product_ids = self.ids
+        else:
+            self.env.cr.execute("SELECT id FROM product_product ORDER BY id")
+            product_ids = [row[0] for row in self.env.cr.fetchall()]
+        company_ids = self.env['res.company'].sudo().search([]).ids
+
+        for start in range(0, len(product_ids), chunk_size):
+            chunk = product_ids[start:start + chunk_size]
+            rates = {
+                months: self._get_sell_through_data(chunk, months, company_ids=company_ids)
+                for months in SELL_THROUGH_WINDOWS
+            }
+            self.env.cr.execute(
+                """
+                UPDATE product_product p
+                SET sell_through_rate_6m = v.rate_6m,
+                    sell_through_rate_12m = v.rate_12m
+                FROM (
+                    SELECT UNNEST(%s::int[]) AS id,
+                           UNNEST(%s::float8[]) AS rate_6m,
+                           UNNEST(%s::float8[]) AS rate_12m
+                ) v
+                WHERE p.id = v.id
+                """,
+                (
+                    chunk,
+                    [rates[6][pid]['rate'] for pid in chunk],
+                    [rates[12][pid]['rate'] for pid in chunk],
+                ),
+            )
+        self.browse(product_ids).invalidate_recordset(
+            ['sell_through_rate_6m', 'sell_through_rate_12m']
+        )
+        return len(product_ids)
+
     # ── Compute methods ─────────────────────────────────────────────────────
 
     @api.depends_context('company', 'allowed_company_ids', 'warehouse', 'warehouse_id', 'active_model', 'active_id')
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from dateutil.relativedelta import relativedelta
+from datetime import timedelta
+import math
+import logging
+import threading
+_logger = logging.getLogger(__name__)
+
+# Ventanas (meses) que el cron precalcula cada noche
+STANDARD_WINDOWS = (1, 3, 6, 12)
+ANALYTICS_CHUNK_SIZE = 2000
+SNAPSHOT_RETENTION_DAYS = 400
+
+# ABC: participación acumulada del valor vendido (A hasta 80 %, B hasta 95 %)
+ABC_THRESHOLDS = (0.80, 0.95)
+# XYZ: coeficiente de variación de la demanda semanal
+XYZ_THRESHOLDS = (0.5, 1.0)
+
+
+class ProductRotationSnapshot(models.Model):
+    """Resultado de la analítica de rotación por producto, ventana y fecha"""
+
+    _name = 'product.rotation.snapshot'
+    _description = 'Snapshot de rotación de producto'
+    _log_access = False
+    _order = 'snapshot_date desc, months, sold_value desc'
+
+    snapshot_date = fields.Date(string='Fecha', required=True, index=True)
+    months = fields.Integer(string='Ventana (meses)', required=True)
+    product_id = fields.Many2one(
+        'product.product', string='Producto',
+        required=True, ondelete='cascade', index=True,
+    )
+    qty_sold = fields.Float(string='Vendido (uds)')
+    qty_in = fields.Float(string='Entradas (uds)')
+    initial_stock = fields.Float(string='Stock inicial (uds)')
+    available_stock = fields.Float(string='Disponible (uds)')
+    current_stock = fields.Float(string='Stock actual (uds)')
+    sell_through = fields.Float(string='Sell-Through (%)', digits=(5, 2))
+    avg_daily_sold = fields.Float(string='Venta diaria promedio', digits=(16, 4))
+    days_of_cover = fields.Float(
+        string='Días de cobertura', digits=(16, 1),
+        help='Stock actual / venta diaria promedio (0 si no hubo ventas)',
+    )
+    weeks_of_supply = fields.Float(
+        string='Semanas de inventario', digits=(16, 1),
+        help='Stock actual / venta semanal promedio (0 si no hubo ventas)',
+    )
+    sold_value = fields.Float(string='Valor vendido (costo)')
+    demand_cv = fields.Float(
+        string='Variación de demanda', digits=(16, 2),
+        help='Coeficiente de variación de las ventas semanales de la ventana',
+    )
+    abc_class = fields.Selection(
+        [('A', 'A'), ('B', 'B'), ('C', 'C')], string='Clase ABC', index=True,
+    )
+    xyz_class = fields.Selection(
+        [('X', 'X'), ('Y', 'Y'), ('Z', 'Z')], string='Clase XYZ', index=True,
+    )
+
+    _sql_constraints = [
+        ('snapshot_window_product_uniq',
+         'unique(snapshot_date, months, product_id)',
+         'Solo puede existir un resultado por fecha, ventana y producto.'),
+    ]
+
+
+class ProductRotationAnalytics(models.AbstractModel):
+    """Analítica de rotación del catálogo completo (ABC/XYZ, cobertura).
+
+    Cada ventana se calcula en una pasada por bloques de IDs de producto
+    reutilizando los helpers de sell-through (acumulado diario y stock_quant);
+    la clasificación ABC se resuelve al final con una sola consulta sobre los
+    resultados guardados.
+    """
+
+    _name = 'product.rotation.analytics'
+    _description = 'Analítica de rotación de productos'
+
+    @api.model
+    def compute_window(self, months, chunk_size=ANALYTICS_CHUNK_SIZE):
+        """Calcula y guarda el snapshot de hoy para la ventana de `months` meses
+
+        Returns:
+            int: número de productos analizados
+        """
+        snapshot_date = fields.Date.today()
+        date_from = snapshot_date - relativedelta(months=months)
+        window_days = (snapshot_date - date_from).days + 1
+        company_ids = self.env['res.company'].sudo().search([]).ids
+
+        self.env['product.sellthrough.rollup'].flush_model()
+        self.env['stock.quant'].flush_model(['product_id', 'location_id', 'quantity'])
+        self.env.cr.execute(
+            """
+            DELETE FROM product_rotation_snapshot
+            WHERE snapshot_date = %s AND months = %s
+            """,
+            (snapshot_date, months),
+        )
+
+        count = 0
+        for product_ids in self._iter_product_chunks(chunk_size):
+            rows = self._compute_chunk(
+                product_ids, date_from, snapshot_date, window_days, company_ids
+            )
+            self._insert_snapshot_rows(snapshot_date, months, rows)
+            count += len(product_ids)
+
+        self._classify_abc(snapshot_date, months)
+        self.env['product.rotation.snapshot'].invalidate_model()
+        _logger.info(
+            "Analítica de rotación %s meses: %s productos (%s)",
+            months, count, snapshot_date,
+        )
+        return count
+
+    @api.model
+    def get_window(self, months, product_ids=None, snapshot_date=None):
+        """Último snapshot guardado de la ventana (o el de `snapshot_date`)
+
+        Returns:
+            list: dicts con los campos del snapshot por producto
+        """
+        Snapshot = self.env['product.rotation.snapshot']
+        if not snapshot_date:
+            latest = Snapshot.search(
+                [('months', '=', months)], order='snapshot_date desc', limit=1
+            )
+            if not latest:
+                return []
+            snapshot_date = latest.snapshot_date
+        domain = [('months', '=', months), ('snapshot_date', '=', snapshot_date)]
+        if product_ids is not None:
+            domain.append(('product_id', 'in', list(product_ids)))
+        return Snapshot.search_read(domain, load=None)
+
+    @api.model
+    def _cron_compute_standard_windows(self):
+        """Cron nocturno: precalcula las ventanas estándar y depura snapshots viejos"""
+        for months in STANDARD_WINDOWS:
+            self.compute_window(months)
+            # Las pruebas corren en una sola transacción que no se confirma
+            if not getattr(threading.current_thread(), "testing", False):
+                self.env.cr.commit()
+        self._prune()
+
+    @api.model
+    def _prune(self):
+        limit_date = fields.Date.today() - timedelta(days=SNAPSHOT_RETENTION_DAYS)
+        self.env.cr.execute(
+            "DELETE FROM product_rotation_snapshot WHERE snapshot_date < %s",
+            (limit_date,),
+        )
+
+    # ── Helpers privados ────────────────────────────────────────────────────
+
+    def _iter_product_chunks(self, chunk_size):
+        """IDs de productos almacenables activos por rangos consecutivos"""
+        last_id = 0
+        while True:
+            self.env.cr.execute(
+                """
+                SELECT pp.id
+                FROM product_product pp
+                JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                WHERE pp.active
+                  AND pt.type = 'product'
+                  AND pp.id > %s
+                ORDER BY pp.id
+                LIMIT %s
+                """,
+                (last_id, chunk_size),
+            )
+            product_ids = [row[0] for row in self.env.cr.fetchall()]
+            if not product_ids:
+                return
+            yield product_ids
+            last_id = product_ids[-1]
+
+    def _get_weekly_demand(self, product_ids, date_from, date_to, company_ids):
+        """Suma y suma de cuadrados de las ventas semanales por producto
+
+        Returns:
+            dict: {product_id: (total, suma_cuadrados)}
+        """
+        self.env.cr.execute(
+            """
+            SELECT product_id, SUM(qty), SUM(qty * qty)
+            FROM (
+                SELECT product_id, date_trunc('week', date) AS week, SUM(qty_sold) AS qty
+                FROM product_sellthrough_rollup
+                WHERE product_id = ANY(%s)
+                  AND company_id = ANY(%s)
+                  AND date >= %s
+                  AND date <= %s
+                GROUP BY product_id, week
+            ) weekly
+            GROUP BY product_id
+            """,
+            (product_ids, company_ids, date_from, date_to),
+        )
+        return {row[0]: (row[1] or 0.0, row[2] or 0.0) for row in self.env.cr.fetchall()}
+
+    def _compute_chunk(self, product_ids, date_from, date_to, window_days, company_ids):
+        Product = self.env['product.product']
+        scope = {'company_ids': company_ids}
+        sold_map = Product._get_sold_qty(product_ids, date_from, date_to, **scope)
+        moves_map = Product._get_moves_in_period(product_ids, date_from, date_to, **scope)
+        current_map = Product._get_current_stock(product_ids, **scope)
+        demand_map = self._get_weekly_demand(product_ids, date_from, date_to, company_ids)
+        products = Product.browse(product_ids)
+        cost_map = dict(zip(products.ids, products.mapped('standard_price')))
+        weeks = window_days / 7.0
+
+        rows = []
+        for pid in product_ids:
+            current = current_map.get(pid, 0.0)
+            moves = moves_map.get(pid, {'in': 0.0, 'out': 0.0})
+            sold = sold_map.get(pid, 0.0)
+            initial = max(current - moves['in'] + moves['out'], 0.0)
+            available = initial + moves['in']
+
+            avg_daily = sold / window_days
+            if avg_daily > 0:
+                days_of_cover = max(current, 0.0) / avg_daily
+                weeks_of_supply = days_of_cover / 7.0
+            else:
+                days_of_cover = weeks_of_supply = 0.0
+
+            # Las semanas sin ventas cuentan como demanda cero
+            total, squares = demand_map.get(pid, (0.0, 0.0))
+            mean = total / weeks
+            if mean > 0:
+                variance = max(squares / weeks - mean * mean, 0.0)
+                cv = math.sqrt(variance) / mean
+            else:
+                cv = 0.0
+            if mean <= 0 or cv > XYZ_THRESHOLDS[1]:
+                xyz_class = 'Z'
+            elif cv > XYZ_THRESHOLDS[0]:
+                xyz_class = 'Y'
+            else:
+                xyz_class = 'X'
+
+            rows.append((
+                pid, sold, moves['in'], initial, available, current,
+                round(sold / available, 4) if available > 0 else 0.0,
+                avg_daily, days_of_cover, weeks_of_supply,
+                sold * (cost_map.get(pid) or 0.0), cv, xyz_class,
+            ))
+        return rows
+
+    def _insert_snapshot_rows(self, snapshot_date, months, rows):
+        if not rows:
+            return
+        columns = list(zip(*rows))
+        self.env.cr.execute(
+            """
+            INSERT INTO product_rotation_snapshot (
+                snapshot_date, months, product_id, qty_sold, qty_in,
+                initial_stock, available_stock, current_stock, sell_through,
+                avg_daily_sold, days_of_cover, weeks_of_supply, sold_value,
+                demand_cv, xyz_class
+            )
+            SELECT %s, %s, UNNEST(%s::int[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::float8[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::float8[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::float8[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::float8[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::float8[]), UNNEST(%s::float8[]),
+                   UNNEST(%s::varchar[])
+            """,
+            (snapshot_date, months, *(list(column) for column in columns)),
+        )
+
+    def _classify_abc(self, snapshot_date, months):
+        """Clase ABC por participación acumulada del valor vendido de la ventana"""
+        self.env.cr.execute(
+            """
+            WITH ranked AS (
+                SELECT id,
+                       sold_value,
+                       SUM(sold_value) OVER (
+                           ORDER BY sold_value DESC, product_id
+                           ROWS UNBOUNDED PRECEDING
+                       ) - sold_value AS previous,
+                       SUM(sold_value) OVER () AS total
+                FROM product_rotation_snapshot
+                WHERE snapshot_date = %(date)s AND months = %(months)s
+            )
+            UPDATE product_rotation_snapshot s
+            SET abc_class = CASE
+                WHEN r.total <= 0 OR r.sold_value <= 0 THEN 'C'
+                WHEN r.previous < %(a)s * r.total THEN 'A'
+                WHEN r.previous < %(b)s * r.total THEN 'B'
+                ELSE 'C'
+            END
+            FROM ranked r
+            WHERE s.id = r.id
+            """,
+            {
+                'date': snapshot_date,
+                'months': months,
+                'a': ABC_THRESHOLDS[0],
+                'b': ABC_THRESHOLDS[1],
+            },
+        )
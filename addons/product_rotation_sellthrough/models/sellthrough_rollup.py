@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+_logger = logging.getLogger(__name__)
+
+# Días recientes que el cron nocturno reconstruye desde stock_move
+# (correcciones de cantidades en movimientos ya hechos)
+ROLLUP_REBUILD_DAYS = 7
+
+# Clasificación de un movimiento hecho para el acumulado:
+#   entrada: proveedor → interna          (se registra en la ubicación destino)
+#   salida : interna → cliente            (se registra en la ubicación origen)
+#   venta  : interna/tránsito → cliente   (se registra en la ubicación origen)
+_ROLLUP_SELECT = """
+    SELECT
+        sm.date::date AS date,
+        sm.product_id,
+        CASE WHEN src.usage = 'supplier'
+             THEN sm.location_dest_id ELSE sm.location_id END AS location_id,
+        sm.company_id,
+        SUM(CASE WHEN src.usage = 'supplier' AND dest.usage = 'internal'
+                 THEN sm.quantity ELSE 0 END) AS qty_in,
+        SUM(CASE WHEN src.usage = 'internal' AND dest.usage = 'customer'
+                 THEN sm.quantity ELSE 0 END) AS qty_out,
+        SUM(CASE WHEN src.usage IN ('internal', 'transit') AND dest.usage = 'customer'
+                 THEN sm.quantity ELSE 0 END) AS qty_sold
+    FROM stock_move sm
+    JOIN stock_location src ON src.id = sm.location_id
+    JOIN stock_location dest ON dest.id = sm.location_dest_id
+    WHERE sm.state = 'done'
+      AND (
+            (src.usage = 'supplier' AND dest.usage = 'internal')
+         OR (src.usage IN ('internal', 'transit') AND dest.usage = 'customer')
+      )
+      AND {scope}
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+class ProductSellthroughRollup(models.Model):
+    """Acumulado diario de entradas/salidas/ventas por producto y ubicación.
+
+    Se alimenta de forma incremental al validar movimientos y el sell-through
+    de cualquier ventana y almacén se obtiene sumando unas cuantas filas, sin
+    recorrer stock_move.
+    """
+
+    _name = 'product.sellthrough.rollup'
+    _description = 'Acumulado diario de sell-through'
+    _log_access = False
+    _order = 'date desc, product_id'
+
+    date = fields.Date(string='Día', required=True, index=True)
+    product_id = fields.Many2one(
+        'product.product', string='Producto',
+        required=True, ondelete='cascade', index=True,
+    )
+    location_id = fields.Many2one(
+        'stock.location', string='Ubicación', required=True, ondelete='cascade',
+    )
+    company_id = fields.Many2one(
+        'res.company', string='Compañía', required=True, ondelete='cascade',
+    )
+    qty_in = fields.Float(string='Entradas (uds)', readonly=True)
+    qty_out = fields.Float(string='Salidas (uds)', readonly=True)
+    qty_sold = fields.Float(string='Vendido (uds)', readonly=True)
+
+    _sql_constraints = [
+        ('day_product_location_company_uniq',
+         'unique(date, product_id, location_id, company_id)',
+         'Solo puede existir un acumulado por día, producto, ubicación y compañía.'),
+    ]
+
+    def init(self):
+        # Primera instalación: construir el acumulado con el histórico completo
+        self.env.cr.execute("SELECT 1 FROM product_sellthrough_rollup LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild()
+            self.env['product.product']._refresh_sell_through_rates()
+
+    @api.model
+    def _add_moves(self, move_ids):
+        """Suma al acumulado los movimientos hechos indicados (una sola consulta)"""
+        if not move_ids:
+            return
+        self.env['stock.move'].flush_model(
+            ['state', 'date', 'product_id', 'quantity', 'location_id',
+             'location_dest_id', 'company_id']
+        )
+        self.env.cr.execute(
+            f"""
+            INSERT INTO product_sellthrough_rollup
+                (date, product_id, location_id, company_id, qty_in, qty_out, qty_sold)
+            {_ROLLUP_SELECT.format(scope='sm.id = ANY(%(move_ids)s)')}
+            ON CONFLICT (date, product_id, location_id, company_id) DO UPDATE SET
+                qty_in = product_sellthrough_rollup.qty_in + EXCLUDED.qty_in,
+                qty_out = product_sellthrough_rollup.qty_out + EXCLUDED.qty_out,
+                qty_sold = product_sellthrough_rollup.qty_sold + EXCLUDED.qty_sold
+            """,
+            {'move_ids': list(move_ids)},
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild(self, date_from=None):
+        """Reconstruye el acumulado desde stock_move a partir de `date_from`
+        (todo el histórico si no se indica)."""
+        self.env['stock.move'].flush_model()
+        if date_from:
+            self.env.cr.execute(
+                "DELETE FROM product_sellthrough_rollup WHERE date >= %(date_from)s",
+                {'date_from': date_from},
+            )
+            scope = "sm.date::date >= %(date_from)s"
+        else:
+            self.env.cr.execute("DELETE FROM product_sellthrough_rollup")
+            scope = 'TRUE'
+        self.env.cr.execute(
+            f"""
+            INSERT INTO product_sellthrough_rollup
+                (date, product_id, location_id, company_id, qty_in, qty_out, qty_sold)
+            {_ROLLUP_SELECT.format(scope=scope)}
+            """,
+            {'date_from': date_from},
+        )
+        _logger.info(
+            "Acumulado de sell-through reconstruido desde %s: %s filas",
+            date_from or 'el inicio', self.env.cr.rowcount,
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh(self):
+        """Cron nocturno: reconcilia los últimos días y recalcula las tasas
+        almacenadas (la ventana se desplaza un día cada noche)."""
+        self._rebuild(fields.Date.today() - timedelta(days=ROLLUP_REBUILD_DAYS))
+        self.env['product.product']._refresh_sell_through_rates()
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        done_moves = moves.filtered(lambda m: m.state == 'done')
+        if done_moves:
+            self.env['product.sellthrough.rollup'].sudo()._add_moves(done_moves.ids)
+            done_moves.product_id.sudo()._refresh_sell_through_rates()
+        return moves
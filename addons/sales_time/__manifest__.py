@@ -22,7 +22,7 @@
         - Identificación de cuellos de botella en el proceso
         - Información de todas las operaciones de stock relacionadas
     """,
-    "depends": ["base", "sale", "stock"],
+    "depends": ["base", "sale", "stock", "xlsx_stream_export"],
     "data": [
         "security/groups.xml",
         "security/ir.model.access.csv",
@@ -1,14 +1,15 @@
 from odoo import models, fields, api
-from odoo.exceptions import UserError
 from datetime import datetime, timedelta
 import pytz
-import base64
-from io import BytesIO
+import json
 
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Tiempos que se promedian en el reporte
+AVERAGE_KEYS = ("quote_to_order", "order_to_pick", "total_time", "pick_to_out")
+
 
 class SalesTimeWizard(models.TransientModel):
     _name = "sales.time.wizard"
@@ -16,6 +17,7 @@ class SalesTimeWizard(models.TransientModel):
 
     order_ids = fields.Many2many("sale.order", string="Selected Orders")
     report_html = fields.Html(string="Report", readonly=True)
+    report_data = fields.Text(string="Report Data", readonly=True)
 
     def _format_datetime_mexico(self, dt):
         """Convierte una fecha UTC a hora de Ciudad de México y la formatea"""
@@ -99,8 +101,77 @@ class SalesTimeWizard(models.TransientModel):
 
         return " ".join(parts) if parts else "0s"
 
+    def _get_picking_type_sets(self, type_ids):
+        """Clasifica los tipos de operación una sola vez (PICK / PACK / OUT)"""
+        pick_types, pack_types, out_types = set(), set(), set()
+        types = self.env["stock.picking.type"].browse(type_ids).read(["name", "code"])
+        for picking_type in types:
+            name = (picking_type["name"] or "").lower()
+            if "pick" in name or picking_type["code"] == "internal":
+                pick_types.add(picking_type["id"])
+            if "pack" in name:
+                pack_types.add(picking_type["id"])
+            if "out" in name or picking_type["code"] == "outgoing":
+                out_types.add(picking_type["id"])
+        return pick_types, pack_types, out_types
+
+    def _load_pickings_by_order(self, orders):
+        """Pickings no cancelados de todas las órdenes, ordenados por creación
+
+        Returns:
+            dict: {order_id: [{"picking_type_id", "state", "create_date", "date_done"}]}
+        """
+        pickings = self.env["stock.picking"].search(
+            [("sale_id", "in", orders.ids), ("state", "!=", "cancel")],
+            order="sale_id, create_date, id",
+        )
+        pickings_by_order = {}
+        for picking in pickings.read(
+            ["sale_id", "picking_type_id", "state", "create_date", "date_done"],
+            load=None,
+        ):
+            pickings_by_order.setdefault(picking["sale_id"], []).append(picking)
+        return pickings_by_order
+
+    def _calculate_times_batch(self, orders):
+        """Calcula los tiempos de todas las órdenes en una sola pasada
+
+        Los pickings de todas las órdenes se leen con una consulta y los tipos
+        de operación se clasifican una vez, en lugar de filtrar y ordenar los
+        pickings de cada orden por separado.
+
+        Returns:
+            dict: {order_id: (times, dates)}
+        """
+        pickings_by_order = self._load_pickings_by_order(orders)
+        type_ids = {
+            picking["picking_type_id"]
+            for pickings in pickings_by_order.values()
+            for picking in pickings
+        }
+        type_sets = self._get_picking_type_sets(list(type_ids))
+
+        result = {}
+        for order in orders.read(["create_date", "date_order", "state"]):
+            result[order["id"]] = self._calculate_order_times(
+                order, pickings_by_order.get(order["id"], []), *type_sets
+            )
+        return result
+
     def _calculate_times(self, order):
         """Calcula los tiempos para cada etapa de la orden"""
+        return self._calculate_times_batch(order)[order.id]
+
+    @staticmethod
+    def _last_done(operations):
+        """Última operación terminada (o la última, si ninguna está terminada)"""
+        done = [p for p in operations if p["state"] == "done"]
+        return done[-1] if done else operations[-1]
+
+    def _calculate_order_times(
+        self, order, pickings, pick_types, pack_types, out_types
+    ):
+        """Tiempos de una orden a partir de sus pickings ya cargados"""
         times = {
             "quote_to_order": None,
             "order_to_pick": None,
@@ -111,7 +182,7 @@ class SalesTimeWizard(models.TransientModel):
         }
 
         dates = {
-            "quote_date": order.create_date,
+            "quote_date": order["create_date"],
             "quote_date_end": None,
             "order_date": None,
             "order_date_end": None,
@@ -124,146 +195,93 @@ class SalesTimeWizard(models.TransientModel):
         }
 
         # 1. COTIZACIÓN -> PEDIDO (Desde creación hasta confirmación)
-        if order.state not in ["draft", "sent", "cancel"]:
-            dates["order_date"] = order.date_order
-            dates["quote_date_end"] = order.date_order
+        if order["state"] not in ["draft", "sent", "cancel"]:
+            dates["order_date"] = order["date_order"]
+            dates["quote_date_end"] = order["date_order"]
             if dates["quote_date"] and dates["order_date"]:
                 times["quote_to_order"] = dates["order_date"] - dates["quote_date"]
 
-        # Buscar pickings relacionados (excluir cancelados)
-        pickings = order.picking_ids.filtered(lambda p: p.state != "cancel")
-
         if pickings:
-            # Ordenar por fecha de creación
-            pickings = pickings.sorted(key=lambda p: p.create_date)
-
-            # Log para debug
-            _logger.info(
-                "Order %s - Total pickings (non-cancelled): %d",
-                order.name,
-                len(pickings),
-            )
-            for p in pickings:
-                _logger.info(
-                    "  Picking: %s | Type: %s | Code: %s | Create: %s | Scheduled: %s | Done: %s | State: %s",
-                    p.name,
-                    p.picking_type_id.name,
-                    p.picking_type_id.code,
-                    p.create_date,
-                    p.scheduled_date,
-                    p.date_done,
-                    p.state,
-                )
-
-            # Identificar tipos de picking (solo los no cancelados)
-            pick_operations = pickings.filtered(
-                lambda p: "pick" in p.picking_type_id.name.lower()
-                or p.picking_type_id.code == "internal"
-            ).filtered(lambda p: p.state != "cancel")
-
-            pack_operations = pickings.filtered(
-                lambda p: "pack" in p.picking_type_id.name.lower()
-            ).filtered(lambda p: p.state != "cancel")
+            # Identificar tipos de picking (ya vienen sin cancelados y ordenados)
+            pick_operations = [
+                p for p in pickings if p["picking_type_id"] in pick_types
+            ]
+            pack_operations = [
+                p for p in pickings if p["picking_type_id"] in pack_types
+            ]
+            out_operations = [p for p in pickings if p["picking_type_id"] in out_types]
 
-            out_operations = pickings.filtered(
-                lambda p: "out" in p.picking_type_id.name.lower()
-                or p.picking_type_id.code == "outgoing"
-            ).filtered(lambda p: p.state != "cancel")
+            pick_last = self._last_done(pick_operations) if pick_operations else None
+            pack_last = self._last_done(pack_operations) if pack_operations else None
+            out_last = self._last_done(out_operations) if out_operations else None
 
             # 2. PEDIDO -> PICK (Desde confirmación hasta que COMPLETA el picking)
             if pick_operations:
-                # Buscar el primer pick y el último pick que esté done
-                pick_first = pick_operations[0]
-                pick_done = pick_operations.filtered(lambda p: p.state == "done")
-                pick_last = pick_done[-1] if pick_done else pick_operations[-1]
-
                 # Inicio: Confirmación del pedido
                 dates["order_date_end"] = dates["order_date"]
 
                 # Fin: Solo si el pick se ha completado (tiene date_done)
-                if pick_last.date_done:
-                    dates["pick_date"] = pick_last.date_done
-                    dates["pick_date_end"] = pick_last.date_done
+                if pick_last["date_done"]:
+                    dates["pick_date"] = pick_last["date_done"]
+                    dates["pick_date_end"] = pick_last["date_done"]
 
                     if dates["order_date"]:
                         times["order_to_pick"] = (
-                            pick_last.date_done - dates["order_date"]
+                            pick_last["date_done"] - dates["order_date"]
                         )
                 # Si no está completado, no poner fecha fin (mostrará N/A)
 
             # 3. PICK -> PACK (Desde que TERMINA pick hasta que TERMINA pack)
             if pick_operations and pack_operations:
-                # Tomar el último pick completado
-                pick_done = pick_operations.filtered(lambda p: p.state == "done")
-                pick_last = pick_done[-1] if pick_done else pick_operations[-1]
-
-                # Tomar el último pack completado
-                pack_done = pack_operations.filtered(lambda p: p.state == "done")
-                pack_last = pack_done[-1] if pack_done else pack_operations[-1]
+                if pick_last["date_done"]:
+                    dates["pack_date"] = pick_last["date_done"]
 
-                # Inicio: Cuando TERMINA el pick
-                # Fin: Cuando TERMINA el pack
-                if pick_last.date_done:
-                    dates["pack_date"] = pick_last.date_done
-
-                    if pack_last.date_done:
-                        dates["pack_date_end"] = pack_last.date_done
+                    if pack_last["date_done"]:
+                        dates["pack_date_end"] = pack_last["date_done"]
                         times["pick_to_pack"] = (
-                            pack_last.date_done - pick_last.date_done
+                            pack_last["date_done"] - pick_last["date_done"]
                         )
 
             # 4. PACK -> OUT (Desde que TERMINA pack hasta que TERMINA out)
             if pack_operations and out_operations:
-                # Tomar el último pack completado
-                pack_done = pack_operations.filtered(lambda p: p.state == "done")
-                pack_last = pack_done[-1] if pack_done else pack_operations[-1]
-
-                # Tomar el último out completado
-                out_done = out_operations.filtered(lambda p: p.state == "done")
-                out_last = out_done[-1] if out_done else out_operations[-1]
+                if pack_last["date_done"]:
+                    dates["out_date"] = pack_last["date_done"]
 
-                # Inicio: Cuando TERMINA el pack
-                # Fin: Cuando TERMINA el out
-                if pack_last.date_done:
-                    dates["out_date"] = pack_last.date_done
-
-                    if out_last.date_done:
-                        dates["out_date_end"] = out_last.date_done
-                        times["pack_to_out"] = out_last.date_done - pack_last.date_done
+                    if out_last["date_done"]:
+                        dates["out_date_end"] = out_last["date_done"]
+                        times["pack_to_out"] = (
+                            out_last["date_done"] - pack_last["date_done"]
+                        )
 
             # Caso especial: Solo OUT (sin pick ni pack separados)
             elif not pick_operations and not pack_operations and out_operations:
-                out_done = out_operations.filtered(lambda p: p.state == "done")
+                out_done = [p for p in out_operations if p["state"] == "done"]
                 out_first = out_done[0] if out_done else out_operations[0]
 
                 # Etapa 2: Desde confirmación hasta que INICIA el OUT
                 dates["order_date_end"] = dates["order_date"]
-                dates["pick_date"] = out_first.create_date
+                dates["pick_date"] = out_first["create_date"]
 
-                if dates["order_date"] and out_first.create_date:
-                    times["order_to_pick"] = out_first.create_date - dates["order_date"]
+                if dates["order_date"] and out_first["create_date"]:
+                    times["order_to_pick"] = (
+                        out_first["create_date"] - dates["order_date"]
+                    )
 
                 # Guardar cuando TERMINA el OUT
-                if out_first.date_done:
-                    dates["out_date_end"] = out_first.date_done
+                if out_first["date_done"]:
+                    dates["out_date_end"] = out_first["date_done"]
 
             # Caso: PICK + OUT (sin pack)
             elif pick_operations and not pack_operations and out_operations:
-                # Tomar el último pick completado
-                pick_done = pick_operations.filtered(lambda p: p.state == "done")
-                pick_last = pick_done[-1] if pick_done else pick_operations[-1]
-
-                # Tomar el último out completado
-                out_done = out_operations.filtered(lambda p: p.state == "done")
-                out_last = out_done[-1] if out_done else out_operations[-1]
-
                 # Etapa 3: Desde que TERMINA pick hasta que TERMINA out
-                if pick_last.date_done:
-                    dates["pack_date"] = pick_last.date_done
+                if pick_last["date_done"]:
+                    dates["pack_date"] = pick_last["date_done"]
 
-                    if out_last.date_done:
-                        dates["pack_date_end"] = out_last.date_done
-                        times["pick_to_pack"] = out_last.date_done - pick_last.date_done
+                    if out_last["date_done"]:
+                        dates["pack_date_end"] = out_last["date_done"]
+                        times["pick_to_pack"] = (
+                            out_last["date_done"] - pick_last["date_done"]
+                        )
 
         # Calcular tiempo total (desde cotización hasta entrega final)
         final_date = (
@@ -280,56 +298,97 @@ class SalesTimeWizard(models.TransientModel):
 
         return times, dates
 
+    def _get_report_data(self):
+        """Tiempos y promedios de las órdenes seleccionadas
+
+        Se calculan una sola vez por asistente y se guardan en report_data,
+        así el reporte en pantalla y la exportación a Excel usan el mismo
+        resultado.
+
+        Returns:
+            dict: {"orders": [{"name", "partner", "state", "times", "dates"}],
+                   "averages": {clave: timedelta o None},
+                   "counts": {clave: int}}
+        """
+        self.ensure_one()
+        if self.report_data:
+            data = self._deserialize_report_data(self.report_data)
+            if data["order_ids"] == self.order_ids.ids:
+                return data
+
+        orders = self.order_ids
+        times_by_order = self._calculate_times_batch(orders)
+        state_labels = dict(orders._fields["state"]._description_selection(self.env))
+
+        totals = dict.fromkeys(AVERAGE_KEYS, timedelta())
+        counts = dict.fromkeys(AVERAGE_KEYS, 0)
+        rows = []
+        for order in orders:
+            times, dates = times_by_order[order.id]
+            for key in AVERAGE_KEYS:
+                if times[key]:
+                    totals[key] += times[key]
+                    counts[key] += 1
+            rows.append(
+                {
+                    "name": order.name,
+                    "partner": order.partner_id.name or "",
+                    "state": state_labels.get(order.state, order.state),
+                    "times": times,
+                    "dates": dates,
+                }
+            )
+
+        data = {
+            "order_ids": orders.ids,
+            "orders": rows,
+            "averages": {
+                key: totals[key] / counts[key] if counts[key] else None
+                for key in AVERAGE_KEYS
+            },
+            "counts": counts,
+        }
+        self.report_data = self._serialize_report_data(data)
+        return data
+
+    @staticmethod
+    def _serialize_report_data(data):
+        """JSON con fechas en texto y tiempos en segundos"""
+
+        def encode(value):
+            if isinstance(value, timedelta):
+                return {"__td__": value.total_seconds()}
+            if isinstance(value, datetime):
+                return {"__dt__": fields.Datetime.to_string(value)}
+            raise TypeError(f"Tipo no serializable: {type(value)}")
+
+        return json.dumps(data, default=encode)
+
+    @staticmethod
+    def _deserialize_report_data(raw):
+        def decode(obj):
+            if "__td__" in obj:
+                return timedelta(seconds=obj["__td__"])
+            if "__dt__" in obj:
+                return fields.Datetime.to_datetime(obj["__dt__"])
+            return obj
+
+        return json.loads(raw, object_hook=decode)
+
     def action_generate_report(self):
         """Genera el reporte de tiempos de las órdenes seleccionadas"""
         self.ensure_one()
 
-        # Calcular promedios de todas las órdenes seleccionadas
-        total_quote_to_order = timedelta()
-        total_order_to_pick = timedelta()
-        total_quote_to_out = timedelta()
-        total_pick_to_out = timedelta()
-        count_quote_to_order = 0
-        count_order_to_pick = 0
-        count_quote_to_out = 0
-        count_pick_to_out = 0
-
-        for order in self.order_ids:
-            times, dates = self._calculate_times(order)
-
-            if times["quote_to_order"]:
-                total_quote_to_order += times["quote_to_order"]
-                count_quote_to_order += 1
-
-            if times["order_to_pick"]:
-                total_order_to_pick += times["order_to_pick"]
-                count_order_to_pick += 1
-
-            if times["total_time"]:
-                total_quote_to_out += times["total_time"]
-                count_quote_to_out += 1
-
-            if times["pick_to_out"]:
-                total_pick_to_out += times["pick_to_out"]
-                count_pick_to_out += 1
-
-        # Calcular promedios
-        avg_quote_to_order = (
-            total_quote_to_order / count_quote_to_order
-            if count_quote_to_order > 0
-            else None
-        )
-        avg_order_to_pick = (
-            total_order_to_pick / count_order_to_pick
-            if count_order_to_pick > 0
-            else None
-        )
-        avg_quote_to_out = (
-            total_quote_to_out / count_quote_to_out if count_quote_to_out > 0 else None
-        )
-        avg_pick_to_out = (
-            total_pick_to_out / count_pick_to_out if count_pick_to_out > 0 else None
-        )
+        data = self._get_report_data()
+        averages, counts = data["averages"], data["counts"]
+        avg_quote_to_order = averages["quote_to_order"]
+        avg_order_to_pick = averages["order_to_pick"]
+        avg_quote_to_out = averages["total_time"]
+        avg_pick_to_out = averages["pick_to_out"]
+        count_quote_to_order = counts["quote_to_order"]
+        count_order_to_pick = counts["order_to_pick"]
+        count_quote_to_out = counts["total_time"]
+        count_pick_to_out = counts["pick_to_out"]
 
         report_lines = []
 
@@ -375,8 +434,8 @@ class SalesTimeWizard(models.TransientModel):
         """
         )
 
-        for order in self.order_ids:
-            times, dates = self._calculate_times(order)
+        for order in data["orders"]:
+            times, dates = order["times"], order["dates"]
 
             # Header de la orden
             report_lines.append(
@@ -384,12 +443,12 @@ class SalesTimeWizard(models.TransientModel):
                 <div style="background: #f8f9fa; border-left: 4px solid #3498db; padding: 15px 20px; margin-bottom: 25px; border-radius: 4px;">
                     <div style="display: flex; justify-content: space-between; align-items: center;">
                         <div>
-                            <h2 style="color: #2c3e50; font-size: 20px; font-weight: 500; margin: 0 0 5px 0;">{order.name}</h2>
-                            <p style="color: #7f8c8d; font-size: 14px; margin: 0;">{order.partner_id.name}</p>
+                            <h2 style="color: #2c3e50; font-size: 20px; font-weight: 500; margin: 0 0 5px 0;">{order["name"]}</h2>
+                            <p style="color: #7f8c8d; font-size: 14px; margin: 0;">{order["partner"]}</p>
                         </div>
                         <div>
                             <span style="padding: 6px 12px; background: #3498db; color: white; border-radius: 20px; font-size: 12px; font-weight: 500;">
-                                {dict(order._fields['state'].selection).get(order.state, order.state)}
+                                {order["state"]}
                             </span>
                         </div>
                     </div>
@@ -484,65 +543,41 @@ class SalesTimeWizard(models.TransientModel):
         """Exporta el reporte a Excel"""
         self.ensure_one()
 
-        try:
-            import xlsxwriter
-        except ImportError:
-            raise UserError(
-                "La biblioteca xlsxwriter no está instalada. Instálala con: pip install xlsxwriter"
-            )
-
-        # Calcular promedios de todas las órdenes seleccionadas
-        total_quote_to_order = timedelta()
-        total_order_to_pick = timedelta()
-        total_quote_to_out = timedelta()
-        total_pick_to_out = timedelta()
-        count_quote_to_order = 0
-        count_order_to_pick = 0
-        count_quote_to_out = 0
-        count_pick_to_out = 0
-
-        for order in self.order_ids:
-            times, dates = self._calculate_times(order)
-
-            if times["quote_to_order"]:
-                total_quote_to_order += times["quote_to_order"]
-                count_quote_to_order += 1
-
-            if times["order_to_pick"]:
-                total_order_to_pick += times["order_to_pick"]
-                count_order_to_pick += 1
-
-            if times["total_time"]:
-                total_quote_to_out += times["total_time"]
-                count_quote_to_out += 1
-
-            if times["pick_to_out"]:
-                total_pick_to_out += times["pick_to_out"]
-                count_pick_to_out += 1
-
-        # Calcular promedios
-        avg_quote_to_order = (
-            total_quote_to_order / count_quote_to_order
-            if count_quote_to_order > 0
-            else None
-        )
-        avg_order_to_pick = (
-            total_order_to_pick / count_order_to_pick
-            if count_order_to_pick > 0
-            else None
-        )
-        avg_quote_to_out = (
-            total_quote_to_out / count_quote_to_out if count_quote_to_out > 0 else None
+        data = self._get_report_data()
+        filename = (
+            f'reporte_tiempos_{fields.Datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
         )
-        avg_pick_to_out = (
-            total_pick_to_out / count_pick_to_out if count_pick_to_out > 0 else None
+        Export = self.env["xlsx.stream.export"]
+        attachment = Export.create_attachment(
+            filename,
+            lambda workbook: self._write_excel_report(workbook, data),
+            res_model="sales.time.wizard",
+            res_id=self.id,
+            public=True,
         )
 
-        # Crear archivo Excel en memoria
-        output = BytesIO()
-        workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+        # Retornar acción para descargar directamente
+        return Export.download_action(attachment)
+
+    def _write_excel_report(self, workbook, data):
+        """Escribe el reporte en el libro (filas en orden: modo constant_memory)"""
+        averages, counts = data["averages"], data["counts"]
+        avg_quote_to_order = averages["quote_to_order"]
+        avg_order_to_pick = averages["order_to_pick"]
+        avg_quote_to_out = averages["total_time"]
+        avg_pick_to_out = averages["pick_to_out"]
+        count_quote_to_order = counts["quote_to_order"]
+        count_order_to_pick = counts["order_to_pick"]
+        count_quote_to_out = counts["total_time"]
+        count_pick_to_out = counts["pick_to_out"]
+
         worksheet = workbook.add_worksheet("Reporte de Tiempos")
 
+        # Ajustar anchos de columna
+        worksheet.set_column("A:A", 25)
+        worksheet.set_column("B:C", 22)
+        worksheet.set_column("D:D", 15)
+
         # Formatos
         header_format = workbook.add_format(
             {
@@ -646,8 +681,8 @@ class SalesTimeWizard(models.TransientModel):
         worksheet.write(row, 3, "", data_format)
         row += 3
 
-        for order in self.order_ids:
-            times, dates = self._calculate_times(order)
+        for order in data["orders"]:
+            times, dates = order["times"], order["dates"]
 
             # Título del pedido
             worksheet.merge_range(
@@ -655,7 +690,7 @@ class SalesTimeWizard(models.TransientModel):
                 0,
                 row,
                 3,
-                f"REPORTE DE TIEMPOS: {order.name} - {order.partner_id.name}",
+                f"REPORTE DE TIEMPOS: {order['name']} - {order['partner']}",
                 header_format,
             )
             row += 2
@@ -713,36 +748,3 @@ class SalesTimeWizard(models.TransientModel):
                 row, 3, self._format_timedelta(times["total_time"]), total_format
             )
             row += 3
-
-        # Ajustar anchos de columna
-        worksheet.set_column("A:A", 25)
-        worksheet.set_column("B:C", 22)
-        worksheet.set_column("D:D", 15)
-
-        workbook.close()
-        output.seek(0)
-
-        # Guardar el archivo
-        excel_data = base64.b64encode(output.read())
-        filename = (
-            f'reporte_tiempos_{fields.Datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        )
-
-        # Crear un attachment temporal para la descarga
-        attachment = self.env["ir.attachment"].create(
-            {
-                "name": filename,
-                "type": "binary",
-                "datas": excel_data,
-                "res_model": "sales.time.wizard",
-                "res_id": self.id,
-                "public": True,
-            }
-        )
-
-        # Retornar acción para descargar directamente
-        return {
-            "type": "ir.actions.act_url",
-            "url": f"/web/content/{attachment.id}?download=true",
-            "target": "self",
-        }
@@ -0,0 +1,13 @@
+{
+    "name": "XLSX Stream Export",
+    "version": "17.0.1.0.0",
+    "author": "Ing. Diego Venegas",
+    "category": "Technical",
+    "license": "LGPL-3",
+    "summary": "Exportación a Excel en memoria constante para reportes grandes",
+    "depends": ["base"],
+    "external_dependencies": {"python": ["xlsxwriter"]},
+    "data": [],
+    "installable": True,
+    "application": False,
+}
@@ -0,0 +1 @@
+from . import xlsx_stream_export
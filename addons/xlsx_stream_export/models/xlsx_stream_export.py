@@ -0,0 +1,122 @@
+from odoo import models, api
+import logging
+import os
+import tempfile
+
+import xlsxwriter
+
+_logger = logging.getLogger(__name__)
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Registros que se leen por consulta al recorrer un recordset grande
+DEFAULT_CHUNK_SIZE = 2000
+# Bytes por bloque al enviar el archivo generado en la respuesta HTTP
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class XlsxStreamExport(models.AbstractModel):
+    """Servicio compartido para exportar reportes grandes a Excel.
+
+    El libro se escribe con xlsxwriter en modo constant_memory: cada fila se
+    vuelca a disco al pasar a la siguiente, así que las filas deben escribirse
+    en orden. El archivo resultante se guarda como adjunto en el filestore
+    sin pasar por BytesIO ni por una copia en base64.
+    """
+
+    _name = "xlsx.stream.export"
+    _description = "Exportación XLSX en Memoria Constante"
+
+    @api.model
+    def iter_read(self, records, field_names, chunk_size=DEFAULT_CHUNK_SIZE, load=None):
+        """Lee un recordset por bloques con solo los campos indicados
+
+        La caché de cada bloque se libera antes de leer el siguiente, por lo
+        que la memoria no crece con el tamaño del recordset.
+
+        Yields:
+            list: dicts de read() del bloque, en el orden del recordset
+        """
+        for i in range(0, len(records), chunk_size):
+            chunk = records[i : i + chunk_size]
+            yield chunk.read(field_names, load=load)
+            chunk.invalidate_recordset()
+
+    @api.model
+    def create_attachment(
+        self, filename, write_workbook, res_model=False, res_id=0, **vals
+    ):
+        """Genera el libro en un archivo temporal y lo guarda como ir.attachment
+
+        Args:
+            filename (str): Nombre del adjunto
+            write_workbook (callable): Recibe el xlsxwriter.Workbook y escribe las hojas
+            res_model, res_id: Registro al que se liga el adjunto
+            vals: Valores extra para el adjunto (public, etc.)
+
+        Returns:
+            ir.attachment
+        """
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+            try:
+                write_workbook(workbook)
+            finally:
+                workbook.close()
+
+            with open(path, "rb") as xlsx_file:
+                attachment_vals = {
+                    "name": filename,
+                    "type": "binary",
+                    "raw": xlsx_file.read(),
+                    "mimetype": XLSX_MIMETYPE,
+                    "res_model": res_model,
+                    "res_id": res_id,
+                }
+            attachment_vals.update(vals)
+            attachment = self.env["ir.attachment"].create(attachment_vals)
+        finally:
+            os.unlink(path)
+
+        _logger.info(f"📄 Excel generado: {filename} ({attachment.file_size} bytes)")
+        return attachment
+
+    @api.model
+    def iter_workbook(self, write_workbook, block_size=STREAM_BLOCK_SIZE):
+        """Genera el libro en un archivo temporal y lo entrega por bloques
+
+        Pensado para respuestas HTTP en streaming: el libro se escribe al
+        empezar a iterar y el archivo temporal se borra al terminar. Como la
+        respuesta se envía después de cerrar el cursor de la petición,
+        `write_workbook` debe abrir su propio cursor si consulta la base.
+
+        Yields:
+            bytes: bloques del archivo .xlsx
+        """
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+            try:
+                write_workbook(workbook)
+            finally:
+                workbook.close()
+
+            with open(path, "rb") as xlsx_file:
+                while True:
+                    block = xlsx_file.read(block_size)
+                    if not block:
+                        break
+                    yield block
+        finally:
+            os.unlink(path)
+
+    @api.model
+    def download_action(self, attachment):
+        """Acción de descarga directa del adjunto"""
+        return {
+            "type": "ir.actions.act_url",
+            "url": f"/web/content/{attachment.id}?download=true",
+            "target": "self",
+        }